@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class AppointmentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'appointments'
+
+    def ready(self):
+        # Signal wiring only; no database access at startup.
+        from . import cache as window_cache
+        from .signals import appointments_changed
+
+        appointments_changed.connect(
+            window_cache.on_appointments_changed,
+            dispatch_uid="appointments.window_cache",
+        )
@@ -0,0 +1,158 @@
+# backend/appointments/blocks.py
+"""
+Recurring blocks, expanded at read time.
+
+Lunch, admin time and out-of-office patterns are BlockTemplate rows (provider,
+optional location, weekdays, every n-th week, times, date bounds, skipped
+dates) instead of one Appointment per occurrence. Only one-off blocks are
+materialized as Appointment(is_block=True).
+
+Occurrences are computed where they are needed, each from one query for the
+templates involved:
+- schedule windows: the first page of a window request (start_date +
+  end_date) carries the window's occurrences under "blocks", shaped like
+  appointment rows (id null, block_template set) and cached with the page;
+- overlap checks: AppointmentSerializer.validate and bulk moves treat an
+  occurrence like a block row (a template without a location blocks every
+  location);
+- reports: blocked minutes include occurrences.
+
+Template writes send appointments_changed with a series scope for the
+provider, so every cached window of that provider is dropped.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from typing import Iterable, List, Optional
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db.models import Q
+
+from .models import BlockTemplate
+from .signals import AppointmentScope, notify_appointments_changed
+
+
+UTC = ZoneInfo("UTC")
+
+
+@dataclass(frozen=True)
+class Occurrence:
+    template: BlockTemplate
+    date: date
+
+    @property
+    def start_time(self) -> time:
+        return self.template.start_time
+
+    @property
+    def end_time(self) -> time:
+        return self.template.end_time
+
+    def applies_at(self, office: Optional[str]) -> bool:
+        location = self.template.location
+        return location is None or office is None or location.slug == office
+
+    def as_row(self) -> dict:
+        """The occurrence in the shape of an AppointmentSerializer row."""
+        tpl = self.template
+        zone = tpl.location.timezone if tpl.location_id else settings.TIME_ZONE
+        start = datetime.combine(self.date, tpl.start_time, ZoneInfo(zone))
+        end = datetime.combine(self.date, tpl.end_time, ZoneInfo(zone))
+        return {
+            "id": None,
+            "block_template": tpl.pk,
+            "patient": None,
+            "provider": tpl.provider_id,
+            "provider_name": str(tpl.provider),
+            "office": tpl.location.slug if tpl.location_id else None,
+            "appointment_type": tpl.label,
+            "is_block": True,
+            "color_code": tpl.color_code,
+            "date": self.date.isoformat(),
+            "start_time": tpl.start_time.isoformat(),
+            "end_time": tpl.end_time.isoformat(),
+            "duration": tpl.duration,
+            "timezone": zone,
+            "start_utc": start.astimezone(UTC).isoformat().replace("+00:00", "Z"),
+            "end_utc": end.astimezone(UTC).isoformat().replace("+00:00", "Z"),
+        }
+
+
+# -----------------------------
+# Expansion
+# -----------------------------
+
+def templates(start: date, end: date, provider_ids: Optional[Iterable[int]] = None, office: Optional[str] = None):
+    """Templates of the current practice that may occur in [start, end]."""
+    qs = BlockTemplate.objects.filter(
+        Q(end_date__isnull=True) | Q(end_date__gte=start), start_date__lte=end,
+    ).select_related("provider", "location")
+    if provider_ids is not None:
+        qs = qs.filter(provider_id__in=list(provider_ids))
+    if office:
+        qs = qs.filter(Q(location__isnull=True) | Q(location__slug__iexact=office))
+    return qs
+
+
+def occurrences(start: date, end: date, provider_ids=None, office=None, queryset=None) -> List[Occurrence]:
+    found = [
+        Occurrence(tpl, day)
+        for tpl in (queryset if queryset is not None else templates(start, end, provider_ids, office))
+        for day in tpl.dates(start, end)
+    ]
+    found.sort(key=lambda o: (o.date, o.start_time, o.template.provider_id, o.template.pk))
+    return found
+
+
+def overlapping(provider_id: int, day: date, office: Optional[str], start: time, end: time) -> Optional[Occurrence]:
+    """A template block of the provider overlapping [start, end) on `day` at `office`, if any."""
+    for occ in occurrences(day, day, [provider_id], office):
+        if occ.start_time < end and occ.end_time > start:
+            return occ
+    return None
+
+
+# -----------------------------
+# Schedule windows
+# -----------------------------
+
+def _window(params):
+    try:
+        start = date.fromisoformat(params.get("start_date") or "")
+        end = date.fromisoformat(params.get("end_date") or "")
+    except ValueError:
+        return None
+    if end < start or params.get("page", "1") != "1":
+        return None
+    provider_ids = set(params.getlist("providers"))
+    if params.get("provider"):
+        provider_ids.add(params["provider"])
+    try:
+        provider_ids = sorted(int(p) for p in provider_ids if p.strip()) or None
+    except ValueError:
+        return None
+    return start, end, provider_ids, (params.get("office") or "").strip() or None
+
+
+def add_to_window(request, data) -> None:
+    """Attach the window's template occurrences to a (first) window page."""
+    window = _window(request.query_params)
+    if window is None or not isinstance(data, dict):
+        return
+    data["blocks"] = [occ.as_row() for occ in occurrences(*window)]
+
+
+# -----------------------------
+# Invalidation
+# -----------------------------
+
+def template_changed(*templates: BlockTemplate) -> None:
+    """Drop every cached window of the templates' providers (on commit)."""
+    notify_appointments_changed([
+        AppointmentScope(
+            provider_id=tpl.provider_id, date=tpl.start_date, is_recurring=True, practice_id=tpl.practice_id,
+        )
+        for tpl in templates
+    ])
@@ -0,0 +1,305 @@
+# backend/appointments/bulk.py
+"""
+Bulk moves: shift, reassign or re-date many appointments in one request.
+
+    POST /api/appointments/bulk-move/
+    {
+      "ids": [1, 2, 3],                          # a selection, or
+      "provider": 7,                             # a provider's day or range
+      "start_date": "2026-03-09", "end_date": "2026-03-13",
+
+      "shift_minutes": 30,                       # any combination of these
+      "to_provider": 9,
+      "to_date": "2026-03-16",
+
+      "allow_overlap": false,
+      "dry_run": true
+    }
+
+A (provider, range) selection takes that provider's patient appointments that
+still hold their time (no blocks, no cancelled or no-show rows); `ids` takes
+exactly the rows named, and any of those kinds among them is a problem. to_date
+moves the selection's first day to that date; later days keep their distance
+from it.
+
+plan() works out where every row lands. problems() checks the whole plan in
+one query against the rest of the schedule (the AppointmentSerializer rule:
+same provider, date and office with overlapping times; cancelled and no-show
+rows don't count), in one query against the providers' recurring blocks
+(appointments/blocks.py) and in memory against itself. Rows handed to another
+provider must also land in that provider's hours at the row's location
+(Provider.locations, LocationHours): two more queries, only for reassignments. apply() writes the plan with
+one bulk_update in a transaction, or nothing at all if any row has a problem.
+A dry run stops after problems(), so the preview is exactly what apply() would
+check.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core import audit
+from locations.models import WEEKDAYS, LocationHours
+from providers.models import Provider
+
+from . import blocks
+from .models import Appointment
+from .signals import FREED_STATUSES, notify_appointments_changed, scope_of
+
+
+MOVED_FIELDS = ["provider", "date", "start_time", "end_time"]
+
+
+@dataclass
+class Move:
+    appointment: Appointment
+    provider_id: int
+    date: date
+    start_time: Optional[time]
+    end_time: Optional[time]
+
+    def as_dict(self) -> dict:
+        appt = self.appointment
+        return {
+            "id": appt.pk,
+            "provider": self.provider_id,
+            "date": _iso(self.date),
+            "start_time": _iso(self.start_time),
+            "end_time": _iso(self.end_time),
+            "from": {
+                "provider": appt.provider_id,
+                "date": appt.date.isoformat(),
+                "start_time": _iso(appt.start_time),
+                "end_time": _iso(appt.end_time),
+            },
+        }
+
+
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+# -----------------------------
+# Selection + plan
+# -----------------------------
+
+def select(ids=None, provider=None, start_date=None, end_date=None, for_update=False) -> List[Appointment]:
+    if ids:
+        qs = Appointment.objects.filter(pk__in=ids)
+    else:
+        qs = Appointment.objects.filter(
+            provider=provider, date__gte=start_date, date__lte=end_date,
+            is_block=False, patient__isnull=False,
+        ).exclude(status__in=FREED_STATUSES)
+    if for_update:
+        qs = qs.select_for_update()
+    return list(qs.order_by("date", "start_time", "pk"))
+
+
+def _shift(day: date, value: Optional[time], minutes: int):
+    """(day, time) moved by `minutes`; the day is None if it leaves `day`."""
+    if value is None or not minutes:
+        return day, value
+    moved = datetime.combine(day, value) + timedelta(minutes=minutes)
+    return (day if moved.date() == day else None), moved.time()
+
+
+def plan(appointments: Iterable[Appointment], shift_minutes: int = 0,
+         to_provider: Optional[int] = None, to_date: Optional[date] = None) -> List[Move]:
+    appointments = list(appointments)
+    day_offset = timedelta()
+    if to_date is not None and appointments:
+        day_offset = to_date - min(a.date for a in appointments)
+
+    moves = []
+    for appt in appointments:
+        day = appt.date + day_offset
+        start_day, start = _shift(day, appt.start_time, shift_minutes)
+        end_day, end = _shift(day, appt.end_time, shift_minutes)
+        moves.append(Move(
+            appointment=appt,
+            provider_id=to_provider or appt.provider_id,
+            # A time pushed past midnight is reported by problems().
+            date=day if start_day is not None and end_day is not None else None,
+            start_time=start,
+            end_time=end,
+        ))
+    return moves
+
+
+# -----------------------------
+# Checks
+# -----------------------------
+
+def problems(moves: List[Move], allow_overlap: bool = False) -> Dict[int, List[str]]:
+    """appointment id -> reasons it can't move; empty if the plan can be applied."""
+    found: Dict[int, List[str]] = {}
+
+    def add(appt_id, reason):
+        found.setdefault(appt_id, []).append(reason)
+
+    timed = []
+    for move in moves:
+        appt = move.appointment
+        # What a (provider, range) selection leaves out, named by id.
+        if appt.is_block or appt.patient_id is None:
+            add(appt.pk, "Not a patient appointment.")
+        elif appt.status in FREED_STATUSES:
+            add(appt.pk, f"Appointment is {appt.get_status_display().lower()}.")
+        elif move.date is None:
+            add(appt.pk, "Would move past midnight.")
+        elif appt.status == "in_room" and move.date != appt.date:
+            add(appt.pk, "Patient is in a room.")
+        elif move.start_time is not None and move.end_time is not None:
+            timed.append(move)
+
+    reassigned = [m for m in timed if m.provider_id != m.appointment.provider_id and m.appointment.location_id]
+    for appt_id, reason in _hours_problems(reassigned):
+        add(appt_id, reason)
+
+    if allow_overlap or not timed:
+        return found
+
+    for appt_id, other_id, office in _schedule_conflicts(timed):
+        add(appt_id, f"Overlaps appointment #{other_id} in {office}.")
+    for appt_id, occ in _template_conflicts(timed):
+        add(appt_id, f"Overlaps {occ.template.label} ({occ.start_time:%H:%M}-{occ.end_time:%H:%M}).")
+    for appt_id, other_id, office in _plan_conflicts(timed):
+        add(appt_id, f"Overlaps appointment #{other_id} in {office}, also being moved.")
+    return found
+
+
+def _hours_problems(moves: List[Move]):
+    """Rows outside their new provider's hours at the row's location."""
+    if not moves:
+        return
+    works_at: Dict[int, set] = {}
+    for provider_id, location_id in Provider.locations.through.objects.filter(
+        provider_id__in={m.provider_id for m in moves},
+    ).values_list("provider_id", "location_id"):
+        works_at.setdefault(provider_id, set()).add(location_id)
+    hours = {
+        (h.location_id, h.weekday): h
+        for h in LocationHours.objects.filter(location_id__in={m.appointment.location_id for m in moves})
+    }
+
+    for move in moves:
+        location_id = move.appointment.location_id
+        weekday = WEEKDAYS[move.date.weekday()]
+        day = hours.get((location_id, weekday))
+        if move.provider_id in works_at and location_id not in works_at[move.provider_id]:
+            yield move.appointment.pk, "Provider has no hours at this location."
+        elif day is not None and not day.open:
+            yield move.appointment.pk, f"Location is closed on {weekday.title()}."
+        elif day is not None and (move.start_time < day.start or move.end_time > day.end):
+            yield move.appointment.pk, f"Outside location hours ({day.start:%H:%M}-{day.end:%H:%M})."
+
+
+def _schedule_conflicts(moves: List[Move]):
+    """Overlaps with rows that stay put: one join of the plan against the table."""
+    table = connection.ops.quote_name(Appointment._meta.db_table)
+    columns = list(zip(*(
+        (m.appointment.pk, m.provider_id, m.date, m.appointment.office, m.start_time, m.end_time)
+        for m in moves
+    )))
+    sql = f"""
+        SELECT m.id, a.id, a.office
+        FROM unnest(%s::bigint[], %s::bigint[], %s::date[], %s::text[], %s::time[], %s::time[])
+             AS m(id, provider_id, date, office, start_time, end_time)
+        JOIN {table} a
+          ON a.provider_id = m.provider_id AND a.date = m.date AND a.office = m.office
+         AND a.start_time < m.end_time AND a.end_time > m.start_time
+        WHERE a.id <> ALL(%s::bigint[]) AND a.status <> ALL(%s::text[])
+        ORDER BY m.id, a.id
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*map(list, columns), list(columns[0]), list(FREED_STATUSES)])
+        return cursor.fetchall()
+
+
+def _template_conflicts(moves: List[Move]):
+    """Overlaps with recurring blocks: the involved templates in one query, matched in memory."""
+    by_provider: Dict[int, list] = {}
+    for tpl in blocks.templates(
+        min(m.date for m in moves), max(m.date for m in moves), {m.provider_id for m in moves},
+    ):
+        by_provider.setdefault(tpl.provider_id, []).append(tpl)
+
+    for move in moves:
+        for tpl in by_provider.get(move.provider_id, ()):
+            occ = blocks.Occurrence(tpl, move.date)
+            if (
+                tpl.start_time < move.end_time and tpl.end_time > move.start_time
+                and occ.applies_at(move.appointment.office) and tpl.occurs_on(move.date)
+            ):
+                yield move.appointment.pk, occ
+                break
+
+
+def _plan_conflicts(moves: List[Move]):
+    """Overlaps among the moved rows themselves (e.g. two providers merged into one)."""
+    lanes: Dict[tuple, List[Move]] = {}
+    for move in moves:
+        lanes.setdefault((move.provider_id, move.date, move.appointment.office), []).append(move)
+
+    for (_provider, _day, office), lane in lanes.items():
+        lane.sort(key=lambda m: (m.start_time, m.appointment.pk))
+        latest = None
+        for move in lane:
+            if latest is not None and move.start_time < latest.end_time:
+                yield move.appointment.pk, latest.appointment.pk, office
+            if latest is None or move.end_time > latest.end_time:
+                latest = move
+
+
+# -----------------------------
+# Apply
+# -----------------------------
+
+def apply(request_or_user, moves: List[Move]) -> None:
+    """Write a checked plan (caller holds the row locks from select(for_update=True))."""
+    before = {m.appointment.pk: (scope_of(m.appointment), audit.snapshot(m.appointment)) for m in moves}
+
+    now = timezone.now()
+    changed = []
+    for move in moves:
+        appt = move.appointment
+        appt.provider_id, appt.date = move.provider_id, move.date
+        appt.start_time, appt.end_time = move.start_time, move.end_time
+        # bulk_update skips auto_now; reminders rescan moved rows by updated_at.
+        appt.updated_at = now
+        changed.append(appt)
+    Appointment.objects.bulk_update(changed, MOVED_FIELDS + ["updated_at"])
+
+    scopes = []
+    for appt in changed:
+        scope, old_values = before[appt.pk]
+        scopes += [scope, scope_of(appt)]
+        audit.updated(request_or_user, appt, old_values, metadata={"bulk": "move"})
+    notify_appointments_changed(scopes)
+
+
+def move(request_or_user, *, shift_minutes=0, to_provider=None, to_date=None,
+         allow_overlap=False, dry_run=False, **selection) -> dict:
+    """Select, plan, check and (unless dry_run or a problem is found) apply."""
+    with transaction.atomic():
+        moves = plan(
+            select(for_update=not dry_run, **selection),
+            shift_minutes=shift_minutes, to_provider=to_provider, to_date=to_date,
+        )
+        found = problems(moves, allow_overlap=allow_overlap)
+        result = {
+            "dry_run": dry_run,
+            "applied": False,
+            "count": len(moves),
+            "moves": [m.as_dict() for m in moves],
+            "conflicts": [{"id": pk, "reasons": reasons} for pk, reasons in sorted(found.items())],
+        }
+        if not dry_run and not found and moves:
+            apply(request_or_user, moves)
+            result["applied"] = True
+    return result
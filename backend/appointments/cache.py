@@ -0,0 +1,299 @@
+# backend/appointments/cache.py
+"""
+Shared response cache for schedule windows.
+
+Every workstation in a clinic polls the same (office, providers, week) windows of
+GET /api/appointments/?start_date=...&end_date=..., so the serialized page is cached
+under a key built from the normalized query parameters plus the current version
+token of every tag the window covers:
+
+  p{provider}:{date}    one per provider per day (windows filtered by provider)
+  *:{date}              one per day (windows across all providers)
+  p{provider}:series    recurring rows of that provider
+  *:series              recurring rows of any provider
+  all                   everything in the practice (demo reset, bulk writes)
+
+Every tag is namespaced by practice (t{practice}:...; core/tenancy.py), so one
+practice's writes never invalidate another's windows, and so is the entry key.
+The global "all" tag drops every practice's windows (unscoped bulk writes).
+
+Writes never delete entries: they give the tags they touch a new token (via the
+appointments_changed signal), so keys built from the old token are never looked
+up again and simply expire. Each lookup is one get_many for the tags plus one get
+for the entry, which works the same on any Django cache backend (locmem, file,
+redis). A hit is returned without touching the ORM.
+
+Calendar feeds (appointments/feeds.py) key their entries on the same tags
+through tag_tokens() and provider_tags().
+
+Windows, feeds and room boards also show patient and provider names, so
+patient and provider edits bump tags too (patient_changed / provider_changed):
+a patient's provider-day tags, or a provider's whole practice.
+
+With read replicas a window can be read from a lagging replica just after a write
+by another user; WINDOW_CACHE_TIMEOUT bounds how long such an entry is served.
+"""
+from __future__ import annotations
+
+import hashlib
+import uuid
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core import metrics, tenancy
+
+from .signals import AppointmentScope
+
+
+KEY_PREFIX = "appt-window"
+ALL_TAG = "all"
+
+# Query parameters whose values are sets (order-insensitive).
+_LIST_PARAMS = {"providers"}
+
+
+# -----------------------------
+# Tags
+# -----------------------------
+
+def _tag_key(tag: str) -> str:
+    return f"{KEY_PREFIX}:tag:{tag}"
+
+
+def _new_token() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def _practice_tag(practice_id, tag: str) -> str:
+    return f"t{practice_id}:{tag}"
+
+
+def tags_for_scopes(scopes: Iterable[AppointmentScope]) -> set:
+    tags = set()
+    for scope in scopes:
+        practice_id = scope.practice_id or tenancy.current_practice_id()
+        day = scope.date.isoformat()
+        tags.add(_practice_tag(practice_id, f"p{scope.provider_id}:{day}"))
+        tags.add(_practice_tag(practice_id, f"*:{day}"))
+        if scope.is_recurring:
+            tags.add(_practice_tag(practice_id, f"p{scope.provider_id}:series"))
+            tags.add(_practice_tag(practice_id, "*:series"))
+    return tags
+
+
+def bump_tags(tags: Iterable[str]) -> None:
+    tags = list(tags)
+    if tags:
+        cache.set_many({_tag_key(t): _new_token() for t in tags}, timeout=None)
+
+
+def invalidate(scopes: Optional[Iterable[AppointmentScope]]) -> None:
+    if scopes is None:
+        practice_id = tenancy.current_practice_id()
+        bump_tags([ALL_TAG if practice_id is None else _practice_tag(practice_id, ALL_TAG)])
+    else:
+        bump_tags(tags_for_scopes(scopes))
+
+
+def on_appointments_changed(sender, scopes=None, **kwargs) -> None:
+    invalidate(scopes)
+
+
+# -----------------------------
+# Patients + providers
+# -----------------------------
+
+# Fields shown with appointments (names, initials, DOB, gender).
+PATIENT_FIELDS = {"first_name", "last_name", "date_of_birth", "gender"}
+PROVIDER_FIELDS = {"first_name", "last_name"}
+
+
+def appointment_scopes(**filters) -> List[AppointmentScope]:
+    """One scope per provider-day of the matching appointments (one query); for deletes that cascade."""
+    from .models import Appointment
+
+    rows = (
+        Appointment.all_objects.filter(**filters)
+        .values_list("provider_id", "date", "is_recurring", "practice_id").distinct()
+    )
+    return [AppointmentScope(p, d, bool(r), t) for p, d, r, t in rows]
+
+
+def occupied_locations(**filters) -> List[int]:
+    """Locations whose room board shows one of the matching appointments."""
+    from .models import Appointment
+    from .rooms import IN_ROOM
+
+    return list(
+        Appointment.all_objects.filter(status=IN_ROOM, **filters)
+        .values_list("location_id", flat=True).distinct()
+    )
+
+
+def patient_changed(patient, changed_fields: Iterable[str]) -> None:
+    """Drop the windows, feeds and room boards showing this patient (on commit)."""
+    if not PATIENT_FIELDS.intersection(changed_fields):
+        return
+    from . import rooms
+
+    tags = tags_for_scopes(appointment_scopes(patient_id=patient.pk))
+    transaction.on_commit(lambda: bump_tags(tags))
+    rooms.notify_changed(occupied_locations(patient_id=patient.pk))
+
+
+def provider_changed(provider, changed_fields: Iterable[str]) -> None:
+    """Drop every window and feed of the provider's practice, and the boards showing them (on commit)."""
+    if not PROVIDER_FIELDS.intersection(changed_fields):
+        return
+    from . import rooms
+
+    tag = _practice_tag(provider.practice_id, ALL_TAG)
+    transaction.on_commit(lambda: bump_tags([tag]))
+    rooms.notify_changed(occupied_locations(provider_id=provider.pk))
+
+
+# -----------------------------
+# Window keys
+# -----------------------------
+
+def _parse_date(value: str) -> Optional[date]:
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def window_plan(request) -> Optional[Tuple[str, List[str]]]:
+    """
+    Normalized parameter string and tag list for a cacheable window request,
+    or None if the request isn't a bounded date window. Does no I/O.
+    """
+    if not settings.WINDOW_CACHE_ENABLED or request.method != "GET":
+        return None
+
+    params = request.query_params
+    start = _parse_date(params.get("start_date"))
+    end = _parse_date(params.get("end_date"))
+    if not start or not end or end < start:
+        return None
+    if (end - start).days >= settings.WINDOW_CACHE_MAX_DAYS:
+        return None
+
+    normalized = []
+    for name in sorted(params.keys()):
+        values = [v.strip() for v in params.getlist(name) if v.strip()]
+        if name == "office":
+            values = [v.lower() for v in values]
+        if name in _LIST_PARAMS:
+            values = sorted(set(values))
+        if values:
+            normalized.append(f"{name}={','.join(values)}")
+
+    provider_ids = set(params.getlist("providers"))
+    if params.get("provider"):
+        provider_ids.add(params["provider"])
+    provider_ids = sorted(p.strip() for p in provider_ids if p.strip())
+
+    days = [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+    if provider_ids:
+        tags = [f"p{p}:{d}" for p in provider_ids for d in days]
+        tags += [f"p{p}:series" for p in provider_ids]
+    else:
+        tags = [f"*:{d}" for d in days]
+    # Unfiltered-by-provider series changes also reach provider-filtered windows.
+    tags += ["*:series", ALL_TAG]
+
+    practice_id = tenancy.current_practice_id()
+    tags = [_practice_tag(practice_id, t) for t in tags] + [ALL_TAG]
+
+    # Pagination links are absolute URLs.
+    identity = f"{tenancy.cache_namespace()}|{request.get_host()}?{'&'.join(normalized)}"
+    return identity, tags
+
+
+def _resolve_tokens(tags: List[str], found: dict) -> Tuple[List[str], dict]:
+    tokens, missing = [], {}
+    for tag in tags:
+        key = _tag_key(tag)
+        token = found.get(key)
+        if token is None:
+            # A tag with no token yet (or evicted) gets a fresh one, which no
+            # existing entry can match.
+            token = missing[key] = _new_token()
+        tokens.append(token)
+    return tokens, missing
+
+
+def tag_tokens(tags: List[str]) -> List[str]:
+    """Current token of each tag (one get_many); used by other caches keyed on the same tags."""
+    tokens, missing = _resolve_tokens(tags, cache.get_many([_tag_key(t) for t in tags]))
+    if missing:
+        cache.set_many(missing, timeout=None)
+    return tokens
+
+
+def provider_tags(practice_id, provider_id, days: List[date]) -> Tuple[List[str], List[str]]:
+    """(one tag per day, tags covering every day) of one provider's schedule."""
+    day_tags = [_practice_tag(practice_id, f"p{provider_id}:{d.isoformat()}") for d in days]
+    shared = [
+        _practice_tag(practice_id, f"p{provider_id}:series"),
+        _practice_tag(practice_id, "*:series"),
+        _practice_tag(practice_id, ALL_TAG),
+        ALL_TAG,
+    ]
+    return day_tags, shared
+
+
+def _entry_key(identity: str, tokens: List[str]) -> str:
+    digest = hashlib.sha1(identity.encode("utf-8"))
+    for token in tokens:
+        digest.update(b"|" + token.encode("ascii"))
+    return f"{KEY_PREFIX}:entry:{digest.hexdigest()}"
+
+
+def window_key(request) -> Optional[str]:
+    """
+    Cache key for a window request, or None if it isn't cacheable.
+    Computed *before* the query runs: if a write lands meanwhile, the response
+    is stored under the superseded tokens and never served.
+    """
+    plan = window_plan(request)
+    if plan is None:
+        return None
+    identity, tags = plan
+    return _entry_key(identity, tag_tokens(tags))
+
+
+async def awindow_key(request) -> Optional[str]:
+    plan = window_plan(request)
+    if plan is None:
+        return None
+    identity, tags = plan
+    tokens, missing = _resolve_tokens(tags, await cache.aget_many([_tag_key(t) for t in tags]))
+    if missing:
+        await cache.aset_many(missing, timeout=None)
+    return _entry_key(identity, tokens)
+
+
+def get_window(key: str):
+    data = cache.get(key)
+    metrics.record_cache("appointment_window", data is not None)
+    return data
+
+
+def set_window(key: str, data) -> None:
+    cache.set(key, data, timeout=settings.WINDOW_CACHE_TIMEOUT)
+
+
+async def aget_window(key: str):
+    data = await cache.aget(key)
+    metrics.record_cache("appointment_window", data is not None)
+    return data
+
+
+async def aset_window(key: str, data) -> None:
+    await cache.aset(key, data, timeout=settings.WINDOW_CACHE_TIMEOUT)
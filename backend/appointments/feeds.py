@@ -0,0 +1,273 @@
+# backend/appointments/feeds.py
+"""
+iCalendar subscription feeds.
+
+    GET /api/feeds/<token>.ics
+
+A CalendarFeed is a provider's schedule (optionally one location) as a
+tokenized .ics URL that calendar apps poll every few minutes. Events carry no
+notes, complaints or patient names: the summary is the appointment type
+(plus the patient's initials with CALENDAR_FEED_SHOW_INITIALS), events are
+CLASS:PRIVATE, and times are UTC so no VTIMEZONE is needed. Cancelled and
+no-show rows are left out; blocks and recurring blocks (appointments/blocks.py)
+are included so the calendar shows when the provider is busy.
+
+Feeds cover CALENDAR_FEED_PAST_DAYS before today to CALENDAR_FEED_FUTURE_DAYS
+after it, and are cached on the schedule-window tags (appointments/cache.py):
+
+- the ETag hashes the current token of every day tag of the provider plus
+  the series/all tags, so a poll with a matching If-None-Match is answered
+  304 after a token lookup and one get_many, without touching the ORM;
+- the rendered body is cached under the ETag;
+- each day's events are cached separately under that day's token, so after
+  a write only the days whose tags were bumped are queried and rendered
+  again (one query for their appointments, one for templates).
+
+Token -> feed lookups are cached too; rotating or deleting a feed forgets them.
+"""
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from core import metrics, tenancy
+
+from . import blocks
+from . import cache as window_cache
+from .models import Appointment, CalendarFeed
+from .signals import FREED_STATUSES
+
+
+KEY_PREFIX = "appt-feed"
+UTC = ZoneInfo("UTC")
+PRODID = "-//Schedule//Provider calendar feed//EN"
+
+
+@dataclass(frozen=True)
+class Feed:
+    """What a poll needs to know about a CalendarFeed (cached per token)."""
+    id: int
+    practice_id: int
+    provider_id: int
+    location_id: Optional[int]
+    name: str
+
+
+@dataclass(frozen=True)
+class Plan:
+    feed: Feed
+    days: List[date]
+    day_tokens: List[str]
+    shared_token: str
+    etag: str
+
+
+# -----------------------------
+# Tokens
+# -----------------------------
+
+def _token_key(token: str) -> str:
+    return f"{KEY_PREFIX}:token:{hashlib.sha1(token.encode('utf-8')).hexdigest()}"
+
+
+def lookup(token: str) -> Optional[Feed]:
+    key = _token_key(token)
+    feed = cache.get(key)
+    metrics.record_cache("calendar_feed_token", feed is not None)
+    if feed is not None:
+        return feed
+
+    row = CalendarFeed.all_objects.select_related("provider", "location").filter(token=token).first()
+    if row is None:
+        return None
+    name = f"{row.provider.first_name} {row.provider.last_name}"
+    if row.location_id:
+        name = f"{name} ({row.location.name})"
+    feed = Feed(row.pk, row.practice_id, row.provider_id, row.location_id, name)
+    cache.set(key, feed, timeout=settings.CALENDAR_FEED_CACHE_TIMEOUT)
+    return feed
+
+
+def forget(*tokens: str) -> None:
+    cache.delete_many([_token_key(t) for t in tokens])
+
+
+# -----------------------------
+# ETag + body
+# -----------------------------
+
+def feed_days(today: date) -> List[date]:
+    start = today - timedelta(days=settings.CALENDAR_FEED_PAST_DAYS)
+    return [start + timedelta(days=i) for i in range(settings.CALENDAR_FEED_PAST_DAYS + settings.CALENDAR_FEED_FUTURE_DAYS + 1)]
+
+
+def plan(feed: Feed) -> Plan:
+    """The feed's current ETag; one cache round trip, no queries."""
+    days = feed_days(timezone.localdate())
+    day_tags, shared_tags = window_cache.provider_tags(feed.practice_id, feed.provider_id, days)
+    tokens = window_cache.tag_tokens(day_tags + shared_tags)
+    day_tokens, shared_token = tokens[:len(day_tags)], "|".join(tokens[len(day_tags):])
+
+    digest = hashlib.sha1(f"{feed.id}|{feed.location_id}|{feed.name}|{days[0]}|{shared_token}".encode("utf-8"))
+    for token in day_tokens:
+        digest.update(b"|" + token.encode("ascii"))
+    return Plan(feed, days, day_tokens, shared_token, digest.hexdigest())
+
+
+def body(plan: Plan) -> str:
+    key = f"{KEY_PREFIX}:body:{plan.etag}"
+    text = cache.get(key)
+    metrics.record_cache("calendar_feed", text is not None)
+    if text is None:
+        text = _assemble(plan)
+        cache.set(key, text, timeout=settings.CALENDAR_FEED_CACHE_TIMEOUT)
+    return text
+
+
+def _day_key(feed: Feed, day: date, token: str, shared_token: str) -> str:
+    digest = hashlib.sha1(f"{token}|{shared_token}".encode("ascii")).hexdigest()
+    return f"{KEY_PREFIX}:day:{feed.practice_id}:{feed.provider_id}:{feed.location_id or '*'}:{day}:{digest}"
+
+
+def _assemble(plan: Plan) -> str:
+    feed = plan.feed
+    keys = [_day_key(feed, d, t, plan.shared_token) for d, t in zip(plan.days, plan.day_tokens)]
+    chunks = cache.get_many(keys)
+    missing = [d for d, k in zip(plan.days, keys) if k not in chunks]
+    if missing:
+        rendered = _render_days(feed, missing)
+        fresh = {k: rendered[d] for d, k in zip(plan.days, keys) if d in rendered}
+        cache.set_many(fresh, timeout=settings.CALENDAR_FEED_CACHE_TIMEOUT)
+        chunks.update(fresh)
+
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_text(feed.name)}",
+        f"REFRESH-INTERVAL;VALUE=DURATION:PT{settings.CALENDAR_FEED_REFRESH_MINUTES}M",
+        f"X-PUBLISHED-TTL:PT{settings.CALENDAR_FEED_REFRESH_MINUTES}M",
+    ]
+    text = "\r\n".join(_fold(line) for line in lines) + "\r\n"
+    text += "".join(chunks[k] for k in keys)
+    return text + "END:VCALENDAR\r\n"
+
+
+# -----------------------------
+# Rendering
+# -----------------------------
+
+def _render_days(feed: Feed, days: List[date]) -> Dict[date, str]:
+    """VEVENT text per day, for the days not in the cache."""
+    events: Dict[date, List[str]] = {d: [] for d in days}
+    with tenancy.use_practice(feed.practice_id):
+        qs = (
+            Appointment.objects.filter(provider_id=feed.provider_id, date__in=days)
+            .exclude(status__in=FREED_STATUSES)
+            .select_related("patient", "location")
+            .order_by("date", "start_time", "pk")
+        )
+        if feed.location_id:
+            qs = qs.filter(location_id=feed.location_id)
+        for appt in qs:
+            if appt.start_utc is not None and appt.end_utc is not None:
+                events[appt.date].append(_appointment_event(appt))
+
+        for occ in blocks.occurrences(min(days), max(days), [feed.provider_id]):
+            if occ.date not in events:
+                continue
+            if feed.location_id and occ.template.location_id not in (None, feed.location_id):
+                continue
+            events[occ.date].append(_occurrence_event(occ))
+
+    return {d: "".join(lines) for d, lines in events.items()}
+
+
+def _appointment_event(appt: Appointment) -> str:
+    if appt.is_block or appt.patient_id is None:
+        summary = appt.appointment_type or "Blocked"
+    else:
+        summary = appt.appointment_type or "Appointment"
+        if settings.CALENDAR_FEED_SHOW_INITIALS:
+            summary = f"{summary} ({_initials(appt.patient)})"
+    return _event(
+        uid=f"appointment-{appt.pk}",
+        start=appt.start_utc,
+        end=appt.end_utc,
+        stamp=appt.updated_at,
+        summary=summary,
+        location=appt.location.name if appt.location_id else appt.office,
+        status="TENTATIVE" if appt.status == "tentative" else "CONFIRMED",
+    )
+
+
+def _occurrence_event(occ: blocks.Occurrence) -> str:
+    tpl = occ.template
+    zone = ZoneInfo(tpl.location.timezone if tpl.location_id else settings.TIME_ZONE)
+    return _event(
+        uid=f"block-{tpl.pk}-{occ.date:%Y%m%d}",
+        start=datetime.combine(occ.date, tpl.start_time, zone),
+        end=datetime.combine(occ.date, tpl.end_time, zone),
+        stamp=tpl.updated_at,
+        summary=tpl.label,
+        location=tpl.location.name if tpl.location_id else "",
+        status="CONFIRMED",
+    )
+
+
+def _initials(patient) -> str:
+    return "".join(f"{n[0]}." for n in (patient.first_name, patient.last_name) if n).upper()
+
+
+def _event(*, uid, start, end, stamp, summary, location, status) -> str:
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}@{settings.CALENDAR_FEED_UID_DOMAIN}",
+        f"DTSTAMP:{_utc(stamp)}",
+        f"DTSTART:{_utc(start)}",
+        f"DTEND:{_utc(end)}",
+        f"SUMMARY:{_text(summary)}",
+        "CLASS:PRIVATE",
+        f"STATUS:{status}",
+    ]
+    if location:
+        lines.append(f"LOCATION:{_text(location)}")
+    lines.append("END:VEVENT")
+    return "".join(_fold(line) + "\r\n" for line in lines)
+
+
+def _utc(value: datetime) -> str:
+    return value.astimezone(UTC).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _text(value: str) -> str:
+    """RFC 5545 TEXT escaping."""
+    return (
+        str(value).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Fold lines longer than 75 octets (RFC 5545 3.1), never inside a UTF-8 sequence."""
+    if len(line.encode("utf-8")) <= 75:
+        return line
+    parts, current, size = [], "", 0
+    for char in line:
+        width = len(char.encode("utf-8"))
+        if size + width > (75 if not parts else 74):
+            parts.append(current)
+            current, size = "", 0
+        current += char
+        size += width
+    parts.append(current)
+    return "\r\n ".join(parts)
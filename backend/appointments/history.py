@@ -0,0 +1,136 @@
+# backend/appointments/history.py
+"""
+A patient's appointment history.
+
+    GET /api/patients/<id>/appointments/
+    GET /api/patients/<id>/appointments/?when=past&cursor=<next>&page_size=50
+
+The first request returns the summary and the first page of both lists:
+
+    {
+      "patient": 12,
+      "today": "2026-10-19",
+      "summary": {"visits": 9, "no_shows": 1, "cancelled": 2, "upcoming": 1, "last_seen": "2026-09-30"},
+      "upcoming": {"results": [...], "next": null},
+      "past": {"results": [...], "next": "...?when=past&cursor=..."}
+    }
+
+Following a `next` link returns that list only. The split is by instant:
+upcoming starts at or after now (start_utc), soonest first; past started
+before now, latest first. Rows without a start time have no start_utc and
+stay upcoming through the whole of their date (in the server's TIME_ZONE).
+
+Pages are keyset-paginated on (date, start_time, id): the cursor is the last
+row's key, so page n costs the same as page 1 on the (patient, -date) index.
+Each list is one query joining provider and location; the summary is one
+aggregate over the patient's rows. A visit is a past appointment the patient
+arrived for (arrived, in lobby, in room or seen).
+"""
+from __future__ import annotations
+
+import base64
+from datetime import date, datetime, time
+from typing import Optional, Tuple
+
+from django.db.models import Count, F, Max, Q
+from django.utils import timezone
+
+from .models import Appointment
+from .signals import FREED_STATUSES
+
+
+UPCOMING = "upcoming"
+PAST = "past"
+ATTENDED_STATUSES = ("arrived", "in_lobby", "in_room", "seen")
+
+Key = Tuple[date, Optional[time], int]
+
+
+class CursorError(ValueError):
+    pass
+
+
+# -----------------------------
+# Cursors
+# -----------------------------
+
+def encode_cursor(appt: Appointment) -> str:
+    raw = f"{appt.date.isoformat()}|{appt.start_time.isoformat() if appt.start_time else ''}|{appt.pk}"
+    return base64.urlsafe_b64encode(raw.encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Key:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        day, start, pk = raw.split("|")
+        return date.fromisoformat(day), (time.fromisoformat(start) if start else None), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise CursorError("Invalid cursor.")
+
+
+def _after(key: Key, descending: bool) -> Q:
+    """Rows after `key` in (date, start_time, id) order; NULL times sort first ascending, last descending."""
+    day, start, pk = key
+    later_day = Q(date__lt=day) if descending else Q(date__gt=day)
+    past_id = Q(pk__lt=pk) if descending else Q(pk__gt=pk)
+    if start is None:
+        same_day = Q(start_time__isnull=True) & past_id
+        if not descending:
+            same_day |= Q(start_time__isnull=False)
+    else:
+        past_time = Q(start_time__lt=start) if descending else Q(start_time__gt=start)
+        same_day = past_time | (Q(start_time=start) & past_id)
+        if descending:
+            same_day |= Q(start_time__isnull=True)
+    return later_day | (Q(date=day) & same_day)
+
+
+# -----------------------------
+# Queries
+# -----------------------------
+
+def _patient_rows(patient_id: int):
+    return Appointment.objects.filter(patient_id=patient_id, is_block=False)
+
+
+def _upcoming(now: datetime) -> Q:
+    return Q(start_utc__gte=now) | Q(start_utc__isnull=True, date__gte=timezone.localdate(now))
+
+
+def _past(now: datetime) -> Q:
+    return Q(start_utc__lt=now) | Q(start_utc__isnull=True, date__lt=timezone.localdate(now))
+
+
+def summary(patient_id: int, now: datetime) -> dict:
+    visit = Q(status__in=ATTENDED_STATUSES) & _past(now)
+    row = _patient_rows(patient_id).aggregate(
+        visits=Count("pk", filter=visit),
+        no_shows=Count("pk", filter=Q(status="no_show")),
+        cancelled=Count("pk", filter=Q(status="cancelled")),
+        upcoming=Count("pk", filter=_upcoming(now) & ~Q(status__in=FREED_STATUSES)),
+        last_seen=Max("date", filter=visit),
+    )
+    row["last_seen"] = row["last_seen"].isoformat() if row["last_seen"] else None
+    return row
+
+
+def page(patient, when: str, now: datetime, size: int, cursor: Optional[str] = None):
+    """(rows, cursor of the next page or None on the last page)."""
+    descending = when == PAST
+    qs = _patient_rows(patient.pk).select_related("provider", "location")
+    qs = qs.filter(_past(now) if descending else _upcoming(now))
+    if cursor:
+        qs = qs.filter(_after(decode_cursor(cursor), descending))
+    if descending:
+        qs = qs.order_by("-date", F("start_time").desc(nulls_last=True), "-pk")
+    else:
+        qs = qs.order_by("date", F("start_time").asc(nulls_first=True), "pk")
+
+    rows = list(qs[:size + 1])
+    for row in rows:
+        # Every row is this patient's; skip the join.
+        row.patient = patient
+    if len(rows) > size:
+        rows = rows[:size]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
@@ -0,0 +1,544 @@
+# backend/appointments/imports.py
+"""
+Bulk appointment import from CSV or iCalendar, for migrations from another
+scheduling system.
+
+    POST /api/appointment-imports/   (multipart: file, format, allow_overlap)
+    python manage.py import_appointments export.csv --practice acme
+
+Both end up in run(), usually as the appointments_import job
+(appointments/tasks.py):
+
+1. The source is streamed record by record (csv.DictReader, or a VEVENT
+   reader that unfolds lines as it goes); nothing holds the whole file.
+2. Patients, providers, locations and appointment-type colours are resolved
+   through lookup maps built with one query each before the first record.
+3. Records are handled in batches of APPOINTMENT_IMPORT_BATCH_SIZE. Overlaps
+   are checked per (provider, date, office) lane with one query for the
+   batch's existing rows, then a sort-and-sweep over the lane (the
+   AppointmentSerializer rule; cancelled and no-show rows don't count).
+   Recurring blocks are not checked: imported history predates them.
+4. Each batch is one bulk_create plus the checkpoint (rows_done) in one
+   transaction, so a retried or resumed import starts after the last
+   committed batch. Rejected records go to a CSV error report (record
+   number, reason); a batch's report lines are written before it commits,
+   so a crash may repeat them but never loses them.
+   Uploads and reports live in IMPORT_ROOT (storage()), never in MEDIA_ROOT.
+5. At the end the reporting rollups are rebuilt for the imported date range
+   and the schedule caches are dropped (bulk_create sends no signals).
+
+CSV columns (header names, any order; empty cells are ignored):
+
+    date, start_time, end_time            YYYY-MM-DD, HH:MM[:SS]
+    provider_email | provider_id
+    patient_prn | patient_email | patient_last_name + patient_first_name + patient_dob
+    location                              slug or name (optional with one location)
+    appointment_type, status, notes, chief_complaint, is_block
+
+A record without patient columns is a (one-off) block.
+
+iCalendar: one appointment per VEVENT. DTSTART/DTEND (or DURATION) in UTC,
+with TZID or floating (the location's wall clock); SUMMARY is the type,
+LOCATION the location, ORGANIZER (mailto) or X-PROVIDER-EMAIL the provider,
+X-PATIENT-PRN or ATTENDEE (mailto) the patient, DESCRIPTION the notes, and
+STATUS:CANCELLED / TENTATIVE map to those statuses. All-day events are
+rejected.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import logging
+import os
+import re
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core import audit
+from locations.models import Location
+from patients.models import Patient
+from providers.models import Provider
+from reporting import rollups
+from schedule.models import ScheduleSettings
+
+from .models import Appointment, AppointmentImport
+from .signals import FREED_STATUSES, notify_appointments_changed
+
+
+logger = logging.getLogger("appointments.imports")
+
+UTC = ZoneInfo("UTC")
+BLOCK_COLOR = "#737373"
+# Live workflow states that make no sense for imported rows.
+IMPORTABLE_STATUSES = {s for s, _label in Appointment.STATUS_CHOICES} - {"in_room"}
+_TRUE = {"1", "true", "yes", "y"}
+
+
+class RecordError(ValueError):
+    """A record that can't be imported; the message goes into the report."""
+
+
+@dataclass
+class Pending:
+    number: int
+    appointment: Appointment
+
+
+# -----------------------------
+# Readers
+# -----------------------------
+
+def read_csv(stream) -> Iterator[Tuple[int, dict]]:
+    for number, row in enumerate(csv.DictReader(stream), start=1):
+        yield number, {
+            key.strip().lower(): value.strip()
+            for key, value in row.items()
+            if key and isinstance(value, str) and value.strip()
+        }
+
+
+def _unfolded(stream) -> Iterator[str]:
+    current = None
+    for raw in stream:
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def _content_line(line: str) -> Tuple[str, dict, str]:
+    """NAME;PARAM=V;...:VALUE -> (NAME, {PARAM: V}, VALUE); colons inside quotes don't split."""
+    quoted = False
+    for i, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == ":" and not quoted:
+            head, value = line[:i], line[i + 1:]
+            break
+    else:
+        return "", {}, ""
+    name, *params = head.split(";")
+    return name.upper(), dict(p.split("=", 1) for p in params if "=" in p), value
+
+
+def _unescape(value: str) -> str:
+    return re.sub(r"\\([\\;,nN])", lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+def _mailto(value: str) -> str:
+    return value[len("mailto:"):] if value.lower().startswith("mailto:") else value
+
+
+def _ics_datetime(params: dict, value: str) -> datetime:
+    if "T" not in value or params.get("VALUE", "").upper() == "DATE":
+        raise RecordError("All-day events are not imported.")
+    try:
+        naive = datetime.strptime(value.rstrip("Zz")[:15], "%Y%m%dT%H%M%S")
+    except ValueError:
+        raise RecordError(f"Invalid date-time {value!r}.")
+    if value.upper().endswith("Z"):
+        return naive.replace(tzinfo=UTC)
+    if "TZID" in params:
+        try:
+            return naive.replace(tzinfo=ZoneInfo(params["TZID"].strip('"')))
+        except (ZoneInfoNotFoundError, ValueError):
+            raise RecordError(f"Unknown time zone {params['TZID']!r}.")
+    return naive
+
+
+_DURATION = re.compile(r"^P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+
+
+def _ics_duration(value: str) -> timedelta:
+    match = _DURATION.match(value.upper())
+    if not match:
+        raise RecordError(f"Invalid duration {value!r}.")
+    weeks, days, hours, minutes, seconds = (int(g or 0) for g in match.groups())
+    return timedelta(weeks=weeks, days=days, hours=hours, minutes=minutes, seconds=seconds)
+
+
+def _event_record(props: dict) -> dict:
+    def value(name):
+        return props[name][1] if name in props else ""
+
+    try:
+        if "DTSTART" not in props:
+            raise RecordError("No DTSTART.")
+        start = _ics_datetime(*props["DTSTART"])
+        if "DTEND" in props:
+            end = _ics_datetime(*props["DTEND"])
+        elif "DURATION" in props:
+            end = start + _ics_duration(value("DURATION"))
+        else:
+            raise RecordError("No DTEND or DURATION.")
+    except RecordError as exc:
+        return {"_error": str(exc), "uid": value("UID")}
+
+    status = {"CANCELLED": "cancelled", "TENTATIVE": "tentative"}.get(value("STATUS").upper(), "")
+    record = {
+        "start": start,
+        "end": end,
+        "uid": value("UID"),
+        "appointment_type": _unescape(value("SUMMARY")),
+        "location": _unescape(value("LOCATION")),
+        "provider_email": value("X-PROVIDER-EMAIL") or _mailto(value("ORGANIZER")),
+        "patient_prn": value("X-PATIENT-PRN"),
+        "patient_email": _mailto(value("ATTENDEE")),
+        "notes": _unescape(value("DESCRIPTION")),
+        "status": status,
+    }
+    return {k: v for k, v in record.items() if v}
+
+
+def read_ics(stream) -> Iterator[Tuple[int, dict]]:
+    number, event, nested = 0, None, 0
+    for line in _unfolded(stream):
+        name, params, value = _content_line(line)
+        if name == "BEGIN":
+            if event is not None:
+                nested += 1          # VALARM etc.: their properties aren't the event's
+            elif value.upper() == "VEVENT":
+                event = {}
+        elif name == "END":
+            if nested:
+                nested -= 1
+            elif event is not None and value.upper() == "VEVENT":
+                number += 1
+                yield number, _event_record(event)
+                event = None
+        elif event is not None and not nested and name and name not in event:
+            # First ATTENDEE wins (the patient).
+            event[name] = (params, value)
+
+
+READERS = {"csv": read_csv, "ics": read_ics}
+
+
+# -----------------------------
+# Lookups
+# -----------------------------
+
+class Lookups:
+    """In-memory maps for resolving records, one query per table."""
+
+    def __init__(self):
+        self.providers: Dict[str, int] = {}
+        for pk, email in Provider.objects.values_list("pk", "email"):
+            self.providers[str(pk)] = pk
+            if email:
+                self.providers[f"email:{email.lower()}"] = pk
+
+        self.patients: Dict[str, Optional[int]] = {}
+        for pk, prn, email, first, last, dob in Patient.objects.values_list(
+            "pk", "prn", "email", "first_name", "last_name", "date_of_birth",
+        ):
+            self.patients[f"prn:{prn.upper()}"] = pk
+            for key in (f"email:{(email or '').lower()}", f"name:{last.lower()}|{first.lower()}|{dob}"):
+                # Shared emails or namesakes are ambiguous.
+                self.patients[key] = None if key in self.patients else pk
+        self.patients.pop("email:", None)
+
+        self.locations: Dict[str, Location] = {}
+        locations = list(Location.objects.all())
+        for loc in locations:
+            self.locations[loc.slug.lower()] = loc
+            self.locations.setdefault(loc.name.lower(), loc)
+        self.only_location = locations[0] if len(locations) == 1 else None
+
+        self.colors: Dict[str, str] = {}
+        settings_row = ScheduleSettings.objects.first()
+        for t in (settings_row.appointment_types if settings_row else []) or []:
+            if isinstance(t, dict) and t.get("name") and t.get("color_code"):
+                self.colors[t["name"].lower()] = t["color_code"]
+
+    def provider(self, record: dict) -> int:
+        if record.get("provider_id"):
+            key = record["provider_id"]
+        elif record.get("provider_email"):
+            key = f"email:{record['provider_email'].lower()}"
+        else:
+            raise RecordError("No provider.")
+        if key not in self.providers:
+            raise RecordError(f"Unknown provider {key.removeprefix('email:')!r}.")
+        return self.providers[key]
+
+    def patient(self, record: dict) -> Optional[int]:
+        if record.get("patient_prn"):
+            key = f"prn:{record['patient_prn'].upper()}"
+        elif record.get("patient_email"):
+            key = f"email:{record['patient_email'].lower()}"
+        elif record.get("patient_last_name") or record.get("patient_first_name") or record.get("patient_dob"):
+            key = "name:{}|{}|{}".format(
+                record.get("patient_last_name", "").lower(), record.get("patient_first_name", "").lower(),
+                record.get("patient_dob", ""),
+            )
+        else:
+            return None
+        if key not in self.patients:
+            raise RecordError(f"Unknown patient ({key.split(':', 1)[0]}).")
+        if self.patients[key] is None:
+            raise RecordError(f"Ambiguous patient ({key.split(':', 1)[0]}).")
+        return self.patients[key]
+
+    def location(self, record: dict) -> Location:
+        name = record.get("location", "").lower()
+        loc = self.locations.get(name) if name else self.only_location
+        if loc is None:
+            raise RecordError(f"Unknown location {record.get('location', '')!r}." if name else "No location.")
+        return loc
+
+
+# -----------------------------
+# Records -> appointments
+# -----------------------------
+
+def _parse_time(value: str) -> time:
+    try:
+        return time.fromisoformat(value)
+    except ValueError:
+        raise RecordError(f"Invalid time {value!r}.")
+
+
+def _wall_clock(record: dict, loc: Location) -> Tuple[date, time, time]:
+    if "start" in record:
+        start, end = record["start"], record["end"]
+        if start.tzinfo is not None:
+            start, end = start.astimezone(loc.tzinfo), end.astimezone(loc.tzinfo)
+        if end.date() != start.date():
+            raise RecordError("Events spanning midnight are not imported.")
+        return start.date(), start.time(), end.time()
+    try:
+        day = date.fromisoformat(record.get("date", ""))
+    except ValueError:
+        raise RecordError(f"Invalid date {record.get('date', '')!r}.")
+    if not record.get("start_time") or not record.get("end_time"):
+        raise RecordError("No start_time or end_time.")
+    return day, _parse_time(record["start_time"]), _parse_time(record["end_time"])
+
+
+def build(record: dict, lookups: Lookups) -> Appointment:
+    if "_error" in record:
+        raise RecordError(record["_error"])
+    provider_id = lookups.provider(record)
+    patient_id = lookups.patient(record)
+    loc = lookups.location(record)
+    day, start, end = _wall_clock(record, loc)
+    minutes = (end.hour * 60 + end.minute) - (start.hour * 60 + start.minute)
+    if minutes <= 0:
+        raise RecordError("End time must be after start time.")
+
+    status = record.get("status", "pending").lower()
+    if status not in IMPORTABLE_STATUSES:
+        raise RecordError(f"Invalid status {status!r}.")
+
+    is_block = patient_id is None or record.get("is_block", "").lower() in _TRUE
+    appt_type = record.get("appointment_type") or ("Block Time" if is_block else "Appointment")
+    return Appointment(
+        patient_id=patient_id,
+        provider_id=provider_id,
+        location=loc,
+        office=loc.slug,
+        timezone=loc.timezone,
+        appointment_type=appt_type[:100],
+        is_block=is_block,
+        status=status,
+        color_code=BLOCK_COLOR if is_block else lookups.colors.get(appt_type.lower(), "#FF6B6B"),
+        notes=record.get("notes", ""),
+        chief_complaint=record.get("chief_complaint", ""),
+        date=day,
+        start_time=start,
+        end_time=end,
+        duration=minutes,
+    )
+
+
+# -----------------------------
+# Conflicts (sort and sweep)
+# -----------------------------
+
+def _existing(keys: Iterable[Tuple[int, date]]):
+    """Rows that occupy time on the batch's (provider, date) pairs: one query."""
+    providers, days = zip(*keys)
+    table = connection.ops.quote_name(Appointment._meta.db_table)
+    sql = f"""
+        SELECT a.id, a.provider_id, a.date, a.office, a.start_time, a.end_time
+        FROM unnest(%s::bigint[], %s::date[]) AS k(provider_id, date)
+        JOIN {table} a ON a.provider_id = k.provider_id AND a.date = k.date
+        WHERE a.status <> ALL(%s::text[]) AND a.start_time IS NOT NULL AND a.end_time IS NOT NULL
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [list(providers), list(days), list(FREED_STATUSES)])
+        return cursor.fetchall()
+
+
+def conflicts(pending: List[Pending]) -> Dict[int, str]:
+    """record number -> reason, for records overlapping the schedule or an earlier record."""
+    timed = [p for p in pending if p.appointment.status not in FREED_STATUSES]
+    if not timed:
+        return {}
+    lanes: Dict[tuple, List[Pending]] = {}
+    for p in timed:
+        a = p.appointment
+        lanes.setdefault((a.provider_id, a.date, a.office), []).append(p)
+
+    fixed: Dict[tuple, list] = {}
+    for appt_id, provider_id, day, office, start, end in _existing({(k[0], k[1]) for k in lanes}):
+        fixed.setdefault((provider_id, day, office), []).append((start, end, f"appointment #{appt_id}"))
+
+    found = {}
+    for key, lane in lanes.items():
+        # Existing rows merged into disjoint intervals, so one bisect finds an overlap.
+        merged: list = []
+        for start, end, label in sorted(fixed.get(key, ())):
+            if merged and start < merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end, label])
+        starts = [m[0] for m in merged]
+
+        lane.sort(key=lambda p: (p.appointment.start_time, p.number))
+        reach, holder = None, None
+        for p in lane:
+            a = p.appointment
+            i = bisect_left(starts, a.end_time) - 1
+            if i >= 0 and merged[i][1] > a.start_time:
+                found[p.number] = f"Overlaps {merged[i][2]}."
+            elif reach is not None and a.start_time < reach:
+                found[p.number] = f"Overlaps record {holder} of this import."
+            elif reach is None or a.end_time > reach:
+                reach, holder = a.end_time, p.number
+    return found
+
+
+# -----------------------------
+# Running
+# -----------------------------
+
+def storage() -> FileSystemStorage:
+    """Private storage for uploads and error reports (IMPORT_ROOT; no URLs)."""
+    return FileSystemStorage(location=settings.IMPORT_ROOT, base_url=None)
+
+
+def _open(source: str):
+    return open(source, "rb") if os.path.isabs(source) else storage().open(source, "rb")
+
+
+def _size(source: str) -> int:
+    return os.path.getsize(source) if os.path.isabs(source) else storage().size(source)
+
+
+class _Report:
+    """Appends (record, reason) lines to the import's CSV error report."""
+
+    def __init__(self, imp: AppointmentImport):
+        self.imp = imp
+        self.file = None
+
+    def write(self, rows: List[Tuple[int, str]]) -> None:
+        if not rows:
+            return
+        if self.file is None:
+            if not self.imp.report:
+                self.imp.report = f"reports/{self.imp.pk}-errors.csv"
+                AppointmentImport.all_objects.filter(pk=self.imp.pk).update(report=self.imp.report)
+            path = storage().path(self.imp.report)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            new = not os.path.exists(path)
+            self.file = open(path, "a", newline="", encoding="utf-8")
+            if new:
+                self.file.write("record,reason\r\n")
+        writer = csv.writer(self.file)
+        writer.writerows(rows)
+        self.file.flush()
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+
+
+def run(imp: AppointmentImport, progress: Optional[Callable[[float, str], None]] = None, user=None) -> dict:
+    """Import (or resume importing) `imp`; returns the counts."""
+    batch_size = settings.APPOINTMENT_IMPORT_BATCH_SIZE
+    AppointmentImport.all_objects.filter(pk=imp.pk).update(status=AppointmentImport.STATUS_RUNNING)
+    lookups = Lookups()
+    total = _size(imp.source) or 1
+    report = _Report(imp)
+
+    try:
+        with _open(imp.source) as raw:
+            stream = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+            records = READERS[imp.format](stream)
+            # Resume after the last committed batch.
+            records = islice(records, imp.rows_done, None)
+            while True:
+                batch = list(islice(records, batch_size))
+                if not batch:
+                    break
+                _import_batch(imp, batch, lookups, report)
+                if progress is not None:
+                    progress(
+                        min(95, 100 * raw.tell() / total),
+                        f"{imp.rows_done} records read, {imp.imported} imported, {imp.skipped} skipped",
+                    )
+    finally:
+        report.close()
+
+    if imp.first_date is not None:
+        rollups.rebuild(imp.first_date, imp.last_date)
+    # bulk_create sent no appointments_changed.
+    notify_appointments_changed(None)
+
+    imp.status = AppointmentImport.STATUS_SUCCEEDED
+    imp.finished_at = timezone.now()
+    imp.save(update_fields=["status", "finished_at"])
+    result = {
+        "import_id": imp.pk,
+        "records": imp.rows_done,
+        "imported": imp.imported,
+        "skipped": imp.skipped,
+        "report": imp.report or None,
+    }
+    audit.record(user if user is not None else imp.created_by, "import", imp, metadata=result)
+    logger.info("Import #%s: %s records, %s imported, %s skipped", imp.pk, imp.rows_done, imp.imported, imp.skipped)
+    return result
+
+
+def _import_batch(imp: AppointmentImport, batch: List[Tuple[int, dict]], lookups: Lookups, report: _Report) -> None:
+    pending, errors = [], []
+    for number, record in batch:
+        try:
+            pending.append(Pending(number, build(record, lookups)))
+        except RecordError as exc:
+            errors.append((number, str(exc)))
+
+    with transaction.atomic():
+        if pending and not imp.allow_overlap:
+            found = conflicts(pending)
+            errors += sorted(found.items())
+            pending = [p for p in pending if p.number not in found]
+
+        Appointment.objects.bulk_create([p.appointment for p in pending], batch_size=1000)
+        report.write(sorted(errors))
+
+        days = [p.appointment.date for p in pending]
+        if days:
+            imp.first_date = min([d for d in (imp.first_date, min(days)) if d is not None])
+            imp.last_date = max([d for d in (imp.last_date, max(days)) if d is not None])
+        imp.rows_done = batch[-1][0]
+        imp.imported += len(pending)
+        imp.skipped += len(errors)
+        imp.save(update_fields=["rows_done", "imported", "skipped", "first_date", "last_date"])
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:23
+
+from django.db import migrations, models
+
+# Found with core/query_stats.py (slow-query fingerprints + EXPLAIN):
+# - appt_provider_date_idx serves the overlap check in
+#   AppointmentSerializer.validate:
+#     WHERE provider_id = %s AND date = %s AND office = %s
+#       AND start_time < %s AND end_time > %s
+#   which otherwise bitmap-scans every appointment of the provider.
+# - appt_date_start_idx served the week window
+#     WHERE date BETWEEN %s AND %s [AND provider_id IN (...)]
+#     ORDER BY date, start_time
+#   (0014_practice replaces it with appt_practice_date_idx).
+# office__iexact gets no index of its own: it only filters rows these
+# indexes have already narrowed to a day or a week.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0010_backfill_location_from_office'),
+        ('locations', '0003_alter_location_slug'),
+        ('patients', '0009_alter_patient_options'),
+        ('providers', '0002_provider_user'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['date', 'start_time'], name='appt_date_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['provider', 'date'], name='appt_provider_date_idx'),
+        ),
+    ]
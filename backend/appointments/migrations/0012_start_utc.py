@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:33
+
+import appointments.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0011_schedule_indexes'),
+        ('locations', '0003_alter_location_slug'),
+        ('patients', '0009_alter_patient_options'),
+        ('providers', '0002_provider_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='start_utc',
+            field=models.GeneratedField(db_persist=True, expression=appointments.models.LocalDateTime('date', 'start_time', models.Value('America/Chicago')), output_field=models.DateTimeField()),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(condition=models.Q(('is_block', False), ('patient__isnull', False)), fields=['start_utc'], name='appt_start_utc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['updated_at'], name='appt_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def rooms_from_labels(apps, schema_editor):
+    """
+    Create a Room for every room label already used at a location, so existing
+    labels stay valid, and put the patients already in a room into it.
+    """
+    Appointment = apps.get_model("appointments", "Appointment")
+    Room = apps.get_model("locations", "Room")
+
+    used = (
+        Appointment.objects.exclude(room="").exclude(location__isnull=True)
+        .values_list("location_id", "room").distinct()
+    )
+    Room.objects.bulk_create(
+        [Room(location_id=location_id, name=name.strip()) for location_id, name in used if name.strip()],
+        ignore_conflicts=True,
+    )
+
+    rooms = {
+        (location_id, name.lower()): pk
+        for pk, location_id, name in Room.objects.values_list("pk", "location_id", "name")
+    }
+    in_room = (
+        Appointment.objects.filter(status="in_room", assigned_room__isnull=True, location__isnull=False)
+        .exclude(room="").only("pk", "location_id", "room", "date", "updated_at")
+        .order_by("-updated_at", "-pk")
+    )
+    seated, changed = set(), []
+    for appt in in_room:
+        room_id = rooms.get((appt.location_id, appt.room.strip().lower()))
+        # appt_room_occupied_uniq: one patient per room and day; the latest change keeps it.
+        if room_id is None or (room_id, appt.date) in seated:
+            continue
+        seated.add((room_id, appt.date))
+        appt.assigned_room_id, appt.room_since = room_id, appt.updated_at
+        changed.append(appt)
+    Appointment.objects.bulk_update(changed, ["assigned_room", "room_since"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0012_start_utc'),
+        ('locations', '0004_room'),
+        ('patients', '0009_alter_patient_options'),
+        ('providers', '0002_provider_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='assigned_room',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='appointments', to='locations.room'),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='room_since',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'in_room')), fields=('assigned_room', 'date'), name='appt_room_occupied_uniq'),
+        ),
+        migrations.RunPython(rooms_from_labels, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:17
+
+import core.tenancy
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0013_room_occupancy'),
+        ('core', '0005_practice'),
+        ('locations', '0004_room'),
+        ('patients', '0009_alter_patient_options'),
+        ('providers', '0002_provider_user'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='appointment',
+            name='appt_date_start_idx',
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='practice',
+            field=models.ForeignKey(db_index=False, default=core.tenancy.practice_for_new_rows, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.practice'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['practice', 'date', 'start_time'], name='appt_practice_date_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:24
+
+import appointments.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    start_utc now reads date/start_time in the appointment's own zone (a copy
+    of its location's) rather than TIME_ZONE. Generated columns can't be
+    altered in place, so it is dropped and re-added with its index.
+    """
+
+    dependencies = [
+        ('appointments', '0014_practice'),
+        ('locations', '0006_location_timezone'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='appointment',
+            name='appt_start_utc_idx',
+        ),
+        migrations.RemoveField(
+            model_name='appointment',
+            name='start_utc',
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='timezone',
+            field=models.CharField(default='America/Chicago', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='start_utc',
+            field=models.GeneratedField(db_persist=True, expression=appointments.models.LocalDateTime('date', 'start_time', 'timezone'), output_field=models.DateTimeField()),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='end_utc',
+            field=models.GeneratedField(db_persist=True, expression=appointments.models.LocalDateTime('date', 'end_time', 'timezone'), output_field=models.DateTimeField()),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(condition=models.Q(('is_block', False), ('patient__isnull', False)), fields=['start_utc'], name='appt_start_utc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['provider', 'start_utc'], name='appt_provider_start_idx'),
+        ),
+    ]
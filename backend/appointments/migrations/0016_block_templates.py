@@ -0,0 +1,43 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:34
+
+import core.tenancy
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0015_location_timezone'),
+        ('core', '0005_practice'),
+        ('locations', '0006_location_timezone'),
+        ('providers', '0003_practice'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlockTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(default='Block Time', help_text='Shown as the appointment type.', max_length=100)),
+                ('color_code', models.CharField(default='#737373', max_length=20)),
+                ('weekdays', models.JSONField(default=list, help_text='Weekday codes, e.g. ["mon", "wed"].')),
+                ('interval_weeks', models.PositiveSmallIntegerField(default=1, help_text='Every n-th week, counted from the week of start_date.')),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('exceptions', models.JSONField(blank=True, default=list, help_text='Dates (YYYY-MM-DD) the block is skipped.')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('location', models.ForeignKey(blank=True, help_text='Location the block applies at; empty for every location.', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='block_templates', to='locations.location')),
+                ('practice', models.ForeignKey(db_index=False, default=core.tenancy.practice_for_new_rows, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.practice')),
+                ('provider', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='block_templates', to='providers.provider')),
+            ],
+            options={
+                'ordering': ['provider', 'start_time'],
+                'indexes': [models.Index(fields=['practice', 'provider'], name='blocktpl_practice_provider_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('end_time__gt', models.F('start_time'))), name='blocktpl_times_ordered'), models.CheckConstraint(condition=models.Q(('interval_weeks__gte', 1)), name='blocktpl_interval_positive')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:38
+
+import appointments.models
+import core.tenancy
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0016_block_templates'),
+        ('core', '0005_practice'),
+        ('locations', '0006_location_timezone'),
+        ('providers', '0003_practice'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarFeed',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(default=appointments.models.new_feed_token, editable=False, max_length=64, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('location', models.ForeignKey(blank=True, help_text='Only appointments at this location; empty for all locations.', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='calendar_feeds', to='locations.location')),
+                ('practice', models.ForeignKey(default=core.tenancy.practice_for_new_rows, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.practice')),
+                ('provider', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='calendar_feeds', to='providers.provider')),
+            ],
+            options={
+                'ordering': ['provider', 'id'],
+            },
+        ),
+    ]
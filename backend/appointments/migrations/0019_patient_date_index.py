@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0018_appointment_imports'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['patient', '-date'], name='appt_patient_date_idx'),
+        ),
+    ]
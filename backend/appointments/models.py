@@ -1,13 +1,39 @@
 # backend/appointments/models.py
 
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
-from locations.models import Location
+from django.utils.deconstruct import deconstructible
+
+from core.tenancy import PracticeScopedManager, practice_for_new_rows
+from locations.models import WEEKDAYS, Location
 from patients.models import Patient
 from providers.models import Provider
 
 
+@deconstructible(path="appointments.models.LocalDateTime")
+class LocalDateTime(models.Func):
+    """
+    (date + time) read as wall-clock time in a named time zone, as an aware
+    timestamp: LocalDateTime("date", "start_time", "timezone").
+    Immutable in PostgreSQL, so it can back a stored generated column.
+    """
+    output_field = models.DateTimeField()
+    arity = 3
+
+    def as_sql(self, compiler, connection, **extra_context):
+        (day, day_params), (time, time_params), (tz, tz_params) = (
+            compiler.compile(expr) for expr in self.get_source_expressions()
+        )
+        return f"(({day} + {time}) AT TIME ZONE {tz})", (*day_params, *time_params, *tz_params)
+
+
 class Appointment(models.Model):
+    """Scoped to the current practice (core/tenancy.py); see all_objects."""
+
     # ---------------------------
     # Choices
     # ---------------------------
@@ -92,6 +118,15 @@ class Appointment(models.Model):
         default="",
         help_text="Optional room number when status is 'in_room' (e.g. '2' or '309B').",
     )
+    # The Room named by `room` while the appointment is in it (appointments/rooms.py).
+    assigned_room = models.ForeignKey(
+        "locations.Room",
+        on_delete=models.SET_NULL,
+        related_name="appointments",
+        null=True,
+        blank=True,
+    )
+    room_since = models.DateTimeField(null=True, blank=True)
 
     intake_status = models.CharField(
         max_length=20,
@@ -115,6 +150,26 @@ class Appointment(models.Model):
     end_time = models.TimeField(null=True, blank=True)
     duration = models.PositiveIntegerField(default=30)
 
+    # date/start_time/end_time are wall-clock times in this zone: a copy of
+    # location.timezone, set by the serializer (and by whoever bulk-writes)
+    # and kept in step by Location.save().
+    timezone = models.CharField(max_length=64, default=settings.TIME_ZONE, editable=False)
+
+    # date + start/end time as instants, computed by the database on every
+    # write (ORM, bulk and raw SQL alike). Lets reminders, range queries across
+    # locations and other time-based scans use one index range instead of
+    # combining date, time and zone per row.
+    start_utc = models.GeneratedField(
+        expression=LocalDateTime("date", "start_time", "timezone"),
+        output_field=models.DateTimeField(),
+        db_persist=True,
+    )
+    end_utc = models.GeneratedField(
+        expression=LocalDateTime("date", "end_time", "timezone"),
+        output_field=models.DateTimeField(),
+        db_persist=True,
+    )
+
     is_recurring = models.BooleanField(default=False)
     repeat_days = models.JSONField(null=True, blank=True)
     repeat_interval_weeks = models.PositiveSmallIntegerField(default=1)
@@ -124,5 +179,219 @@ class Appointment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
     updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
 
+    practice = models.ForeignKey(
+        "core.Practice", on_delete=models.CASCADE, related_name="+",
+        default=practice_for_new_rows,
+        # Covered by appt_practice_date_idx.
+        db_index=False,
+    )
+
+    objects = PracticeScopedManager()
+    all_objects = models.Manager()
+
     class Meta:
         ordering = ["date", "start_time"]
+        indexes = [
+            # Schedule windows (one practice, date range, ordered by date/start_time).
+            models.Index(fields=["practice", "date", "start_time"], name="appt_practice_date_idx"),
+            # Overlap check in AppointmentSerializer.validate (provider + date).
+            models.Index(fields=["provider", "date"], name="appt_provider_date_idx"),
+            # A provider's appointments by instant, across locations and zones.
+            models.Index(fields=["provider", "start_utc"], name="appt_provider_start_idx"),
+            # Reminder due-window scans (reminders/dispatch.py): patient
+            # appointments by start instant, and recently edited ones.
+            models.Index(
+                fields=["start_utc"], name="appt_start_utc_idx",
+                condition=models.Q(is_block=False, patient__isnull=False),
+            ),
+            models.Index(fields=["updated_at"], name="appt_updated_idx"),
+            # A patient's history, latest first (appointments/history.py).
+            models.Index(fields=["patient", "-date"], name="appt_patient_date_idx"),
+        ]
+        constraints = [
+            # One patient per room at a time (a forgotten 'in_room' from an
+            # earlier day does not block the room today).
+            models.UniqueConstraint(
+                fields=["assigned_room", "date"], name="appt_room_occupied_uniq",
+                condition=models.Q(status="in_room"),
+            ),
+        ]
+
+
+class BlockTemplate(models.Model):
+    """
+    A recurring block (lunch, admin time, out of office) stored once and
+    expanded into schedule windows, overlap checks and reports at read time
+    (appointments/blocks.py). One-off blocks stay Appointment rows with
+    is_block=True. Scoped to the current practice (core/tenancy.py).
+    """
+
+    provider = models.ForeignKey(Provider, on_delete=models.CASCADE, related_name="block_templates")
+    location = models.ForeignKey(
+        Location,
+        on_delete=models.CASCADE,
+        related_name="block_templates",
+        null=True,
+        blank=True,
+        help_text="Location the block applies at; empty for every location.",
+    )
+
+    label = models.CharField(max_length=100, default="Block Time", help_text="Shown as the appointment type.")
+    color_code = models.CharField(max_length=20, default="#737373")
+
+    weekdays = models.JSONField(default=list, help_text='Weekday codes, e.g. ["mon", "wed"].')
+    interval_weeks = models.PositiveSmallIntegerField(
+        default=1, help_text="Every n-th week, counted from the week of start_date.",
+    )
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+    exceptions = models.JSONField(default=list, blank=True, help_text="Dates (YYYY-MM-DD) the block is skipped.")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    practice = models.ForeignKey(
+        "core.Practice", on_delete=models.CASCADE, related_name="+",
+        default=practice_for_new_rows,
+        # Covered by blocktpl_practice_provider_idx.
+        db_index=False,
+    )
+
+    objects = PracticeScopedManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        ordering = ["provider", "start_time"]
+        indexes = [
+            models.Index(fields=["practice", "provider"], name="blocktpl_practice_provider_idx"),
+        ]
+        constraints = [
+            models.CheckConstraint(condition=models.Q(end_time__gt=models.F("start_time")), name="blocktpl_times_ordered"),
+            models.CheckConstraint(condition=models.Q(interval_weeks__gte=1), name="blocktpl_interval_positive"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.label} ({self.provider_id}, {', '.join(self.weekdays)} {self.start_time:%H:%M}-{self.end_time:%H:%M})"
+
+    @property
+    def duration(self) -> int:
+        return (self.end_time.hour * 60 + self.end_time.minute) - (self.start_time.hour * 60 + self.start_time.minute)
+
+    def occurs_on(self, day) -> bool:
+        if day < self.start_date or (self.end_date is not None and day > self.end_date):
+            return False
+        if WEEKDAYS[day.weekday()] not in self.weekdays:
+            return False
+        if self.interval_weeks > 1:
+            first_monday = self.start_date - timedelta(days=self.start_date.weekday())
+            if ((day - first_monday).days // 7) % self.interval_weeks:
+                return False
+        return day.isoformat() not in self.exceptions
+
+    def dates(self, start, end):
+        """Days in [start, end] the block occurs on."""
+        start = max(start, self.start_date)
+        if self.end_date is not None:
+            end = min(end, self.end_date)
+        day = start
+        while day <= end:
+            if self.occurs_on(day):
+                yield day
+            day += timedelta(days=1)
+
+
+def new_feed_token() -> str:
+    return secrets.token_urlsafe(24)
+
+
+class CalendarFeed(models.Model):
+    """
+    A tokenized iCalendar subscription to a provider's schedule, optionally
+    limited to one location (appointments/feeds.py). The token is the only
+    credential calendar apps send; rotating it revokes old subscriptions.
+    """
+
+    provider = models.ForeignKey(Provider, on_delete=models.CASCADE, related_name="calendar_feeds")
+    location = models.ForeignKey(
+        Location,
+        on_delete=models.CASCADE,
+        related_name="calendar_feeds",
+        null=True,
+        blank=True,
+        help_text="Only appointments at this location; empty for all locations.",
+    )
+    token = models.CharField(max_length=64, unique=True, default=new_feed_token, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    practice = models.ForeignKey(
+        "core.Practice", on_delete=models.CASCADE, related_name="+",
+        default=practice_for_new_rows,
+    )
+
+    objects = PracticeScopedManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        ordering = ["provider", "id"]
+
+    def __str__(self) -> str:
+        return f"Calendar feed #{self.pk} (provider {self.provider_id})"
+
+
+class AppointmentImport(models.Model):
+    """
+    One bulk import of appointments from a CSV or iCalendar file
+    (appointments/imports.py). `rows_done` is the checkpoint: source records
+    consumed by committed batches, so a retried job resumes after them.
+    """
+    FORMAT_CHOICES = [("csv", "CSV"), ("ics", "iCalendar")]
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_SUCCEEDED, "Succeeded"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    # Name in imports.storage() (IMPORT_ROOT), or an absolute path (manage.py import_appointments).
+    source = models.CharField(max_length=500)
+    format = models.CharField(max_length=8, choices=FORMAT_CHOICES)
+    allow_overlap = models.BooleanField(default=False)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING)
+
+    rows_done = models.PositiveIntegerField(default=0)
+    imported = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    # Date range of the imported rows (for the reporting rebuild at the end).
+    first_date = models.DateField(null=True, blank=True)
+    last_date = models.DateField(null=True, blank=True)
+    # Name in imports.storage() of the CSV error report (source row, reason).
+    report = models.CharField(max_length=500, blank=True)
+    error = models.TextField(blank=True)
+
+    job = models.ForeignKey("core.Job", on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="+",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    practice = models.ForeignKey(
+        "core.Practice", on_delete=models.CASCADE, related_name="+",
+        default=practice_for_new_rows,
+    )
+
+    objects = PracticeScopedManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+
+    def __str__(self) -> str:
+        return f"Import #{self.pk} ({self.format}, {self.status})"
@@ -0,0 +1,170 @@
+# backend/appointments/rooms.py
+"""
+Room occupancy and the per-location room board.
+
+An appointment occupies a room while its status is 'in_room': the serializer
+resolves Appointment.room (the name the front desk types or picks) to a Room
+of the appointment's location and stores it in assigned_room, with room_since.
+The partial unique constraint appt_room_occupied_uniq on (assigned_room, date)
+WHERE status = 'in_room' is what rejects a second patient in the same room,
+including two desks racing; the serializer checks first to name the occupant.
+
+GET /api/locations/<id>/board/ is polled every few seconds by every front
+desk screen. A location's board is cached as one snapshot under the
+location's current version token, the same scheme as appointments/cache.py:
+occupancy changes and room edits give the location a new token on commit,
+so stale snapshots are never looked up again. A refresh is two cache gets
+and no SQL; a client sending the last ETag gets a 304 after one. Snapshots
+are stored per practice (core/tenancy.py): another practice asking for the
+same location id builds its own, which finds no location (404).
+"""
+from __future__ import annotations
+
+import uuid
+from typing import Iterable, Optional
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from core import metrics, tenancy
+from locations.models import Location, Room
+
+from .models import Appointment
+
+
+KEY_PREFIX = "room-board"
+IN_ROOM = "in_room"
+
+
+# -----------------------------
+# Occupancy
+# -----------------------------
+
+def resolve(office: str, name: str) -> Optional[Room]:
+    """The active room called `name` at the current practice's location with slug `office`."""
+    return (
+        tenancy.scoped(Room.objects, "location__practice")
+        .filter(location__slug=office, name__iexact=name.strip(), is_active=True)
+        .select_related("location")
+        .first()
+    )
+
+
+def occupant(room: Room, day, exclude_pk=None) -> Optional[Appointment]:
+    qs = Appointment.objects.filter(assigned_room=room, date=day, status=IN_ROOM).select_related("patient")
+    if exclude_pk is not None:
+        qs = qs.exclude(pk=exclude_pk)
+    return qs.first()
+
+
+def occupancy(appointment: Appointment):
+    """What the board shows for this appointment: (location_id, room_id), or None."""
+    if appointment.status == IN_ROOM and appointment.assigned_room_id:
+        return appointment.location_id, appointment.assigned_room_id
+    return None
+
+
+def occupancy_changed(before, after) -> None:
+    """Refresh the boards of the locations whose occupancy differs between two occupancy() values."""
+    if before != after:
+        notify_changed(o[0] for o in (before, after) if o is not None)
+
+
+# -----------------------------
+# Board cache
+# -----------------------------
+
+def _token_key(location_id: int) -> str:
+    return f"{KEY_PREFIX}:v:{location_id}"
+
+
+def _tz_key(location_id: int) -> str:
+    return f"{KEY_PREFIX}:tz:{location_id}"
+
+
+def _entry_key(location_id: int, day: str, token: str) -> str:
+    return f"{KEY_PREFIX}:{tenancy.cache_namespace()}:{location_id}:{day}:{token}"
+
+
+def bump(location_ids: Iterable[int]) -> None:
+    location_ids = {pk for pk in location_ids if pk}
+    if location_ids:
+        cache.set_many({_token_key(pk): uuid.uuid4().hex[:16] for pk in location_ids}, timeout=None)
+
+
+def notify_changed(location_ids: Iterable[int]) -> None:
+    """Invalidate these locations' boards once the current transaction commits."""
+    location_ids = set(location_ids)
+    transaction.on_commit(lambda: bump(location_ids))
+
+
+def board_version(location_id: int) -> str:
+    """
+    ETag-style version: changes with occupancy, room edits and the date at the
+    location (its time zone is remembered by build_board; until then TIME_ZONE).
+    """
+    found = cache.get_many([_token_key(location_id), _tz_key(location_id)])
+    token = found.get(_token_key(location_id))
+    if token is None:
+        token = uuid.uuid4().hex[:16]
+        # add(): a concurrent bump wins over a fresh token.
+        if not cache.add(_token_key(location_id), token, timeout=None):
+            token = cache.get(_token_key(location_id)) or token
+    today = timezone.localdate(timezone=ZoneInfo(found.get(_tz_key(location_id)) or settings.TIME_ZONE))
+    return f"{today.isoformat()}:{token}"
+
+
+def build_board(location_id: int, version: str) -> Optional[dict]:
+    location = Location.objects.filter(pk=location_id).values("id", "name", "slug", "timezone").first()
+    if location is None:
+        return None
+    tz_name = location.pop("timezone")
+    cache.set(_tz_key(location_id), tz_name, timeout=None)
+    today = timezone.localdate(timezone=ZoneInfo(tz_name))
+    occupants = {
+        a.assigned_room_id: a
+        for a in Appointment.objects.filter(
+            assigned_room__location_id=location_id, date=today, status=IN_ROOM,
+        ).select_related("patient", "provider")
+    }
+    rooms = []
+    for room in Room.objects.filter(location_id=location_id, is_active=True):
+        appt = occupants.get(room.pk)
+        rooms.append({
+            "id": room.pk,
+            "name": room.name,
+            "occupied": appt is not None,
+            "appointment": None if appt is None else {
+                "id": appt.pk,
+                "patient_name": f"{appt.patient.first_name} {appt.patient.last_name}" if appt.patient else None,
+                "provider_name": f"{appt.provider.first_name} {appt.provider.last_name}",
+                "appointment_type": appt.appointment_type,
+                "start_time": appt.start_time.isoformat() if appt.start_time else None,
+                "since": appt.room_since.isoformat() if appt.room_since else None,
+            },
+        })
+    return {
+        "location": location,
+        "date": today.isoformat(),
+        "version": version,
+        "generated_at": timezone.now().isoformat(),
+        "rooms": rooms,
+        "occupied": sum(r["occupied"] for r in rooms),
+    }
+
+
+def get_board(location_id: int, version: Optional[str] = None) -> Optional[dict]:
+    """The cached board for a location (built on a miss); None if the location doesn't exist."""
+    version = version or board_version(location_id)
+    day, token = version.split(":", 1)
+    key = _entry_key(location_id, day, token)
+    board = cache.get(key)
+    metrics.record_cache("room_board", board is not None)
+    if board is None:
+        board = build_board(location_id, version)
+        if board is not None:
+            cache.set(key, board, timeout=settings.ROOM_BOARD_CACHE_TIMEOUT)
+    return board
@@ -1,17 +1,28 @@
 # backend/appointments/serializers.py
+from django.conf import settings
 from rest_framework import serializers
-from .models import Appointment
-from locations.models import Location
+from .models import Appointment, AppointmentImport, BlockTemplate, CalendarFeed
+from locations.models import WEEKDAYS, Location
+from django.db import IntegrityError, transaction
 from django.db.models import Q
-from datetime import datetime, time
+from django.urls import reverse
+from datetime import date
+from zoneinfo import ZoneInfo
 from django.utils import timezone
 from providers.models import Provider
+from core.perf import TimedSerializerMixin
+from . import blocks, rooms
+from .signals import FREED_STATUSES, notify_slot_freed
 
 
-class AppointmentSerializer(serializers.ModelSerializer):
+class AppointmentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for appointments.
     Handles both patient-linked and 'block time' appointments.
+
+    date/start_time/end_time are read and written as wall-clock times at the
+    appointment's location (`timezone`); start_utc/end_utc are the same
+    instants in UTC, derived by the database.
     """
 
     patient_name = serializers.SerializerMethodField()
@@ -25,8 +36,10 @@ class AppointmentSerializer(serializers.ModelSerializer):
 
     allow_overlap = serializers.BooleanField(write_only=True, required=False, default=False)
 
+    # The manager rather than .all(): DRF evaluates it per request, in the
+    # request's practice.
     provider = serializers.PrimaryKeyRelatedField(
-        queryset=Provider.objects.all(),
+        queryset=Provider.objects,
         required=True
     )
 
@@ -35,6 +48,9 @@ class AppointmentSerializer(serializers.ModelSerializer):
     intake_status = serializers.CharField(required=False)
     notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
 
+    start_utc = serializers.DateTimeField(read_only=True, default_timezone=ZoneInfo("UTC"))
+    end_utc = serializers.DateTimeField(read_only=True, default_timezone=ZoneInfo("UTC"))
+
     class Meta:
         model = Appointment
         fields = [
@@ -46,6 +62,8 @@ class AppointmentSerializer(serializers.ModelSerializer):
             "is_block",
             "status",
             "room",
+            "assigned_room",
+            "room_since",
             "intake_status",
             "notes",
             "color_code",
@@ -54,6 +72,9 @@ class AppointmentSerializer(serializers.ModelSerializer):
             "start_time",
             "end_time",
             "duration",
+            "timezone",
+            "start_utc",
+            "end_utc",
             "is_recurring",
             "repeat_days",
             "repeat_interval_weeks",
@@ -67,7 +88,7 @@ class AppointmentSerializer(serializers.ModelSerializer):
             "provider_name",
             "allow_overlap",
         ]
-        read_only_fields = ["id", "created_at", "updated_at"]
+        read_only_fields = ["id", "assigned_room", "room_since", "timezone", "created_at", "updated_at"]
 
     def get_patient_name(self, obj):
         return str(obj.patient) if obj.patient else None
@@ -87,6 +108,13 @@ class AppointmentSerializer(serializers.ModelSerializer):
         return str(obj.provider) if obj.provider else None
 
 
+    def get_unique_together_constraints(self, model):
+        # Room occupancy is checked in _validate_room (with the occupant's
+        # name); DRF's generic validator would make 'status' required.
+        for constraint in super().get_unique_together_constraints(model):
+            if tuple(constraint[0]) != ("assigned_room", "date"):
+                yield constraint
+
     # ---- Validation Rules ----
     def validate(self, data):
         start = data.get("start_time")
@@ -149,6 +177,17 @@ class AppointmentSerializer(serializers.ModelSerializer):
                     }
                 )
 
+            block = blocks.overlapping(data["provider"].pk, data["date"], data["office"], start, end)
+            if block is not None:
+                raise serializers.ValidationError(
+                    {
+                        "non_field_errors": [
+                            f"This time overlaps with {block.template.label} "
+                            f"({block.start_time:%H:%M}-{block.end_time:%H:%M})."
+                        ]
+                    }
+                )
+
 
         # --- Repeat logic validation ---
         if data.get("is_recurring"):
@@ -172,25 +211,61 @@ class AppointmentSerializer(serializers.ModelSerializer):
                     "repeat_days": "At least one day must be selected for recurring appointments."
                 })
 
+        # --- Room occupancy ---
+        self._validate_room(data)
+
         return data
 
-    def to_representation(self, instance):
+    def _validate_room(self, data):
         """
-        Ensure date fields are returned as local (TIME_ZONE) midnights
-        instead of naive UTC midnights, preventing one-day drift in frontend.
+        'in_room' with a room name: resolve the name to a Room of the
+        appointment's location and reject it while another patient is in it.
+        Any other status (or no room) releases the room.
         """
-        data = super().to_representation(instance)
-
-        if "date" in data and data["date"]:
-            try:
-                local_dt = timezone.localtime(
-                    timezone.make_aware(datetime.combine(instance.date, time.min))
-                )
-                data["date"] = local_dt.date().isoformat()
-            except Exception:
-                pass
-
-        return data
+        instance = self.instance
+        status = data.get("status", instance.status if instance else "pending")
+        name = (data.get("room", instance.room if instance else "") or "").strip()
+        day = data.get("date", instance.date if instance else None) or timezone.localdate()
+
+        data["assigned_room"] = None
+        if status != "in_room" or not name:
+            return
+        if (
+            instance is not None
+            and instance.status == "in_room"
+            and instance.assigned_room_id
+            and instance.room == name
+            and instance.office == data["office"]
+            and instance.date == day
+        ):
+            # Still in the same room: nothing to look up.
+            data["assigned_room"] = instance.assigned_room
+            return
+
+        room = rooms.resolve(data["office"], name)
+        if room is None:
+            raise serializers.ValidationError({"room": f"Unknown room '{name}' at {data['office']}."})
+        other = rooms.occupant(room, day, exclude_pk=instance.pk if instance else None)
+        if other is not None:
+            raise serializers.ValidationError(
+                {"room": f"Room {room.name} is occupied by {other.patient or 'another appointment'}."}
+            )
+        data["room"] = room.name
+        data["assigned_room"] = room
+
+    def _save_with_room(self, save, validated_data):
+        # The constraint backs the check in _validate_room when two desks race;
+        # only a save that puts the patient in a room needs the savepoint.
+        room = validated_data.get("assigned_room")
+        if room is None:
+            return save()
+        try:
+            with transaction.atomic():
+                return save()
+        except IntegrityError as exc:
+            if "appt_room_occupied_uniq" not in str(exc):
+                raise
+            raise serializers.ValidationError({"room": f"Room {room.name} is occupied."})
 
     def create(self, validated_data):
         validated_data.pop("allow_overlap", None)
@@ -204,13 +279,19 @@ class AppointmentSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError({
                     "office": f"Invalid location '{office}'."
                 })
+            validated_data["timezone"] = validated_data["location"].timezone
 
         # Automatically assign gray color for block times
         appt_type = (validated_data.get("appointment_type") or "").lower()
         if appt_type in ["block time", "out of office", "meeting", "surgery", "lunch", "other"]:
             validated_data["color_code"] = "#737373"
 
-        return super().create(validated_data)
+        validated_data["room_since"] = timezone.now() if validated_data.get("assigned_room") else None
+        instance = self._save_with_room(
+            lambda: super(AppointmentSerializer, self).create(validated_data), validated_data,
+        )
+        rooms.occupancy_changed(None, rooms.occupancy(instance))
+        return instance
 
     def update(self, instance, validated_data):
         # Resolve office slug → Location FK (if changed or present)
@@ -222,6 +303,7 @@ class AppointmentSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError({
                     "office": f"Invalid location '{office}'."
                 })
+            validated_data["timezone"] = validated_data["location"].timezone
 
         # --- Status rule: clear room on "seen" ---
         new_status = validated_data.get("status", instance.status)
@@ -232,4 +314,184 @@ class AppointmentSerializer(serializers.ModelSerializer):
         if "intake_status" not in validated_data:
             validated_data["intake_status"] = instance.intake_status
 
-        return super().update(instance, validated_data)
+        # --- Room occupancy: (re)start the clock when the patient enters a room ---
+        room = validated_data.get("assigned_room")
+        if room is None:
+            validated_data["room_since"] = None
+        elif instance.status != "in_room" or instance.assigned_room_id != room.pk:
+            validated_data["room_since"] = timezone.now()
+
+        old_status = instance.status
+        old_clock = _wall_clock(instance)
+        before = rooms.occupancy(instance)
+        instance = self._save_with_room(
+            lambda: super(AppointmentSerializer, self).update(instance, validated_data), validated_data,
+        )
+        if _wall_clock(instance) != old_clock:
+            # The database recomputed the instants; save() doesn't read them back.
+            instance.refresh_from_db(fields=["start_utc", "end_utc"])
+        rooms.occupancy_changed(before, rooms.occupancy(instance))
+
+        # --- Cancelled / no-show: offer the time to the waitlist ---
+        if instance.status in FREED_STATUSES and old_status not in FREED_STATUSES:
+            notify_slot_freed(instance.pk)
+
+        return instance
+
+
+
+class BulkMoveSerializer(serializers.Serializer):
+    """Input of POST /api/appointments/bulk-move/; see appointments/bulk.py."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False,
+        max_length=settings.BULK_MOVE_MAX_IDS,
+    )
+    provider = serializers.PrimaryKeyRelatedField(queryset=Provider.objects, required=False)
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+
+    shift_minutes = serializers.IntegerField(required=False, default=0, min_value=-24 * 60, max_value=24 * 60)
+    to_provider = serializers.PrimaryKeyRelatedField(queryset=Provider.objects, required=False, allow_null=True)
+    to_date = serializers.DateField(required=False, allow_null=True)
+
+    allow_overlap = serializers.BooleanField(required=False, default=False)
+    dry_run = serializers.BooleanField(required=False, default=False)
+
+    def validate(self, data):
+        by_range = [name for name in ("provider", "start_date", "end_date") if data.get(name) is not None]
+        if data.get("ids"):
+            if by_range:
+                raise serializers.ValidationError("Give either ids or provider, start_date and end_date.")
+        elif len(by_range) < 3:
+            raise serializers.ValidationError("Give ids, or provider with start_date and end_date.")
+        else:
+            days = (data["end_date"] - data["start_date"]).days
+            if days < 0:
+                raise serializers.ValidationError({"end_date": "End date cannot be before start date."})
+            if days >= settings.BULK_MOVE_MAX_DAYS:
+                raise serializers.ValidationError(
+                    {"end_date": f"At most {settings.BULK_MOVE_MAX_DAYS} days per move."}
+                )
+
+        if not (data.get("shift_minutes") or data.get("to_provider") or data.get("to_date")):
+            raise serializers.ValidationError("Nothing to change: give shift_minutes, to_provider or to_date.")
+        return data
+
+
+class BlockTemplateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Recurring blocks; see appointments/blocks.py."""
+
+    class Meta:
+        model = BlockTemplate
+        fields = [
+            "id",
+            "provider",
+            "location",
+            "label",
+            "color_code",
+            "weekdays",
+            "interval_weeks",
+            "start_time",
+            "end_time",
+            "start_date",
+            "end_date",
+            "exceptions",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = ["id", "created_at", "updated_at"]
+
+    def validate_weekdays(self, value):
+        if not isinstance(value, list) or not value or any(d not in WEEKDAYS for d in value):
+            raise serializers.ValidationError(f"A non-empty list of {', '.join(WEEKDAYS)}.")
+        return sorted(set(value), key=WEEKDAYS.index)
+
+    def validate_exceptions(self, value):
+        if not isinstance(value, list):
+            raise serializers.ValidationError("A list of dates (YYYY-MM-DD).")
+        try:
+            return sorted({date.fromisoformat(str(d)).isoformat() for d in value})
+        except ValueError:
+            raise serializers.ValidationError("A list of dates (YYYY-MM-DD).")
+
+    def validate(self, data):
+        def current(name):
+            return data.get(name, getattr(self.instance, name, None))
+
+        if current("start_time") and current("end_time") and current("end_time") <= current("start_time"):
+            raise serializers.ValidationError({"end_time": "End time must be after start time."})
+        if current("end_date") and current("start_date") and current("end_date") < current("start_date"):
+            raise serializers.ValidationError({"end_date": "End date cannot be before start date."})
+        return data
+
+
+class CalendarFeedSerializer(serializers.ModelSerializer):
+    """Calendar subscriptions; `url` is what goes into the calendar app (appointments/feeds.py)."""
+
+    url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CalendarFeed
+        fields = ["id", "provider", "location", "token", "url", "created_at"]
+        read_only_fields = ["id", "token", "url", "created_at"]
+
+    def get_url(self, obj):
+        path = reverse("calendar-feed", args=[obj.token])
+        request = self.context.get("request")
+        return request.build_absolute_uri(path) if request is not None else path
+
+
+class AppointmentImportSerializer(serializers.ModelSerializer):
+    """Bulk imports (appointments/imports.py); `file` is the upload, write-only."""
+
+    file = serializers.FileField(write_only=True)
+    format = serializers.ChoiceField(choices=AppointmentImport.FORMAT_CHOICES, required=False)
+
+    class Meta:
+        model = AppointmentImport
+        fields = [
+            "id", "file", "format", "allow_overlap", "status",
+            "rows_done", "imported", "skipped", "first_date", "last_date",
+            "report", "error", "job", "created_at", "finished_at",
+        ]
+        read_only_fields = [
+            "id", "status", "rows_done", "imported", "skipped", "first_date", "last_date",
+            "report", "error", "job", "created_at", "finished_at",
+        ]
+
+    def validate(self, data):
+        if not data.get("format"):
+            extension = data["file"].name.rsplit(".", 1)[-1].lower()
+            if extension not in dict(AppointmentImport.FORMAT_CHOICES):
+                raise serializers.ValidationError({"format": "Give csv or ics (not inferable from the file name)."})
+            data["format"] = extension
+        return data
+
+
+class PatientAppointmentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Read-only rows of a patient's history (appointments/history.py); provider and location are joined."""
+
+    provider_name = serializers.SerializerMethodField()
+    location_name = serializers.SerializerMethodField()
+    start_utc = serializers.DateTimeField(read_only=True, default_timezone=ZoneInfo("UTC"))
+    end_utc = serializers.DateTimeField(read_only=True, default_timezone=ZoneInfo("UTC"))
+
+    class Meta:
+        model = Appointment
+        fields = [
+            "id", "date", "start_time", "end_time", "duration", "timezone", "start_utc", "end_utc",
+            "status", "appointment_type", "chief_complaint", "provider", "provider_name",
+            "location", "location_name", "office",
+        ]
+        read_only_fields = fields
+
+    def get_provider_name(self, obj):
+        return str(obj.provider) if obj.provider_id else None
+
+    def get_location_name(self, obj):
+        return obj.location.name if obj.location_id else None
+
+
+def _wall_clock(appt):
+    return appt.date, appt.start_time, appt.end_time, appt.timezone
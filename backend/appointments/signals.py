@@ -0,0 +1,72 @@
+# backend/appointments/signals.py
+"""
+appointments_changed: sent after appointment rows are written.
+
+Unlike post_save it carries the *before* state of an update (an appointment moved
+to another day or provider changes two schedule windows), covers deletes and bulk
+writes, and fires once per request rather than once per row.
+
+    appointments_changed.send(sender=Appointment, scopes=[AppointmentScope, ...])
+
+scopes=None means "anything may have changed" (demo reset, bulk imports) in the
+current practice, or in every practice when none is current (core/tenancy.py).
+
+appointment_slot_freed: sent after an appointment moves to a status that gives
+its time back (cancelled, no-show), with the appointment's pk.
+
+    appointment_slot_freed.send(sender=Appointment, appointment_id=42)
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.dispatch import Signal
+
+
+appointments_changed = Signal()
+appointment_slot_freed = Signal()
+
+# Appointments in these statuses no longer occupy their time.
+FREED_STATUSES = ("cancelled", "no_show")
+
+
+@dataclass(frozen=True)
+class AppointmentScope:
+    provider_id: int
+    date: date
+    is_recurring: bool = False
+    practice_id: Optional[int] = None
+
+
+def scope_of(appointment) -> AppointmentScope:
+    return AppointmentScope(
+        provider_id=appointment.provider_id,
+        date=appointment.date,
+        is_recurring=bool(appointment.is_recurring),
+        practice_id=appointment.practice_id,
+    )
+
+
+def notify_appointments_changed(scopes: Optional[Iterable[AppointmentScope]]) -> None:
+    """
+    Send appointments_changed once the current transaction commits
+    (immediately when not in one), so receivers never see uncommitted rows.
+    """
+    from .models import Appointment
+
+    scopes = None if scopes is None else list(set(scopes))
+    transaction.on_commit(
+        lambda: appointments_changed.send(sender=Appointment, scopes=scopes)
+    )
+
+
+def notify_slot_freed(appointment_id: int) -> None:
+    """Send appointment_slot_freed once the current transaction commits."""
+    from .models import Appointment
+
+    transaction.on_commit(
+        lambda: appointment_slot_freed.send(sender=Appointment, appointment_id=appointment_id)
+    )
@@ -0,0 +1,22 @@
+# backend/appointments/tasks.py
+"""Background job handlers for appointments (see core/jobs.py)."""
+from core.jobs import job
+
+from . import imports
+from .models import AppointmentImport
+
+
+@job("appointments_import", concurrency=2, max_attempts=3, retry_delay=30)
+def appointments_import(ctx) -> dict:
+    imp = AppointmentImport.objects.get(pk=ctx.payload["import_id"])
+    ctx.progress(1, "Importing appointments")
+    try:
+        return imports.run(imp, progress=ctx.progress, user=ctx.job.created_by)
+    except Exception as exc:
+        # A retry resumes from the checkpoint; only the last attempt fails the import.
+        last = ctx.job.attempts >= ctx.job.max_attempts
+        AppointmentImport.all_objects.filter(pk=imp.pk).update(
+            status=AppointmentImport.STATUS_FAILED if last else AppointmentImport.STATUS_PENDING,
+            error=str(exc)[:2000],
+        )
+        raise
@@ -1,3 +1,807 @@
-from django.test import TestCase
+import importlib
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, time, timedelta
+from unittest import mock
+from zoneinfo import ZoneInfo
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from locations.models import Location, Room
+from patients.models import Patient
+from providers.models import Provider
+
+from . import blocks, feeds, history, imports
+from .models import Appointment, AppointmentImport, BlockTemplate, CalendarFeed
+
+
+@override_settings(QUERY_STATS_ENABLED=False, REPORTING_ASYNC=False, WAITLIST_ENABLED=False)
+class RoomOccupancyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(name="Room Office", slug="room-office")
+        cls.rooms = [Room.objects.create(location=cls.location, name=str(n), sort_order=n) for n in (1, 2)]
+        cls.provider = Provider.objects.create(first_name="Ada", last_name="Lane", email="ada@example.com")
+        cls.patients = [
+            Patient.objects.create(first_name=f"P{i}", last_name="Roomer", date_of_birth="1980-01-01")
+            for i in range(2)
+        ]
+        cls.user = User.objects.create_user("frontdesk", password="x")
+        today = timezone.localdate()
+        cls.appts = [
+            Appointment.objects.create(
+                patient=p, provider=cls.provider, location=cls.location, office="room-office",
+                date=today, start_time=time(9 + i), end_time=time(9 + i, 30),
+            )
+            for i, p in enumerate(cls.patients)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def move(self, appt, status, room=""):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.patch(
+                f"/api/appointments/{appt.pk}/",
+                {"status": status, "room": room, "patient": appt.patient_id, "office": appt.office},
+                format="json",
+            )
+
+    def board(self, **headers):
+        return self.client.get(f"/api/locations/{self.location.pk}/board/", **headers)
+
+    def test_room_holds_one_patient_at_a_time(self):
+        first, second = self.appts
+        response = self.move(first, "in_room", "1")
+        self.assertEqual(response.status_code, 200, response.content[:300])
+        self.assertEqual(response.json()["assigned_room"], self.rooms[0].pk)
+        self.assertIsNotNone(response.json()["room_since"])
+
+        response = self.move(second, "in_room", "1")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("occupied", response.json()["room"][0])
+        self.assertEqual(self.move(second, "in_room", "9").status_code, 400)
+
+        # Seen frees the room.
+        response = self.move(first, "seen")
+        self.assertIsNone(response.json()["assigned_room"])
+        self.assertEqual(self.move(second, "in_room", "1").status_code, 200)
+
+    def test_board_is_cached_and_invalidated_by_occupancy(self):
+        board = self.board()
+        self.assertEqual(board.status_code, 200)
+        self.assertEqual([r["occupied"] for r in board.json()["rooms"]], [False, False])
+
+        with CaptureQueriesContext(connection) as ctx:
+            again = self.board()
+        self.assertEqual(len(ctx), 0)
+        self.assertEqual(self.board(HTTP_IF_NONE_MATCH=again["ETag"]).status_code, 304)
+
+        self.move(self.appts[1], "in_room", "2")
+        board = self.board(HTTP_IF_NONE_MATCH=again["ETag"])
+        self.assertEqual(board.status_code, 200)
+        self.assertNotEqual(board["ETag"], again["ETag"])
+        room = board.json()["rooms"][1]
+        self.assertEqual(room["appointment"]["id"], self.appts[1].pk)
+        self.assertEqual(room["appointment"]["patient_name"], "P1 Roomer")
+        self.assertEqual(board.json()["occupied"], 1)
+
+    def test_board_for_unknown_location(self):
+        self.assertEqual(self.client.get("/api/locations/999999/board/").status_code, 404)
+
+    def book_in_room(self, room):
+        return Appointment.objects.create(
+            patient=self.patients[0], provider=self.provider, location=self.location, office="room-office",
+            date=timezone.localdate(), start_time=time(11), end_time=time(11, 30), status="in_room", room=room,
+        )
+
+    def test_room_migration_seats_patients_already_in_a_room(self):
+        migration = importlib.import_module("appointments.migrations.0013_room_occupancy")
+        first, second = self.appts
+        earlier = self.book_in_room("3 ")
+        Appointment.objects.filter(pk__in=[first.pk, second.pk]).update(status="in_room", room="3")
+        # Already seated rows are left as they are.
+        Appointment.objects.filter(pk=second.pk).update(assigned_room=self.rooms[1])
+        Appointment.objects.filter(pk=earlier.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+
+        migration.rooms_from_labels(apps, None)
+
+        room = Room.objects.get(location=self.location, name="3")
+        first.refresh_from_db()
+        earlier.refresh_from_db()
+        self.assertEqual((first.assigned_room_id, first.room_since), (room.pk, first.updated_at))
+        # Same room and day as a later change: left unseated (appt_room_occupied_uniq).
+        self.assertIsNone(earlier.assigned_room_id)
+        self.assertEqual(Appointment.objects.get(pk=second.pk).assigned_room_id, self.rooms[1].pk)
+
+
+@override_settings(QUERY_STATS_ENABLED=False, REPORTING_ASYNC=False, WAITLIST_ENABLED=False)
+class LocationTimeZoneTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.chicago = Location.objects.create(name="Chicago", slug="chicago", timezone="America/Chicago")
+        cls.ny = Location.objects.create(name="New York", slug="new-york", timezone="America/New_York")
+        cls.provider = Provider.objects.create(first_name="Ada", last_name="Zone", email="zone@example.com")
+        cls.patient = Patient.objects.create(first_name="Pat", last_name="Zone", date_of_birth="1980-01-01")
+        cls.user = User.objects.create_user("zones", password="x", is_staff=True)
+        cls.day = date(2026, 3, 10)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def book(self, office, start, end):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/appointments/", {
+                "patient": self.patient.pk, "provider": self.provider.pk, "office": office,
+                "appointment_type": "Consult", "date": str(self.day), "start_time": start, "end_time": end,
+            }, format="json")
+        self.assertEqual(response.status_code, 201, response.content[:300])
+        return response.json()
+
+    def test_local_times_in_utc_instants_out(self):
+        ny = self.book("new-york", "09:00", "09:30")
+        self.assertEqual((ny["timezone"], ny["start_time"]), ("America/New_York", "09:00:00"))
+        self.assertEqual(ny["start_utc"], "2026-03-10T13:00:00Z")
+        self.assertEqual(ny["end_utc"], "2026-03-10T13:30:00Z")
+
+        chicago = self.book("chicago", "09:00", "09:30")
+        self.assertEqual(chicago["start_utc"], "2026-03-10T14:00:00Z")
+
+        # Moving it to New York re-reads the same wall-clock time there.
+        with self.captureOnCommitCallbacks(execute=True):
+            moved = self.client.patch(f"/api/appointments/{chicago['id']}/",
+                                      {"patient": self.patient.pk, "office": "new-york"}, format="json").json()
+        self.assertEqual(moved["start_utc"], "2026-03-10T13:00:00Z")
+
+    def test_instant_range_spans_locations(self):
+        ny = self.book("new-york", "09:00", "09:30")          # 13:00Z
+        chicago = self.book("chicago", "08:30", "09:00")      # 13:30Z
+        self.book("chicago", "09:00", "09:30")                # 14:00Z
+
+        response = self.client.get(
+            f"/api/appointments/?provider={self.provider.pk}"
+            "&start_after=2026-03-10T13:00:00Z&start_before=2026-03-10T14:00:00Z&ordering=start_time"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(a["id"] for a in response.json()["results"]), sorted([ny["id"], chicago["id"]]))
+        self.assertEqual(self.client.get("/api/appointments/?start_after=2026-03-10T13:00").status_code, 400)
+
+    def test_changing_location_zone_moves_instants(self):
+        appt = self.book("chicago", "09:00", "09:30")
+        self.chicago.timezone = "America/Denver"
+        self.chicago.save()
+        row = Appointment.objects.get(pk=appt["id"])
+        self.assertEqual((row.timezone, row.start_time), ("America/Denver", time(9)))
+        self.assertEqual(row.start_utc, datetime(2026, 3, 10, 9, tzinfo=ZoneInfo("America/Denver")))
+
+        response = self.client.patch(f"/api/locations/{self.chicago.pk}/", {"timezone": "Mars/Olympus"},
+                                     format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_saving_a_location_only_rehomes_appointments_when_its_zone_changes(self):
+        self.book("chicago", "09:00", "09:30")
+        location = Location.objects.get(pk=self.chicago.pk)
+
+        def appointment_writes(**save_kwargs):
+            with CaptureQueriesContext(connection) as ctx:
+                location.save(**save_kwargs)
+            return [q["sql"] for q in ctx.captured_queries if q["sql"].startswith('UPDATE "appointments_')]
+
+        location.phone = "555-0100"
+        self.assertEqual(appointment_writes(), [])
+        location.timezone = "America/Denver"
+        self.assertEqual(appointment_writes(update_fields=["phone"]), [])
+        self.assertEqual(len(appointment_writes()), 1)
+        self.assertEqual(appointment_writes(), [])
+
+
+@override_settings(QUERY_STATS_ENABLED=False, REPORTING_ASYNC=False, WAITLIST_ENABLED=False)
+class BulkMoveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(name="Bulk North", slug="bulk-north")
+        cls.sick = Provider.objects.create(first_name="Sam", last_name="Sick", email="sick@example.com")
+        cls.cover = Provider.objects.create(first_name="Cora", last_name="Cover", email="cover@example.com")
+        cls.patient = Patient.objects.create(first_name="Pat", last_name="Moved", date_of_birth="1980-01-01")
+        cls.user = User.objects.create_user("bulk", password="x")
+        cls.day = date(2026, 3, 10)
+        cls.appts = [cls.book(cls.sick, time(9 + i), time(9 + i, 30)) for i in range(3)]
+        cls.lunch = Appointment.objects.create(
+            provider=cls.sick, location=cls.location, office="bulk-north", appointment_type="Lunch",
+            is_block=True, date=cls.day, start_time=time(12), end_time=time(13),
+        )
+
+    @classmethod
+    def book(cls, provider, start, end, **fields):
+        return Appointment.objects.create(
+            patient=cls.patient, provider=provider, location=cls.location, office="bulk-north",
+            date=cls.day, start_time=start, end_time=end, **fields,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def bulk(self, **payload):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post("/api/appointments/bulk-move/", payload, format="json")
+
+    def range_of(self, provider):
+        return {"provider": provider.pk, "start_date": str(self.day), "end_date": str(self.day)}
+
+    def test_move_day_to_another_provider(self):
+        response = self.bulk(**self.range_of(self.sick), to_provider=self.cover.pk)
+        self.assertEqual(response.status_code, 200, response.content[:300])
+        self.assertTrue(response.json()["applied"])
+        self.assertEqual(response.json()["count"], 3)
+
+        moved = Appointment.objects.filter(pk__in=[a.pk for a in self.appts])
+        self.assertEqual({a.provider_id for a in moved}, {self.cover.pk})
+        # Blocks stay with the provider they belong to.
+        self.lunch.refresh_from_db()
+        self.assertEqual(self.lunch.provider_id, self.sick.pk)
+
+    def test_conflicts_are_checked_as_a_set_and_nothing_is_written(self):
+        blocker = self.book(self.cover, time(10, 15), time(10, 45))
+
+        preview = self.bulk(**self.range_of(self.sick), to_provider=self.cover.pk, dry_run=True)
+        self.assertEqual(preview.status_code, 200)
+        self.assertFalse(preview.json()["applied"])
+        self.assertEqual(
+            preview.json()["conflicts"],
+            [{"id": self.appts[1].pk, "reasons": [f"Overlaps appointment #{blocker.pk} in bulk-north."]}],
+        )
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.bulk(**self.range_of(self.sick), to_provider=self.cover.pk)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Appointment.objects.filter(provider=self.cover).count(), 1)
+        self.assertFalse(any(q["sql"].startswith("UPDATE") for q in ctx.captured_queries))
+
+        cancelled = Appointment.objects.filter(pk=blocker.pk).update(status="cancelled")
+        self.assertEqual(cancelled, 1)
+        self.assertEqual(self.bulk(**self.range_of(self.sick), to_provider=self.cover.pk).status_code, 200)
+
+    def test_shift_selection_and_collisions_within_it(self):
+        ids = [a.pk for a in self.appts]
+        # Shifting onto each other's old times is fine: they all move together.
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post("/api/appointments/bulk-move/", {"ids": ids, "shift_minutes": 30},
+                                        format="json")
+        self.assertEqual(response.status_code, 200, response.content[:300])
+        # Lock + load, conflict checks (appointments, block templates), one
+        # UPDATE and the savepoint pair (audit and rollups follow on commit).
+        self.assertLessEqual(len(ctx), 6)
+        self.assertEqual(
+            list(Appointment.objects.filter(pk__in=ids).order_by("start_time").values_list("start_time", flat=True)),
+            [time(9, 30), time(10, 30), time(11, 30)],
+        )
+
+        # Into the lunch block (which isn't being moved), and past midnight.
+        response = self.bulk(ids=ids[2:], shift_minutes=30)
+        self.assertEqual(response.status_code, 409)
+        response = self.bulk(ids=ids[:1], shift_minutes=15 * 60)
+        self.assertEqual(response.json()["conflicts"][0]["reasons"], ["Would move past midnight."])
+
+        # Two providers' rows merged into one lane collide with each other.
+        other = self.book(self.cover, time(9, 45), time(10, 15))
+        response = self.bulk(ids=[ids[0], other.pk], to_provider=self.cover.pk, dry_run=True)
+        self.assertIn("also being moved", response.json()["conflicts"][0]["reasons"][0])
+
+    def test_id_selection_rejects_what_a_range_selection_leaves_out(self):
+        cancelled = self.book(self.sick, time(14), time(14, 30), status="cancelled")
+        response = self.bulk(ids=[self.appts[0].pk, self.lunch.pk, cancelled.pk], to_provider=self.cover.pk)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["conflicts"], [
+            {"id": self.lunch.pk, "reasons": ["Not a patient appointment."]},
+            {"id": cancelled.pk, "reasons": ["Appointment is cancelled."]},
+        ])
+        self.assertEqual(Appointment.objects.filter(provider=self.cover).count(), 0)
+
+    def test_reassignment_needs_the_new_providers_hours_at_the_location(self):
+        south = Location.objects.create(name="Bulk South", slug="bulk-south")
+        self.cover.locations.set([south])
+        response = self.bulk(**self.range_of(self.sick), to_provider=self.cover.pk, dry_run=True)
+        self.assertEqual(
+            {c["id"]: c["reasons"] for c in response.json()["conflicts"]},
+            {a.pk: ["Provider has no hours at this location."] for a in self.appts},
+        )
+
+        self.cover.locations.add(self.location)
+        self.location.hours.filter(weekday="tue").update(start=time(10))
+        response = self.bulk(**self.range_of(self.sick), to_provider=self.cover.pk, dry_run=True)
+        self.assertEqual(response.json()["conflicts"], [
+            {"id": self.appts[0].pk, "reasons": ["Outside location hours (10:00-17:00)."]},
+        ])
+        self.location.hours.filter(weekday="tue").update(open=False)
+        response = self.bulk(**self.range_of(self.sick), to_provider=self.cover.pk)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["conflicts"][0]["reasons"], ["Location is closed on Tue."])
+
+    def test_move_to_date_keeps_day_offsets_and_validates(self):
+        response = self.bulk(ids=[self.appts[0].pk], to_date="2026-03-12")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Appointment.objects.get(pk=self.appts[0].pk).date, date(2026, 3, 12))
+
+        self.assertEqual(self.bulk(ids=[self.appts[0].pk]).status_code, 400)
+        self.assertEqual(self.bulk(provider=self.sick.pk, shift_minutes=5).status_code, 400)
+
+
+@override_settings(QUERY_STATS_ENABLED=False, REPORTING_ASYNC=False, WAITLIST_ENABLED=False)
+class BlockTemplateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(name="Block North", slug="block-north")
+        cls.provider = Provider.objects.create(first_name="Bea", last_name="Blocked", email="bea@example.com")
+        cls.patient = Patient.objects.create(first_name="Pat", last_name="Block", date_of_birth="1980-01-01")
+        cls.user = User.objects.create_user("blocks", password="x")
+        # Mon 2026-03-02 onwards.
+        cls.lunch = BlockTemplate.objects.create(
+            provider=cls.provider, label="Lunch", weekdays=["mon", "tue", "wed", "thu", "fri"],
+            start_time=time(12), end_time=time(13), start_date=date(2026, 3, 2), exceptions=["2026-03-04"],
+        )
+        cls.away = BlockTemplate.objects.create(
+            provider=cls.provider, location=cls.location, label="Out of Office", weekdays=["fri"],
+            interval_weeks=2, start_time=time(8), end_time=time(12),
+            start_date=date(2026, 3, 2), end_date=date(2026, 3, 31),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_expansion_honours_interval_bounds_and_exceptions(self):
+        days = list(self.lunch.dates(date(2026, 3, 1), date(2026, 3, 8)))
+        self.assertEqual(days, [date(2026, 3, d) for d in (2, 3, 5, 6)])
+        self.assertEqual(
+            list(self.away.dates(date(2026, 3, 1), date(2026, 4, 30))),
+            [date(2026, 3, 6), date(2026, 3, 20)],
+        )
+        found = blocks.occurrences(date(2026, 3, 6), date(2026, 3, 6), office="elsewhere")
+        self.assertEqual([o.template.label for o in found], ["Lunch"])
+
+    def test_window_carries_occurrences_and_template_writes_drop_it(self):
+        url = f"/api/appointments/?start_date=2026-03-02&end_date=2026-03-06&provider={self.provider.pk}"
+        rows = self.client.get(url).json()["blocks"]
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]["appointment_type"], "Lunch")
+        self.assertEqual(rows[0]["block_template"], self.lunch.pk)
+        self.assertIsNone(rows[0]["id"])
+        # Nothing is materialized.
+        self.assertFalse(Appointment.objects.filter(is_block=True).exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f"/api/block-templates/{self.lunch.pk}/skip/", {"date": "2026-03-05"},
+                                        format="json")
+        self.assertEqual(response.status_code, 200, response.content[:300])
+        self.assertEqual(response.json()["exceptions"], ["2026-03-04", "2026-03-05"])
+        self.assertEqual(len(self.client.get(url).json()["blocks"]), 4)
+
+    def test_occurrences_are_checked_for_overlap(self):
+        payload = {
+            "patient": self.patient.pk, "provider": self.provider.pk, "office": "block-north",
+            "appointment_type": "Consult", "date": "2026-03-06", "start_time": "11:30", "end_time": "12:00",
+        }
+        response = self.client.post("/api/appointments/", payload, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Out of Office", str(response.json()))
+
+        # Another Friday of the fortnight is free in the morning but not at lunch.
+        payload["date"] = "2026-03-13"
+        self.assertEqual(self.client.post("/api/appointments/", payload, format="json").status_code, 201)
+        payload.update(start_time="12:30", end_time="13:00")
+        self.assertIn("Lunch", str(self.client.post("/api/appointments/", payload, format="json").json()))
+
+        appt = Appointment.objects.get(date=date(2026, 3, 13))
+        response = self.client.post("/api/appointments/bulk-move/", {"ids": [appt.pk], "to_date": "2026-03-20"},
+                                    format="json")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["conflicts"][0]["reasons"], ["Overlaps Out of Office (08:00-12:00)."])
+
+    def test_template_validation(self):
+        response = self.client.post("/api/block-templates/", {
+            "provider": self.provider.pk, "weekdays": ["mon", "someday"],
+            "start_time": "13:00", "end_time": "12:00", "start_date": "2026-03-02",
+        }, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("weekdays", response.json())
+
+
+@override_settings(QUERY_STATS_ENABLED=False, REPORTING_ASYNC=False, WAITLIST_ENABLED=False)
+class CalendarFeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.north = Location.objects.create(name="Feed North", slug="feed-north")
+        cls.south = Location.objects.create(name="Feed South", slug="feed-south")
+        cls.provider = Provider.objects.create(first_name="Fay", last_name="Feed", email="fay@example.com")
+        cls.patient = Patient.objects.create(first_name="Jane", last_name="Private", date_of_birth="1980-01-01")
+        cls.user = User.objects.create_user("feeds", password="x")
+        cls.today = timezone.localdate()
+        cls.appts = [
+            Appointment.objects.create(
+                patient=cls.patient, provider=cls.provider, location=loc, office=loc.slug,
+                appointment_type="Consult", chief_complaint="Knee pain", notes="Private notes",
+                date=cls.today, start_time=time(9 + i), end_time=time(9 + i, 30),
+            )
+            for i, loc in enumerate([cls.north, cls.south])
+        ]
+        BlockTemplate.objects.create(
+            provider=cls.provider, label="Lunch", weekdays=["mon", "tue", "wed", "thu", "fri", "sat", "sun"],
+            start_time=time(12), end_time=time(13), start_date=cls.today, end_date=cls.today,
+        )
+        cls.feed = CalendarFeed.objects.create(provider=cls.provider)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def get(self, feed=None, **headers):
+        return self.client.get(f"/api/feeds/{(feed or self.feed).token}.ics", **headers)
+
+    def test_feed_has_events_without_phi(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        text = response.content.decode()
+        self.assertTrue(text.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertEqual(text.count("BEGIN:VEVENT"), 3)
+        self.assertIn(f"UID:appointment-{self.appts[0].pk}@", text)
+        self.assertIn("SUMMARY:Lunch", text)
+        self.assertIn("LOCATION:Feed North", text)
+        for secret in ("Jane", "Private", "Knee"):
+            self.assertNotIn(secret, text)
+
+        location_feed = CalendarFeed.objects.create(provider=self.provider, location=self.south)
+        text = self.get(location_feed).content.decode()
+        self.assertEqual(text.count("BEGIN:VEVENT"), 2)
+        self.assertNotIn("Feed North", text.split("END:VEVENT")[0])
+
+    def test_etag_polls_and_incremental_regeneration(self):
+        first = self.get()
+        with CaptureQueriesContext(connection) as ctx:
+            again = self.get(HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(len(ctx), 0)
+
+        appt = self.appts[1]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.force_authenticate(self.user)
+            response = self.client.patch(
+                f"/api/appointments/{appt.pk}/", {"patient": self.patient.pk, "office": appt.office, "status": "cancelled"}, format="json",
+            )
+            self.client.force_authenticate(None)
+        self.assertEqual(response.status_code, 200)
+
+        with CaptureQueriesContext(connection) as ctx:
+            changed = self.get(HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], first["ETag"])
+        self.assertEqual(changed.content.decode().count("BEGIN:VEVENT"), 2)
+        # Only the changed day is queried again.
+        appointment_sql = [q["sql"] for q in ctx.captured_queries if '"appointments_appointment"' in q["sql"]]
+        self.assertEqual(len(appointment_sql), 1)
+        self.assertIn(f"\"date\" IN ('{self.today}'::date)", appointment_sql[0])
+
+    def test_rotate_and_delete_revoke(self):
+        self.assertEqual(self.get().status_code, 200)
+        self.client.force_authenticate(self.user)
+        response = self.client.post(f"/api/calendar-feeds/{self.feed.pk}/rotate/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["url"].endswith(f"/api/feeds/{response.json()['token']}.ics"))
+        self.client.force_authenticate(None)
+        self.assertEqual(self.get().status_code, 404)
+
+        rotated = CalendarFeed.objects.get(pk=self.feed.pk)
+        self.assertEqual(self.get(rotated).status_code, 200)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.delete(f"/api/calendar-feeds/{rotated.pk}/").status_code, 204)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.get(rotated).status_code, 404)
+
+    def test_lines_are_folded_and_escaped(self):
+        line = "SUMMARY:" + feeds._text("Pre-op, knee; left\n") + "é" * 80
+        folded = feeds._fold(line)
+        self.assertTrue(all(len(part.encode()) <= 75 for part in folded.split("\r\n")))
+        self.assertEqual(folded.replace("\r\n ", ""), line)
+        self.assertIn("Pre-op\\, knee\\; left\\n", line)
+
+
+IMPORT_CSV = """date,start_time,end_time,provider_email,patient_prn,location,appointment_type,status
+2019-05-06,09:00,09:30,imp@example.com,{prn},Import North,Consult,seen
+2019-05-06,09:15,09:45,imp@example.com,{prn},import-north,Consult,seen
+2019-05-06,09:15,09:45,imp@example.com,{prn},import-north,Consult,cancelled
+2019-05-06,10:00,10:30,nobody@example.com,{prn},import-north,Consult,seen
+2019-05-06,10:30,11:00,imp@example.com,{prn},import-north,Follow-up,seen
+2019-05-06,12:00,13:00,imp@example.com,,import-north,Lunch,
+2019-05-07,08:00,08:30,imp@example.com,{prn},import-north,Consult,seen
+"""
+
+IMPORT_ICS = (
+    "BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"
+    "BEGIN:VEVENT\r\nUID:a1\r\nDTSTART:20190506T130000Z\r\nDTEND:20190506T133000Z\r\n"
+    "SUMMARY:Consult\r\nORGANIZER;CN=\"Dr: Imp\":mailto:imp@example.com\r\n"
+    "ATTENDEE:mailto:ivy@example.com\r\nLOCATION:Import\r\n  North\r\n"
+    "BEGIN:VALARM\r\nDESCRIPTION:Reminder\r\nEND:VALARM\r\nEND:VEVENT\r\n"
+    "BEGIN:VEVENT\r\nUID:a2\r\nDTSTART;TZID=America/New_York:20190506T100000\r\nDURATION:PT45M\r\n"
+    "SUMMARY:Follow-up\r\nX-PROVIDER-EMAIL:imp@example.com\r\nSTATUS:CANCELLED\r\n"
+    "X-PATIENT-PRN:{prn}\r\nLOCATION:import-north\r\nEND:VEVENT\r\n"
+    "BEGIN:VEVENT\r\nUID:a3\r\nDTSTART;VALUE=DATE:20190507\r\nSUMMARY:Holiday\r\nEND:VEVENT\r\n"
+    "END:VCALENDAR\r\n"
+)
+
+
+@override_settings(QUERY_STATS_ENABLED=False, REPORTING_ASYNC=False, WAITLIST_ENABLED=False,
+                   JOBS_EAGER=True)
+class AppointmentImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(name="Import North", slug="import-north", timezone="America/New_York")
+        cls.provider = Provider.objects.create(first_name="Ima", last_name="Porter", email="imp@example.com")
+        cls.patient = Patient.objects.create(
+            first_name="Ivy", last_name="Import", date_of_birth="1980-01-01", email="ivy@example.com",
+        )
+        cls.admin = User.objects.create_user("importer", password="x", is_staff=True)
+
+    def setUp(self):
+        self.media, self.private = tempfile.mkdtemp(), tempfile.mkdtemp()
+        for directory in (self.media, self.private):
+            self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media, IMPORT_ROOT=self.private))
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def source(self, name, text):
+        path = f"{self.private}/{name}"
+        with open(path, "w", newline="") as fh:
+            fh.write(text)
+        return path
+
+    def test_csv_upload_runs_as_job_with_report(self):
+        upload = SimpleUploadedFile("legacy.csv", IMPORT_CSV.format(prn=self.patient.prn).encode())
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/appointment-imports/", {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, 202, response.content[:300])
+
+        imp = AppointmentImport.objects.get(pk=response.json()["import_id"])
+        self.assertEqual(imp.status, AppointmentImport.STATUS_SUCCEEDED)
+        self.assertEqual((imp.rows_done, imp.imported, imp.skipped), (7, 5, 2))
+        self.assertEqual((imp.first_date, imp.last_date), (date(2019, 5, 6), date(2019, 5, 7)))
+
+        rows = Appointment.objects.filter(provider=self.provider).order_by("date", "start_time")
+        self.assertEqual(rows.count(), 5)
+        lunch = rows.get(appointment_type="Lunch")
+        self.assertTrue(lunch.is_block)
+        self.assertIsNone(lunch.patient_id)
+        self.assertEqual(rows.first().timezone, "America/New_York")
+
+        report = self.client.get(f"/api/appointment-imports/{imp.pk}/report/")
+        self.assertEqual(report.status_code, 200)
+        lines = b"".join(report.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "record,reason")
+        self.assertEqual(lines[1], "2,Overlaps record 1 of this import.")
+        self.assertEqual(lines[2], "4,Unknown provider 'nobody@example.com'.")
+
+        # The upload and the report stay in IMPORT_ROOT, out of the public MEDIA_ROOT.
+        self.assertEqual(os.listdir(self.media), [])
+        self.assertEqual(sorted(os.listdir(self.private)), ["reports", "uploads"])
+
+        clerk = User.objects.create_user("clerk-import", password="x")
+        self.client.force_authenticate(clerk)
+        self.assertEqual(self.client.get("/api/appointment-imports/").status_code, 403)
+        self.assertEqual(self.client.get(f"/api/appointment-imports/{imp.pk}/report/").status_code, 403)
+
+    @override_settings(APPOINTMENT_IMPORT_BATCH_SIZE=2)
+    def test_ics_import_resumes_and_checks_existing_rows(self):
+        Appointment.objects.create(
+            patient=self.patient, provider=self.provider, location=self.location, office="import-north",
+            timezone="America/New_York", date=date(2019, 5, 6), start_time=time(9, 15), end_time=time(9, 20),
+        )
+        path = self.source("legacy.ics", IMPORT_ICS.format(prn=self.patient.prn))
+        imp = AppointmentImport.objects.create(source=path, format="ics")
+        with CaptureQueriesContext(connection) as ctx:
+            result = imports.run(imp)
+        self.assertEqual(result, {"import_id": imp.pk, "records": 3, "imported": 1, "skipped": 2,
+                                  "report": f"reports/{imp.pk}-errors.csv"})
+        # Lookup maps are built once, not per record or batch.
+        patient_selects = [q for q in ctx.captured_queries if 'FROM "patients_patient"' in q["sql"]]
+        self.assertEqual(len(patient_selects), 1)
+
+        with open(f"{self.private}/{result['report']}") as fh:
+            report = fh.read().splitlines()
+        # 13:00Z is 09:00 in New York, over the existing 09:15 row.
+        self.assertRegex(report[1], r"^1,Overlaps appointment #\d+\.$")
+        self.assertEqual(report[2], "3,All-day events are not imported.")
+        follow_up = Appointment.objects.get(appointment_type="Follow-up")
+        self.assertEqual((follow_up.status, follow_up.start_time, follow_up.end_time),
+                         ("cancelled", time(10), time(10, 45)))
+
+        # A resumed import skips the checkpointed records.
+        path = self.source("legacy.csv", IMPORT_CSV.format(prn=self.patient.prn))
+        imp = AppointmentImport.objects.create(source=path, format="csv", rows_done=4)
+        result = imports.run(imp)
+        self.assertEqual((result["records"], result["imported"], result["skipped"]), (7, 3, 0))
+        self.assertEqual(Appointment.objects.filter(provider=self.provider).count(), 5)
+
+    def test_sweep_flags_overlaps_in_any_order(self):
+        def pending(number, start, end, status="seen"):
+            return imports.Pending(number, Appointment(
+                provider=self.provider, office="import-north", date=date(2019, 6, 3),
+                start_time=start, end_time=end, status=status,
+            ))
+
+        Appointment.objects.create(
+            provider=self.provider, location=self.location, office="import-north", is_block=True,
+            date=date(2019, 6, 3), start_time=time(12), end_time=time(13),
+        )
+        found = imports.conflicts([
+            pending(1, time(11, 30), time(12, 15)),   # runs into the existing block
+            pending(2, time(9), time(10)),
+            pending(3, time(9, 30), time(11)),        # overlaps record 2
+            pending(4, time(10), time(11), "cancelled"),
+            pending(5, time(13), time(14)),
+        ])
+        self.assertEqual(set(found), {1, 3})
+        self.assertIn("Overlaps appointment #", found[1])
+
+
+@override_settings(QUERY_STATS_ENABLED=False, REPORTING_ASYNC=False, WAITLIST_ENABLED=False)
+class PatientHistoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(name="History Office", slug="history-office")
+        cls.provider = Provider.objects.create(first_name="Hal", last_name="Story", email="hal@example.com")
+        cls.patient = Patient.objects.create(first_name="Hana", last_name="History", date_of_birth="1975-05-05")
+        other = Patient.objects.create(first_name="Other", last_name="Person", date_of_birth="1975-05-05")
+        cls.user = User.objects.create_user("historian", password="x")
+
+        today = timezone.localdate()
+        common = {"provider": cls.provider, "location": cls.location, "office": "history-office"}
+        # Past, latest first: earlier today, two on the same day, one without times.
+        plan = [
+            (0, time(9), "seen"), (-1, time(14), "seen"), (-1, time(9), "no_show"), (-3, None, "seen"),
+            (-5, time(10), "cancelled"), (-8, time(11), "arrived"),
+            (0, time(16), "pending"), (2, time(9), "pending"), (4, time(9), "cancelled"),
+        ]
+        cls.appts = {}
+        for offset, start, status in plan:
+            end = time(start.hour, 30) if start else None
+            cls.appts[(offset, start)] = Appointment.objects.create(
+                patient=cls.patient, date=today + timedelta(days=offset), start_time=start, end_time=end,
+                status=status, **common,
+            )
+        Appointment.objects.create(patient=other, date=today, start_time=time(8), end_time=time(8, 30), **common)
+        cls.today = today
+
+    def setUp(self):
+        # Midday: this morning's visit is past, this afternoon's slot upcoming.
+        noon = timezone.make_aware(datetime.combine(self.today, time(12)))
+        self.enterContext(mock.patch("django.utils.timezone.now", return_value=noon))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def url(self, query=""):
+        return f"/api/patients/{self.patient.pk}/appointments/{query}"
+
+    def test_split_lists_and_summary(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url())
+        self.assertEqual(response.status_code, 200, response.content[:300])
+        # Patient, summary, one page query per list; no per-row queries.
+        self.assertEqual(len(ctx), 4, "\n".join(q["sql"][:160] for q in ctx.captured_queries))
+
+        data = response.json()
+        self.assertEqual(data["summary"], {
+            "visits": 4, "no_shows": 1, "cancelled": 2, "upcoming": 2, "last_seen": self.today.isoformat(),
+        })
+        upcoming = [(r["date"], r["status"]) for r in data["upcoming"]["results"]]
+        self.assertEqual([s for _, s in upcoming], ["pending", "pending", "cancelled"])
+        self.assertEqual(data["upcoming"]["results"][0]["location_name"], "History Office")
+        self.assertEqual(data["upcoming"]["results"][0]["provider_name"], "Hal Story")
+        past_ids = [r["id"] for r in data["past"]["results"]]
+        self.assertEqual(past_ids, [
+            self.appts[key].pk
+            for key in [(0, time(9)), (-1, time(14)), (-1, time(9)), (-3, None), (-5, time(10)), (-8, time(11))]
+        ])
+        self.assertIsNone(data["past"]["next"])
+
+    def test_keyset_pages_follow_next_links(self):
+        seen, url = [], self.url("?page_size=2")
+        first = self.client.get(url).json()
+        url = first["past"]["next"]
+        seen += [r["id"] for r in first["past"]["results"]]
+        while url:
+            data = self.client.get(url).json()
+            self.assertNotIn("upcoming", data)
+            self.assertNotIn("summary", data)
+            seen += [r["id"] for r in data["past"]["results"]]
+            url = data["past"]["next"]
+        self.assertEqual(seen, [
+            self.appts[key].pk
+            for key in [(0, time(9)), (-1, time(14)), (-1, time(9)), (-3, None), (-5, time(10)), (-8, time(11))]
+        ])
+
+        upcoming = self.client.get(first["upcoming"]["next"]).json()["upcoming"]
+        self.assertEqual([r["id"] for r in upcoming["results"]], [self.appts[(4, time(9))].pk])
+        self.assertIsNone(upcoming["next"])
+
+    def test_cursor_handles_rows_without_times(self):
+        rows = [self.appts[key] for key in [(-3, None), (-5, time(10))]]
+        after_null = history.decode_cursor(history.encode_cursor(rows[0]))
+        self.assertEqual(after_null, (rows[0].date, None, rows[0].pk))
+        ids = list(
+            Appointment.objects.filter(patient=self.patient, date__lt=self.today)
+            .filter(history._after(after_null, descending=True)).values_list("pk", flat=True)
+        )
+        self.assertEqual(sorted(ids), sorted([rows[1].pk, self.appts[(-8, time(11))].pk]))
+
+    def test_bad_parameters(self):
+        for query in ("?when=later", "?when=past&cursor=%%%", "?cursor=abc", "?page_size=x"):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(self.url(query)).status_code, 400)
+
+
+@override_settings(QUERY_STATS_ENABLED=False, REPORTING_ASYNC=False, WAITLIST_ENABLED=False)
+class PeopleInvalidationTests(TestCase):
+    """Cached windows show patient and provider names; editing them drops the windows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(name="Cache Office", slug="cache-office")
+        cls.provider = Provider.objects.create(
+            user=User.objects.create_user("ccache"), first_name="Cass", last_name="Cache", email="cass@example.com",
+        )
+        cls.patient = Patient.objects.create(first_name="Pia", last_name="Before", date_of_birth="1990-01-01")
+        cls.user = User.objects.create_user("cachedesk", password="x", is_staff=True)
+        cls.day = timezone.localdate()
+        cls.appt = Appointment.objects.create(
+            patient=cls.patient, provider=cls.provider, location=cls.location, office="cache-office",
+            date=cls.day, start_time=time(9), end_time=time(9, 30),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.window = f"/api/appointments/?start_date={self.day}&end_date={self.day}&providers={self.provider.pk}"
+
+    def read_window(self):
+        return self.client.get(self.window).json()["results"]
+
+    def write(self, method, path, payload=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = getattr(self.client, method)(path, payload, format="json")
+        self.assertLess(response.status_code, 300, response.content[:300])
+
+    def test_patient_edit_refreshes_cached_window(self):
+        self.assertEqual(self.read_window()[0]["patient_name"], f"Pia Before ({self.patient.prn})")
+
+        # Fields the window doesn't show leave the entry alone.
+        self.write("patch", f"/api/patients/{self.patient.pk}/", {"phone": "555-0199"})
+        with CaptureQueriesContext(connection) as ctx:
+            self.read_window()
+        self.assertEqual(len(ctx), 0)
+
+        self.write("patch", f"/api/patients/{self.patient.pk}/", {"last_name": "After"})
+        self.assertEqual(self.read_window()[0]["patient_name"], f"Pia After ({self.patient.prn})")
+
+        self.write("delete", f"/api/patients/{self.patient.pk}/")
+        self.assertEqual(self.read_window(), [])
+
+    def test_provider_edit_refreshes_cached_window(self):
+        self.assertEqual(self.read_window()[0]["provider_name"], "Cass Cache")
+        self.write("patch", f"/api/providers/{self.provider.pk}/", {"last_name": "Renamed"})
+        self.assertEqual(self.read_window()[0]["provider_name"], "Cass Renamed")
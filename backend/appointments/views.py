@@ -1,10 +1,32 @@
-from rest_framework import viewsets, permissions, filters
+from rest_framework import mixins, viewsets, permissions, filters, status
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.exceptions import ValidationError
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.views import APIView
+import uuid
 
-from .models import Appointment
-from .serializers import AppointmentSerializer
+from django.db import transaction
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.dateparse import parse_datetime
+from django.utils.http import parse_etags, quote_etag
+
+from . import cache as window_cache
+from . import blocks, bulk, feeds, imports, rooms
+from .models import Appointment, AppointmentImport, BlockTemplate, CalendarFeed, new_feed_token
+from .serializers import (
+    AppointmentImportSerializer,
+    AppointmentSerializer,
+    BlockTemplateSerializer,
+    BulkMoveSerializer,
+    CalendarFeedSerializer,
+)
+from .signals import notify_appointments_changed, scope_of
 from schedule.models import ScheduleSettings
+from core import audit, jobs
+from core.db_routing import ReplicaReadMixin
+from core.tenancy import PracticeScopedViewMixin
+from core.views_jobs import job_accepted
 
 
 class AppointmentPagination(PageNumberPagination):
@@ -17,11 +39,12 @@ class AppointmentPagination(PageNumberPagination):
     max_page_size = 500
 
 
-class AppointmentViewSet(viewsets.ModelViewSet):
+class AppointmentViewSet(PracticeScopedViewMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     """
     Provides list, create, retrieve, update, and delete for appointments.
     """
-    queryset = Appointment.objects.all().order_by("-start_time")
+    # The serializer reads patient and provider names on every row.
+    queryset = Appointment.objects.select_related("patient", "provider").order_by("-start_time")
     serializer_class = AppointmentSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = AppointmentPagination
@@ -55,7 +78,60 @@ class AppointmentViewSet(viewsets.ModelViewSet):
                 color = match.get("color_code", color)
                 duration = match.get("default_duration", duration)
 
-        serializer.save(color_code=color, duration=duration)
+        instance = serializer.save(color_code=color, duration=duration)
+        notify_appointments_changed([scope_of(instance)])
+        audit.created(self.request, instance)
+
+    def perform_update(self, serializer):
+        # The window the appointment leaves is affected as much as the one it lands in.
+        before = scope_of(serializer.instance)
+        old_values = audit.snapshot(serializer.instance)
+        instance = serializer.save()
+        notify_appointments_changed([before, scope_of(instance)])
+        audit.updated(self.request, instance, old_values)
+
+    def perform_destroy(self, instance):
+        scope = scope_of(instance)
+        occupancy = rooms.occupancy(instance)
+        audit.deleted(self.request, instance)
+        instance.delete()
+        notify_appointments_changed([scope])
+        rooms.occupancy_changed(occupancy, None)
+
+    @action(detail=False, methods=["post"], url_path="bulk-move")
+    def bulk_move(self, request):
+        """
+        Shift, reassign or re-date a selection or a provider's date range in
+        one transaction; see appointments/bulk.py. Conflicts (or any other
+        reason a row can't move) are returned with 409 and nothing is written;
+        dry_run returns the same plan without writing.
+        """
+        serializer = BulkMoveSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        to_provider = data.pop("to_provider", None)
+        result = bulk.move(request, to_provider=to_provider.pk if to_provider else None, **data)
+        conflicted = result["conflicts"] and not result["dry_run"]
+        return Response(result, status=status.HTTP_409_CONFLICT if conflicted else status.HTTP_200_OK)
+
+    def list(self, request, *args, **kwargs):
+        """
+        Schedule windows (start_date + end_date) are served from the shared
+        window cache when possible; see appointments/cache.py. Their first
+        page also carries the recurring blocks (appointments/blocks.py).
+        """
+        key = window_cache.window_key(request)
+        if key is not None:
+            data = window_cache.get_window(key)
+            if data is not None:
+                return Response(data)
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            blocks.add_to_window(request, response.data)
+        if key is not None and response.status_code == 200:
+            window_cache.set_window(key, response.data)
+        return response
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -81,4 +157,195 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         if start_date and end_date:
             qs = qs.filter(date__gte=start_date, date__lte=end_date)
 
+        # ---- Instant Range Filtering (across locations and time zones) ----
+        # ISO 8601 with an offset, e.g. 2026-03-09T00:00:00Z; one range scan
+        # of appt_provider_start_idx per provider.
+        for param, lookup in (("start_after", "start_utc__gte"), ("start_before", "start_utc__lt")):
+            value = self.request.query_params.get(param)
+            if value:
+                qs = qs.filter(**{lookup: _parse_instant(param, value)})
+
+        return qs
+
+
+
+class BlockTemplateViewSet(PracticeScopedViewMixin, viewsets.ModelViewSet):
+    """
+    Recurring blocks (lunch, admin time, out of office); see appointments/blocks.py.
+
+    - GET    /api/block-templates/?provider=<id>
+    - POST   /api/block-templates/
+    - PATCH  /api/block-templates/{id}/
+    - DELETE /api/block-templates/{id}/
+    - POST   /api/block-templates/{id}/skip/   {"date": "YYYY-MM-DD"}  (one occurrence)
+    """
+    queryset = BlockTemplate.objects.select_related("provider", "location")
+    serializer_class = BlockTemplateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        provider = self.request.query_params.get("provider")
+        if provider:
+            qs = qs.filter(provider_id=provider)
+        return qs
+
+    def perform_create(self, serializer):
+        template = serializer.save()
+        blocks.template_changed(template)
+        audit.created(self.request, template)
+
+    def perform_update(self, serializer):
+        before = BlockTemplate(provider_id=serializer.instance.provider_id,
+                               start_date=serializer.instance.start_date,
+                               practice_id=serializer.instance.practice_id)
+        old_values = audit.snapshot(serializer.instance)
+        template = serializer.save()
+        blocks.template_changed(before, template)
+        audit.updated(self.request, template, old_values)
+
+    def perform_destroy(self, instance):
+        audit.deleted(self.request, instance)
+        instance.delete()
+        blocks.template_changed(instance)
+
+    @action(detail=True, methods=["post"])
+    def skip(self, request, pk=None):
+        template = self.get_object()
+        serializer = self.get_serializer(
+            template, data={"exceptions": [*template.exceptions, request.data.get("date")]}, partial=True,
+        )
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+        return Response(serializer.data)
+
+
+class CalendarFeedViewSet(
+    PracticeScopedViewMixin,
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    iCalendar subscriptions of provider schedules; see appointments/feeds.py.
+
+    - GET    /api/calendar-feeds/?provider=<id>
+    - POST   /api/calendar-feeds/                {"provider": 1, "location": null}
+    - DELETE /api/calendar-feeds/{id}/            (revokes the URL)
+    - POST   /api/calendar-feeds/{id}/rotate/     (new URL, old one stops working)
+    """
+    queryset = CalendarFeed.objects.all()
+    serializer_class = CalendarFeedSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        provider = self.request.query_params.get("provider")
+        if provider:
+            qs = qs.filter(provider_id=provider)
         return qs
+
+    def perform_create(self, serializer):
+        feed = serializer.save()
+        audit.created(self.request, feed)
+
+    def perform_destroy(self, instance):
+        audit.deleted(self.request, instance)
+        instance.delete()
+        feeds.forget(instance.token)
+
+    @action(detail=True, methods=["post"])
+    def rotate(self, request, pk=None):
+        feed = self.get_object()
+        old_token = feed.token
+        feed.token = new_feed_token()
+        feed.save(update_fields=["token"])
+        feeds.forget(old_token)
+        audit.record(request, "update", feed, {}, metadata={"rotated": True})
+        return Response(self.get_serializer(feed).data)
+
+
+class CalendarFeedView(APIView):
+    """
+    GET /api/feeds/<token>.ics — the feed itself. The token is the credential
+    (calendar apps can't send headers), so there's no other authentication.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, token):
+        feed = feeds.lookup(token)
+        if feed is None:
+            return HttpResponse(status=404)
+        plan = feeds.plan(feed)
+        etag = quote_etag(plan.etag)
+
+        if etag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(feeds.body(plan), content_type="text/calendar; charset=utf-8")
+            response["Content-Disposition"] = 'inline; filename="schedule.ics"'
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+
+class AppointmentImportViewSet(
+    PracticeScopedViewMixin,
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Bulk appointment imports; see appointments/imports.py. Admin only.
+
+    - POST /api/appointment-imports/              multipart: file, format (csv|ics), allow_overlap
+                                                  -> 202 with the job (GET /api/jobs/<id>/ for progress)
+    - GET  /api/appointment-imports/{id}/          counts and checkpoint
+    - GET  /api/appointment-imports/{id}/report/   CSV of rejected records
+    """
+    queryset = AppointmentImport.objects.all()
+    serializer_class = AppointmentImportSerializer
+    permission_classes = [permissions.IsAdminUser]
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        source = imports.storage().save(f"uploads/{uuid.uuid4().hex}.{data['format']}", data["file"])
+
+        with transaction.atomic():
+            imp = AppointmentImport.objects.create(
+                source=source, format=data["format"], allow_overlap=data.get("allow_overlap", False),
+                created_by=request.user,
+            )
+            imp.job = jobs.enqueue("appointments_import", {"import_id": imp.pk}, user=request.user)
+            imp.save(update_fields=["job"])
+        response = job_accepted(request, imp.job)
+        response.data["import_id"] = imp.pk
+        return response
+
+    @action(detail=True, methods=["get"])
+    def report(self, request, pk=None):
+        imp = self.get_object()
+        files = imports.storage()
+        if not imp.report or not files.exists(imp.report):
+            return Response({"detail": "No rejected records."}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(
+            files.open(imp.report, "rb"), as_attachment=True,
+            filename=f"import-{imp.pk}-errors.csv", content_type="text/csv",
+        )
+
+
+def _parse_instant(param, value):
+    try:
+        # An unencoded "+" in the query string arrives as a space.
+        instant = parse_datetime(value.replace(" ", "+"))
+    except ValueError:
+        instant = None
+    if instant is None or instant.tzinfo is None:
+        raise ValidationError({param: "Expected an ISO 8601 date-time with a UTC offset."})
+    return instant
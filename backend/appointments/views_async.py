@@ -0,0 +1,32 @@
+# backend/appointments/views_async.py
+from asgiref.sync import sync_to_async
+from rest_framework.response import Response
+
+from core.async_api import AsyncListView
+
+from . import blocks
+from . import cache as window_cache
+from .views import AppointmentViewSet
+
+
+class AppointmentListAsyncView(AsyncListView):
+    """
+    Async GET /api/appointments/ (schedule windows).
+    Filtering, search, ordering, pagination and the patient/provider
+    joins come from AppointmentViewSet.
+    """
+    viewset_class = AppointmentViewSet
+
+    async def alist(self, viewset) -> Response:
+        key = await window_cache.awindow_key(viewset.request)
+        if key is not None:
+            data = await window_cache.aget_window(key)
+            if data is not None:
+                return Response(data)
+
+        response = await super().alist(viewset)
+        if response.status_code == 200:
+            await sync_to_async(blocks.add_to_window)(viewset.request, response.data)
+        if key is not None and response.status_code == 200:
+            await window_cache.aset_window(key, response.data)
+        return response
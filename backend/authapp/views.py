@@ -65,7 +65,7 @@ class CurrentProviderView(APIView):
 
     def get(self, request):
         try:
-            provider = Provider.objects.get(user=request.user)
+            provider = Provider.objects.select_related('user').get(user=request.user)
             serializer = ProviderSerializer(provider)
             return Response(serializer.data)
         except Provider.DoesNotExist:
@@ -1,9 +1,86 @@
 from django.contrib import admin
-from .models import AuditLog
+from django.utils.html import format_html
+
+from .models import AuditLog, Job, Practice, QueryStat, SlowQuery
+
+
+class ReadOnlyAdmin(admin.ModelAdmin):
+    """Rows are written by core/audit.py / query_stats.py / jobs.py only; they can be browsed and deleted."""
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Practice)
+class PracticeAdmin(admin.ModelAdmin):
+    list_display = ("name", "slug", "is_active", "created_at")
+    list_filter = ("is_active",)
+    search_fields = ("name", "slug")
+    prepopulated_fields = {"slug": ("name",)}
 
 
 @admin.register(AuditLog)
-class AuditLogAdmin(admin.ModelAdmin):
-    list_display = ("created_at", "action", "actor")
-    list_filter = ("action", "created_at")
-    search_fields = ("action", "actor__username", "actor__email")
+class AuditLogAdmin(ReadOnlyAdmin):
+    list_display = ("created_at", "action", "actor_username", "object_type", "object_id")
+    list_filter = ("action", "object_type", "created_at")
+    search_fields = ("action", "actor_username", "object_id")
+    date_hierarchy = "created_at"
+    readonly_fields = (
+        "created_at", "action", "actor", "actor_username", "object_type", "object_id", "changes", "metadata",
+    )
+    show_full_result_count = False
+
+    def has_delete_permission(self, request, obj=None):
+        # The trail is append-only; retention is `manage.py audit_partitions --drop-before`.
+        return False
+
+
+@admin.register(QueryStat)
+class QueryStatAdmin(ReadOnlyAdmin):
+    list_display = ("short_statement", "alias", "calls", "total_ms", "mean", "max_ms", "last_seen")
+    list_filter = ("alias",)
+    search_fields = ("statement", "fingerprint")
+    ordering = ("-total_ms",)
+
+    @admin.display(description="statement")
+    def short_statement(self, obj):
+        return obj.statement[:120]
+
+    @admin.display(description="mean ms")
+    def mean(self, obj):
+        return round(obj.mean_ms, 2)
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(ReadOnlyAdmin):
+    list_display = ("captured_at", "duration_ms", "alias", "caller", "request", "has_plan")
+    list_filter = ("alias", "captured_at")
+    search_fields = ("statement", "fingerprint", "caller", "request")
+    fields = ("captured_at", "duration_ms", "alias", "request", "caller", "fingerprint", "statement", "plan_pre")
+
+    @admin.display(boolean=True, description="plan")
+    def has_plan(self, obj):
+        return bool(obj.plan)
+
+    @admin.display(description="plan")
+    def plan_pre(self, obj):
+        return format_html("<pre>{}</pre>", obj.plan or "(not sampled)")
+
+    def get_readonly_fields(self, request, obj=None):
+        return self.fields
+
+
+@admin.register(Job)
+class JobAdmin(ReadOnlyAdmin):
+    list_display = ("id", "kind", "status", "progress", "attempts", "created_by", "created_at", "finished_at")
+    list_filter = ("status", "kind")
+    search_fields = ("kind", "error", "worker")
+    date_hierarchy = "created_at"
+    readonly_fields = (
+        "kind", "status", "progress", "progress_message", "payload", "result", "error", "attempts",
+        "max_attempts", "run_after", "worker", "heartbeat_at", "created_by", "created_at",
+        "started_at", "finished_at",
+    )
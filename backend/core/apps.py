@@ -6,8 +6,14 @@ class CoreConfig(AppConfig):
     name = "core"
 
     def ready(self):
-        # Run startup bootstrap for Demo/Admin accounts.
-        # This is idempotent and guarded so it won't crash during migrations.
-        from .bootstrap import ensure_bootstrap_accounts
+        # Signal wiring only. Startup must not touch the database; bootstrap
+        # accounts are ensured once per deploy via
+        # `python manage.py bootstrap_accounts` (see core/bootstrap.py).
+        from django.db.backends.signals import connection_created
+        from django.utils.module_loading import autodiscover_modules
 
-        ensure_bootstrap_accounts()
+        from .perf import install_query_hook
+
+        connection_created.connect(install_query_hook, dispatch_uid="core.perf.query_hook")
+        # Background job handlers (@jobs.job in each app's tasks.py).
+        autodiscover_modules("tasks")
@@ -3,6 +3,12 @@ ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Production ASGI mode runs under gunicorn with uvicorn workers:
+
+    DJANGO_SERVER_MODE=asgi gunicorn -c gunicorn.conf.py
+
+which also enables the async read views (see core/async_api.py).
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -0,0 +1,129 @@
+# backend/core/async_api.py
+"""
+Async read path for hot list endpoints (enabled with ASYNC_READ_VIEWS under ASGI).
+
+An AsyncListView sits on the same URL as a DRF ViewSet's list route:
+- GET is served natively async: the ViewSet's own get_queryset()/filter_queryset()
+  build the query (no I/O), the async ORM fetches it, and the ViewSet's serializer
+  and paginator shape the response, so the JSON is identical to the sync path.
+- Every other method (POST, OPTIONS, ...) is delegated unchanged to the sync ViewSet.
+
+Authentication, permissions and throttling still run DRF's own `initial()`
+(in a worker thread, since JWT user lookup is sync).
+"""
+from __future__ import annotations
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage
+from django.utils.decorators import classonlymethod
+from django.views import View
+from rest_framework.exceptions import NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+
+class AsyncListView(View):
+    viewset_class = None
+    # Action map for the delegated sync view (same as the router's list route).
+    actions = {"get": "list", "post": "create"}
+    # Relations the serializer touches must be loaded up front:
+    # lazy loads are not allowed inside the event loop.
+    select_related: tuple = ()
+    prefetch_related: tuple = ()
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # DRF enforces CSRF itself for session-authenticated requests.
+        view.csrf_exempt = True
+        cls._sync_view = staticmethod(sync_to_async(cls.viewset_class.as_view(cls.actions)))
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method != "GET":
+            return await self._sync_view(request, *args, **kwargs)
+        return await self.get(request, *args, **kwargs)
+
+    def _make_viewset(self, request, *args, **kwargs):
+        viewset = self.viewset_class()
+        viewset.action_map = self.actions
+        viewset.action = "list"
+        viewset.format_kwarg = None
+        viewset.args = args
+        viewset.kwargs = kwargs
+        viewset.request = viewset.initialize_request(request, *args, **kwargs)
+        viewset.headers = viewset.default_response_headers
+        return viewset
+
+    async def get(self, request, *args, **kwargs):
+        viewset = self._make_viewset(request, *args, **kwargs)
+        drf_request = viewset.request
+
+        try:
+            await sync_to_async(viewset.initial)(drf_request, *args, **kwargs)
+            response = await self.alist(viewset)
+        except Exception as exc:
+            response = viewset.handle_exception(exc)
+
+        response = viewset.finalize_response(drf_request, response, *args, **kwargs)
+        if isinstance(drf_request.accepted_renderer, JSONRenderer):
+            response.render()
+        else:
+            # Browsable API renderer may query the DB (forms, filters).
+            await sync_to_async(response.render)()
+        return response
+
+    # -----------------------------
+    # Hooks
+    # -----------------------------
+
+    def get_queryset(self, viewset):
+        qs = viewset.filter_queryset(viewset.get_queryset())
+        if self.select_related:
+            qs = qs.select_related(*self.select_related)
+        if self.prefetch_related:
+            qs = qs.prefetch_related(*self.prefetch_related)
+        return qs
+
+    async def alist(self, viewset) -> Response:
+        qs = self.get_queryset(viewset)
+        if viewset.paginator is None:
+            objects = [obj async for obj in qs]
+            return Response(viewset.get_serializer(objects, many=True).data)
+
+        objects = await apaginate_queryset(viewset.paginator, qs, viewset.request)
+        data = viewset.get_serializer(objects, many=True).data
+        return viewset.paginator.get_paginated_response(data)
+
+
+async def apaginate_queryset(paginator, queryset, request) -> list:
+    """
+    Async equivalent of PageNumberPagination.paginate_queryset():
+    one COUNT plus one LIMIT/OFFSET fetch, leaving the paginator ready
+    for get_paginated_response().
+    """
+    paginator.request = request
+    page_size = paginator.get_page_size(request)
+
+    django_paginator = paginator.django_paginator_class(queryset, page_size)
+    # Pre-fill the cached count so nothing below issues a sync query.
+    django_paginator.__dict__["count"] = await queryset.acount()
+    page_number = paginator.get_page_number(request, django_paginator)
+
+    try:
+        number = django_paginator.validate_number(page_number)
+    except InvalidPage as exc:
+        raise NotFound(
+            paginator.invalid_page_message.format(page_number=page_number, message=str(exc))
+        )
+
+    bottom = (number - 1) * django_paginator.per_page
+    top = bottom + django_paginator.per_page
+    if top + django_paginator.orphans >= django_paginator.count:
+        top = django_paginator.count
+
+    objects = [obj async for obj in queryset[bottom:top]]
+    paginator.page = django_paginator._get_page(objects, number, django_paginator)
+    if django_paginator.num_pages > 1 and paginator.template is not None:
+        paginator.display_page_controls = True
+    return objects
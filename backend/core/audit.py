@@ -0,0 +1,314 @@
+# backend/core/audit.py
+"""
+Audit trail pipeline: who changed which appointment or patient field and when.
+
+Views describe a change (created / updated / deleted / record) and move on:
+- the event is built in the request (actor, field diff, event time), and
+  queued only once the surrounding transaction commits, so rolled-back
+  writes leave no trail;
+- a per-process background thread writes queued events with one bulk_create
+  every AUDIT_FLUSH_INTERVAL seconds (or as soon as AUDIT_BATCH_SIZE are
+  waiting), on its own pooled connection.
+
+If the database is unavailable the batch stays queued and is retried; past
+AUDIT_MAX_BUFFER queued events the request that adds one flushes inline
+(backpressure instead of dropping). Workers flush on exit (gunicorn
+worker_exit and atexit), so only a hard kill can lose the last interval.
+With AUDIT_ASYNC=False events are written inline on commit (tests, scripts).
+
+On PostgreSQL core_auditlog is partitioned by month on created_at; see
+ensure_partitions() and `manage.py audit_partitions`.
+"""
+from __future__ import annotations
+
+import atexit
+import datetime as dt
+import decimal
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import tenancy
+
+
+logger = logging.getLogger("core.audit")
+
+# Bookkeeping columns that change on every save.
+IGNORED_FIELDS = {"created_at", "updated_at"}
+# Credentials (calendar feed tokens) never enter the trail.
+SECRET_FIELDS = {"token"}
+
+
+# -----------------------------
+# Describing changes
+# -----------------------------
+
+def _json_value(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (dt.date, dt.time, dt.datetime)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return [_json_value(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _json_value(v) for k, v in value.items()}
+    if hasattr(value, "name") and hasattr(value, "url"):
+        return value.name  # FieldFile
+    return str(value)
+
+
+def snapshot(instance) -> dict:
+    """Concrete field values of a model instance (FKs as ids, generated columns skipped), JSON-ready."""
+    return {
+        field.attname: _json_value(getattr(instance, field.attname))
+        for field in instance._meta.concrete_fields
+        if field.name not in IGNORED_FIELDS | SECRET_FIELDS and not field.primary_key and not field.generated
+    }
+
+
+def diff(before: dict, after: dict) -> dict:
+    """{field: [old, new]} for the fields that differ."""
+    return {
+        name: [before.get(name), value]
+        for name, value in after.items()
+        if before.get(name) != value
+    }
+
+
+def _actor(user):
+    if user is not None and getattr(user, "is_authenticated", False):
+        return user.pk, user.get_username()
+    return None, ""
+
+
+def _event(user, action: str, instance=None, changes=None, metadata=None) -> dict:
+    actor_id, username = _actor(user)
+    event = {
+        "action": action,
+        "actor_id": actor_id,
+        "actor_username": username,
+        "created_at": timezone.now(),
+        "object_type": "",
+        "object_id": "",
+        "changes": changes,
+        "metadata": metadata,
+        # Events are written by a thread outside any practice: stamp it now.
+        "practice_id": getattr(instance, "practice_id", None) or tenancy.practice_for_new_rows(),
+    }
+    if instance is not None:
+        event["object_type"] = instance._meta.label_lower
+        event["object_id"] = str(instance.pk)
+    return event
+
+
+def _user_of(request_or_user):
+    return getattr(request_or_user, "user", request_or_user)
+
+
+def created(request_or_user, instance, metadata=None) -> None:
+    after = snapshot(instance)
+    changes = {k: [None, v] for k, v in after.items() if v is not None}
+    record(request_or_user, "create", instance, changes, metadata)
+
+
+def updated(request_or_user, instance, before: dict, metadata=None) -> None:
+    """`before` is snapshot(instance) taken before the save."""
+    changes = diff(before, snapshot(instance))
+    if changes:
+        record(request_or_user, "update", instance, changes, metadata)
+
+
+def deleted(request_or_user, instance, before: Optional[dict] = None, metadata=None) -> None:
+    """Call before instance.delete() (the pk is gone afterwards) or pass `before`."""
+    before = before if before is not None else snapshot(instance)
+    changes = {k: [v, None] for k, v in before.items() if v is not None}
+    record(request_or_user, "delete", instance, changes, metadata)
+
+
+def record(request_or_user, action: str, instance=None, changes=None, metadata=None, using=None) -> None:
+    """Queue one audit event for when the current transaction commits."""
+    event = _event(_user_of(request_or_user), action, instance, changes, metadata)
+    transaction.on_commit(lambda: buffer.add(event), using=using)
+
+
+# -----------------------------
+# Buffer + writer thread
+# -----------------------------
+
+class AuditBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events: list = []
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = None
+
+    def add(self, event: dict) -> None:
+        if not settings.AUDIT_ASYNC:
+            self.write([event])
+            return
+        with self._lock:
+            self._events.append(event)
+            pending = len(self._events)
+        if pending >= settings.AUDIT_MAX_BUFFER:
+            logger.warning("Audit buffer at %d events; flushing inline", pending)
+            self.flush()
+            return
+        self._ensure_thread()
+        if pending >= settings.AUDIT_BATCH_SIZE:
+            self._wake.set()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._events)
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns the number of events written."""
+        with self._lock:
+            events, self._events = self._events, []
+        if not events:
+            return 0
+        try:
+            self.write(events)
+        except Exception:
+            logger.exception("Could not write %d audit events; will retry", len(events))
+            with self._lock:
+                self._events[:0] = events
+            return 0
+        return len(events)
+
+    @staticmethod
+    def write(events: Iterable[dict]) -> None:
+        from .models import AuditLog
+
+        AuditLog.objects.bulk_create(
+            [AuditLog(**event) for event in events], batch_size=settings.AUDIT_BATCH_SIZE,
+        )
+
+    def _ensure_thread(self) -> None:
+        # Started lazily in each worker (never in a pre-fork master).
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid is None:
+                atexit.register(self.flush)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        from django.db import connection
+
+        while True:
+            self._wake.wait(settings.AUDIT_FLUSH_INTERVAL)
+            self._wake.clear()
+            started = time.perf_counter()
+            written = self.flush()
+            # Give the connection back to the pool between batches.
+            connection.close()
+            if written:
+                from . import metrics
+
+                metrics.observe_job("audit_flush", time.perf_counter() - started)
+
+
+buffer = AuditBuffer()
+
+
+# -----------------------------
+# Partitions (PostgreSQL)
+# -----------------------------
+
+TABLE = "core_auditlog"
+
+
+def _month_start(day: dt.date) -> dt.date:
+    return day.replace(day=1)
+
+
+def _next_month(day: dt.date) -> dt.date:
+    year, month = divmod(day.month, 12)
+    return day.replace(year=day.year + year, month=month + 1, day=1)
+
+
+def partition_name(month: dt.date) -> str:
+    return f"{TABLE}_p{month:%Y%m}"
+
+
+def ensure_partitions(months_ahead: int = 3, using: str = "default") -> list:
+    """
+    Create monthly partitions from the current month through `months_ahead`
+    months ahead. Rows that already landed in the default partition for a
+    month are moved into its new partition. Returns the partitions created.
+    """
+    from django.db import connections
+
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return []
+
+    created_names = []
+    month = _month_start(timezone.now().date())
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            [TABLE],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        for _ in range(months_ahead + 1):
+            end = _next_month(month)
+            name = partition_name(month)
+            if name not in existing:
+                with transaction.atomic(using=using):
+                    # Stand-alone table first so default-partition rows can move in.
+                    cursor.execute(f"CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS)")
+                    cursor.execute(
+                        f"WITH moved AS (DELETE FROM {TABLE}_default WHERE created_at >= %s AND created_at < %s "
+                        f"RETURNING *) INSERT INTO {name} SELECT * FROM moved",
+                        [month, end],
+                    )
+                    cursor.execute(
+                        f"ALTER TABLE {TABLE} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)",
+                        [month.isoformat(), end.isoformat()],
+                    )
+                created_names.append(name)
+            month = end
+    return created_names
+
+
+def drop_partitions_before(month: dt.date, using: str = "default") -> list:
+    """Detach and drop monthly partitions that end on or before `month`."""
+    from django.db import connections
+
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return []
+
+    cutoff = partition_name(_month_start(month))
+    dropped = []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass AND c.relname LIKE %s ORDER BY c.relname",
+            [TABLE, f"{TABLE}_p%"],
+        )
+        for (name,) in cursor.fetchall():
+            if name >= cutoff:
+                break
+            with transaction.atomic(using=using):
+                cursor.execute(f"ALTER TABLE {TABLE} DETACH PARTITION {name}")
+                cursor.execute(f"DROP TABLE {name}")
+            dropped.append(name)
+    return dropped
@@ -0,0 +1,53 @@
+# backend/core/authentication.py
+"""
+DRF authentication that also enforces the request's practice (core/tenancy.py).
+
+A user belongs to the practice of their provider profile; users without one
+(service and staff accounts) to the default practice. Superusers may act in
+any practice. JWT authentication loads the provider profile in the same query
+as the user, so the check costs no extra round trip.
+"""
+from django.contrib.auth.models import User
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.exceptions import PermissionDenied
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from . import tenancy
+
+
+def practice_of(user):
+    provider = getattr(user, "provider_profile", None)
+    return provider.practice_id if provider is not None else tenancy.default_practice_id()
+
+
+def check_practice(user) -> None:
+    practice_id = tenancy.current_practice_id()
+    if practice_id is None or user.is_superuser:
+        return
+    if practice_of(user) != practice_id:
+        raise PermissionDenied("You are not a member of this practice.")
+
+
+class PracticeMemberMixin:
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            check_practice(result[0])
+        return result
+
+
+class _UsersWithProvider:
+    """Stands in for the user model in JWTAuthentication.get_user()."""
+    objects = User.objects.select_related("provider_profile")
+    DoesNotExist = User.DoesNotExist
+
+
+class PracticeJWTAuthentication(PracticeMemberMixin, JWTAuthentication):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The library's own lookup and checks, joined with the provider profile.
+        self.user_model = _UsersWithProvider
+
+
+class PracticeSessionAuthentication(PracticeMemberMixin, SessionAuthentication):
+    pass
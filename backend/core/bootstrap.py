@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 from django.contrib.auth.models import User
-from django.db import connection
 from django.db.utils import OperationalError, ProgrammingError
 
 from providers.models import Provider
@@ -17,27 +16,41 @@ ADMIN_EMAIL = "clay.adminton@example.test"
 ADMIN_PASSWORD = "AdminPass1!"
 
 
-def _tables_exist(required: set[str]) -> bool:
-    try:
-        existing = set(connection.introspection.table_names())
-        return required.issubset(existing)
-    except Exception:
-        return False
+def bootstrap_accounts_present() -> bool:
+    """
+    Cheap marker check: one indexed query confirming both accounts exist
+    and are linked to a Provider. No table introspection.
+    """
+    return (
+        User.objects.filter(
+            username__in=[DEMO_USERNAME, ADMIN_USERNAME],
+            provider_profile__isnull=False,
+        ).count()
+        == 2
+    )
 
 
-def ensure_bootstrap_accounts() -> None:
+def ensure_bootstrap_accounts(*, force: bool = False) -> bool:
     """
     Ensures the Demo and Admin accounts exist so the system is always log-in-able.
 
+    Run once per deploy (after migrate) via `python manage.py bootstrap_accounts`;
+    it is intentionally NOT called from AppConfig.ready().
+
     Safe properties:
     - Idempotent (will not create duplicates)
-    - Guarded during migrate/startup (won’t crash if tables don’t exist yet)
+    - Skips all work when the marker check passes, unless force=True
+    - Guarded if tables don't exist yet (returns False instead of crashing)
     - Creates BOTH User and linked Provider records (login requires Provider linkage)
+
+    Returns True if accounts were (re)applied, False if skipped.
     """
-    # Avoid crashing during migrations / first boot before tables exist
-    required_tables = {"auth_user", "providers_provider"}
-    if not _tables_exist(required_tables):
-        return
+    try:
+        if not force and bootstrap_accounts_present():
+            return False
+    except (OperationalError, ProgrammingError):
+        # Tables missing (migrate not run yet)
+        return False
 
     try:
         _ensure_one(
@@ -64,7 +77,9 @@ def ensure_bootstrap_accounts() -> None:
         )
     except (OperationalError, ProgrammingError):
         # DB not ready yet; ignore safely
-        return
+        return False
+
+    return True
 
 
 def _ensure_one(
@@ -0,0 +1,14 @@
+# backend/core/db.py
+"""
+Database connection helpers.
+"""
+
+
+def pool_stats(connection) -> dict | None:
+    """
+    psycopg_pool counters for one Django connection alias in this process,
+    or None if pooling is disabled for it.
+    """
+    if connection.vendor != "postgresql" or not connection.settings_dict["OPTIONS"].get("pool"):
+        return None
+    return connection.pool.get_stats()
@@ -0,0 +1,96 @@
+# backend/core/db_routing.py
+"""
+Primary/replica routing with read-your-writes pinning.
+
+- Writes always go to "default" (the primary).
+- Reads go to a replica only while a view has opted in for the current request
+  (ReplicaReadMixin on safe-method requests); everything else reads from the
+  primary, so admin, management commands and write paths are unaffected.
+- After a user writes, they are pinned to the primary for REPLICA_PIN_SECONDS
+  so their next reads don't hit a lagging replica. The pin lives in the default
+  cache, which must be shared between worker processes for this to hold
+  across workers.
+"""
+from __future__ import annotations
+
+import random
+from contextvars import ContextVar
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+
+# Alias reads should use for the current request (None = primary).
+_read_alias: ContextVar[Optional[str]] = ContextVar("read_alias", default=None)
+
+
+def replica_aliases() -> list[str]:
+    return [alias for alias in settings.DATABASES if alias.startswith("replica_")]
+
+
+def _pin_key(user_id) -> str:
+    return f"db-pin:user:{user_id}"
+
+
+def pin_to_primary(user) -> None:
+    if user is not None and user.is_authenticated:
+        cache.set(_pin_key(user.pk), 1, timeout=settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user) -> bool:
+    if user is None or not user.is_authenticated:
+        return False
+    return cache.get(_pin_key(user.pk)) is not None
+
+
+def set_read_alias(alias: Optional[str]) -> Optional[str]:
+    """
+    Set the read alias for the current context and return the previous one.
+    Uses plain set() rather than tokens: the value may be set in a worker
+    thread (sync_to_async) and restored from the event loop.
+    """
+    previous = _read_alias.get()
+    _read_alias.set(alias)
+    return previous
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas are copies of the primary; relations across them are fine.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaReadMixin:
+    """
+    DRF view mixin: serve safe-method requests from a replica (one replica per
+    request, chosen at random) unless the user recently wrote; pin the user to
+    the primary after any successful write.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        self._previous_read_alias = _read_alias.get()
+        super().initial(request, *args, **kwargs)
+
+        aliases = replica_aliases()
+        if aliases and request.method in SAFE_METHODS and not is_pinned(request.user):
+            set_read_alias(random.choice(aliases))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        set_read_alias(getattr(self, "_previous_read_alias", None))
+
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(getattr(request, "user", None))
+        return response
@@ -2,15 +2,15 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import date, datetime, time, timedelta
+from datetime import date, time, timedelta
 from typing import Iterable, List, Tuple
 
 from django.contrib.auth.models import User
 from django.db import transaction
 from django.utils import timezone
 
-from appointments.models import Appointment
-from locations.models import BusinessSettings, Location, LocationHours
+from appointments.models import Appointment, BlockTemplate
+from locations.models import BusinessSettings, Location, LocationHours, Room
 from patients.models import Patient
 from providers.models import Provider
 from schedule.models import ScheduleSettings
@@ -36,6 +36,7 @@ DEMO_LOCATIONS = [
     {"name": "North Office", "slug": "north"},
     {"name": "South Office", "slug": "south"},
 ]
+DEMO_ROOMS = 4
 
 # Passwords must pass validate_password_strength (upper/lower/number/special, >= 8)
 DEMO_PASSWORD_A = "DemoPass1!"
@@ -261,6 +262,35 @@ def _block_plan(d: date, provider_idx: int) -> List[Tuple[str, time, time]]:
     return blocks
 
 
+def _block_templates(provider: Provider, provider_idx: int, start: date) -> List[BlockTemplate]:
+    """
+    _block_plan as recurring blocks (appointments/blocks.py), for every office.
+    The out-of-office patterns start on the first matching day on or after `start`.
+    """
+    weekdays = ["mon", "tue", "wed", "thu", "fri"]
+    templates = [
+        BlockTemplate(provider=provider, label="Lunch", color_code=BLOCK_COLOR, weekdays=weekdays,
+                      start_time=_time(12, 0), end_time=_time(13, 0), start_date=start),
+        BlockTemplate(provider=provider, label="Admin", color_code=BLOCK_COLOR, weekdays=weekdays,
+                      start_time=_time(15, 15), end_time=_time(15, 45), start_date=start),
+    ]
+    out_of_office = {
+        2: ("wed", 2, _time(13, 0), _time(17, 0)),  # every other Wednesday afternoon
+        4: ("fri", 3, _time(8, 0), _time(12, 0)),   # every third Friday morning
+    }
+    if provider_idx in out_of_office:
+        weekday, every, b_start, b_end = out_of_office[provider_idx]
+        first = next(
+            d for d in _daterange(start, start + timedelta(weeks=every))
+            if any(label == "Out of Office" for label, _s, _e in _block_plan(d, provider_idx))
+        )
+        templates.append(BlockTemplate(
+            provider=provider, label="Out of Office", color_code=BLOCK_COLOR, weekdays=[weekday],
+            interval_weeks=every, start_time=b_start, end_time=b_end, start_date=first,
+        ))
+    return templates
+
+
 def _status_for_slot(i: int) -> str:
     # Curated variety, deterministic
     cycle = ["pending", "arrived", "in_lobby", "seen", "tentative"]
@@ -301,10 +331,7 @@ def reset_and_seed_demo_data() -> dict:
         # -------------------------
         # Recreate core config
         # -------------------------
-        BusinessSettings.objects.get_or_create(
-            pk=1,
-            defaults={"name": "", "show_name_in_nav": True},
-        )
+        BusinessSettings.objects.create(name="", show_name_in_nav=True)
 
         locations_by_slug = {}
         WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
@@ -331,6 +358,11 @@ def reset_and_seed_demo_data() -> dict:
                     },
                 )
 
+            # Exam rooms 1–4 for the room board
+            Room.objects.bulk_create(
+                [Room(location=loc, name=str(n), sort_order=n) for n in range(1, DEMO_ROOMS + 1)]
+            )
+
         ScheduleSettings.objects.all().delete()
         ScheduleSettings.objects.create(
             appointment_types=APPOINTMENT_TYPES
@@ -389,11 +421,15 @@ def reset_and_seed_demo_data() -> dict:
             )
 
         # -------------------------
-        # Appointments & blocks
+        # Blocks (recurring) & appointments
         # -------------------------
+        block_templates = []
+        for p_idx, provider in enumerate(providers):
+            block_templates += _block_templates(provider, p_idx, start)
+        BlockTemplate.objects.bulk_create(block_templates)
+
         patient_cursor = 0
         appt_count = 0
-        block_count = 0
 
         slot_plan = _slot_plan()
 
@@ -404,33 +440,8 @@ def reset_and_seed_demo_data() -> dict:
             for p_idx, provider in enumerate(providers):
                 morning_slug, afternoon_slug = _choose_location_pattern(p_idx, d)
 
-                # Blocks first (so we can skip patient slots that would overlap out-of-office)
+                # The block templates cover _block_plan; skip patient slots that would overlap them
                 blocks = _block_plan(d, p_idx)
-                for label, b_start, b_end in blocks:
-                    # decide office based on start time (morning vs afternoon)
-                    office_slug = morning_slug if b_start < _time(12, 0) else afternoon_slug
-                    Appointment.objects.create(
-                        patient=None,
-                        provider=provider,
-                        location=locations_by_slug.get(office_slug),
-                        office=office_slug,
-                        appointment_type=label,
-                        is_block=True,
-                        status="pending",
-                        room="",
-                        intake_status="not_submitted",
-                        notes="",
-                        color_code=BLOCK_COLOR,
-                        chief_complaint="",
-                        date=d,
-                        start_time=b_start,
-                        end_time=b_end,
-                        duration=int(
-                            (datetime.combine(d, b_end) - datetime.combine(d, b_start)).total_seconds() / 60
-                        ),
-                        is_recurring=False,
-                    )
-                    block_count += 1
 
                 # Patient appointments (7/day target), skipping anything that overlaps blocks
                 for slot_i, (s, e) in enumerate(slot_plan):
@@ -472,8 +483,9 @@ def reset_and_seed_demo_data() -> dict:
             "window_start": str(start),
             "window_end": str(end),
             "locations": Location.objects.count(),
+            "rooms": Room.objects.count(),
             "providers": Provider.objects.count(),
             "patients": Patient.objects.count(),
             "appointments": appt_count,
-            "blocks": block_count,
+            "blocks": len(block_templates),
         }
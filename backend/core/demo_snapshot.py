@@ -0,0 +1,327 @@
+# backend/core/demo_snapshot.py
+"""
+Snapshot-based demo reset.
+
+The deterministic seed in demo_reset.py is slow (row-by-row deletes and inserts,
+password hashing for every provider). In snapshot mode we run it once, dump the
+resulting rows with COPY, and every later reset becomes:
+
+  TRUNCATE ... RESTART IDENTITY  ->  COPY ... FROM STDIN  ->  one date-shift UPDATE
+
+which is sub-second and independent of how much data the demo contains.
+
+Tables that reference the snapshot tables (RESET_MODELS: calendar feeds,
+reminders, rollups, waitlist entries and offers) are truncated with them and
+come back empty; rollups are rebuilt by the appointments_changed signal. The
+TRUNCATE has no CASCADE, so a new foreign key to a snapshot table fails the
+reset until its table is added to one of the lists.
+
+The demo lives in the default practice (core/tenancy.py). TRUNCATE would take
+every other practice's rows with it, so once a deployment serves more than one
+practice, resets fall back to the full seed, which only touches the demo's rows.
+"""
+from __future__ import annotations
+
+import json
+import os
+from datetime import date, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+
+from appointments.models import Appointment, BlockTemplate, CalendarFeed
+from appointments import rooms
+from appointments.signals import notify_appointments_changed
+from locations.models import BusinessSettings, Location, LocationHours, Room
+from patients.models import Patient
+from providers.models import Provider
+from reminders.models import Reminder
+from reporting.models import AppointmentRollup
+from schedule.models import ScheduleSettings
+from waitlist.models import WaitlistEntry, WaitlistOffer
+
+from . import tenancy
+from .demo_reset import reset_and_seed_demo_data
+from .models import Practice
+
+
+SNAPSHOT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+# Restore order (parents first). TRUNCATE is issued for all of them at once.
+SNAPSHOT_MODELS = [
+    BusinessSettings,
+    ScheduleSettings,
+    Location,
+    LocationHours,
+    Room,
+    Patient,
+    Provider,
+    Provider.locations.through,
+    Appointment,
+    BlockTemplate,
+]
+
+# Not in the snapshot: rows pointing at demo rows, emptied by every restore.
+RESET_MODELS = [
+    CalendarFeed,
+    Reminder,
+    AppointmentRollup,
+    WaitlistEntry,
+    WaitlistOffer,
+]
+
+# Arbitrary constant for pg_advisory_xact_lock so concurrent resets serialize.
+_RESET_LOCK_KEY = 0x64656D6F  # "demo"
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+
+def _snapshot_dir() -> Path:
+    return Path(settings.DEMO_SNAPSHOT_DIR)
+
+
+def _columns(model) -> List[str]:
+    # Generated columns are recomputed by the database on COPY FROM.
+    return [f.column for f in model._meta.concrete_fields if not f.generated]
+
+
+def _column_list(columns: List[str]) -> str:
+    qn = connection.ops.quote_name
+    return ", ".join(qn(c) for c in columns)
+
+
+def _copy_out(cursor, sql: str, path: Path) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as fh, cursor.copy(sql) as copy:
+        for chunk in copy:
+            fh.write(chunk)
+    os.replace(tmp, path)
+
+
+def _copy_in(cursor, sql: str, path: Path) -> None:
+    with open(path, "rb") as fh, cursor.copy(sql) as copy:
+        while chunk := fh.read(1 << 16):
+            copy.write(chunk)
+
+
+def _week_aligned_shift(seeded_for: date, today: date) -> int:
+    """
+    Shift in whole weeks so weekday-only seed data stays on weekdays.
+    The ±3 week demo window ends up within a few days of being centred on today.
+    """
+    delta = (today - seeded_for).days
+    return 7 * round(delta / 7)
+
+
+def load_manifest() -> Optional[dict]:
+    path = _snapshot_dir() / MANIFEST_NAME
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        return None
+    return manifest
+
+
+def snapshot_is_current(manifest: Optional[dict]) -> bool:
+    """
+    A snapshot is only usable if every table still has the exact columns it was
+    dumped with (a migration since then invalidates it) and all files exist.
+    """
+    if not manifest:
+        return False
+
+    tables = manifest.get("tables") or {}
+    for model in SNAPSHOT_MODELS:
+        if tables.get(model._meta.db_table) != _columns(model):
+            return False
+        if not (_snapshot_dir() / f"{model._meta.db_table}.copy").exists():
+            return False
+
+    if manifest.get("users") != _columns(User):
+        return False
+    return (_snapshot_dir() / f"{User._meta.db_table}.copy").exists()
+
+
+# -----------------------------
+# Build / restore
+# -----------------------------
+
+def write_snapshot(summary: dict) -> dict:
+    """
+    Dump the currently seeded demo rows. Must run in the same transaction
+    as the seed so the dump sees exactly what was just written.
+    """
+    directory = _snapshot_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    qn = connection.ops.quote_name
+
+    user_ids = sorted(
+        Provider.objects.exclude(user__isnull=True).values_list("user_id", flat=True)
+    )
+    user_columns = _columns(User)
+    tables = {}
+
+    with connection.cursor() as cursor:
+        for model in SNAPSHOT_MODELS:
+            table = model._meta.db_table
+            columns = _columns(model)
+            _copy_out(
+                cursor,
+                f"COPY {qn(table)} ({_column_list(columns)}) TO STDOUT",
+                directory / f"{table}.copy",
+            )
+            tables[table] = columns
+
+        # Only the provider-linked accounts belong to the demo; other users are left alone.
+        id_list = ", ".join(str(int(pk)) for pk in user_ids) or "NULL"
+        _copy_out(
+            cursor,
+            f"COPY (SELECT {_column_list(user_columns)} FROM {qn(User._meta.db_table)} "
+            f"WHERE {qn('id')} IN ({id_list})) TO STDOUT",
+            directory / f"{User._meta.db_table}.copy",
+        )
+
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "created_at": timezone.now().isoformat(),
+        "seeded_for_date": summary["seeded_for_date"],
+        "summary": summary,
+        "tables": tables,
+        "users": user_columns,
+        "usernames": list(
+            User.objects.filter(id__in=user_ids).values_list("username", flat=True)
+        ),
+        "user_ids": user_ids,
+    }
+
+    tmp = directory / (MANIFEST_NAME + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+    os.replace(tmp, directory / MANIFEST_NAME)
+    return manifest
+
+
+def restore_snapshot(manifest: dict) -> dict:
+    """
+    Replace all demo tables with the snapshot contents and move the
+    appointment dates so the data is centred on today again.
+    """
+    directory = _snapshot_dir()
+    qn = connection.ops.quote_name
+
+    provider_user_ids = list(
+        Provider.objects.exclude(user__isnull=True).values_list("user_id", flat=True)
+    )
+
+    with connection.cursor() as cursor:
+        # TRUNCATE refuses tables with deferred FK checks still pending in
+        # this transaction (e.g. a reset that just seeded); run them now.
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        tables = ", ".join(qn(m._meta.db_table) for m in SNAPSHOT_MODELS + RESET_MODELS)
+        cursor.execute(f"TRUNCATE {tables} RESTART IDENTITY")
+
+        # Users are shared with non-demo data, so they are replaced individually
+        # (the ORM nulls the SET_NULL references to them; audit rows keep actor_id).
+        User.objects.filter(id__in=provider_user_ids).delete()
+        User.objects.filter(id__in=manifest["user_ids"]).delete()
+        User.objects.filter(username__in=manifest["usernames"]).delete()
+
+        _copy_in(
+            cursor,
+            f"COPY {qn(User._meta.db_table)} ({_column_list(manifest['users'])}) FROM STDIN",
+            directory / f"{User._meta.db_table}.copy",
+        )
+        for model in SNAPSHOT_MODELS:
+            table = model._meta.db_table
+            _copy_in(
+                cursor,
+                f"COPY {qn(table)} ({_column_list(manifest['tables'][table])}) FROM STDIN",
+                directory / f"{table}.copy",
+            )
+
+        # COPY writes explicit ids; move the sequences past them.
+        for sql in connection.ops.sequence_reset_sql(no_style(), SNAPSHOT_MODELS + [User]):
+            cursor.execute(sql)
+
+        seeded_for = date.fromisoformat(manifest["seeded_for_date"])
+        today = timezone.localdate()
+        shift = _week_aligned_shift(seeded_for, today)
+        if shift:
+            table = qn(Appointment._meta.db_table)
+            cursor.execute(
+                f"UPDATE {table} SET {qn('date')} = {qn('date')} + %s, "
+                f"{qn('repeat_end_date')} = {qn('repeat_end_date')} + %s",
+                [shift, shift],
+            )
+            table = qn(BlockTemplate._meta.db_table)
+            cursor.execute(
+                f"UPDATE {table} SET {qn('start_date')} = {qn('start_date')} + %s, "
+                f"{qn('end_date')} = {qn('end_date')} + %s, "
+                f"{qn('exceptions')} = COALESCE((SELECT jsonb_agg(to_char(value::date + %s, 'YYYY-MM-DD')) "
+                f"FROM jsonb_array_elements_text({qn('exceptions')})), '[]'::jsonb)",
+                [shift, shift, shift],
+            )
+
+    summary = dict(manifest["summary"])
+    summary["seeded_for_date"] = str(today)
+    summary["window_start"] = str(date.fromisoformat(summary["window_start"]) + timedelta(days=shift))
+    summary["window_end"] = str(date.fromisoformat(summary["window_end"]) + timedelta(days=shift))
+    return summary
+
+
+# -----------------------------
+# Entry point
+# -----------------------------
+
+def reset_demo_data(*, rebuild: bool = False) -> dict:
+    """
+    Reset demo data using the configured DEMO_RESET_MODE.
+
+    - "snapshot" (PostgreSQL only): restore from the COPY snapshot, building it
+      first if it is missing, stale, or rebuild=True.
+    - "full": always run the deterministic seed (the original behaviour).
+    """
+    with tenancy.use_practice(tenancy.default_practice_id()):
+        summary = _reset_demo_data(rebuild=rebuild)
+        # Every appointment was rewritten: drop all cached schedule windows.
+        notify_appointments_changed(None)
+        rooms.notify_changed(Location.objects.values_list("pk", flat=True))
+    return summary
+
+
+def _reset_demo_data(*, rebuild: bool) -> dict:
+    if (
+        settings.DEMO_RESET_MODE != "snapshot"
+        or connection.vendor != "postgresql"
+        or Practice.objects.exclude(pk=tenancy.current_practice_id()).exists()
+    ):
+        summary = reset_and_seed_demo_data()
+        summary["reset_mode"] = "full"
+        return summary
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [_RESET_LOCK_KEY])
+
+        manifest = None if rebuild else load_manifest()
+        if not snapshot_is_current(manifest):
+            summary = reset_and_seed_demo_data()
+            write_snapshot(summary)
+            summary["reset_mode"] = "snapshot_rebuilt"
+            return summary
+
+        summary = restore_snapshot(manifest)
+        summary["reset_mode"] = "snapshot"
+        return summary
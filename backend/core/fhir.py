@@ -0,0 +1,274 @@
+# backend/core/fhir.py
+"""
+FHIR R4 bulk data export (system level, $export).
+
+    GET  /api/fhir/$export?_type=Patient,Appointment&_since=2026-01-01T00:00:00Z
+         -> 202, Content-Location: /api/fhir/$export/<job id>/
+    GET  /api/fhir/$export/<job id>/            202 + X-Progress, then the manifest
+    GET  /api/fhir/$export/<job id>/<Type>.ndjson
+    DELETE /api/fhir/$export/<job id>/          cancel and delete the files
+
+The export runs as a background job ("fhir_export", core/tasks.py) under the
+practice that asked for it, and writes one NDJSON file per resource type to
+FHIR_EXPORT_ROOT/<job id>/:
+
+- Patient       <- patients.Patient (identifier: the PRN)
+- Practitioner  <- providers.Provider
+- Location      <- locations.Location
+- Appointment   <- appointments.Appointment; blocks are not appointments and
+                   are left out, like rows without a patient
+
+Every type is read with one query through a server-side cursor
+(QuerySet.iterator(chunk_size=FHIR_EXPORT_CHUNK_SIZE)) and written line by
+line, so memory stays flat however large the practice is.
+
+`_since` keeps resources whose updated_at is after it. Each export only
+includes rows updated up to its transactionTime, which the manifest reports:
+the next incremental export passes it as `_since` and picks up everything
+changed while this one ran. Deletions are not reported.
+"""
+from __future__ import annotations
+
+import json
+import shutil
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from appointments.models import Appointment
+from locations.models import Location
+from patients.models import Patient
+from providers.models import Provider
+
+
+JOB_KIND = "fhir_export"
+NDJSON = "application/fhir+ndjson"
+OUTPUT_FORMATS = {NDJSON, "application/ndjson", "ndjson"}
+TIMEZONE_EXTENSION = "http://hl7.org/fhir/StructureDefinition/timezone"
+
+PATIENT_GENDERS = {
+    "Male": "male",
+    "Female": "female",
+    "Nonbinary": "other",
+    "Other": "other",
+    "Prefer not to say": "unknown",
+}
+APPOINTMENT_STATUSES = {
+    "tentative": "pending",
+    "pending": "booked",
+    "arrived": "arrived",
+    "in_lobby": "checked-in",
+    "in_room": "arrived",
+    "seen": "fulfilled",
+    "no_show": "noshow",
+    "cancelled": "cancelled",
+}
+
+
+class ExportError(ValueError):
+    """Invalid kick-off parameters; the message is returned to the client."""
+
+
+# -----------------------------
+# Kick-off parameters
+# -----------------------------
+
+def parse_request(params) -> dict:
+    """Job payload from the kick-off query parameters (_type, _since, _outputFormat)."""
+    output_format = params.get("_outputFormat")
+    if output_format and output_format not in OUTPUT_FORMATS:
+        raise ExportError(f"Unsupported _outputFormat {output_format!r}; use {NDJSON}.")
+
+    types = list(RESOURCES)
+    if params.get("_type"):
+        types = [t.strip() for t in params["_type"].split(",") if t.strip()]
+        unknown = [t for t in types if t not in RESOURCES]
+        if unknown:
+            raise ExportError(f"Unsupported _type {', '.join(unknown)}; supported: {', '.join(RESOURCES)}.")
+
+    since = None
+    if params.get("_since"):
+        since = parse_datetime(params["_since"].replace(" ", "+"))
+        if since is None or timezone.is_naive(since):
+            raise ExportError("_since must be a FHIR instant with a time zone, e.g. 2026-01-01T00:00:00Z.")
+    return {"types": types, "since": since.isoformat() if since else None}
+
+
+# -----------------------------
+# Resources
+# -----------------------------
+
+def _instant(value: Optional[datetime]) -> Optional[str]:
+    if value is None:
+        return None
+    return value.astimezone(dt_timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+
+def _meta(updated_at) -> dict:
+    return {"lastUpdated": _instant(updated_at)} if updated_at else {}
+
+
+def _telecom(phone, email) -> list:
+    found = []
+    if phone:
+        found.append({"system": "phone", "value": phone, "use": "work"})
+    if email:
+        found.append({"system": "email", "value": email})
+    return found
+
+
+def _compact(resource: dict) -> dict:
+    """Drop empty elements: FHIR forbids empty strings, lists and objects."""
+    return {k: v for k, v in resource.items() if v not in (None, "", [], {})}
+
+
+def patient_resource(p: Patient) -> dict:
+    return _compact({
+        "resourceType": "Patient",
+        "id": str(p.pk),
+        "meta": _meta(p.updated_at),
+        "identifier": [{"system": f"{settings.FHIR_IDENTIFIER_SYSTEM}/prn", "value": p.prn}],
+        "name": [{"family": p.last_name, "given": [p.first_name]}],
+        "gender": PATIENT_GENDERS.get(p.gender or ""),
+        "birthDate": p.date_of_birth.isoformat() if p.date_of_birth else None,
+        "telecom": _telecom(p.phone, p.email),
+        "address": [{"text": p.address}] if p.address else [],
+    })
+
+
+def practitioner_resource(p: Provider) -> dict:
+    return _compact({
+        "resourceType": "Practitioner",
+        "id": str(p.pk),
+        "meta": _meta(p.updated_at),
+        "active": True,
+        "name": [{"family": p.last_name, "given": [p.first_name]}],
+        "telecom": _telecom(p.phone, p.email),
+        "qualification": [{"code": {"text": p.specialty}}] if p.specialty else [],
+    })
+
+
+def location_resource(loc: Location) -> dict:
+    return _compact({
+        "resourceType": "Location",
+        "id": str(loc.pk),
+        "meta": _meta(loc.updated_at),
+        "identifier": [{"system": f"{settings.FHIR_IDENTIFIER_SYSTEM}/location", "value": loc.slug}] if loc.slug else [],
+        "status": "active" if loc.is_active else "inactive",
+        "name": loc.name,
+        "mode": "instance",
+        "telecom": _telecom(loc.phone, loc.email),
+        "address": {"text": loc.address} if loc.address else None,
+        "extension": [{"url": TIMEZONE_EXTENSION, "valueCode": loc.timezone}] if loc.timezone else [],
+    })
+
+
+def appointment_resource(a: Appointment) -> dict:
+    participants = [
+        {"actor": {"reference": f"Patient/{a.patient_id}"}, "required": "required", "status": "accepted"},
+        {"actor": {"reference": f"Practitioner/{a.provider_id}"}, "required": "required", "status": "accepted"},
+    ]
+    if a.location_id:
+        participants.append(
+            {"actor": {"reference": f"Location/{a.location_id}"}, "required": "required", "status": "accepted"}
+        )
+    return _compact({
+        "resourceType": "Appointment",
+        "id": str(a.pk),
+        "meta": _meta(a.updated_at),
+        "status": APPOINTMENT_STATUSES.get(a.status, "booked"),
+        "appointmentType": {"text": a.appointment_type} if a.appointment_type else None,
+        "reasonCode": [{"text": a.chief_complaint}] if a.chief_complaint else [],
+        "start": _instant(a.start_utc),
+        "end": _instant(a.end_utc),
+        "minutesDuration": a.duration or None,
+        "created": _instant(a.created_at),
+        "comment": a.notes,
+        "participant": participants,
+    })
+
+
+@dataclass(frozen=True)
+class Resource:
+    queryset: Callable[[], QuerySet]
+    to_fhir: Callable[[object], dict]
+
+
+# Export order: referenced resources before the appointments that point at them.
+RESOURCES: Dict[str, Resource] = {
+    "Patient": Resource(lambda: Patient.objects.all(), patient_resource),
+    "Practitioner": Resource(lambda: Provider.objects.all(), practitioner_resource),
+    "Location": Resource(lambda: Location.objects.all(), location_resource),
+    "Appointment": Resource(
+        lambda: Appointment.objects.filter(is_block=False, patient__isnull=False), appointment_resource,
+    ),
+}
+
+
+# -----------------------------
+# Export
+# -----------------------------
+
+def export_dir(job_id: int) -> Path:
+    return Path(settings.FHIR_EXPORT_ROOT) / str(job_id)
+
+
+def file_path(job_id: int, resource_type: str) -> Path:
+    return export_dir(job_id) / f"{resource_type}.ndjson"
+
+
+def remove(job_id: int) -> None:
+    shutil.rmtree(export_dir(job_id), ignore_errors=True)
+
+
+def run(job_id: int, types: List[str], since: Optional[str] = None, request_url: str = "",
+        progress: Callable[[float, str], None] = lambda pct, msg: None) -> dict:
+    """
+    Write the practice's resources as NDJSON and return the manifest (with
+    file names; the status view turns them into URLs). A retry starts over.
+    """
+    transaction_time = timezone.now()
+    since_at = datetime.fromisoformat(since) if since else None
+    directory = export_dir(job_id)
+    remove(job_id)
+    directory.mkdir(parents=True)
+
+    output = []
+    for index, resource_type in enumerate(types):
+        resource = RESOURCES[resource_type]
+        # exclude() keeps appointments that predate updated_at (NULL).
+        qs = resource.queryset().exclude(updated_at__gt=transaction_time)
+        if since_at is not None:
+            qs = qs.filter(updated_at__gt=since_at)
+        total = qs.count()
+        start_pct = 100 * index / len(types)
+        progress(start_pct, f"Exporting {resource_type}")
+
+        path = file_path(job_id, resource_type)
+        count = 0
+        with path.open("w", encoding="utf-8") as out:
+            for row in qs.order_by("pk").iterator(chunk_size=settings.FHIR_EXPORT_CHUNK_SIZE):
+                out.write(json.dumps(resource.to_fhir(row), separators=(",", ":")))
+                out.write("\n")
+                count += 1
+                if count % settings.FHIR_EXPORT_CHUNK_SIZE == 0:
+                    progress(start_pct + 100 * count / total / len(types), f"Exporting {resource_type}")
+
+        if count:
+            output.append({"type": resource_type, "file": path.name, "count": count})
+        else:
+            path.unlink()
+
+    return {
+        "transactionTime": _instant(transaction_time),
+        "request": request_url,
+        "requiresAccessToken": True,
+        "output": output,
+        "error": [],
+    }
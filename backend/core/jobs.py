@@ -0,0 +1,427 @@
+# backend/core/jobs.py
+"""
+Background jobs without a broker: the queue is the core_job table.
+
+Heavy operations (demo reset, exports, imports, ...) are registered with the
+@job decorator in an app's tasks.py (autodiscovered at startup). Views call
+enqueue() and answer 202 with the job id right away; the client polls
+GET /api/jobs/<id>/ for status and progress.
+
+`python manage.py run_jobs` runs a pool of worker threads. Each one:
+
+- claims the oldest due queued job with SELECT ... FOR UPDATE SKIP LOCKED,
+  so concurrent workers (threads or processes, on any host) never wait on
+  or double-claim a row;
+- honours the per-kind concurrency limit: claimers of a limited kind
+  serialize on a transaction-level advisory lock before counting its running
+  jobs, so the limit holds across processes;
+- runs the handler outside any transaction, stores its JSON result, and on
+  failure requeues with exponential backoff until max_attempts.
+
+Running jobs get a heartbeat from their process (the pool's housekeeping
+thread, or a per-job thread under run_pending); jobs whose heartbeat is older
+than JOBS_STALE_AFTER (worker killed, host lost) are requeued or failed.
+
+A job records the practice it was enqueued for (core/tenancy.py) and its
+handler runs with that practice current.
+
+Cancellation is cooperative: a cancelled running job stops at its next
+progress() call. With JOBS_EAGER=True jobs run inline when the enqueuing
+transaction commits (tests, scripts, dev without a worker).
+"""
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Iterable, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import tenancy
+
+
+logger = logging.getLogger("core.jobs")
+
+# Candidates examined per claim (rows of full kinds are skipped).
+CLAIM_BATCH = 20
+# Namespace for pg_try_advisory_xact_lock(namespace, hashtext(kind)).
+_CONCURRENCY_LOCK_NAMESPACE = 0x6A6F6273  # "jobs"
+
+
+class JobCancelled(Exception):
+    """Raised by JobContext.progress() once the job has been cancelled."""
+
+
+# -----------------------------
+# Registry
+# -----------------------------
+
+@dataclass(frozen=True)
+class JobType:
+    kind: str
+    func: Callable
+    # Max jobs of this kind running at once across all workers (0 = no limit).
+    concurrency: int = 0
+    max_attempts: int = 1
+    # Seconds before the first retry; doubled for every further attempt.
+    retry_delay: float = 30.0
+
+
+_registry: dict = {}
+
+
+def job(kind: str, *, concurrency: int = 0, max_attempts: int = 1, retry_delay: float = 30.0):
+    """Register `func(ctx: JobContext) -> JSON-serializable result` as a job kind."""
+    def decorator(func):
+        _registry[kind] = JobType(kind, func, concurrency, max_attempts, retry_delay)
+        return func
+    return decorator
+
+
+def registered_kinds() -> list:
+    return sorted(_registry)
+
+
+def get_type(kind: str) -> JobType:
+    try:
+        return _registry[kind]
+    except KeyError:
+        raise LookupError(f"Unknown job kind {kind!r}; registered: {', '.join(registered_kinds())}")
+
+
+# -----------------------------
+# Enqueueing
+# -----------------------------
+
+def enqueue(kind: str, payload: Optional[dict] = None, *, user=None, run_after=None, dedupe: bool = False):
+    """
+    Queue a job for the current practice and return it. With dedupe=True an
+    already queued job of the same kind, practice and payload is returned
+    instead of adding another one.
+    """
+    from .models import Job
+
+    job_type = get_type(kind)
+    payload = payload or {}
+    if dedupe:
+        existing = Job.objects.filter(
+            kind=kind, status=Job.STATUS_QUEUED, payload=payload, practice_id=tenancy.practice_for_new_rows(),
+        ).order_by("id").first()
+        if existing is not None:
+            return existing
+
+    created = Job.objects.create(
+        kind=kind,
+        payload=payload,
+        max_attempts=job_type.max_attempts,
+        run_after=run_after or timezone.now(),
+        created_by=user if getattr(user, "is_authenticated", False) else None,
+    )
+    if settings.JOBS_EAGER:
+        transaction.on_commit(lambda: run_pending(created.pk))
+    return created
+
+
+def cancel(job) -> bool:
+    """Cancel a queued or running job; False if it had already finished."""
+    from .models import Job
+
+    updated = Job.objects.filter(
+        pk=job.pk, status__in=[Job.STATUS_QUEUED, Job.STATUS_RUNNING],
+    ).update(status=Job.STATUS_CANCELLED, finished_at=timezone.now())
+    return bool(updated)
+
+
+# -----------------------------
+# Running
+# -----------------------------
+
+class JobContext:
+    """What a handler gets: the claimed job, its payload and progress reporting."""
+
+    def __init__(self, job):
+        self.job = job
+        self.payload = job.payload
+
+    def progress(self, percent: float, message: str = "") -> None:
+        """Record progress (0-100); raises JobCancelled if the job was cancelled."""
+        from .models import Job
+
+        percent = max(0, min(100, int(percent)))
+        updated = Job.objects.filter(pk=self.job.pk, status=Job.STATUS_RUNNING).update(
+            progress=percent, progress_message=message[:255], heartbeat_at=timezone.now(),
+        )
+        if not updated:
+            raise JobCancelled(self.job.pk)
+        self.job.progress, self.job.progress_message = percent, message
+
+
+def _concurrency_slot_free(job_type: JobType) -> bool:
+    from .models import Job
+
+    if not job_type.concurrency:
+        return True
+    if connection.vendor == "postgresql":
+        # Held until the claim commits: a second claimer of this kind skips it
+        # instead of reading the same running count.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_try_advisory_xact_lock(%s, hashtext(%s))",
+                [_CONCURRENCY_LOCK_NAMESPACE, job_type.kind],
+            )
+            if not cursor.fetchone()[0]:
+                return False
+    running = Job.objects.filter(kind=job_type.kind, status=Job.STATUS_RUNNING).count()
+    return running < job_type.concurrency
+
+
+def claim(worker: str, kinds: Optional[Iterable[str]] = None, job_id: Optional[int] = None):
+    """Mark the oldest due job this worker may run as running and return it (or None)."""
+    from .models import Job
+
+    kinds = [k for k in (kinds or _registry) if k in _registry]
+    if not kinds:
+        return None
+    now = timezone.now()
+    with transaction.atomic():
+        candidates = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.STATUS_QUEUED, run_after__lte=now, kind__in=kinds)
+            .order_by("run_after", "id")
+        )
+        if job_id is not None:
+            candidates = candidates.filter(pk=job_id)
+        full = set()
+        for candidate in candidates[:CLAIM_BATCH]:
+            if candidate.kind in full:
+                continue
+            if not _concurrency_slot_free(_registry[candidate.kind]):
+                full.add(candidate.kind)
+                continue
+            candidate.status = Job.STATUS_RUNNING
+            candidate.attempts += 1
+            candidate.worker = worker[:128]
+            candidate.started_at = candidate.heartbeat_at = now
+            candidate.progress, candidate.progress_message = 0, ""
+            candidate.save(update_fields=[
+                "status", "attempts", "worker", "started_at", "heartbeat_at", "progress", "progress_message",
+            ])
+            return candidate
+    return None
+
+
+def execute(job) -> str:
+    """Run a claimed job's handler and record the outcome; returns the final status."""
+    from . import metrics
+    from .models import Job
+
+    job_type = _registry[job.kind]
+    running = Job.objects.filter(pk=job.pk, status=Job.STATUS_RUNNING)
+    logger.info("Job %s started (attempt %d/%d)", job, job.attempts, job.max_attempts)
+    started = time.perf_counter()
+    try:
+        with tenancy.use_practice(job.practice_id):
+            result = job_type.func(JobContext(job))
+    except JobCancelled:
+        outcome = Job.STATUS_CANCELLED
+        logger.info("Job %s cancelled", job)
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"[:4000]
+        if job.attempts < job.max_attempts:
+            outcome = Job.STATUS_QUEUED
+            delay = job_type.retry_delay * 2 ** (job.attempts - 1)
+            logger.warning("Job %s failed (attempt %d/%d), retrying in %.0fs",
+                           job, job.attempts, job.max_attempts, delay, exc_info=True)
+            running.update(
+                status=outcome, error=error, worker="", heartbeat_at=None,
+                run_after=timezone.now() + timedelta(seconds=delay),
+            )
+        else:
+            outcome = Job.STATUS_FAILED
+            logger.exception("Job %s failed", job)
+            running.update(status=outcome, error=error, finished_at=timezone.now())
+    else:
+        outcome = Job.STATUS_SUCCEEDED
+        running.update(
+            status=outcome, result=result, error="", progress=100, finished_at=timezone.now(),
+        )
+        logger.info("Job %s succeeded in %.1fs", job, time.perf_counter() - started)
+    metrics.observe_job(
+        job.kind, time.perf_counter() - started,
+        status={Job.STATUS_SUCCEEDED: "ok", Job.STATUS_CANCELLED: "cancelled"}.get(outcome, "error"),
+    )
+    return outcome
+
+
+def run_pending(job_id: Optional[int] = None, worker: str = "", kinds=None) -> int:
+    """
+    Claim and run due jobs in this thread until none is left (or just `job_id`).
+    Returns the number of jobs run.
+    """
+    worker = worker or worker_name()
+    count = 0
+    while True:
+        claimed = claim(worker, kinds, job_id=job_id)
+        if claimed is None:
+            return count
+        with _heartbeating(claimed.pk):
+            execute(claimed)
+        count += 1
+        if job_id is not None:
+            return count
+
+
+def heartbeat(job_ids: Iterable[int]) -> int:
+    """Refresh the heartbeat of these jobs if they are still running; returns how many."""
+    from .models import Job
+
+    with transaction.atomic():
+        # A row locked by its own handler right now gets its beat next time.
+        ids = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(pk__in=list(job_ids), status=Job.STATUS_RUNNING)
+            .values_list("pk", flat=True)
+        )
+        return Job.objects.filter(pk__in=ids).update(heartbeat_at=timezone.now()) if ids else 0
+
+
+@contextmanager
+def _heartbeating(job_id: int):
+    """Heartbeat one job from a side thread while it runs outside a WorkerPool."""
+    done = threading.Event()
+
+    def beat():
+        while not done.wait(settings.JOBS_HEARTBEAT_INTERVAL):
+            try:
+                heartbeat([job_id])
+            except Exception:
+                logger.exception("Job heartbeat failed")
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f"job-heartbeat-{job_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        done.set()
+        thread.join()
+
+
+def requeue_stale(stale_after: Optional[float] = None) -> int:
+    """Requeue (or fail, when out of attempts) running jobs whose heartbeat stopped."""
+    from django.db.models import F
+
+    from .models import Job
+
+    stale_after = settings.JOBS_STALE_AFTER if stale_after is None else stale_after
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    stale = Job.objects.filter(status=Job.STATUS_RUNNING, heartbeat_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.STATUS_FAILED, error="Worker stopped responding.", finished_at=timezone.now(),
+    )
+    requeued = stale.update(status=Job.STATUS_QUEUED, worker="", heartbeat_at=None, run_after=timezone.now())
+    if failed or requeued:
+        logger.warning("Stale jobs: %d requeued, %d failed", requeued, failed)
+    return failed + requeued
+
+
+def worker_name(thread: Optional[str] = None) -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{thread or threading.current_thread().name}"
+
+
+# -----------------------------
+# Worker pool (`manage.py run_jobs`)
+# -----------------------------
+
+class WorkerPool:
+    """
+    `workers` threads polling the queue, plus one housekeeping thread that
+    heartbeats this process's running jobs and requeues stale ones. Each
+    thread uses its own pooled connection and gives it back while idle.
+    """
+
+    def __init__(self, workers: int = 1, kinds: Optional[Iterable[str]] = None,
+                 poll_interval: Optional[float] = None, exit_when_idle: bool = False):
+        self.workers = workers
+        # Drain mode (`run_jobs --once`): a thread exits once nothing is due.
+        self.exit_when_idle = exit_when_idle
+        self.kinds = list(kinds) if kinds else None
+        self.poll_interval = settings.JOBS_POLL_INTERVAL if poll_interval is None else poll_interval
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._running: set = set()
+        self._threads: list = []
+
+    def start(self) -> None:
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{i + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        housekeeping = threading.Thread(target=self._housekeeping, name="job-housekeeping", daemon=True)
+        housekeeping.start()
+        self._threads.append(housekeeping)
+
+    def stop(self) -> None:
+        """Stop claiming; jobs already running are allowed to finish."""
+        self._stop.set()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def wait_workers(self) -> None:
+        """Block until every worker thread has exited (drain mode), then stop."""
+        for thread in self._threads:
+            if thread.name != "job-housekeeping":
+                thread.join()
+        self.stop()
+
+    def _work(self) -> None:
+        from django.db import close_old_connections
+
+        from . import metrics
+
+        name = worker_name()
+        while not self._stop.is_set():
+            try:
+                claimed = claim(name, self.kinds)
+                if claimed is not None:
+                    with self._lock:
+                        self._running.add(claimed.pk)
+                    try:
+                        execute(claimed)
+                    finally:
+                        with self._lock:
+                            self._running.discard(claimed.pk)
+                    metrics.registry.maybe_flush()
+                    continue
+                if self.exit_when_idle:
+                    break
+            except Exception:
+                logger.exception("Job worker %s crashed; continuing", name)
+                close_old_connections()
+            # Idle: give the connection back to the pool until the next poll.
+            connection.close()
+            self._stop.wait(self.poll_interval)
+        connection.close()
+
+    def _housekeeping(self) -> None:
+        interval = settings.JOBS_HEARTBEAT_INTERVAL
+        while not self._stop.wait(interval):
+            try:
+                with self._lock:
+                    running = list(self._running)
+                if running:
+                    heartbeat(running)
+                requeue_stale()
+            except Exception:
+                logger.exception("Job housekeeping failed")
+            connection.close()
@@ -0,0 +1,4 @@
+"""
+Dependency-free async HTTP load tooling used by the `bench_concurrency`
+management command (and anything else that needs to drive a live server).
+"""
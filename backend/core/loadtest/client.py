@@ -0,0 +1,132 @@
+# backend/core/loadtest/client.py
+"""
+Minimal keep-alive HTTP/1.1 client on asyncio streams.
+
+Deliberately tiny: one connection per simulated client, JSON in/out, enough to
+drive hundreds of concurrent clients without pulling in aiohttp/httpx.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import ssl
+from typing import Optional
+from urllib.parse import urlencode, urlsplit
+
+
+class HttpError(Exception):
+    pass
+
+
+class HttpClient:
+    def __init__(self, base_url: str, *, timeout: float = 30.0):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or "http"
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or (443 if self.scheme == "https" else 80)
+        self.base_path = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.headers: dict = {}
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def _connect(self) -> None:
+        ctx = ssl.create_default_context() if self.scheme == "https" else None
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port, ssl=ctx)
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        self._reader = self._writer = None
+
+    def set_bearer(self, token: str) -> None:
+        self.headers["Authorization"] = f"Bearer {token}"
+
+    async def request(self, method: str, path: str, *, params=None, json_body=None):
+        """
+        Returns (status, parsed JSON or None). Reconnects once if the server
+        closed an idle keep-alive connection.
+        """
+        for attempt in (1, 2):
+            if self._writer is None:
+                await self._connect()
+            try:
+                return await asyncio.wait_for(
+                    self._roundtrip(method, path, params, json_body), self.timeout
+                )
+            except (ConnectionError, asyncio.IncompleteReadError) as exc:
+                await self.close()
+                if attempt == 2:
+                    raise HttpError(str(exc)) from exc
+            except asyncio.TimeoutError as exc:
+                await self.close()
+                raise HttpError("timeout") from exc
+
+    async def _roundtrip(self, method, path, params, json_body):
+        target = self.base_path + path
+        if params:
+            target += ("&" if "?" in target else "?") + urlencode(params, doseq=True)
+
+        body = b""
+        headers = {
+            "Host": f"{self.host}:{self.port}",
+            "Accept": "application/json",
+            "Connection": "keep-alive",
+            **self.headers,
+        }
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            headers["Content-Type"] = "application/json"
+        headers["Content-Length"] = str(len(body))
+
+        head = f"{method} {target} HTTP/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+        self._writer.write(head.encode("latin-1") + b"\r\n" + body)
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed")
+        status = int(status_line.split()[1])
+
+        resp_headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            resp_headers[key.strip().lower()] = value.strip()
+
+        if resp_headers.get("transfer-encoding", "").lower() == "chunked":
+            payload = bytearray()
+            while True:
+                size = int((await self._reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await self._reader.readline()
+                    break
+                payload += await self._reader.readexactly(size)
+                await self._reader.readline()
+            payload = bytes(payload)
+        else:
+            payload = await self._reader.readexactly(int(resp_headers.get("content-length", 0)))
+
+        if resp_headers.get("connection", "").lower() == "close":
+            await self.close()
+
+        data = None
+        if payload and "json" in resp_headers.get("content-type", ""):
+            data = json.loads(payload)
+        return status, data
+
+
+async def login(client: HttpClient, username: str, password: str) -> str:
+    status, data = await client.request(
+        "POST", "/api/auth/login/", json_body={"username": username, "password": password}
+    )
+    if status != 200 or not data:
+        raise HttpError(f"login failed ({status})")
+    client.set_bearer(data["access"])
+    return data["access"]
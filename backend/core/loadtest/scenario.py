@@ -0,0 +1,80 @@
+# backend/core/loadtest/scenario.py
+"""
+Load-test scenarios: JSON files describing N clinics x M workstations and the
+mix of frontend actions each workstation performs.
+
+    {
+      "name": "clinic_day",
+      "clinics": 4,
+      "workstations_per_clinic": 6,
+      "duration_s": 120,
+      "ramp_up_s": 10,
+      "think_time_ms": 1500,          # mean pause between actions (exponential)
+      "seed": 42,
+      "weights": {"week_load": 40, "typeahead": 20, "status_flip": 25,
+                  "recurring_create": 3, "settings_read": 12}
+    }
+
+Bundled scenarios live in core/loadtest/scenarios/ and can be referred to by name.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+
+SCENARIO_DIR = Path(__file__).resolve().parent / "scenarios"
+
+ACTIONS = ["week_load", "typeahead", "status_flip", "recurring_create", "settings_read"]
+
+DEFAULTS = {
+    "description": "",
+    "clinics": 1,
+    "workstations_per_clinic": 1,
+    "duration_s": 60,
+    "ramp_up_s": 0,
+    "think_time_ms": 1000,
+    "keystroke_ms": 120,
+    "seed": 0,
+}
+
+
+class ScenarioError(ValueError):
+    pass
+
+
+def bundled_scenarios() -> list[str]:
+    return sorted(p.stem for p in SCENARIO_DIR.glob("*.json"))
+
+
+def load_scenario(name_or_path: str) -> dict:
+    """
+    Load a bundled scenario by name or any scenario file by path,
+    fill in defaults and validate the action weights.
+    """
+    path = Path(name_or_path)
+    if not path.suffix:
+        path = SCENARIO_DIR / f"{name_or_path}.json"
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            raw = json.load(fh)
+    except OSError as exc:
+        raise ScenarioError(f"Cannot read scenario {name_or_path!r}: {exc}")
+    except ValueError as exc:
+        raise ScenarioError(f"Invalid JSON in {path}: {exc}")
+
+    scenario = {**DEFAULTS, "name": path.stem, **raw}
+
+    weights = scenario.get("weights") or {}
+    unknown = set(weights) - set(ACTIONS)
+    if unknown:
+        raise ScenarioError(f"Unknown actions in weights: {', '.join(sorted(unknown))}")
+    if not any(w > 0 for w in weights.values()):
+        raise ScenarioError("At least one action needs a positive weight.")
+    scenario["weights"] = {a: float(weights.get(a, 0)) for a in ACTIONS}
+
+    for key in ("clinics", "workstations_per_clinic"):
+        if int(scenario[key]) < 1:
+            raise ScenarioError(f"{key} must be >= 1")
+        scenario[key] = int(scenario[key])
+    return scenario
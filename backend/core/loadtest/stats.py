@@ -0,0 +1,65 @@
+# backend/core/loadtest/stats.py
+from __future__ import annotations
+
+import math
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class LatencyRecorder:
+    """
+    Collects per-endpoint latencies (ms) and error counts for one run.
+    """
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def record(self, endpoint: str, elapsed_ms: float, ok: bool) -> None:
+        self.latencies[endpoint].append(elapsed_ms)
+        if not ok:
+            self.errors[endpoint] += 1
+
+    def stop(self) -> None:
+        self.finished = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def _summarize(self, values: List[float], errors: int) -> dict:
+        values = sorted(values)
+        n = len(values)
+        return {
+            "requests": n,
+            "errors": errors,
+            "error_rate": round(errors / n, 4) if n else 0.0,
+            "rps": round(n / self.elapsed, 1) if self.elapsed else 0.0,
+            "p50_ms": round(percentile(values, 50), 2),
+            "p95_ms": round(percentile(values, 95), 2),
+            "p99_ms": round(percentile(values, 99), 2),
+            "max_ms": round(values[-1], 2) if values else 0.0,
+        }
+
+    def summary(self) -> dict:
+        endpoints = {
+            name: self._summarize(values, self.errors.get(name, 0))
+            for name, values in sorted(self.latencies.items())
+        }
+        all_values = [v for values in self.latencies.values() for v in values]
+        return {
+            "duration_s": round(self.elapsed, 2),
+            "total": self._summarize(all_values, sum(self.errors.values())),
+            "endpoints": endpoints,
+        }
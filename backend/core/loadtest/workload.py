@@ -0,0 +1,194 @@
+# backend/core/loadtest/workload.py
+"""
+Simulated front-desk workstations replaying what the frontend actually sends.
+
+Each workstation belongs to a clinic (one location + a share of the providers)
+and loops over weighted actions with exponential think time:
+
+- week_load:        appointmentsApi.listAllAppointments — Monday..next Monday,
+                    following `next` until the last page (mostly the current
+                    week, sometimes one week either side)
+- typeahead:        patient search on every keystroke of a last-name prefix
+- status_flip:      PUT of a full appointment with the next check-in status
+- recurring_create: POST of a recurring appointment after hours (cleaned up at the end)
+- settings_read:    schedule settings + locations + business settings
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+from .client import HttpClient, HttpError
+from .stats import LatencyRecorder
+
+
+# axios serializes arrays as "providers[]=1&providers[]=2"; mirror it exactly.
+PROVIDERS_PARAM = "providers[]"
+
+STATUS_FLOW = ["pending", "arrived", "in_lobby", "in_room", "seen"]
+
+WRITABLE_FIELDS = [
+    "patient", "provider", "office", "appointment_type", "is_block", "status",
+    "room", "intake_status", "notes", "color_code", "chief_complaint", "date",
+    "start_time", "end_time", "duration", "is_recurring", "repeat_days",
+    "repeat_interval_weeks", "repeat_end_date", "repeat_occurrences",
+]
+
+
+def week_range(day: date):
+    """Same range as the frontend's getWeekRangeForApi(): Monday to the next Monday."""
+    start = day - timedelta(days=day.weekday())
+    return start, start + timedelta(days=7)
+
+
+class Clinic:
+    def __init__(self, index: int, office: str, provider_ids: List[int]):
+        self.index = index
+        self.office = office
+        self.provider_ids = provider_ids
+        # Filled by week loads; used to pick appointments/patients for writes.
+        self.appointments: list = []
+        self.patient_ids: set = set()
+        self.created_ids: list = []
+
+
+class Workstation:
+    def __init__(self, clinic: Clinic, client: HttpClient, recorder: LatencyRecorder,
+                 scenario: dict, rng: random.Random, surnames: List[str]):
+        self.clinic = clinic
+        self.client = client
+        self.recorder = recorder
+        self.scenario = scenario
+        self.rng = rng
+        self.surnames = surnames
+        self.actions = [a for a, w in scenario["weights"].items() if w > 0]
+        self.weights = [scenario["weights"][a] for a in self.actions]
+        self.action_counts: dict = {}
+
+    async def _call(self, endpoint: str, method: str, path: str, *, params=None, json_body=None,
+                    expected=(200,)):
+        started = time.perf_counter()
+        try:
+            status, data = await self.client.request(method, path, params=params, json_body=json_body)
+        except (HttpError, OSError):
+            status, data = None, None
+        self.recorder.record(endpoint, (time.perf_counter() - started) * 1000, status in expected)
+        return status, data
+
+    async def run(self, start_delay: float, deadline: float) -> None:
+        await asyncio.sleep(start_delay)
+        # Every workstation opens on the schedule page.
+        await self.settings_read()
+        await self.week_load()
+
+        mean_think = self.scenario["think_time_ms"] / 1000
+        while time.perf_counter() < deadline:
+            action = self.rng.choices(self.actions, weights=self.weights)[0]
+            self.action_counts[action] = self.action_counts.get(action, 0) + 1
+            await getattr(self, action)()
+            if mean_think > 0:
+                await asyncio.sleep(min(self.rng.expovariate(1 / mean_think), mean_think * 5))
+
+    # -----------------------------
+    # Actions
+    # -----------------------------
+
+    async def week_load(self) -> None:
+        offset = self.rng.choices([-1, 0, 1], weights=[1, 8, 1])[0]
+        start, end = week_range(date.today() + timedelta(weeks=offset))
+        params = {
+            PROVIDERS_PARAM: self.clinic.provider_ids,
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+        }
+
+        started = time.perf_counter()
+        results, path, ok = [], "/api/appointments/", True
+        while path:
+            status, data = await self._call("appointments_week", "GET", path, params=params)
+            if status != 200 or not isinstance(data, dict):
+                ok = False
+                break
+            results.extend(data.get("results") or [])
+            path = _path_of(data.get("next"), self.client.base_path)
+            params = None  # `next` already carries the query string
+        self.recorder.record("week_load_all_pages", (time.perf_counter() - started) * 1000, ok)
+
+        if ok and offset == 0:
+            self.clinic.appointments = [a for a in results if a.get("patient") and not a.get("is_block")]
+            self.clinic.patient_ids.update(a["patient"] for a in self.clinic.appointments)
+
+    async def typeahead(self) -> None:
+        name = self.rng.choice(self.surnames)
+        for length in range(1, min(4, len(name)) + 1):
+            status, data = await self._call(
+                "patients_typeahead", "GET", "/api/patients/", params={"search": name[:length]}
+            )
+            if status == 200:
+                rows = data.get("results", []) if isinstance(data, dict) else (data or [])
+                self.clinic.patient_ids.update(p["id"] for p in rows[:5] if "id" in p)
+            await asyncio.sleep(self.scenario["keystroke_ms"] / 1000)
+
+    async def status_flip(self) -> None:
+        if not self.clinic.appointments:
+            return await self.week_load()
+        appt = self.rng.choice(self.clinic.appointments)
+        current = appt.get("status")
+        nxt = STATUS_FLOW[(STATUS_FLOW.index(current) + 1) % len(STATUS_FLOW)] if current in STATUS_FLOW else "arrived"
+
+        payload = {k: appt.get(k) for k in WRITABLE_FIELDS}
+        payload["status"] = nxt
+        # Demo locations have rooms 1-4; a room someone else is in is a 400.
+        payload["room"] = str(self.rng.randint(1, 4)) if nxt == "in_room" else ""
+        status, data = await self._call(
+            "appointment_status", "PUT", f"/api/appointments/{appt['id']}/", json_body=payload,
+            expected=(200, 400),
+        )
+        if status == 200 and isinstance(data, dict):
+            appt.update(data)
+
+    async def recurring_create(self) -> None:
+        if not self.clinic.patient_ids or not self.clinic.provider_ids:
+            return await self.typeahead()
+        start, _ = week_range(date.today())
+        day = start + timedelta(days=self.rng.randrange(5))
+        minute = 17 * 60 + 15 * self.rng.randrange(8)
+        payload = {
+            "patient": self.rng.choice(sorted(self.clinic.patient_ids)),
+            "provider": self.rng.choice(self.clinic.provider_ids),
+            "office": self.clinic.office,
+            "appointment_type": "Follow-up",
+            "date": day.isoformat(),
+            "start_time": f"{minute // 60:02d}:{minute % 60:02d}",
+            "end_time": f"{(minute + 15) // 60:02d}:{(minute + 15) % 60:02d}",
+            "is_recurring": True,
+            "repeat_days": [day.strftime("%a").lower()],
+            "repeat_interval_weeks": 1,
+            "repeat_end_date": (day + timedelta(weeks=4)).isoformat(),
+            "allow_overlap": True,
+        }
+        status, data = await self._call(
+            "appointment_create_recurring", "POST", "/api/appointments/", json_body=payload, expected=(201,)
+        )
+        if status == 201 and isinstance(data, dict):
+            self.clinic.created_ids.append(data["id"])
+
+    async def settings_read(self) -> None:
+        await self._call("schedule_settings", "GET", "/api/schedule-settings/")
+        await self._call("locations", "GET", "/api/locations/")
+        await self._call("business_settings", "GET", "/api/business/settings/")
+
+
+def _path_of(url: Optional[str], base_path: str = "") -> Optional[str]:
+    """DRF `next` links are absolute; keep path + query for the same connection."""
+    if not url:
+        return None
+    parts = urlsplit(url)
+    path = parts.path
+    if base_path and path.startswith(base_path):
+        path = path[len(base_path):]
+    return path + (f"?{parts.query}" if parts.query else "")
@@ -0,0 +1,34 @@
+# backend/core/management/commands/audit_partitions.py
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.audit import drop_partitions_before, ensure_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the audit log's upcoming monthly partitions (run monthly, e.g. from cron or deploy) "
+        "and optionally drop partitions past retention"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months-ahead", type=int, default=3,
+                            help="Months beyond the current one to create (default 3).")
+        parser.add_argument("--drop-before", metavar="YYYY-MM",
+                            help="Detach and drop monthly partitions before this month.")
+
+    def handle(self, *args, **options):
+        created = ensure_partitions(options["months_ahead"])
+        for name in created:
+            self.stdout.write(f"created {name}")
+
+        if options["drop_before"]:
+            try:
+                cutoff = date.fromisoformat(f"{options['drop_before']}-01")
+            except ValueError:
+                raise CommandError("--drop-before expects YYYY-MM.")
+            for name in drop_partitions_before(cutoff):
+                self.stdout.write(f"dropped {name}")
+
+        self.stdout.write(self.style.SUCCESS(f"Audit partitions up to date ({len(created)} created)."))
@@ -0,0 +1,125 @@
+# backend/core/management/commands/bench_concurrency.py
+import asyncio
+import json
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.loadtest.client import HttpClient, HttpError, login
+from core.loadtest.stats import LatencyRecorder
+
+
+PATIENT_PREFIXES = ["M", "No", "Et", "Ca", "Ow", "Lu", "He", "Ja", "So", "Iv", "El", "Av"]
+
+
+def _hot_requests():
+    """The read endpoints the schedule page hits constantly."""
+    today = timezone.localdate()
+    week_start = today - timedelta(days=(today.weekday() + 1) % 7)
+    window = {
+        "start_date": week_start.isoformat(),
+        "end_date": (week_start + timedelta(days=6)).isoformat(),
+    }
+    return [
+        ("appointments_window", "/api/appointments/", lambda: window),
+        ("schedule_settings", "/api/schedule-settings/", lambda: None),
+        ("patients_typeahead", "/api/patients/", lambda: {"search": random.choice(PATIENT_PREFIXES)}),
+        ("locations", "/api/locations/", lambda: None),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrency benchmark for the hot read endpoints: runs N concurrent clients "
+        "against one or more running servers (e.g. WSGI vs ASGI) and reports req/s and latency percentiles"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            action="append",
+            required=True,
+            help="name=base_url, e.g. --target wsgi=http://127.0.0.1:8001 --target asgi=http://127.0.0.1:8002",
+        )
+        parser.add_argument("--clients", type=int, default=500)
+        parser.add_argument("--duration", type=float, default=30.0, help="Seconds per target.")
+        parser.add_argument("--username", default="ademouser")
+        parser.add_argument("--password", default="DemoPass1!")
+        parser.add_argument("--timeout", type=float, default=30.0)
+        parser.add_argument("--json", action="store_true", help="Emit a JSON report.")
+
+    def handle(self, *args, **options):
+        targets = []
+        for raw in options["target"]:
+            name, sep, url = raw.partition("=")
+            if not sep or not url:
+                raise CommandError(f"--target must be name=url, got {raw!r}")
+            targets.append((name, url))
+
+        report = {}
+        for name, url in targets:
+            self.stderr.write(f"Benchmarking {name} ({url}) with {options['clients']} clients...")
+            report[name] = asyncio.run(self._run_target(url, options))
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        header = f"{'target':<10} {'endpoint':<22} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for name, result in report.items():
+            rows = list(result["endpoints"].items()) + [("ALL", result["total"])]
+            for endpoint, s in rows:
+                self.stdout.write(
+                    f"{name:<10} {endpoint:<22} {s['rps']:>9.1f} {s['p50_ms']:>9.2f} "
+                    f"{s['p99_ms']:>9.2f} {s['errors']:>7}"
+                )
+
+        if len(report) >= 2:
+            (base_name, base), *others = report.items()
+            for name, other in others:
+                rps = other["total"]["rps"] / base["total"]["rps"] if base["total"]["rps"] else 0
+                p99 = other["total"]["p99_ms"] / base["total"]["p99_ms"] if base["total"]["p99_ms"] else 0
+                self.stdout.write(
+                    f"\n{name} vs {base_name}: {rps:.2f}x throughput, {p99:.2f}x p99 latency"
+                )
+
+    async def _run_target(self, url: str, options) -> dict:
+        # One login, shared token: 500 password hashes would dominate the run.
+        auth_client = HttpClient(url, timeout=options["timeout"])
+        try:
+            token = await login(auth_client, options["username"], options["password"])
+        except (HttpError, OSError) as exc:
+            raise CommandError(f"Could not log in to {url}: {exc}")
+        finally:
+            await auth_client.close()
+
+        requests = _hot_requests()
+        recorder = LatencyRecorder()
+        deadline = time.perf_counter() + options["duration"]
+
+        async def client_loop(idx: int):
+            client = HttpClient(url, timeout=options["timeout"])
+            client.set_bearer(token)
+            i = idx
+            try:
+                while time.perf_counter() < deadline:
+                    name, path, params = requests[i % len(requests)]
+                    i += 1
+                    started = time.perf_counter()
+                    try:
+                        status, _ = await client.request("GET", path, params=params())
+                        ok = status == 200
+                    except (HttpError, OSError):
+                        ok = False
+                    recorder.record(name, (time.perf_counter() - started) * 1000, ok)
+            finally:
+                await client.close()
+
+        await asyncio.gather(*(client_loop(i) for i in range(options["clients"])))
+        recorder.stop()
+        return recorder.summary()
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Ensure the Demo and Admin login accounts exist (run once per deploy, after migrate)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-apply account fields even if the marker check says they exist.",
+        )
+
+    def handle(self, *args, **options):
+        # Imported here so `manage.py help` and unrelated commands stay cheap.
+        from core.bootstrap import ensure_bootstrap_accounts
+
+        if ensure_bootstrap_accounts(force=options["force"]):
+            self.stdout.write(self.style.SUCCESS("Bootstrap accounts ensured"))
+        else:
+            self.stdout.write("Bootstrap accounts already present (or tables missing); skipped")
@@ -0,0 +1,56 @@
+# backend/core/management/commands/import_appointments.py
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from appointments import imports
+from appointments.models import AppointmentImport
+from core import tenancy
+
+
+class Command(BaseCommand):
+    help = (
+        "Import appointments from a CSV or iCalendar file (see appointments/imports.py); "
+        "runs inline and can be resumed after an interruption"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", help="CSV or .ics file (not needed with --resume).")
+        parser.add_argument("--format", choices=["csv", "ics"], help="Default: from the file extension.")
+        parser.add_argument("--practice", help="Practice slug (default: DEFAULT_PRACTICE_SLUG).")
+        parser.add_argument("--allow-overlap", action="store_true", help="Import overlapping records too.")
+        parser.add_argument("--resume", type=int, metavar="IMPORT_ID",
+                            help="Continue an interrupted import after its last checkpoint.")
+
+    def handle(self, *args, **options):
+        if options["resume"]:
+            imp = AppointmentImport.all_objects.filter(pk=options["resume"]).first()
+            if imp is None:
+                raise CommandError(f"No import #{options['resume']}.")
+            if imp.status == AppointmentImport.STATUS_SUCCEEDED:
+                raise CommandError(f"Import #{imp.pk} already finished.")
+            practice_id = imp.practice_id
+        else:
+            path = options["path"]
+            if not path or not os.path.isfile(path):
+                raise CommandError("Give the file to import (or --resume IMPORT_ID).")
+            fmt = options["format"] or os.path.splitext(path)[1].lstrip(".").lower()
+            if fmt not in ("csv", "ics"):
+                raise CommandError("Can't tell the format from the file name; pass --format csv|ics.")
+            slug = options["practice"]
+            practice_id = tenancy.resolve_practice(slug) if slug else tenancy.default_practice_id()
+            if practice_id is None:
+                raise CommandError(f"Unknown practice {slug!r}.")
+            with tenancy.use_practice(practice_id):
+                imp = AppointmentImport.objects.create(
+                    source=os.path.abspath(path), format=fmt, allow_overlap=options["allow_overlap"],
+                )
+
+        self.stdout.write(f"Import #{imp.pk}: {imp.source} (from record {imp.rows_done + 1})")
+        with tenancy.use_practice(practice_id):
+            result = imports.run(imp, progress=lambda percent, message: self.stdout.write(f"{percent:5.1f}%  {message}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['imported']} of {result['records']} records, {result['skipped']} skipped."
+        ))
+        if result["report"]:
+            self.stdout.write(f"Rejected records: {result['report']}")
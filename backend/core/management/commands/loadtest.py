@@ -0,0 +1,211 @@
+# backend/core/management/commands/loadtest.py
+import asyncio
+import json
+import random
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.loadtest.client import HttpClient, HttpError, login
+from core.loadtest.scenario import ScenarioError, bundled_scenarios, load_scenario
+from core.loadtest.stats import LatencyRecorder
+from core.loadtest.workload import Clinic, Workstation
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay realistic clinic traffic (N clinics x M workstations) against a running server "
+        "and report throughput, p50/p95/p99 and error rate per endpoint"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "scenario",
+            help=f"Bundled scenario name ({', '.join(bundled_scenarios())}) or path to a scenario JSON file.",
+        )
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--username", default="ademouser")
+        parser.add_argument("--password", default="DemoPass1!")
+        parser.add_argument("--clinics", type=int, help="Override the scenario's clinic count.")
+        parser.add_argument("--workstations", type=int, help="Override workstations per clinic.")
+        parser.add_argument("--duration", type=float, help="Override the run length in seconds.")
+        parser.add_argument("--timeout", type=float, default=30.0)
+        parser.add_argument("--keep-data", action="store_true",
+                            help="Keep the appointments created by recurring_create.")
+        parser.add_argument("--json", action="store_true", help="Emit the JSON report on stdout.")
+        parser.add_argument("--output", help="Also write the JSON report to this file.")
+        parser.add_argument("--compare", help="Previous JSON report to compare against; exits non-zero on regression.")
+        parser.add_argument("--tolerance", type=float, default=0.25,
+                            help="Allowed relative p95 / throughput change for --compare (default 0.25).")
+
+    def handle(self, *args, **options):
+        try:
+            scenario = load_scenario(options["scenario"])
+        except ScenarioError as exc:
+            raise CommandError(str(exc))
+
+        if options["clinics"]:
+            scenario["clinics"] = options["clinics"]
+        if options["workstations"]:
+            scenario["workstations_per_clinic"] = options["workstations"]
+        if options["duration"]:
+            scenario["duration_s"] = options["duration"]
+
+        total = scenario["clinics"] * scenario["workstations_per_clinic"]
+        self.stderr.write(
+            f"Scenario {scenario['name']}: {scenario['clinics']} clinics x "
+            f"{scenario['workstations_per_clinic']} workstations ({total}) for {scenario['duration_s']}s "
+            f"against {options['base_url']}"
+        )
+
+        report = asyncio.run(self._run(scenario, options))
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2))
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self._print_report(report)
+
+        if options["compare"]:
+            self._compare(report, options["compare"], options["tolerance"])
+
+    # -----------------------------
+    # Run
+    # -----------------------------
+
+    async def _setup(self, base_url: str, options) -> tuple:
+        client = HttpClient(base_url, timeout=options["timeout"])
+        try:
+            # One login shared by every workstation: password hashing would dominate otherwise.
+            token = await login(client, options["username"], options["password"])
+            _, providers = await client.request("GET", "/api/providers/", params={"page_size": 100})
+            _, locations = await client.request("GET", "/api/locations/")
+        except (HttpError, OSError) as exc:
+            raise CommandError(f"Could not set up against {base_url}: {exc}")
+        finally:
+            await client.close()
+
+        providers = providers.get("results", []) if isinstance(providers, dict) else (providers or [])
+        locations = locations.get("results", []) if isinstance(locations, dict) else (locations or [])
+        locations = [loc for loc in locations if loc.get("is_active", True)]
+        if not providers or not locations:
+            raise CommandError("The target has no providers or locations; seed demo data first.")
+        return token, [p["id"] for p in providers], [loc["slug"] for loc in locations]
+
+    def _clinics(self, scenario, provider_ids, offices) -> list:
+        """Clinic i works at offices[i] with a round-robin share of the providers."""
+        n = scenario["clinics"]
+        clinics = []
+        for i in range(n):
+            share = provider_ids[i::n] or [provider_ids[i % len(provider_ids)]]
+            clinics.append(Clinic(i, offices[i % len(offices)], share))
+        return clinics
+
+    async def _run(self, scenario: dict, options) -> dict:
+        from core.demo_reset import DEMO_PATIENTS
+
+        base_url = options["base_url"]
+        token, provider_ids, offices = await self._setup(base_url, options)
+        clinics = self._clinics(scenario, provider_ids, offices)
+        surnames = sorted({p["last_name"] for p in DEMO_PATIENTS})
+
+        recorder = LatencyRecorder()
+        workstations = []
+        for clinic in clinics:
+            for m in range(scenario["workstations_per_clinic"]):
+                client = HttpClient(base_url, timeout=options["timeout"])
+                client.set_bearer(token)
+                rng = random.Random(f"{scenario['seed']}:{clinic.index}:{m}")
+                workstations.append(Workstation(clinic, client, recorder, scenario, rng, surnames))
+
+        ramp = float(scenario["ramp_up_s"])
+        deadline = time.perf_counter() + ramp + float(scenario["duration_s"])
+        try:
+            await asyncio.gather(*(
+                ws.run(ramp * i / len(workstations), deadline) for i, ws in enumerate(workstations)
+            ))
+        finally:
+            recorder.stop()
+            for ws in workstations:
+                await ws.client.close()
+
+        created = [pk for c in clinics for pk in c.created_ids]
+        if created and not options["keep_data"]:
+            await self._cleanup(base_url, token, created, options)
+
+        actions = {}
+        for ws in workstations:
+            for action, count in ws.action_counts.items():
+                actions[action] = actions.get(action, 0) + count
+
+        return {
+            "scenario": {k: scenario[k] for k in (
+                "name", "clinics", "workstations_per_clinic", "duration_s", "ramp_up_s",
+                "think_time_ms", "seed", "weights",
+            )},
+            "target": base_url,
+            "actions": actions,
+            **recorder.summary(),
+        }
+
+    async def _cleanup(self, base_url, token, ids, options) -> None:
+        client = HttpClient(base_url, timeout=options["timeout"])
+        client.set_bearer(token)
+        try:
+            for pk in ids:
+                await client.request("DELETE", f"/api/appointments/{pk}/")
+        except (HttpError, OSError) as exc:
+            self.stderr.write(self.style.WARNING(f"Cleanup stopped early: {exc}"))
+        finally:
+            await client.close()
+
+    # -----------------------------
+    # Reporting
+    # -----------------------------
+
+    def _print_report(self, report: dict) -> None:
+        header = (
+            f"{'endpoint':<30} {'requests':>9} {'req/s':>8} {'p50 ms':>9} "
+            f"{'p95 ms':>9} {'p99 ms':>9} {'errors':>7} {'err %':>6}"
+        )
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        rows = list(report["endpoints"].items()) + [("ALL", report["total"])]
+        for name, s in rows:
+            self.stdout.write(
+                f"{name:<30} {s['requests']:>9} {s['rps']:>8.1f} {s['p50_ms']:>9.2f} "
+                f"{s['p95_ms']:>9.2f} {s['p99_ms']:>9.2f} {s['errors']:>7} {s['error_rate'] * 100:>6.2f}"
+            )
+        self.stdout.write(
+            f"\n{report['duration_s']}s, actions: "
+            + ", ".join(f"{a}={n}" for a, n in sorted(report["actions"].items()))
+        )
+
+    def _compare(self, report: dict, path: str, tolerance: float) -> None:
+        try:
+            baseline = json.loads(Path(path).read_text())
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read baseline report {path}: {exc}")
+
+        if baseline.get("scenario", {}).get("name") != report["scenario"]["name"]:
+            self.stderr.write(self.style.WARNING("Baseline was recorded with a different scenario."))
+
+        regressions = []
+        base_total, total = baseline["total"], report["total"]
+        if base_total["rps"] and total["rps"] < base_total["rps"] * (1 - tolerance):
+            regressions.append(f"throughput {total['rps']:.1f} req/s vs {base_total['rps']:.1f}")
+
+        for name, s in report["endpoints"].items():
+            base = baseline["endpoints"].get(name)
+            if not base:
+                continue
+            if base["p95_ms"] and s["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+                regressions.append(f"{name} p95 {s['p95_ms']:.1f} ms vs {base['p95_ms']:.1f} ms")
+            if s["error_rate"] > base["error_rate"] + 0.01:
+                regressions.append(f"{name} error rate {s['error_rate']:.2%} vs {base['error_rate']:.2%}")
+
+        if regressions:
+            raise CommandError("Regressions against baseline:\n  " + "\n  ".join(regressions))
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {path} (tolerance {tolerance:.0%})."))
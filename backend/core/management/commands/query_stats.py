@@ -0,0 +1,130 @@
+# backend/core/management/commands/query_stats.py
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, ExpressionWrapper, F, FloatField
+
+from core.models import QueryStat, SlowQuery
+from core.query_stats import collector
+
+
+SORTS = {
+    "total": "-total_ms",
+    "calls": "-calls",
+    "max": "-max_ms",
+    "mean": "-mean",
+}
+
+
+class Command(BaseCommand):
+    help = "Show the heaviest SQL fingerprints, recent slow queries and their EXPLAIN plans"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sort", choices=sorted(SORTS), default="total")
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument("--alias", help="Only this database alias.")
+        parser.add_argument("--search", help="Only statements containing this text (case-insensitive).")
+        parser.add_argument("--slow", action="store_true", help="List recent slow queries instead of fingerprints.")
+        parser.add_argument("--plan", metavar="ID", type=int, help="Print one slow query with its plan.")
+        parser.add_argument("--flush", action="store_true", help="Flush this process's collector first.")
+        parser.add_argument("--reset", action="store_true", help="Delete all fingerprints and slow queries.")
+        parser.add_argument("--json", action="store_true")
+
+    def handle(self, *args, **options):
+        if options["reset"]:
+            stats, _ = QueryStat.objects.all().delete()
+            slow, _ = SlowQuery.objects.all().delete()
+            self.stdout.write(self.style.SUCCESS(f"Deleted {stats} fingerprints and {slow} slow queries."))
+            return
+        if options["flush"]:
+            collector.flush()
+        if options["plan"]:
+            return self._plan(options["plan"], options["json"])
+        if options["slow"]:
+            return self._slow(options)
+        return self._fingerprints(options)
+
+    def _filter(self, qs, options):
+        if options["alias"]:
+            qs = qs.filter(alias=options["alias"])
+        if options["search"]:
+            qs = qs.filter(statement__icontains=options["search"])
+        return qs
+
+    def _fingerprints(self, options):
+        qs = QueryStat.objects.annotate(
+            mean=ExpressionWrapper(F("total_ms") / F("calls"), output_field=FloatField())
+        ).filter(calls__gt=0)
+        stats = list(self._filter(qs, options).order_by(SORTS[options["sort"]])[: options["limit"]])
+        slow_counts = dict(
+            SlowQuery.objects.filter(fingerprint__in=[s.fingerprint for s in stats])
+            .values_list("fingerprint")
+            .annotate(n=Count("id"))
+        )
+        rows = [
+            {
+                "fingerprint": s.fingerprint,
+                "alias": s.alias,
+                "calls": s.calls,
+                "total_ms": round(s.total_ms, 2),
+                "mean_ms": round(s.mean, 3),
+                "max_ms": round(s.max_ms, 2),
+                "slow": slow_counts.get(s.fingerprint, 0),
+                "statement": s.statement,
+            }
+            for s in stats
+        ]
+        if options["json"]:
+            self.stdout.write(json.dumps(rows, indent=2))
+            return
+
+        header = f"{'fingerprint':<12} {'alias':<10} {'calls':>9} {'total ms':>11} {'mean ms':>9} {'max ms':>9} {'slow':>5}  statement"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for r in rows:
+            self.stdout.write(
+                f"{r['fingerprint'][:12]:<12} {r['alias']:<10} {r['calls']:>9} {r['total_ms']:>11.1f} "
+                f"{r['mean_ms']:>9.2f} {r['max_ms']:>9.1f} {r['slow']:>5}  {r['statement'][:100]}"
+            )
+
+    def _slow(self, options):
+        qs = self._filter(SlowQuery.objects.all(), options)[: options["limit"]]
+        rows = [
+            {
+                "id": q.pk,
+                "captured_at": q.captured_at.isoformat(),
+                "duration_ms": round(q.duration_ms, 2),
+                "alias": q.alias,
+                "request": q.request,
+                "caller": q.caller,
+                "has_plan": bool(q.plan),
+                "statement": q.statement,
+            }
+            for q in qs
+        ]
+        if options["json"]:
+            self.stdout.write(json.dumps(rows, indent=2))
+            return
+        for r in rows:
+            plan = "plan" if r["has_plan"] else "    "
+            self.stdout.write(
+                f"#{r['id']:<6} {r['captured_at'][:19]} {r['duration_ms']:>9.1f} ms {plan}  "
+                f"{r['request'] or '-'}  {r['caller'] or '-'}"
+            )
+            self.stdout.write(f"        {r['statement'][:140]}")
+
+    def _plan(self, pk: int, as_json: bool):
+        try:
+            q = SlowQuery.objects.get(pk=pk)
+        except SlowQuery.DoesNotExist:
+            raise CommandError(f"No slow query #{pk}.")
+        if as_json:
+            self.stdout.write(json.dumps({
+                "id": q.pk, "fingerprint": q.fingerprint, "duration_ms": q.duration_ms,
+                "request": q.request, "caller": q.caller, "statement": q.statement, "plan": q.plan,
+            }, indent=2))
+            return
+        self.stdout.write(f"#{q.pk}  {q.duration_ms:.1f} ms on {q.alias} at {q.captured_at}")
+        self.stdout.write(f"request: {q.request or '-'}\ncaller:  {q.caller or '-'}\n")
+        self.stdout.write(q.statement + "\n")
+        self.stdout.write(q.plan or "(no plan sampled)")
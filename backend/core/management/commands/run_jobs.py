@@ -0,0 +1,74 @@
+# backend/core/management/commands/run_jobs.py
+import os
+import signal
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import jobs, metrics
+from core.audit import buffer
+
+
+class Command(BaseCommand):
+    help = (
+        "Run background jobs (demo resets, exports, imports, ...) from the core_job queue "
+        "with a pool of worker threads; start as many of these processes as needed"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, help="Worker threads (default JOBS_WORKERS).")
+        parser.add_argument("--kinds", help="Comma-separated job kinds to run (default: all registered).")
+        parser.add_argument("--once", action="store_true", help="Run the jobs that are due, then exit.")
+        parser.add_argument("--poll", type=float, help="Idle poll interval in seconds (default JOBS_POLL_INTERVAL).")
+
+    def handle(self, *args, **options):
+        from django.conf import settings
+
+        kinds = None
+        if options["kinds"]:
+            kinds = [k.strip() for k in options["kinds"].split(",") if k.strip()]
+            unknown = set(kinds) - set(jobs.registered_kinds())
+            if unknown:
+                raise CommandError(
+                    f"Unknown job kinds: {', '.join(sorted(unknown))} "
+                    f"(registered: {', '.join(jobs.registered_kinds())})"
+                )
+
+        workers = options["workers"] or settings.JOBS_WORKERS
+        pool = jobs.WorkerPool(
+            workers=workers, kinds=kinds, poll_interval=options["poll"], exit_when_idle=options["once"],
+        )
+
+        stopping = threading.Event()
+
+        def shutdown(signum, frame):
+            if stopping.is_set():
+                raise KeyboardInterrupt
+            stopping.set()
+            self.stdout.write("Stopping: finishing running jobs (signal again to abort)...")
+            pool.stop()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        self.stdout.write(
+            f"run_jobs pid {os.getpid()}: {workers} worker(s) for "
+            f"{', '.join(kinds or jobs.registered_kinds())}"
+        )
+        metrics.mark_exited_processes_dead()
+        pool.start()
+        try:
+            if options["once"]:
+                pool.wait_workers()
+            else:
+                # Wake periodically so signals are handled promptly.
+                while not stopping.wait(1.0):
+                    pass
+            pool.join()
+        finally:
+            buffer.flush()
+            try:
+                metrics.registry.flush()
+                metrics.mark_process_dead(os.getpid())
+            except OSError:
+                pass
@@ -1,13 +1,21 @@
 from django.core.management.base import BaseCommand
-from core.demo_reset import reset_and_seed_demo_data
 
 
 class Command(BaseCommand):
     help = "Wipe and reseed deterministic demo data"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild-snapshot",
+            action="store_true",
+            help="Run the full seed and re-dump the demo snapshot (snapshot mode only).",
+        )
+
     def handle(self, *args, **options):
+        from core.demo_snapshot import reset_demo_data
+
         self.stdout.write("Seeding demo data...")
-        summary = reset_and_seed_demo_data()
+        summary = reset_demo_data(rebuild=options["rebuild_snapshot"])
         self.stdout.write(self.style.SUCCESS("Demo data seeded successfully"))
         for k, v in summary.items():
             self.stdout.write(f"{k}: {v}")
@@ -0,0 +1,124 @@
+# backend/core/management/commands/startup_profile.py
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+# Runs in a fresh interpreter so nothing is already imported/cached.
+# Prints one JSON line with per-phase timings (ms) and whether the DB was touched.
+PROBE = r"""
+import json, os, sys, time
+t0 = time.perf_counter()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+import django
+from django.conf import settings
+settings.INSTALLED_APPS
+t_settings = time.perf_counter()
+django.setup()
+t_setup = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+t_urls = time.perf_counter()
+from django.core.handlers.wsgi import WSGIHandler
+WSGIHandler()
+t_handler = time.perf_counter()
+from django.db import connections
+touched = [a for a in connections if connections[a].connection is not None]
+print(json.dumps({
+    "settings": (t_settings - t0) * 1000,
+    "apps_setup": (t_setup - t_settings) * 1000,
+    "urlconf": (t_urls - t_setup) * 1000,
+    "handler": (t_handler - t_urls) * 1000,
+    "total": (t_handler - t0) * 1000,
+    "db_connections_opened": touched,
+}))
+"""
+
+PHASES = ["settings", "apps_setup", "urlconf", "handler", "total"]
+
+
+class Command(BaseCommand):
+    help = "Report process startup timings (settings, app registry, URLconf, handler) and slowest imports"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=3, help="Fresh-interpreter runs (median is reported).")
+        parser.add_argument("--imports", type=int, default=15, help="How many of the slowest imports to list.")
+        parser.add_argument("--json", action="store_true", help="Emit a JSON report instead of text.")
+
+    def _probe(self, importtime: bool = False):
+        cmd = [sys.executable]
+        if importtime:
+            cmd += ["-X", "importtime"]
+        cmd += ["-c", PROBE]
+        proc = subprocess.run(
+            cmd,
+            cwd=str(settings.BASE_DIR),
+            env=dict(os.environ),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        return result, proc.stderr
+
+    @staticmethod
+    def _slowest_imports(stderr: str, limit: int):
+        """
+        Parse `-X importtime` output:
+          import time: self [us] | cumulative | imported package
+        """
+        rows = []
+        for line in stderr.splitlines():
+            if not line.startswith("import time:") or "imported package" in line:
+                continue
+            try:
+                _, rest = line.split(":", 1)
+                self_us, cumulative_us, name = rest.split("|", 2)
+                depth = len(name) - len(name.lstrip())
+                rows.append((int(cumulative_us) / 1000, int(self_us) / 1000, name.strip(), depth))
+            except ValueError:
+                continue
+
+        # Only top-level entries (a single space of indentation) give a useful overview.
+        top = [r[:3] for r in rows if r[3] <= 1]
+        top.sort(reverse=True)
+        return [
+            {"module": name, "cumulative_ms": round(cum, 2), "self_ms": round(own, 2)}
+            for cum, own, name in top[:limit]
+        ]
+
+    def handle(self, *args, **options):
+        runs = [self._probe()[0] for _ in range(max(1, options["runs"]))]
+        _, importtime_stderr = self._probe(importtime=True)
+
+        report = {
+            "runs": len(runs),
+            "median_ms": {p: round(statistics.median(r[p] for r in runs), 2) for p in PHASES},
+            "db_connections_opened": sorted({a for r in runs for a in r["db_connections_opened"]}),
+            "slowest_imports": self._slowest_imports(importtime_stderr, options["imports"]),
+        }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f"Startup profile (median of {report['runs']} fresh interpreters)")
+        for phase in PHASES:
+            self.stdout.write(f"  {phase:<12} {report['median_ms'][phase]:>9.2f} ms")
+
+        if report["db_connections_opened"]:
+            self.stdout.write(self.style.WARNING(
+                f"  DB touched during startup: {', '.join(report['db_connections_opened'])}"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS("  No database connections opened during startup"))
+
+        self.stdout.write("")
+        self.stdout.write("Slowest top-level imports (cumulative):")
+        for row in report["slowest_imports"]:
+            self.stdout.write(f"  {row['cumulative_ms']:>9.2f} ms  {row['module']}")
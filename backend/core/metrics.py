@@ -0,0 +1,315 @@
+# backend/core/metrics.py
+"""
+In-process metrics registry, exposed at /metrics in the Prometheus text format.
+
+Multi-process safe without an external service: every process keeps its own
+counters/histograms/gauges in memory and writes a snapshot to
+METRICS_DIR/<hostname>/metrics-<pid>.json at most every METRICS_FLUSH_INTERVAL
+seconds (and right before serving a scrape). /metrics merges all snapshots of
+all hosts: counters and histograms are summed, gauges are summed over live
+processes only. With METRICS_DIR on a volume shared by every container
+(docker-compose.prod.yml), the backend's /metrics is the one scrape target and
+includes run_jobs and send_reminders; the per-host directory keeps PIDs of
+different containers apart.
+
+gunicorn.conf.py clears its host's directory on start and marks exited workers
+dead: their counters and histograms are folded into <hostname>/dead.json and
+their gauges dropped, so a directory holds one file per live process plus one.
+run_jobs and send_reminders do the same for themselves on exit, and on start
+for processes of their host that were killed before they could.
+
+Recorded:
+- http_requests_total / http_request_duration_seconds   {view, action, method, status}
+- db_queries_total / db_query_duration_seconds_total     {alias}
+- db_pool_connections                                     {alias, state}
+- cache_requests_total {cache, result} and the derived cache_hit_ratio {cache}
+- job_duration_seconds                                    {kind, status}
+- reminders_total                                         {status}
+"""
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import socket
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+JOB_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)
+
+HELP = {
+    "http_requests_total": ("counter", "Requests handled, by DRF view and action."),
+    "http_request_duration_seconds": ("histogram", "Request latency, by DRF view and action."),
+    "db_queries_total": ("counter", "SQL queries executed, by database alias."),
+    "db_query_duration_seconds_total": ("counter", "Time spent in SQL queries, by database alias."),
+    "db_pool_connections": ("gauge", "Connection pool usage summed over live workers."),
+    "cache_requests_total": ("counter", "Cache lookups by result."),
+    "cache_hit_ratio": ("gauge", "Hits / lookups since start."),
+    "job_duration_seconds": ("histogram", "Background job run time, by kind and outcome."),
+    "reminders_total": ("counter", "Appointment reminders processed, by outcome."),
+}
+
+
+def _key(name: str, labels: dict) -> str:
+    # JSON-serializable key: name plus sorted labels.
+    return json.dumps([name, sorted(labels.items())])
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: dict = defaultdict(float)
+        self.histograms: dict = {}
+        self.gauges: dict = {}
+        self._last_flush = 0.0
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        with self._lock:
+            self.counters[_key(name, labels)] += value
+
+    def observe(self, name: str, value: float, buckets=LATENCY_BUCKETS, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = {"buckets": list(buckets), "counts": [0] * len(buckets), "sum": 0.0, "count": 0}
+            idx = bisect.bisect_left(hist["buckets"], value)
+            if idx < len(hist["counts"]):
+                hist["counts"][idx] += 1
+            hist["sum"] += value
+            hist["count"] += 1
+
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            self.gauges[_key(name, labels)] = value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "counters": dict(self.counters),
+                "histograms": {k: dict(v, counts=list(v["counts"])) for k, v in self.histograms.items()},
+                "gauges": dict(self.gauges),
+            }
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+
+    def flush(self) -> None:
+        _collect_pool_gauges(self)
+        directory = process_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"metrics-{os.getpid()}.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.snapshot()))
+        os.replace(tmp, path)
+        self._last_flush = time.monotonic()
+
+    def maybe_flush(self) -> None:
+        if time.monotonic() - self._last_flush >= settings.METRICS_FLUSH_INTERVAL:
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+
+registry = Registry()
+
+
+def metrics_dir() -> Path:
+    return Path(settings.METRICS_DIR)
+
+
+def process_dir() -> Path:
+    """This host's (container's) snapshots."""
+    return metrics_dir() / socket.gethostname()
+
+
+DEAD_SNAPSHOT = "dead.json"
+
+
+def mark_process_dead(pid: int) -> None:
+    """
+    gunicorn child_exit hook (runs in the master, one worker at a time): fold
+    the worker's counters and histograms into dead.json and drop its gauges.
+    Per-worker dead-<pid>.json files left by older releases are folded in too.
+    """
+    directory = process_dir()
+    path = directory / f"metrics-{pid}.json"
+    if not path.exists():
+        return
+    exited = [path, *directory.glob("dead-*.json")]
+    target = directory / DEAD_SNAPSHOT
+    snapshots = [snap for snap in map(_read_snapshot, [target, *exited]) if snap is not None]
+    counters, histograms, _ = _merge([dict(snap, live=False) for snap in snapshots])
+
+    tmp = target.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"pid": None, "counters": counters, "histograms": histograms, "gauges": {}}))
+    os.replace(tmp, target)
+    for exited_path in exited:
+        exited_path.unlink(missing_ok=True)
+
+
+def mark_exited_processes_dead() -> None:
+    """Fold the snapshots of this host's processes that exited without doing it themselves."""
+    for path in process_dir().glob("metrics-*.json"):
+        pid = int(path.stem.partition("-")[2])
+        if pid == os.getpid():
+            continue
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            mark_process_dead(pid)
+        except OSError:
+            pass
+
+
+def clear_metrics_dir() -> None:
+    """gunicorn on_starting hook: drop this host's snapshots (other containers keep theirs)."""
+    directory = process_dir()
+    if directory.exists():
+        for path in directory.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+
+# -----------------------------
+# Recording helpers
+# -----------------------------
+
+def observe_request(view: str, action: str, method: str, status: int, seconds: float) -> None:
+    labels = {"view": view, "action": action, "method": method, "status": f"{status // 100}xx"}
+    registry.inc("http_requests_total", **labels)
+    registry.observe("http_request_duration_seconds", seconds, **labels)
+
+
+def observe_query(alias: str, seconds: float) -> None:
+    registry.inc("db_queries_total", alias=alias)
+    registry.inc("db_query_duration_seconds_total", seconds, alias=alias)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    registry.inc("cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+
+def observe_job(kind: str, seconds: float, status: str = "ok") -> None:
+    registry.observe("job_duration_seconds", seconds, buckets=JOB_BUCKETS, kind=kind, status=status)
+
+
+def _collect_pool_gauges(reg: Registry) -> None:
+    """Pool counters for pools this process has already opened (never opens one)."""
+    from django.db import connections
+
+    for alias in connections:
+        conn = connections[alias]
+        pools = getattr(type(conn), "_connection_pools", {})
+        if alias not in pools:
+            continue
+        stats = pools[alias].get_stats()
+        reg.set_gauge("db_pool_connections", stats.get("pool_size", 0), alias=alias, state="open")
+        reg.set_gauge("db_pool_connections", stats.get("pool_available", 0), alias=alias, state="idle")
+        reg.set_gauge("db_pool_connections", stats.get("pool_max", 0), alias=alias, state="max")
+        reg.set_gauge("db_pool_connections", stats.get("requests_waiting", 0), alias=alias, state="waiting")
+
+
+# -----------------------------
+# Exposition
+# -----------------------------
+
+def _read_snapshot(path: Path):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _load_snapshots() -> list:
+    snapshots = []
+    for path in sorted(metrics_dir().glob("*/*.json")):
+        data = _read_snapshot(path)
+        if data is None:
+            continue
+        data["live"] = path.name.startswith("metrics-")
+        snapshots.append(data)
+    return snapshots
+
+
+def _merge(snapshots: list) -> tuple:
+    counters: dict = defaultdict(float)
+    histograms: dict = {}
+    gauges: dict = defaultdict(float)
+    for snap in snapshots:
+        for key, value in snap["counters"].items():
+            counters[key] += value
+        for key, hist in snap["histograms"].items():
+            merged = histograms.get(key)
+            if merged is None:
+                histograms[key] = dict(hist, counts=list(hist["counts"]))
+                continue
+            merged["counts"] = [a + b for a, b in zip(merged["counts"], hist["counts"])]
+            merged["sum"] += hist["sum"]
+            merged["count"] += hist["count"]
+        if snap["live"]:
+            for key, value in snap["gauges"].items():
+                gauges[key] += value
+    return counters, histograms, gauges
+
+
+def _labels(pairs, extra=()) -> str:
+    items = list(pairs) + list(extra)
+    if not items:
+        return ""
+    escaped = (
+        k + '="' + str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for k, v in items
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def render() -> str:
+    """Text exposition format (version 0.0.4) of all workers' metrics."""
+    registry.flush()
+    counters, histograms, gauges = _merge(_load_snapshots())
+
+    hits: dict = defaultdict(float)
+    totals: dict = defaultdict(float)
+    for key, value in counters.items():
+        name, labels = json.loads(key)
+        if name == "cache_requests_total":
+            cache = dict(labels)["cache"]
+            totals[cache] += value
+            if dict(labels)["result"] == "hit":
+                hits[cache] += value
+    for cache, total in totals.items():
+        gauges[_key("cache_hit_ratio", {"cache": cache})] = hits[cache] / total if total else 0.0
+
+    series: dict = defaultdict(list)
+    for key, value in counters.items():
+        name, labels = json.loads(key)
+        series[name].append(f"{name}{_labels(labels)} {value:g}")
+    for key, value in gauges.items():
+        name, labels = json.loads(key)
+        series[name].append(f"{name}{_labels(labels)} {value:g}")
+    for key, hist in histograms.items():
+        name, labels = json.loads(key)
+        cumulative = 0
+        for bound, count in zip(hist["buckets"], hist["counts"]):
+            cumulative += count
+            series[name].append(f"{name}_bucket{_labels(labels, [('le', f'{bound:g}')])} {cumulative}")
+        series[name].append(f"{name}_bucket{_labels(labels, [('le', '+Inf')])} {hist['count']}")
+        series[name].append(f"{name}_sum{_labels(labels)} {hist['sum']:g}")
+        series[name].append(f"{name}_count{_labels(labels)} {hist['count']}")
+
+    lines = []
+    for name in sorted(series):
+        kind, help_text = HELP.get(name, ("untyped", name))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(sorted(series[name]))
+    return "\n".join(lines) + "\n"
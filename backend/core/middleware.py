@@ -0,0 +1,236 @@
+# backend/core/middleware.py
+import json
+import logging
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+
+from . import metrics, perf, query_stats, tenancy
+
+
+logger = logging.getLogger("core.perf")
+
+
+class PerformanceMiddleware:
+    """
+    Per-request timing for a sample of requests (PERF_SAMPLE_RATE):
+    total time, DB time and query count (per alias), duplicate queries,
+    serializer time and response size.
+
+    Sampled requests get a Server-Timing header (visible in the browser's
+    network panel) and one JSON log line on the "core.perf" logger; N+1
+    suspects are included in the log line and logged at WARNING.
+    Unsampled requests only pay for one random() call.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _sampled(self) -> bool:
+        rate = settings.PERF_SAMPLE_RATE
+        return rate > 0 and (rate >= 1 or random.random() < rate)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+
+        profile = perf.start_profile()
+        try:
+            response = self.get_response(request)
+        finally:
+            perf.end_profile()
+        return self._finish(request, response, profile)
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+
+        profile = perf.start_profile()
+        try:
+            response = await self.get_response(request)
+        finally:
+            perf.end_profile()
+        return self._finish(request, response, profile)
+
+    # -----------------------------
+    # Reporting
+    # -----------------------------
+
+    def _finish(self, request, response, profile):
+        total_ms = (time.perf_counter() - profile.started) * 1000
+        size = None if getattr(response, "streaming", False) else len(response.content)
+        n_plus_one = profile.n_plus_one()
+
+        response["Server-Timing"] = ", ".join([
+            f"total;dur={total_ms:.1f}",
+            f'db;dur={profile.db_ms:.1f};desc="{profile.query_count} queries"',
+            f"ser;dur={profile.serializer_ms:.1f}",
+        ])
+
+        match = getattr(request, "resolver_match", None)
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "total_ms": round(total_ms, 2),
+            "db_ms": round(profile.db_ms, 2),
+            "queries": profile.query_count,
+            "queries_by_alias": dict(profile.queries_by_alias),
+            "duplicate_queries": profile.duplicate_count,
+            "serializer_ms": round(profile.serializer_ms, 2),
+            "response_bytes": size,
+            "n_plus_one": n_plus_one,
+        }
+        logger.info(json.dumps(record, default=str))
+
+        for suspect in n_plus_one:
+            logger.warning(
+                "N+1 suspect on %s %s: %d queries on %s from %s",
+                request.method, request.path, suspect["count"], suspect["table"], suspect["caller"],
+            )
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Feeds request latency into the /metrics registry (core/metrics.py),
+    labelled by the DRF view class and action, and periodically flushes
+    this worker's snapshot for the other workers' /metrics to read.
+
+    Also tags slow queries with the request they ran for and, after the
+    response, flushes query fingerprints to the database (core/query_stats.py).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        token = query_stats.set_request(f"{request.method} {request.path}")
+        try:
+            response = self.get_response(request)
+        finally:
+            query_stats.reset_request(token)
+        self._observe(request, response, time.perf_counter() - started)
+        query_stats.collector.maybe_flush()
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        token = query_stats.set_request(f"{request.method} {request.path}")
+        try:
+            response = await self.get_response(request)
+        finally:
+            query_stats.reset_request(token)
+        self._observe(request, response, time.perf_counter() - started)
+        if settings.QUERY_STATS_ENABLED and query_stats.collector.flush_due():
+            await sync_to_async(query_stats.collector.flush)()
+        return response
+
+    @staticmethod
+    def _labels(request) -> tuple:
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            # Unrouted requests share one label set (no per-path cardinality).
+            return "unmatched", request.method.lower()
+        func = match.func
+        view_class = getattr(func, "cls", None) or getattr(func, "view_class", None)
+        view = view_class.__name__ if view_class else getattr(func, "__name__", "unknown")
+        actions = getattr(func, "actions", None) or {}
+        return view, actions.get(request.method.lower(), request.method.lower())
+
+    def _observe(self, request, response, seconds: float) -> None:
+        view, action = self._labels(request)
+        metrics.observe_request(view, action, request.method, response.status_code, seconds)
+        metrics.registry.maybe_flush()
+
+
+class TenantMiddleware:
+    """
+    Resolves the practice a request is for and makes it current for
+    everything the request runs (core/tenancy.py): the TENANT_HEADER header
+    (X-Practice: <slug>), else <slug>.<TENANT_BASE_DOMAIN>, else
+    DEFAULT_PRACTICE_SLUG. Unknown or inactive practices get a 404.
+
+    Slug lookups are cached per worker, so this normally runs no SQL.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def practice_slug(request) -> str:
+        slug = request.headers.get(settings.TENANT_HEADER, "").strip().lower()
+        if slug:
+            return slug
+        base = settings.TENANT_BASE_DOMAIN
+        if base:
+            host = request.get_host().partition(":")[0].lower()
+            if host.endswith("." + base):
+                sub = host[: -len(base) - 1]
+                if sub and "." not in sub and sub not in settings.TENANT_RESERVED_SUBDOMAINS:
+                    return sub
+        return settings.DEFAULT_PRACTICE_SLUG
+
+    @staticmethod
+    def _resolve(slug: str):
+        if slug == settings.DEFAULT_PRACTICE_SLUG:
+            return tenancy.default_practice_id()
+        return tenancy.resolve_practice(slug)
+
+    @staticmethod
+    def _unknown(slug: str):
+        return JsonResponse({"detail": f"Unknown practice '{slug}'."}, status=404)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        slug = self.practice_slug(request)
+        practice_id = self._resolve(slug)
+        if practice_id is None:
+            return self._unknown(slug)
+
+        request.practice_id = practice_id
+        previous = tenancy.set_current_practice(practice_id)
+        try:
+            return self.get_response(request)
+        finally:
+            tenancy.set_current_practice(previous)
+
+    async def __acall__(self, request):
+        slug = self.practice_slug(request)
+        hit, practice_id = tenancy.cached_practice_id(slug)
+        if not hit:
+            practice_id = await sync_to_async(self._resolve)(slug)
+        if practice_id is None:
+            return self._unknown(slug)
+
+        request.practice_id = practice_id
+        previous = tenancy.set_current_practice(practice_id)
+        try:
+            return await self.get_response(request)
+        finally:
+            tenancy.set_current_practice(previous)
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(db_index=True, max_length=40)),
+                ('alias', models.CharField(max_length=64)),
+                ('statement', models.TextField()),
+                ('duration_ms', models.FloatField()),
+                ('plan', models.TextField(blank=True)),
+                ('caller', models.CharField(blank=True, max_length=255)),
+                ('request', models.CharField(blank=True, max_length=255)),
+                ('captured_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'verbose_name_plural': 'slow queries',
+                'ordering': ['-captured_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='QueryStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=40)),
+                ('alias', models.CharField(max_length=64)),
+                ('statement', models.TextField(help_text='Normalized SQL (literals and IN lists collapsed).')),
+                ('calls', models.BigIntegerField(default=0)),
+                ('total_ms', models.FloatField(default=0)),
+                ('max_ms', models.FloatField(default=0)),
+                ('first_seen', models.DateTimeField(auto_now_add=True)),
+                ('last_seen', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ['-total_ms'],
+                'constraints': [models.UniqueConstraint(fields=('fingerprint', 'alias'), name='querystat_fingerprint_alias_uniq')],
+            },
+        ),
+    ]
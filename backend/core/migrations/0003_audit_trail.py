@@ -0,0 +1,150 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:24
+#
+# Extends AuditLog into the mutation trail and, on PostgreSQL, turns
+# core_auditlog into a table range-partitioned by month on created_at:
+# a default partition plus the current and next two months (later months
+# come from `manage.py audit_partitions`). The primary key becomes
+# (id, created_at), as PostgreSQL requires the partition key in it.
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+TABLE = "core_auditlog"
+
+
+def backfill_actor_username(apps, schema_editor):
+    AuditLog = apps.get_model("core", "AuditLog")
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    names = dict(User.objects.values_list("id", "username"))
+    for log in AuditLog.objects.filter(actor__isnull=False, actor_username=""):
+        log.actor_username = names.get(log.actor_id, "")
+        log.save(update_fields=["actor_username"])
+
+
+def _months(count):
+    today = django.utils.timezone.now().date().replace(day=1)
+    for i in range(count):
+        year, month = divmod(today.month - 1 + i, 12)
+        start = today.replace(year=today.year + year, month=month + 1)
+        year, month = divmod(start.month, 12)
+        yield start, start.replace(year=start.year + year, month=month + 1)
+
+
+def partition(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s AND indexname <> %s",
+            [TABLE, f"{TABLE}_pkey"],
+        )
+        index_defs = cursor.fetchall()
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_old")
+        cursor.execute(f"ALTER TABLE {TABLE}_old RENAME CONSTRAINT {TABLE}_pkey TO {TABLE}_old_pkey")
+        for name, _ in index_defs:
+            cursor.execute(f'DROP INDEX "{name}"')
+
+        cursor.execute(
+            f"CREATE TABLE {TABLE} (LIKE {TABLE}_old INCLUDING DEFAULTS INCLUDING IDENTITY) "
+            f"PARTITION BY RANGE (created_at)"
+        )
+        cursor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id, created_at)")
+        cursor.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+        for start, end in _months(3):
+            cursor.execute(
+                f"CREATE TABLE {TABLE}_p{start:%Y%m} PARTITION OF {TABLE} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+
+        cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {TABLE}_old")
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {TABLE}), 0) + 1, false)"
+        )
+        cursor.execute(f"DROP TABLE {TABLE}_old")
+        for _, definition in index_defs:
+            cursor.execute(definition)
+
+
+def unpartition(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s AND indexname <> %s",
+            [TABLE, f"{TABLE}_pkey"],
+        )
+        index_defs = cursor.fetchall()
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_partitioned")
+        cursor.execute(f"ALTER TABLE {TABLE}_partitioned RENAME CONSTRAINT {TABLE}_pkey TO {TABLE}_partitioned_pkey")
+        for name, _ in index_defs:
+            cursor.execute(f'DROP INDEX "{name}"')
+        cursor.execute(f"CREATE TABLE {TABLE} (LIKE {TABLE}_partitioned INCLUDING DEFAULTS INCLUDING IDENTITY)")
+        cursor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id)")
+        cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {TABLE}_partitioned")
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {TABLE}), 0) + 1, false)"
+        )
+        cursor.execute(f"DROP TABLE {TABLE}_partitioned")
+        for _, definition in index_defs:
+            cursor.execute(definition)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_query_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditlog',
+            name='actor_username',
+            field=models.CharField(blank=True, max_length=150),
+        ),
+        migrations.AddField(
+            model_name='auditlog',
+            name='changes',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='auditlog',
+            name='object_id',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='auditlog',
+            name='object_type',
+            field=models.CharField(blank=True, help_text='app_label.model, e.g. appointments.appointment', max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='actor',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['created_at'], name='auditlog_created_brin'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['object_type', 'object_id', 'created_at'], name='auditlog_object_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['actor', 'created_at'], name='auditlog_actor_idx'),
+        ),
+        migrations.RunPython(backfill_actor_username, migrations.RunPython.noop),
+        migrations.RunPython(partition, unpartition),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:05
+
+import core.tenancy
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_default_practice(apps, schema_editor):
+    Practice = apps.get_model("core", "Practice")
+    slug = settings.DEFAULT_PRACTICE_SLUG
+    Practice.objects.get_or_create(slug=slug, defaults={"name": slug.replace("-", " ").title()})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Practice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('slug', models.SlugField(max_length=63, unique=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        # Every existing row (and every later row without a practice) belongs here.
+        migrations.RunPython(create_default_practice, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='job',
+            name='practice',
+            field=models.ForeignKey(blank=True, default=core.tenancy.practice_for_new_rows, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.practice'),
+        ),
+    ]
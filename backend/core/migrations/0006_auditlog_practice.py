@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:01
+#
+# core_auditlog is partitioned (0003): ADD COLUMN and CREATE INDEX on the
+# parent apply to every partition. Existing rows go to the default practice,
+# like every other table's rows in 0005.
+
+import core.tenancy
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_practice'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditlog',
+            name='practice',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, default=core.tenancy.practice_for_new_rows, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.practice'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['practice', 'created_at'], name='auditlog_practice_idx'),
+        ),
+    ]
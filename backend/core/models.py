@@ -1,20 +1,206 @@
-from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import BrinIndex
+from django.db import models
+from django.utils import timezone
+
+from .tenancy import practice_for_new_rows
+
+
+class Practice(models.Model):
+    """
+    A tenant: one medical practice served by this deployment (core/tenancy.py).
+
+    Patients, providers, appointments, locations and the settings singletons
+    belong to exactly one practice. Users belong to the practice of their
+    provider profile; users without one (service/staff accounts) to the
+    default practice.
+    """
+    name = models.CharField(max_length=255)
+    # Tenant key in the X-Practice header and the host's subdomain.
+    slug = models.SlugField(max_length=63, unique=True)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self) -> str:
+        return self.name
 
 
 class AuditLog(models.Model):
     """
-    Lightweight audit trail for high-value actions (ex: demo resets).
-    Not a full compliance log — just a professional activity record.
+    Audit trail: who changed which appointment or patient field and when,
+    plus high-value actions (ex: demo resets).
+
+    Rows are written in batches by core/audit.py. On PostgreSQL the table is
+    range-partitioned by month on created_at (migration 0003,
+    `manage.py audit_partitions`), so its primary key is (id, created_at);
+    id alone stays unique. Rows belong to the practice the change was made in
+    (core/tenancy.py); the audit API only lists the current practice's.
     """
+    ACTION_CREATE = "create"
+    ACTION_UPDATE = "update"
+    ACTION_DELETE = "delete"
+
     action = models.CharField(max_length=64)
-    actor = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # No FK constraint on the (partitioned) log table, and deleting a user
+    # leaves the trail untouched (no UPDATE across every partition): actor_id
+    # may point at a deleted user, actor_username keeps who it was.
+    actor = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False,
+    )
+    actor_username = models.CharField(max_length=150, blank=True)
+    # Event time (set when the change commits, not when the batch is written).
+    created_at = models.DateTimeField(default=timezone.now)
+    object_type = models.CharField(max_length=100, blank=True, help_text="app_label.model, e.g. appointments.appointment")
+    object_id = models.CharField(max_length=64, blank=True)
+    # {field: [old, new]}; creates/deletes list the row's non-null values as [null, v] / [v, null].
+    changes = models.JSONField(blank=True, null=True)
     metadata = models.JSONField(blank=True, null=True)
+    # Stamped when the event is built (the writer thread has no practice);
+    # no FK constraint on the log table, like actor.
+    practice = models.ForeignKey(
+        Practice, null=True, blank=True, on_delete=models.DO_NOTHING, related_name="+",
+        db_constraint=False, db_index=False, default=practice_for_new_rows,
+    )
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            BrinIndex(fields=["created_at"], name="auditlog_created_brin"),
+            models.Index(fields=["practice", "created_at"], name="auditlog_practice_idx"),
+            models.Index(fields=["object_type", "object_id", "created_at"], name="auditlog_object_idx"),
+            models.Index(fields=["actor", "created_at"], name="auditlog_actor_idx"),
+        ]
+
+    def __str__(self) -> str:
+        actor_str = self.actor_username or "unknown"
+        target = f" {self.object_type}#{self.object_id}" if self.object_type else ""
+        return f"{self.action}{target} by {actor_str} @ {self.created_at}"
+
+
+class QueryStat(models.Model):
+    """
+    Calls and time per SQL fingerprint and database alias, summed over all
+    workers (written by core/query_stats.py).
+    """
+    fingerprint = models.CharField(max_length=40)
+    alias = models.CharField(max_length=64)
+    statement = models.TextField(help_text="Normalized SQL (literals and IN lists collapsed).")
+    calls = models.BigIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-total_ms"]
+        constraints = [
+            models.UniqueConstraint(fields=["fingerprint", "alias"], name="querystat_fingerprint_alias_uniq"),
+        ]
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+
+    def __str__(self) -> str:
+        return f"{self.statement[:80]} ({self.calls} calls)"
+
+
+class SlowQuery(models.Model):
+    """
+    One execution slower than QUERY_SLOW_MS, with the code line and request
+    that issued it and, when sampled, its EXPLAIN (ANALYZE, BUFFERS) output.
+    """
+    fingerprint = models.CharField(max_length=40, db_index=True)
+    alias = models.CharField(max_length=64)
+    statement = models.TextField()
+    duration_ms = models.FloatField()
+    plan = models.TextField(blank=True)
+    caller = models.CharField(max_length=255, blank=True)
+    request = models.CharField(max_length=255, blank=True)
+    captured_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ["-captured_at"]
+        verbose_name_plural = "slow queries"
+
+    def __str__(self) -> str:
+        return f"{self.duration_ms:.0f} ms @ {self.captured_at}: {self.statement[:60]}"
+
+
+class Job(models.Model):
+    """
+    One unit of background work (demo reset, export, import, ...), run by
+    `python manage.py run_jobs` (core/jobs.py).
+
+    Workers claim due rows with SELECT ... FOR UPDATE SKIP LOCKED, so any
+    number of them can poll the same table without handing a job out twice.
+    """
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+    STATUS_CANCELLED = "cancelled"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_SUCCEEDED, "Succeeded"),
+        (STATUS_FAILED, "Failed"),
+        (STATUS_CANCELLED, "Cancelled"),
+    ]
+    FINISHED = (STATUS_SUCCEEDED, STATUS_FAILED, STATUS_CANCELLED)
+
+    kind = models.CharField(max_length=64)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    payload = models.JSONField(default=dict, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    # 0-100, plus a short human-readable step ("Restoring appointments").
+    progress = models.PositiveSmallIntegerField(default=0)
+    progress_message = models.CharField(max_length=255, blank=True)
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=1)
+    # Not claimed before this time (retry backoff, scheduled jobs).
+    run_after = models.DateTimeField(default=timezone.now)
+
+    # "host:pid:thread" of the worker running it, and its last sign of life;
+    # running jobs whose heartbeat goes stale are requeued (or failed).
+    worker = models.CharField(max_length=128, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    created_by = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+    # The handler runs scoped to this practice (core/tenancy.py).
+    practice = models.ForeignKey(
+        Practice, null=True, blank=True, on_delete=models.CASCADE, related_name="+",
+        default=practice_for_new_rows,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # The claim query: due queued jobs, oldest first.
+            models.Index(
+                fields=["run_after", "id"], name="job_queued_idx",
+                condition=models.Q(status="queued"),
+            ),
+            # Per-kind concurrency checks and stale-heartbeat sweeps.
+            models.Index(
+                fields=["kind", "heartbeat_at"], name="job_running_idx",
+                condition=models.Q(status="running"),
+            ),
+            models.Index(fields=["created_by", "created_at"], name="job_created_by_idx"),
+        ]
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in self.FINISHED
 
     def __str__(self) -> str:
-        actor_str = self.actor.username if self.actor else "unknown"
-        return f"{self.action} by {actor_str} @ {self.created_at}"
+        return f"{self.kind} #{self.pk} ({self.status})"
@@ -0,0 +1,194 @@
+# backend/core/perf.py
+"""
+Per-request performance profile (collected by core.middleware.PerformanceMiddleware).
+
+A RequestProfile lives in a context variable for the duration of a sampled request:
+- record_query is installed as an execute_wrapper on every DB connection. It counts
+  every query per alias for /metrics (core/metrics.py) and attributes the details
+  (time, SQL template, params) to the current profile, if the request is sampled.
+- It also feeds query fingerprints and slow-query plans (core/query_stats.py).
+- TimedSerializerMixin adds the time spent producing serializer .data.
+
+From the raw queries the profile derives duplicates (same SQL and params run more
+than once) and N+1 suspects (same SQL template run PERF_N_PLUS_ONE_THRESHOLD+ times
+with differing params), reporting the project code line that issued them.
+"""
+from __future__ import annotations
+
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+from rest_framework import serializers
+
+from . import metrics, query_stats
+
+
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("perf_profile", default=None)
+
+_TABLE_RE = re.compile(r'\bFROM\s+"?([\w.]+)"?', re.IGNORECASE)
+_PERF_FILE = __file__
+_PROJECT_DIR = str(Path(settings.BASE_DIR))
+
+
+def _caller() -> Optional[str]:
+    """First frame in project code (outside this module): 'path.py:line in func'."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_PROJECT_DIR) and filename != _PERF_FILE and "site-packages" not in filename:
+            rel = filename[len(_PROJECT_DIR):].lstrip("/\\")
+            return f"{rel}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_ms = 0.0
+        self.serializer_ms = 0.0
+        self.queries_by_alias: Counter = Counter()
+        self.templates: Counter = Counter()
+        self.statements: Counter = Counter()
+        # SQL template -> caller, captured once when the template hits the threshold.
+        self.n_plus_one_callers: dict = {}
+        self._threshold = settings.PERF_N_PLUS_ONE_THRESHOLD
+
+    @property
+    def query_count(self) -> int:
+        return sum(self.queries_by_alias.values())
+
+    @property
+    def duplicate_count(self) -> int:
+        return sum(n - 1 for n in self.statements.values() if n > 1)
+
+    def add_query(self, alias: str, sql: str, params, elapsed_ms: float) -> None:
+        self.db_ms += elapsed_ms
+        self.queries_by_alias[alias] += 1
+        self.templates[sql] += 1
+        try:
+            self.statements[(sql, repr(params))] += 1
+        except Exception:
+            pass
+        if self.templates[sql] == self._threshold:
+            self.n_plus_one_callers[sql] = _caller()
+
+    def n_plus_one(self) -> list:
+        """
+        Templates run at least the threshold number of times with more than one
+        set of params (a loop over rows, not just one statement repeated).
+        """
+        suspects = []
+        for sql, caller in self.n_plus_one_callers.items():
+            count = self.templates[sql]
+            distinct = sum(1 for (s, _) in self.statements if s == sql)
+            if distinct < 2:
+                continue  # the same statement repeated: reported as duplicates
+            match = _TABLE_RE.search(sql)
+            suspects.append({
+                "table": match.group(1) if match else None,
+                "count": count,
+                "caller": caller,
+                "sql": sql[:200],
+            })
+        suspects.sort(key=lambda s: -s["count"])
+        return suspects
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current.get()
+
+
+def start_profile() -> RequestProfile:
+    profile = RequestProfile()
+    _current.set(profile)
+    return profile
+
+
+def end_profile() -> None:
+    _current.set(None)
+
+
+def record_query(execute, sql, params, many, context):
+    if query_stats.is_suspended():
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        result = execute(sql, params, many, context)
+    except Exception:
+        _observe(context["connection"], sql, params, time.perf_counter() - started)
+        raise
+    elapsed = time.perf_counter() - started
+    _observe(context["connection"], sql, params, elapsed)
+    # After the statement succeeded: a slow SELECT may be EXPLAINed here.
+    query_stats.record(context["connection"], sql, params, many, elapsed * 1000)
+    return result
+
+
+def _observe(connection, sql, params, elapsed: float) -> None:
+    # Every query feeds /metrics; sampled requests also get the detailed profile.
+    metrics.observe_query(connection.alias, elapsed)
+    profile = _current.get()
+    if profile is not None:
+        profile.add_query(connection.alias, sql, params, elapsed * 1000)
+
+
+def install_query_hook(sender=None, connection=None, **kwargs) -> None:
+    """
+    connection_created receiver: wrap every new DB connection with record_query.
+    Connection objects are per thread (the async ORM uses worker threads), so
+    hooking them at creation covers sync and async requests alike.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def timed_serializer():
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.serializer_ms += (time.perf_counter() - started) * 1000
+
+
+# -----------------------------
+# Serializer timing
+# -----------------------------
+
+class TimedListSerializer(serializers.ListSerializer):
+    @property
+    def data(self):
+        with timed_serializer():
+            return super().data
+
+
+class TimedSerializerMixin:
+    """
+    Attribute the time spent building .data (including many=True lists)
+    to the current request profile. Nested serializers are covered by the
+    outermost one.
+    """
+
+    @property
+    def data(self):
+        with timed_serializer():
+            return super().data
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        serializer = super().many_init(*args, **kwargs)
+        if type(serializer) is serializers.ListSerializer:
+            serializer.__class__ = TimedListSerializer
+        return serializer
@@ -0,0 +1,252 @@
+# backend/core/query_stats.py
+"""
+Query fingerprints and slow-query plans (browsable in the admin and via
+`python manage.py query_stats`).
+
+perf.record_query hands every executed statement to the process-wide
+collector, which:
+
+- normalizes the SQL into a fingerprint (literals, IN lists, VALUES rows and
+  savepoint names collapsed) and aggregates calls / total / max time per
+  (fingerprint, alias);
+- for statements slower than QUERY_SLOW_MS keeps a SlowQuery record with the
+  project code line that issued it and, for a sample of plain SELECTs on
+  PostgreSQL, the output of EXPLAIN (ANALYZE, BUFFERS).
+
+The EXPLAIN runs right after the slow query on the same connection, inside a
+transaction / savepoint that is always rolled back and under a
+statement_timeout of QUERY_EXPLAIN_TIMEOUT_MS, and at most once per fingerprint
+every QUERY_EXPLAIN_COOLDOWN seconds per worker. Plans show the filter values of
+the sampled statement, so both models are staff-only.
+
+Nothing is written from inside the query hook: MetricsMiddleware flushes the
+collector to the database every QUERY_STATS_FLUSH_INTERVAL seconds after a
+response, adding to the rows other workers wrote.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+from django.conf import settings
+
+
+logger = logging.getLogger("core.perf")
+
+# Set while the collector itself talks to the DB (EXPLAIN, flush), so those
+# statements are not recorded again.
+_suspended: ContextVar[bool] = ContextVar("query_stats_suspended", default=False)
+# "METHOD /path" of the request being served, for SlowQuery.request.
+_request: ContextVar[str] = ContextVar("query_stats_request", default="")
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w\"$.])-?\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN \((?:\s*(?:%s|\?)\s*,)*\s*(?:%s|\?)\s*\)", re.IGNORECASE)
+_VALUES_RE = re.compile(r"\bVALUES (\([^()]*\))(?:\s*,\s*\([^()]*\))+", re.IGNORECASE)
+_SAVEPOINT_RE = re.compile(r"\b(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT) \"?\w+\"?", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+_LOCKING_RE = re.compile(r"\bFOR (?:UPDATE|SHARE|NO KEY UPDATE|KEY SHARE)\b", re.IGNORECASE)
+
+MAX_SLOW_BUFFER = 200
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(sql: str) -> tuple:
+    """(hex digest, normalized statement) for a SQL string."""
+    normalized = _SPACE_RE.sub(" ", sql).strip()
+    normalized = _STRING_RE.sub("?", normalized)
+    normalized = _NUMBER_RE.sub("?", normalized)
+    normalized = _IN_LIST_RE.sub("IN (...)", normalized)
+    normalized = _VALUES_RE.sub(r"VALUES \1, ...", normalized)
+    normalized = _SAVEPOINT_RE.sub(r"\1 ?", normalized)
+    digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+    return digest, normalized
+
+
+def set_request(label: str):
+    return _request.set(label)
+
+
+def reset_request(token) -> None:
+    _request.reset(token)
+
+
+def is_suspended() -> bool:
+    return _suspended.get()
+
+
+@contextmanager
+def suspended():
+    token = _suspended.set(True)
+    try:
+        yield
+    finally:
+        _suspended.reset(token)
+
+
+def _explainable(connection, sql: str, many: bool) -> bool:
+    if many or connection.vendor != "postgresql" or connection.needs_rollback:
+        return False
+    head = sql.lstrip().lstrip("(").upper()
+    return head.startswith("SELECT") and not _LOCKING_RE.search(sql)
+
+
+def explain(connection, sql: str, params) -> str:
+    """
+    EXPLAIN (ANALYZE, BUFFERS) of a SELECT, always rolled back and bounded by
+    QUERY_EXPLAIN_TIMEOUT_MS. Raises DatabaseError on failure (the enclosing
+    transaction is left as it was).
+    """
+    from django.db import transaction
+
+    timeout_ms = int(settings.QUERY_EXPLAIN_TIMEOUT_MS)
+    with suspended(), transaction.atomic(using=connection.alias):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SET LOCAL statement_timeout = {timeout_ms}")
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", params)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        # Undo SET LOCAL and anything the statement may have touched.
+        transaction.set_rollback(True, using=connection.alias)
+    return plan
+
+
+class Collector:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (fingerprint, alias) -> [statement, calls, total_ms, max_ms]
+        self._stats: dict = {}
+        self._slow: deque = deque(maxlen=MAX_SLOW_BUFFER)
+        self._explained: dict = {}
+        # Start the clock at import: the first flush waits a full interval.
+        self._last_flush = time.monotonic()
+
+    def record(self, connection, sql: str, params, many: bool, elapsed_ms: float, caller=None) -> None:
+        digest, normalized = fingerprint(sql)
+        key = (digest, connection.alias)
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                entry = self._stats[key] = [normalized, 0, 0.0, 0.0]
+            entry[1] += 1
+            entry[2] += elapsed_ms
+            entry[3] = max(entry[3], elapsed_ms)
+
+        if elapsed_ms >= settings.QUERY_SLOW_MS:
+            self._record_slow(connection, sql, params, many, elapsed_ms, digest, normalized, caller)
+
+    def _should_explain(self, digest: str) -> bool:
+        rate = settings.QUERY_EXPLAIN_SAMPLE_RATE
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            return False
+        now = time.monotonic()
+        with self._lock:
+            last = self._explained.get(digest)
+            if last is not None and now - last < settings.QUERY_EXPLAIN_COOLDOWN:
+                return False
+            self._explained[digest] = now
+        return True
+
+    def _record_slow(self, connection, sql, params, many, elapsed_ms, digest, normalized, caller) -> None:
+        from django.db import DatabaseError
+        from django.utils import timezone
+
+        plan = ""
+        if _explainable(connection, sql, many) and self._should_explain(digest):
+            try:
+                plan = explain(connection, sql, params)
+            except DatabaseError as exc:
+                plan = f"EXPLAIN failed: {exc}"
+        with self._lock:
+            self._slow.append({
+                "fingerprint": digest,
+                "alias": connection.alias,
+                "statement": normalized,
+                "duration_ms": elapsed_ms,
+                "plan": plan,
+                "caller": (caller or "")[:255],
+                "request": _request.get()[:255],
+                "captured_at": timezone.now(),
+            })
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+
+    def flush_due(self) -> bool:
+        return time.monotonic() - self._last_flush >= settings.QUERY_STATS_FLUSH_INTERVAL
+
+    def drain(self) -> tuple:
+        with self._lock:
+            stats, self._stats = self._stats, {}
+            slow = list(self._slow)
+            self._slow.clear()
+            self._last_flush = time.monotonic()
+        return stats, slow
+
+    def flush(self) -> None:
+        """Add this worker's aggregates to QueryStat and store buffered SlowQuery rows."""
+        from django.db import DatabaseError, IntegrityError, transaction
+        from django.db.models import F
+        from django.db.models.functions import Greatest
+        from django.utils import timezone
+
+        from .models import QueryStat, SlowQuery
+
+        stats, slow = self.drain()
+        if not stats and not slow:
+            return
+        now = timezone.now()
+        try:
+            with suspended(), transaction.atomic():
+                for (digest, alias), (statement, calls, total_ms, max_ms) in stats.items():
+                    updated = QueryStat.objects.filter(fingerprint=digest, alias=alias).update(
+                        calls=F("calls") + calls,
+                        total_ms=F("total_ms") + total_ms,
+                        max_ms=Greatest("max_ms", max_ms),
+                        last_seen=now,
+                    )
+                    if updated:
+                        continue
+                    try:
+                        with transaction.atomic():
+                            QueryStat.objects.create(
+                                fingerprint=digest, alias=alias, statement=statement,
+                                calls=calls, total_ms=total_ms, max_ms=max_ms, last_seen=now,
+                            )
+                    except IntegrityError:
+                        # Another worker created it first.
+                        QueryStat.objects.filter(fingerprint=digest, alias=alias).update(
+                            calls=F("calls") + calls,
+                            total_ms=F("total_ms") + total_ms,
+                            max_ms=Greatest("max_ms", max_ms),
+                            last_seen=now,
+                        )
+                SlowQuery.objects.bulk_create([SlowQuery(**row) for row in slow])
+        except DatabaseError:
+            logger.exception("Could not flush query stats (%d fingerprints dropped)", len(stats))
+
+    def maybe_flush(self) -> None:
+        if settings.QUERY_STATS_ENABLED and self.flush_due():
+            self.flush()
+
+
+collector = Collector()
+
+
+def record(connection, sql: str, params, many: bool, elapsed_ms: float) -> None:
+    if not settings.QUERY_STATS_ENABLED:
+        return
+    caller = None
+    if elapsed_ms >= settings.QUERY_SLOW_MS:
+        from .perf import _caller
+
+        caller = _caller()
+    collector.record(connection, sql, params, many, elapsed_ms, caller)
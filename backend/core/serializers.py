@@ -0,0 +1,45 @@
+# backend/core/serializers.py
+from rest_framework import serializers
+
+from .models import AuditLog, Job
+from .perf import TimedSerializerMixin
+
+
+class AuditLogSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = AuditLog
+        fields = [
+            "id",
+            "created_at",
+            "action",
+            "actor",
+            "actor_username",
+            "object_type",
+            "object_id",
+            "changes",
+            "metadata",
+        ]
+        read_only_fields = fields
+
+
+class JobSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "kind",
+            "status",
+            "progress",
+            "progress_message",
+            "payload",
+            "result",
+            "error",
+            "attempts",
+            "max_attempts",
+            "created_by",
+            "created_at",
+            "run_after",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
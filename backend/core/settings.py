@@ -1,11 +1,8 @@
+import copy
 import os
+import sys
 from pathlib import Path
-from decouple import config
 from datetime import timedelta
-from urllib.parse import urlparse
-
-
-
 
 # -------------------------------------------------
 # Base Directories
@@ -17,6 +14,8 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # -------------------------------------------------
 SECRET_KEY = os.getenv("DJANGO_SECRET_KEY", "django-insecure-zca1vw+o6rg^ib)zbin!c@v203(p)=x75d_apy465t-097lio7")
 DEBUG = os.getenv("DJANGO_DEBUG", "True") == "True"
+# `manage.py test`: defaults below that would make tests wait on background threads.
+TESTING = sys.argv[1:2] == ["test"]
 if DEBUG:
     ALLOWED_HOSTS = [
         "localhost",
@@ -27,13 +26,12 @@ else:
         "clayparnell.com",
         "www.clayparnell.com",
         "api.clayparnell.com",
+        ".clayparnell.com",  # <practice>.clayparnell.com (TENANT_BASE_DOMAIN)
     ]
 
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 USE_X_FORWARDED_HOST = True
 
-
-print(f"🌍 DJANGO_ENV: {os.getenv('DJANGO_ENV', 'dev')} — Loaded settings for {'Debug' if DEBUG else 'Production'} mode")
 # -------------------------------------------------
 # Installed Apps
 # -------------------------------------------------
@@ -61,16 +59,22 @@ INSTALLED_APPS = [
     "authapp",
     "schedule",
     "locations",
+    "reminders",
+    "reporting",
+    "waitlist",
 ]
 
 # -------------------------------------------------
 # Middleware (CORS must appear BEFORE CommonMiddleware)
 # -------------------------------------------------
 MIDDLEWARE = [
+    "core.middleware.PerformanceMiddleware",  # first, so it times the whole stack
+    "core.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",  # must come before CommonMiddleware
     "django.middleware.common.CommonMiddleware",
+    "core.middleware.TenantMiddleware",  # sets the practice every query is scoped to
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
@@ -92,6 +96,7 @@ CORS_ALLOW_HEADERS = [
     "Cache-Control",
     "X-Requested-With",
     "X-CSRFToken",
+    "X-Practice",
 ]
 
 CORS_ALLOW_METHODS = ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
@@ -138,10 +143,21 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "core.wsgi.application"
+ASGI_APPLICATION = "core.asgi.application"
+
+# "wsgi" (sync gunicorn workers) or "asgi" (gunicorn + uvicorn workers); see gunicorn.conf.py
+SERVER_MODE = os.getenv("DJANGO_SERVER_MODE", "wsgi")
+# Serve hot list endpoints from async views. Defaults on under ASGI only:
+# under WSGI each async view would spin up its own event loop.
+ASYNC_READ_VIEWS = os.getenv("DJANGO_ASYNC_READ_VIEWS", str(SERVER_MODE == "asgi")) == "True"
 
 # -------------------------------------------------
 # Database (Dockerized PostgreSQL / RDS)
 # -------------------------------------------------
+# psycopg 3 with Django's native connection pool: each worker process keeps
+# warm connections instead of paying TCP + TLS setup on every request.
+DB_POOL = os.getenv("DB_POOL", "True") == "True"
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -150,6 +166,7 @@ DATABASES = {
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
         "HOST": os.getenv("POSTGRES_HOST", "db"),
         "PORT": os.getenv("POSTGRES_PORT", 5432),
+        "OPTIONS": {},
     }
 }
 
@@ -157,9 +174,136 @@ DATABASES = {
 # RDS requires SSL in production
 # -------------------------------------------------
 if not DEBUG:
-    DATABASES["default"]["OPTIONS"] = {
-        "sslmode": "require",
+    DATABASES["default"]["OPTIONS"]["sslmode"] = "require"
+
+if DB_POOL:
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+        # Recycle connections periodically (seconds) and drop idle extras.
+        "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", 1800)),
+        "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", 300)),
+        # Seconds a request waits for a free connection before erroring.
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+    }
+else:
+    # No pool: keep persistent per-thread connections instead.
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", 60))
+
+# With the pool this is psycopg_pool's checkout check (one round trip that
+# discards dead connections); without it, Django's per-request check.
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = os.getenv("DB_HEALTH_CHECKS", "True") == "True"
+
+# -------------------------------------------------
+# Read replicas
+# -------------------------------------------------
+# Comma-separated "host[:port][/dbname]" entries; each becomes alias replica_1, replica_2, ...
+# sharing the primary's credentials and pool settings. For local testing point one
+# at the primary itself (e.g. POSTGRES_REPLICA_HOSTS=db) or at a second database.
+for _idx, _entry in enumerate(
+    [e.strip() for e in os.getenv("POSTGRES_REPLICA_HOSTS", "").split(",") if e.strip()],
+    start=1,
+):
+    _hostport, _, _name = _entry.partition("/")
+    _host, _, _port = _hostport.partition(":")
+    _replica = copy.deepcopy(DATABASES["default"])
+    _replica["HOST"] = _host
+    _replica["PORT"] = _port or DATABASES["default"]["PORT"]
+    _replica["NAME"] = _name or DATABASES["default"]["NAME"]
+    _replica["TEST"] = {"MIRROR": "default"}
+    DATABASES[f"replica_{_idx}"] = _replica
+
+DATABASE_ROUTERS = ["core.db_routing.PrimaryReplicaRouter"]
+
+# Seconds a user's reads stay on the primary after they write (read-your-writes).
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", 10))
+
+# -------------------------------------------------
+# Cache
+# -------------------------------------------------
+# "locmem": per-process (tests, runserver).
+# "redis":  CACHE_LOCATION=redis://host:6379/1; the production default. Window-
+#           cache and room-board invalidations and replica pins must reach every
+#           process, including the run_jobs worker (imports, bulk moves, demo
+#           resets), which runs in its own container (docker-compose.prod.yml).
+# "file":   one host only, and only if every process mounts the same directory.
+#           Django's file backend lists the whole directory on every set() to
+#           cull, so keep CACHE_MAX_ENTRIES small with it.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem" if DEBUG else "redis")
+_CACHE_BACKENDS = {
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "healthcare"),
+    "file": ("django.core.cache.backends.filebased.FileBasedCache", str(BASE_DIR / "var" / "cache")),
+    "redis": ("django.core.cache.backends.redis.RedisCache", "redis://127.0.0.1:6379/1"),
+}
+CACHES = {
+    "default": {
+        "BACKEND": _CACHE_BACKENDS[CACHE_BACKEND][0],
+        "LOCATION": os.getenv("CACHE_LOCATION", _CACHE_BACKENDS[CACHE_BACKEND][1]),
+        "TIMEOUT": int(os.getenv("CACHE_TIMEOUT", 300)),
+        "KEY_PREFIX": os.getenv("CACHE_KEY_PREFIX", "hc"),
     }
+}
+if CACHE_BACKEND in ("locmem", "file"):
+    # Schedule windows and calendar feeds keep a version tag per provider per
+    # day; locmem's default of 300 entries would cull them constantly.
+    _default_max_entries = 20000 if CACHE_BACKEND == "locmem" else 2000
+    CACHES["default"]["OPTIONS"] = {"MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", _default_max_entries))}
+
+# Schedule-window response cache (appointments/cache.py).
+WINDOW_CACHE_ENABLED = os.getenv("WINDOW_CACHE_ENABLED", "True") == "True"
+WINDOW_CACHE_TIMEOUT = int(os.getenv("WINDOW_CACHE_TIMEOUT", 300))
+# Longer date ranges are not cached (one tag per provider per day).
+WINDOW_CACHE_MAX_DAYS = int(os.getenv("WINDOW_CACHE_MAX_DAYS", 42))
+
+# Room-board snapshots (appointments/rooms.py); invalidated by version token,
+# the timeout only bounds how long unused snapshots linger.
+ROOM_BOARD_CACHE_TIMEOUT = int(os.getenv("ROOM_BOARD_CACHE_TIMEOUT", 300))
+
+# Bulk moves (appointments/bulk.py): largest selection and date range per request.
+BULK_MOVE_MAX_IDS = int(os.getenv("BULK_MOVE_MAX_IDS", 500))
+BULK_MOVE_MAX_DAYS = int(os.getenv("BULK_MOVE_MAX_DAYS", 31))
+
+# Appointment imports (appointments/imports.py): records per batch / checkpoint.
+APPOINTMENT_IMPORT_BATCH_SIZE = int(os.getenv("APPOINTMENT_IMPORT_BATCH_SIZE", 5000))
+# Uploaded files and error reports. They hold PHI: keep them out of MEDIA_ROOT
+# (served without authentication in development); reports are downloaded
+# through the import's report action. The API saves uploads and the run_jobs
+# worker reads them, so both must see this directory (docker-compose.prod.yml
+# mounts the imports volume into both).
+IMPORT_ROOT = Path(os.getenv("IMPORT_ROOT", BASE_DIR / "var" / "imports"))
+
+# iCalendar subscription feeds (appointments/feeds.py).
+CALENDAR_FEED_PAST_DAYS = int(os.getenv("CALENDAR_FEED_PAST_DAYS", 30))
+CALENDAR_FEED_FUTURE_DAYS = int(os.getenv("CALENDAR_FEED_FUTURE_DAYS", 180))
+# Entries are invalidated by tag token; the timeout only bounds how long unused ones linger.
+CALENDAR_FEED_CACHE_TIMEOUT = int(os.getenv("CALENDAR_FEED_CACHE_TIMEOUT", 6 * 3600))
+# Polling interval suggested to calendar apps.
+CALENDAR_FEED_REFRESH_MINUTES = int(os.getenv("CALENDAR_FEED_REFRESH_MINUTES", 15))
+CALENDAR_FEED_UID_DOMAIN = os.getenv("CALENDAR_FEED_UID_DOMAIN", "schedule.invalid")
+# Patient initials in event summaries (off: appointment type only).
+CALENDAR_FEED_SHOW_INITIALS = os.getenv("CALENDAR_FEED_SHOW_INITIALS", "False") == "True"
+
+# FHIR bulk export (core/fhir.py). Files hold PHI: keep them out of MEDIA_ROOT,
+# which is served without authentication in development. The run_jobs worker
+# writes them and the API serves them, so both must see this directory
+# (docker-compose.prod.yml mounts the fhir-exports volume into both).
+FHIR_EXPORT_ROOT = Path(os.getenv("FHIR_EXPORT_ROOT", BASE_DIR / "var" / "fhir-exports"))
+# Rows fetched per server-side cursor round trip.
+FHIR_EXPORT_CHUNK_SIZE = int(os.getenv("FHIR_EXPORT_CHUNK_SIZE", 2000))
+# Base of identifier systems (patient PRNs, location slugs).
+FHIR_IDENTIFIER_SYSTEM = os.getenv("FHIR_IDENTIFIER_SYSTEM", "https://schedule.invalid/fhir")
+
+# -------------------------------------------------
+# Tenancy (core/tenancy.py)
+# -------------------------------------------------
+# Practice for requests that name none, scripts, and rows that predate tenancy.
+DEFAULT_PRACTICE_SLUG = os.getenv("DEFAULT_PRACTICE_SLUG", "default")
+# Requests name their practice with this header or as <slug>.<TENANT_BASE_DOMAIN>.
+TENANT_HEADER = os.getenv("TENANT_HEADER", "X-Practice")
+TENANT_BASE_DOMAIN = os.getenv("TENANT_BASE_DOMAIN", "" if DEBUG else "clayparnell.com")
+TENANT_RESERVED_SUBDOMAINS = {"www", "api"}
+# Seconds a worker caches practice slug -> id lookups.
+TENANT_CACHE_SECONDS = float(os.getenv("TENANT_CACHE_SECONDS", 300))
 
 # -------------------------------------------------
 # Authentication
@@ -179,6 +323,7 @@ AUTH_PASSWORD_VALIDATORS = [
 # Internationalization
 # -------------------------------------------------
 LANGUAGE_CODE = "en-us"
+# Default zone for new locations; appointments use their location's (Location.timezone).
 TIME_ZONE = "America/Chicago"
 USE_I18N = True
 USE_TZ = True
@@ -192,13 +337,158 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# -------------------------------------------------
+# Performance instrumentation and metrics (core/middleware.py)
+# -------------------------------------------------
+# Fraction of requests profiled (Server-Timing header + "core.perf" log line).
+PERF_SAMPLE_RATE = float(os.getenv("PERF_SAMPLE_RATE", "1.0" if DEBUG else "0.05"))
+# Same SQL template this many times in one request (with differing params) = N+1 suspect.
+PERF_N_PLUS_ONE_THRESHOLD = int(os.getenv("PERF_N_PLUS_ONE_THRESHOLD", 3))
+
+# /metrics (core/metrics.py) merges the per-process snapshots in METRICS_DIR/<hostname>/.
+# Put it on a volume shared by every container (docker-compose.prod.yml) so the
+# backend's /metrics also reports run_jobs and send_reminders; scrape only that.
+METRICS_DIR = os.getenv("METRICS_DIR", str(BASE_DIR / "var" / "metrics"))
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 5))
+# Scrapers without a staff login send "Authorization: Bearer <METRICS_TOKEN>".
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Query fingerprints and slow-query plans (core/query_stats.py, `manage.py query_stats`).
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS_ENABLED", "True") == "True"
+QUERY_STATS_FLUSH_INTERVAL = float(os.getenv("QUERY_STATS_FLUSH_INTERVAL", 30))
+# Statements at least this slow are kept as SlowQuery rows.
+QUERY_SLOW_MS = float(os.getenv("QUERY_SLOW_MS", 200))
+# Fraction of slow SELECTs that get EXPLAIN (ANALYZE, BUFFERS), at most once per
+# fingerprint per cooldown per worker, each bounded by a statement_timeout.
+QUERY_EXPLAIN_SAMPLE_RATE = float(os.getenv("QUERY_EXPLAIN_SAMPLE_RATE", "1.0" if DEBUG else "0.1"))
+QUERY_EXPLAIN_COOLDOWN = float(os.getenv("QUERY_EXPLAIN_COOLDOWN", 600))
+QUERY_EXPLAIN_TIMEOUT_MS = int(os.getenv("QUERY_EXPLAIN_TIMEOUT_MS", 5000))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "plain": {"format": "%(asctime)s %(levelname)s %(name)s %(message)s"},
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "plain"},
+    },
+    "loggers": {
+        "core.perf": {
+            "handlers": ["console"],
+            "level": os.getenv("PERF_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+        "core.jobs": {
+            "handlers": ["console"],
+            "level": os.getenv("JOBS_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+        "reminders": {
+            "handlers": ["console"],
+            "level": os.getenv("REMINDER_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+        "reporting": {
+            "handlers": ["console"],
+            "level": os.getenv("REPORTING_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+        "waitlist": {
+            "handlers": ["console"],
+            "level": os.getenv("WAITLIST_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
+
+# -------------------------------------------------
+# Audit trail (core/audit.py)
+# -------------------------------------------------
+# Events are buffered per worker and written in batches by a background thread.
+# Under `manage.py test` they are written on commit, so tests can assert on them.
+AUDIT_ASYNC = os.getenv("AUDIT_ASYNC", "False" if TESTING else "True") == "True"
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", 1.0))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", 500))
+# Past this many queued events (e.g. DB down), requests flush inline.
+AUDIT_MAX_BUFFER = int(os.getenv("AUDIT_MAX_BUFFER", 10000))
+
+# -------------------------------------------------
+# Background jobs (core/jobs.py, `manage.py run_jobs`)
+# -------------------------------------------------
+# Run jobs inline when the enqueuing transaction commits instead of leaving
+# them for a worker (tests, scripts, dev setups without `run_jobs`).
+JOBS_EAGER = os.getenv("JOBS_EAGER", "False") == "True"
+JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", 2))
+# Seconds an idle worker waits before polling the queue again.
+JOBS_POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", 1.0))
+# Running jobs are heartbeated this often; after JOBS_STALE_AFTER seconds
+# without one (worker killed) they are requeued, or failed if out of attempts.
+JOBS_HEARTBEAT_INTERVAL = float(os.getenv("JOBS_HEARTBEAT_INTERVAL", 15))
+JOBS_STALE_AFTER = float(os.getenv("JOBS_STALE_AFTER", 120))
+
+# -------------------------------------------------
+# Appointment reminders (reminders/dispatch.py, `manage.py send_reminders`)
+# -------------------------------------------------
+# Minutes before the appointment start at which a reminder goes out.
+REMINDER_OFFSETS = [int(m) for m in os.getenv("REMINDER_OFFSETS", "1440,120").split(",") if m.strip()]
+# Seconds between dispatch ticks when send_reminders runs as a loop.
+REMINDER_SCAN_INTERVAL = float(os.getenv("REMINDER_SCAN_INTERVAL", 60))
+# Reminder rows are created this many seconds before they are due.
+REMINDER_LOOKAHEAD = float(os.getenv("REMINDER_LOOKAHEAD", 300))
+REMINDER_BATCH_SIZE = int(os.getenv("REMINDER_BATCH_SIZE", 500))
+# A claimed batch not finished after this many seconds is released again.
+REMINDER_CLAIM_TIMEOUT = float(os.getenv("REMINDER_CLAIM_TIMEOUT", 300))
+REMINDER_MAX_ATTEMPTS = int(os.getenv("REMINDER_MAX_ATTEMPTS", 3))
+REMINDER_RETRY_DELAY = float(os.getenv("REMINDER_RETRY_DELAY", 300))
+# Dotted path to a reminders.transports.BaseTransport subclass.
+REMINDER_TRANSPORT = os.getenv("REMINDER_TRANSPORT", "reminders.transports.ConsoleTransport")
+REMINDER_OUTBOX_PATH = os.getenv("REMINDER_OUTBOX_PATH", str(BASE_DIR / "var" / "reminders.jsonl"))
+# "sms" (patient phone) or "email".
+REMINDER_CHANNEL = os.getenv("REMINDER_CHANNEL", "sms")
+REMINDER_SUBJECT = os.getenv("REMINDER_SUBJECT", "Appointment reminder")
+REMINDER_MESSAGE_TEMPLATE = os.getenv(
+    "REMINDER_MESSAGE_TEMPLATE",
+    "Hi {first_name}, this is a reminder of your {appointment_type} with {provider} "
+    "on {date} at {time} ({location}).",
+)
+
+# -------------------------------------------------
+# Reporting rollups (reporting/rollups.py)
+# -------------------------------------------------
+# Provider-days touched by appointment writes are refreshed in the background
+# every REPORTING_REFRESH_INTERVAL seconds; False refreshes them inline.
+REPORTING_ASYNC = os.getenv("REPORTING_ASYNC", "True") == "True"
+REPORTING_REFRESH_INTERVAL = float(os.getenv("REPORTING_REFRESH_INTERVAL", 2.0))
+
+# -------------------------------------------------
+# Waitlist backfill (waitlist/matcher.py)
+# -------------------------------------------------
+# Offer cancelled / no-show slots to waitlist entries as they are freed.
+WAITLIST_ENABLED = os.getenv("WAITLIST_ENABLED", "True") == "True"
+# Seconds a patient has to accept an offered slot.
+WAITLIST_OFFER_TTL = float(os.getenv("WAITLIST_OFFER_TTL", 2 * 60 * 60))
+# Slots starting sooner than this many minutes from now are not offered.
+WAITLIST_MIN_LEAD = int(os.getenv("WAITLIST_MIN_LEAD", 60))
+# Best candidates checked per slot (patients already busy then are skipped).
+WAITLIST_CANDIDATES = int(os.getenv("WAITLIST_CANDIDATES", 5))
+
+# -------------------------------------------------
+# Demo reset
+# -------------------------------------------------
+# "snapshot": seed once, then reset via TRUNCATE + COPY from the saved snapshot.
+# "full":     run the deterministic seed on every reset.
+DEMO_RESET_MODE = os.getenv("DEMO_RESET_MODE", "snapshot")
+DEMO_SNAPSHOT_DIR = os.getenv("DEMO_SNAPSHOT_DIR", str(BASE_DIR / "var" / "demo_snapshot"))
+
 # -------------------------------------------------
 # REST Framework / JWT
 # -------------------------------------------------
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-        "rest_framework.authentication.SessionAuthentication",
+        # JWT / session auth that also rejects users of another practice.
+        "core.authentication.PracticeJWTAuthentication",
+        "core.authentication.PracticeSessionAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",  # only /auth/login is AllowAny
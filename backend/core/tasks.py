@@ -0,0 +1,54 @@
+# backend/core/tasks.py
+"""Background job handlers for core (see core/jobs.py)."""
+from . import audit, fhir
+from .jobs import job
+
+
+@job("demo_reset", concurrency=1, max_attempts=2, retry_delay=5)
+def demo_reset(ctx) -> dict:
+    # Lazy import: the seed module pulls in every app's models and seed data.
+    from .demo_snapshot import reset_demo_data
+
+    # The reset deletes and restores demo users; keep who asked for it.
+    requested_by = ctx.job.created_by
+    ctx.progress(5, "Resetting demo data")
+    summary = reset_demo_data()
+
+    try:
+        audit.record(
+            requested_by,
+            "demo_reset",
+            metadata={
+                "job_id": ctx.job.pk,
+                "window_start": summary.get("window_start"),
+                "window_end": summary.get("window_end"),
+                "providers": summary.get("providers"),
+                "patients": summary.get("patients"),
+                "appointments": summary.get("appointments"),
+                "blocks": summary.get("blocks"),
+                "reset_mode": summary.get("reset_mode"),
+            },
+        )
+    except Exception:
+        # Audit logging should never break demo reset.
+        pass
+    return summary
+
+
+@job(fhir.JOB_KIND, concurrency=1, max_attempts=2, retry_delay=60)
+def fhir_export(ctx) -> dict:
+    payload = ctx.payload
+    manifest = fhir.run(
+        ctx.job.pk, payload["types"], since=payload.get("since"),
+        request_url=payload.get("request", ""), progress=ctx.progress,
+    )
+    audit.record(
+        ctx.job.created_by,
+        "fhir_export",
+        metadata={
+            "job_id": ctx.job.pk,
+            "since": payload.get("since"),
+            "counts": {o["type"]: o["count"] for o in manifest["output"]},
+        },
+    )
+    return manifest
@@ -0,0 +1,157 @@
+# backend/core/tenancy.py
+"""
+Multi-practice tenancy on one shared schema.
+
+Every tenant-owned table (Patient, Provider, Appointment, Location,
+ScheduleSettings, BusinessSettings) has a `practice` column, and its default
+manager (PracticeScopedManager) filters on the practice that is current for
+this context:
+
+- requests: TenantMiddleware resolves the practice from the X-Practice header,
+  the host's subdomain or DEFAULT_PRACTICE_SLUG; the authentication classes in
+  core/authentication.py then reject users of another practice;
+- background jobs run under the practice that enqueued them (core/jobs.py);
+- anything else (management commands, reminder and rollup threads) has no
+  current practice and sees every practice.
+
+New rows get the current practice (or the default one) from the field default,
+so bulk_create is covered too. Unscoped access goes through `all_objects`;
+relations (appointment.patient etc.) use the plain base manager.
+DRF views add PracticeScopedViewMixin, because a class-level `queryset` is
+built once at import time.
+
+Slug -> id lookups are cached per process for TENANT_CACHE_SECONDS, so
+resolving the practice costs no query on a warm worker.
+"""
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from django.conf import settings
+from django.db import models
+
+
+# Practice id the current request / job runs for (None = unscoped).
+_current: ContextVar[Optional[int]] = ContextVar("practice_id", default=None)
+
+# slug -> (practice id or None, expires at); None = unknown or inactive.
+_by_slug: dict = {}
+
+
+def current_practice_id() -> Optional[int]:
+    return _current.get()
+
+
+def set_current_practice(practice_id: Optional[int]) -> Optional[int]:
+    """
+    Set the practice for the current context and return the previous one.
+    Plain set() rather than tokens, like core/db_routing.py: the value may be
+    set in a worker thread (sync_to_async) and restored from the event loop.
+    """
+    previous = _current.get()
+    _current.set(practice_id)
+    return previous
+
+
+@contextmanager
+def use_practice(practice_id: Optional[int]):
+    previous = set_current_practice(practice_id)
+    try:
+        yield
+    finally:
+        set_current_practice(previous)
+
+
+# -----------------------------
+# Resolution
+# -----------------------------
+
+def cached_practice_id(slug: str):
+    """(hit, practice id) from the process cache; does no I/O."""
+    entry = _by_slug.get(slug)
+    if entry is None or entry[1] < time.monotonic():
+        return False, None
+    return True, entry[0]
+
+
+def resolve_practice(slug: str) -> Optional[int]:
+    """Id of the active practice with this slug, or None."""
+    hit, practice_id = cached_practice_id(slug)
+    if hit:
+        return practice_id
+
+    from .models import Practice
+
+    practice_id = (
+        Practice.objects.filter(slug=slug, is_active=True).values_list("pk", flat=True).first()
+    )
+    _by_slug[slug] = (practice_id, time.monotonic() + settings.TENANT_CACHE_SECONDS)
+    return practice_id
+
+
+def clear_cache() -> None:
+    _by_slug.clear()
+
+
+def default_practice_id() -> int:
+    """The practice single-practice deployments, scripts and legacy rows belong to."""
+    slug = settings.DEFAULT_PRACTICE_SLUG
+    practice_id = resolve_practice(slug)
+    if practice_id is None:
+        from .models import Practice
+
+        # Normally created by core migration 0005; only pk is read so this
+        # also works from older migration states.
+        practice_id = Practice.objects.filter(slug=slug).values_list("pk", flat=True).first()
+        if practice_id is None:
+            practice_id = Practice.objects.create(slug=slug, name=slug.replace("-", " ").title()).pk
+        _by_slug[slug] = (practice_id, time.monotonic() + settings.TENANT_CACHE_SECONDS)
+    return practice_id
+
+
+def practice_for_new_rows() -> int:
+    """Default for every `practice` column."""
+    return _current.get() or default_practice_id()
+
+
+# -----------------------------
+# Querysets
+# -----------------------------
+
+class PracticeScopedManager(models.Manager):
+    """Default manager of tenant-owned models: only the current practice's rows."""
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        practice_id = _current.get()
+        return qs if practice_id is None else qs.filter(practice_id=practice_id)
+
+
+def scoped(queryset, via: str):
+    """
+    Limit a queryset of a model that belongs to a practice through a relation
+    (Room via "location__practice", WaitlistEntry via "patient__practice", ...).
+    """
+    practice_id = _current.get()
+    return queryset if practice_id is None else queryset.filter(**{f"{via}_id": practice_id})
+
+
+class PracticeScopedViewMixin:
+    """
+    DRF view mixin. A class-level `queryset` is built at import time, outside
+    any practice, so get_queryset() scopes it again for each request.
+    """
+
+    practice_field = "practice"
+
+    def get_queryset(self):
+        return scoped(super().get_queryset(), self.practice_field)
+
+
+def cache_namespace() -> str:
+    """Prefix for cache keys holding practice data ("t-" when unscoped)."""
+    practice_id = _current.get()
+    return f"t{practice_id}" if practice_id is not None else "t-"
@@ -0,0 +1,1171 @@
+# backend/core/tests.py
+"""
+Query-count and latency regression suite for the API.
+
+Every endpoint in core/urls.py gets a query budget that must hold at every seed
+scale: the budget is a constant, so a query that starts running once per row
+(an N+1) fails the larger scales even if the small one still passes.
+
+LatencyBaselineTests times the same endpoints at the largest scale and compares
+them against a JSON baseline. Wall-clock timings depend on the machine and on
+what else runs, so it is opt-in and not part of the CI gate (the query budgets
+are): it only runs when PERF_BASELINE_PATH names the baseline file. The first
+run, or one with PERF_BASELINE_UPDATE=1, records the baseline and skips. An
+endpoint fails when its median is more than PERF_REGRESSION_TOLERANCE (default
+0.5 = +50%) and PERF_REGRESSION_MIN_MS (default 10) slower than the baseline,
+or when the baseline has no entry for it (re-record after adding endpoints).
+
+    python manage.py test core
+    PERF_BASELINE_PATH=var/perf_baseline.json python manage.py test core.tests.LatencyBaselineTests
+"""
+from __future__ import annotations
+
+import copy
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time as _time
+import unittest
+from unittest import mock
+from datetime import date, timedelta
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, connections, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django import urls
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from appointments.models import Appointment, BlockTemplate, CalendarFeed
+from appointments.views_async import AppointmentListAsyncView
+from locations.models import BusinessSettings, Location
+from locations.views_async import LocationListAsyncView
+from patients.models import Patient
+from patients.views_async import PatientListAsyncView
+from providers.models import Provider
+from reporting import rollups
+from schedule.models import ScheduleSettings
+from schedule.views_async import ScheduleSettingsListAsyncView
+
+from . import audit, db_routing, demo_snapshot, jobs, metrics, query_stats, tenancy
+from . import urls as core_urls
+from .demo_reset import (
+    APPOINTMENT_TYPES,
+    DEMO_PATIENTS,
+    _block_plan,
+    _block_templates,
+    _daterange,
+    _fake_email,
+    _fake_phone,
+    _is_weekday,
+    _slot_plan,
+    _status_for_slot,
+)
+from .models import AuditLog, Job, Practice
+
+
+# name -> (providers, patients, weekdays of appointments, locations)
+SCALES = {
+    "small": (2, 10, 5, 2),
+    "large": (8, 300, 15, 6),
+}
+
+LOGIN_PASSWORD = "QueryBudget1!"
+
+# Max queries per endpoint, identical at every scale.
+QUERY_BUDGETS = {
+    "auth_login": 3,
+    "auth_me": 3,
+    "auth_verify": 1,
+    "auth_refresh": 1,
+    # Count, page, the window's block templates.
+    "appointments_window": 4,
+    "appointments_window_cached": 1,
+    "appointments_page": 3,
+    "appointments_retrieve": 2,
+    "appointments_create": 6,
+    "appointments_update": 5,
+    "appointments_destroy": 4,  # + its reminders
+    # Dry run over a provider's whole range: both providers, the selection, the
+    # new provider's locations and their hours, and one set-based conflict check
+    # each against appointments and block templates.
+    "appointments_bulk_move": 10,
+    "patients_search": 3,
+    "patients_create": 2,
+    # Patient, visit summary, first page of upcoming and of past.
+    "patients_history": 5,
+    "providers_list": 4,  # + their locations
+    "locations_list": 4,
+    "locations_retrieve": 3,
+    "locations_update_hours": 9,
+    # Uncached: location, occupants, rooms (a cached refresh is auth only).
+    "locations_board": 4,
+    "business_settings": 2,
+    "schedule_settings_list": 5,
+    "schedule_settings_retrieve": 5,
+    # Rollup aggregate, opening hours, provider-days, block templates, provider names.
+    "reports_utilization": 6,
+    "block_templates_list": 3,
+    # Token, the feed's appointments and block templates (a cached poll is none).
+    "calendar_feed": 3,
+    "calendar_feed_cached": 0,
+    # Polled about once a second while a job runs.
+    "jobs_status": 2,
+    "fhir_export_status": 2,
+}
+
+
+# -----------------------------
+# Seeding
+# -----------------------------
+
+def seed_scale(n_providers: int, n_patients: int, n_days: int, n_locations: int) -> dict:
+    """
+    Deterministic data in the shape of core/demo_reset.py (same slot and block
+    plans, appointment types and contact helpers), sized by the arguments and
+    written with bulk_create so large scales stay fast.
+    """
+    BusinessSettings.objects.get_or_create(pk=1, defaults={"name": "", "show_name_in_nav": True})
+    ScheduleSettings.objects.create(appointment_types=APPOINTMENT_TYPES)
+
+    locations = []
+    for idx in range(n_locations):
+        # save() also creates the default hours row for each weekday.
+        locations.append(Location.objects.create(name=f"Office {idx + 1}", slug=f"office-{idx + 1}"))
+
+    users = User.objects.bulk_create([
+        User(username=f"budget{idx}", email=f"budget{idx}@example.test", is_staff=(idx == 0))
+        for idx in range(n_providers)
+    ])
+    login_user = users[0]
+    login_user.set_password(LOGIN_PASSWORD)
+    login_user.save()
+
+    providers = Provider.objects.bulk_create([
+        Provider(
+            user=user,
+            first_name=f"Provider{idx}",
+            last_name=f"Budget{idx}",
+            email=user.email,
+            phone=_fake_phone(idx + 1),
+        )
+        for idx, user in enumerate(users)
+    ])
+
+    patients = Patient.objects.bulk_create([
+        Patient(
+            first_name=spec["first_name"],
+            last_name=f"{spec['last_name']}{idx}",
+            gender=spec["gender"],
+            date_of_birth=spec["date_of_birth"],
+            email=_fake_email(spec["first_name"], f"{spec['last_name']}{idx}"),
+            phone=_fake_phone(idx % 100),
+        )
+        for idx, spec in ((i, DEMO_PATIENTS[i % len(DEMO_PATIENTS)]) for i in range(n_patients))
+    ])
+
+    today = timezone.localdate()
+    days = [d for d in _daterange(today - timedelta(days=n_days * 2), today + timedelta(days=n_days * 2))
+            if _is_weekday(d)]
+    start = len(days) // 2 - n_days // 2
+    days = days[start:start + n_days]
+
+    BlockTemplate.objects.bulk_create([
+        tpl for p_idx, provider in enumerate(providers) for tpl in _block_templates(provider, p_idx, days[0])
+    ])
+
+    rows = []
+    for d in days:
+        for p_idx, provider in enumerate(providers):
+            location = locations[(p_idx + d.toordinal()) % len(locations)]
+            blocks = _block_plan(d, p_idx)
+            for slot_i, (s, e) in enumerate(_slot_plan()):
+                if any(s < b_end and e > b_start for _l, b_start, b_end in blocks):
+                    continue
+                t = APPOINTMENT_TYPES[(d.toordinal() + slot_i + p_idx) % len(APPOINTMENT_TYPES)]
+                rows.append(Appointment(
+                    patient=patients[len(rows) % len(patients)],
+                    provider=provider, location=location, office=location.slug,
+                    appointment_type=t["name"], status=_status_for_slot(slot_i),
+                    color_code=t["color_code"], date=d, start_time=s, end_time=e,
+                    duration=t["default_duration"],
+                ))
+    Appointment.objects.bulk_create(rows)
+    # bulk_create sends no appointments_changed; fill the reporting rollups directly.
+    rollups.rebuild()
+
+    return {
+        "user": login_user,
+        "feed": CalendarFeed.objects.create(provider=providers[0]),
+        "providers": providers,
+        "patients": patients,
+        "locations": locations,
+        "days": days,
+    }
+
+
+# -----------------------------
+# Endpoint catalogue
+# -----------------------------
+
+def endpoint_calls(data: dict) -> list:
+    """
+    (name, method, path, payload) for every endpoint in core/urls.py.
+    Writes come last and are built so each can run repeatedly.
+    """
+    provider = data["providers"][0]
+    patient = data["patients"][0]
+    location = data["locations"][0]
+    days = data["days"]
+    week = f"start_date={days[0]}&end_date={days[min(4, len(days) - 1)]}"
+    provider_ids = "&".join(f"providers={p.id}" for p in data["providers"])
+    appt = Appointment.objects.filter(patient__isnull=False, provider=provider).order_by("id").first()
+    refresh = str(RefreshToken.for_user(data["user"]))
+    access = str(RefreshToken.for_user(data["user"]).access_token)
+    settings_row = ScheduleSettings.objects.first()
+
+    appointment_payload = {
+        "patient": patient.id,
+        "provider": provider.id,
+        "office": location.slug,
+        "appointment_type": "Consult",
+        "date": str(days[-1]),
+        "start_time": "18:00",
+        "end_time": "18:30",
+        "allow_overlap": True,
+    }
+    hours = [{"weekday": d, "open": True, "start": "08:00", "end": "17:00"}
+             for d in ["mon", "tue", "wed", "thu", "fri"]]
+
+    return [
+        ("auth_login", "post", "/api/auth/login/",
+         {"username": data["user"].username, "password": LOGIN_PASSWORD}),
+        ("auth_me", "get", "/api/auth/me/", None),
+        ("auth_verify", "post", "/api/auth/verify/", {"token": access}),
+        ("auth_refresh", "post", "/api/auth/refresh/", {"refresh": refresh}),
+        ("appointments_window", "get", f"/api/appointments/?{week}&{provider_ids}", None),
+        ("appointments_page", "get", "/api/appointments/?page_size=100", None),
+        ("appointments_retrieve", "get", f"/api/appointments/{appt.id}/", None),
+        ("patients_search", "get", "/api/patients/?search=Ma", None),
+        ("patients_history", "get", f"/api/patients/{patient.id}/appointments/", None),
+        ("providers_list", "get", "/api/providers/", None),
+        ("locations_list", "get", "/api/locations/", None),
+        ("locations_retrieve", "get", f"/api/locations/{location.id}/", None),
+        ("locations_board", "get", f"/api/locations/{location.id}/board/", None),
+        ("business_settings", "get", "/api/business/settings/", None),
+        ("schedule_settings_list", "get", "/api/schedule-settings/", None),
+        ("schedule_settings_retrieve", "get", f"/api/schedule-settings/{settings_row.id}/", None),
+        ("reports_utilization", "get", f"/api/reports/utilization/?start={days[0]}&end={days[-1]}", None),
+        ("block_templates_list", "get", f"/api/block-templates/?provider={provider.id}", None),
+        ("calendar_feed", "get", f"/api/feeds/{data['feed'].token}.ics", None),
+        ("appointments_create", "post", "/api/appointments/", appointment_payload),
+        ("appointments_update", "patch", f"/api/appointments/{appt.id}/",
+         {"patient": appt.patient_id, "office": appt.office, "notes": "budget"}),
+        ("patients_create", "post", "/api/patients/",
+         {"first_name": "Budget", "last_name": "Patient", "date_of_birth": "1990-01-01"}),
+        ("locations_update_hours", "patch", f"/api/locations/{location.id}/hours/", {"hours": hours}),
+        ("appointments_bulk_move", "post", "/api/appointments/bulk-move/",
+         {"provider": provider.id, "start_date": str(days[0]), "end_date": str(days[-1]),
+          "to_provider": data["providers"][1].id, "dry_run": True}),
+    ]
+
+
+class ApiScaleMixin:
+    scale = "small"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_scale(*SCALES[cls.scale])
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        token = RefreshToken.for_user(self.data["user"]).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def call(self, method, path, payload):
+        if payload is None:
+            return getattr(self.client, method)(path)
+        return getattr(self.client, method)(path, payload, format="json")
+
+
+# -----------------------------
+# Query budgets
+# -----------------------------
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    PERF_SAMPLE_RATE=0,
+    QUERY_STATS_ENABLED=False,
+    REPORTING_ASYNC=False,
+)
+class QueryBudgetSmallScaleTests(ApiScaleMixin, TestCase):
+    scale = "small"
+
+    def assertWithinBudget(self, name, method, path, payload=None, expected_status=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.call(method, path, payload)
+        self.assertLess(response.status_code, 400, f"{name}: {response.status_code} {response.content[:300]!r}")
+        if expected_status is not None:
+            self.assertEqual(response.status_code, expected_status)
+        budget = QUERY_BUDGETS[name]
+        self.assertLessEqual(
+            len(ctx), budget,
+            f"{name} ({self.scale}): {len(ctx)} queries, budget {budget}\n"
+            + "\n".join(q["sql"][:160] for q in ctx.captured_queries),
+        )
+        return response
+
+    def test_endpoints_within_query_budget(self):
+        for name, method, path, payload in endpoint_calls(self.data):
+            with self.subTest(endpoint=name):
+                self.assertWithinBudget(name, method, path, payload)
+
+    def test_cached_window_skips_the_orm(self):
+        calls = {c[0]: c for c in endpoint_calls(self.data)}
+        _, method, path, payload = calls["appointments_window"]
+        first = self.call(method, path, payload)
+        second = self.assertWithinBudget("appointments_window_cached", method, path, payload)
+        self.assertEqual(first.json(), second.json())
+
+    def test_cached_feed_skips_the_orm(self):
+        calls = {c[0]: c for c in endpoint_calls(self.data)}
+        _, method, path, payload = calls["calendar_feed"]
+        first = self.call(method, path, payload)
+        second = self.assertWithinBudget("calendar_feed_cached", method, path, payload)
+        self.assertEqual(first.content, second.content)
+
+    def test_window_cache_invalidated_by_update(self):
+        calls = {c[0]: c for c in endpoint_calls(self.data)}
+        _, _, window_path, _ = calls["appointments_window"]
+        _, _, update_path, update_payload = calls["appointments_update"]
+        self.call("get", window_path, None)
+        # Invalidation is sent on commit.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.call("patch", update_path, update_payload)
+        with CaptureQueriesContext(connection) as ctx:
+            self.call("get", window_path, None)
+        self.assertGreater(len(ctx), QUERY_BUDGETS["appointments_window_cached"])
+
+    def test_destroy_within_query_budget(self):
+        appt = Appointment.objects.filter(provider=self.data["providers"][0]).order_by("-id").first()
+        self.assertWithinBudget("appointments_destroy", "delete", f"/api/appointments/{appt.id}/",
+                                expected_status=204)
+
+
+class QueryBudgetLargeScaleTests(QueryBudgetSmallScaleTests):
+    scale = "large"
+
+
+# -----------------------------
+# Latency baseline
+# -----------------------------
+
+@unittest.skipUnless(os.getenv("PERF_BASELINE_PATH"), "latency baseline is opt-in: set PERF_BASELINE_PATH")
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    PERF_SAMPLE_RATE=0,
+    QUERY_STATS_ENABLED=False,
+    WINDOW_CACHE_ENABLED=False,
+)
+class LatencyBaselineTests(ApiScaleMixin, TestCase):
+    scale = "large"
+    runs = 5
+
+    def _median_ms(self, method, path, payload) -> float:
+        self.call(method, path, payload)  # warm-up
+        samples = []
+        for _ in range(self.runs):
+            started = _time.perf_counter()
+            response = self.call(method, path, payload)
+            samples.append((_time.perf_counter() - started) * 1000)
+            self.assertLess(response.status_code, 400)
+        return statistics.median(samples)
+
+    def test_latency_against_baseline(self):
+        timings = {
+            name: round(self._median_ms(method, path, payload), 2)
+            for name, method, path, payload in endpoint_calls(self.data)
+        }
+
+        path = Path(os.environ["PERF_BASELINE_PATH"])
+        if os.getenv("PERF_BASELINE_UPDATE") == "1" or not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps({"scale": self.scale, "median_ms": timings}, indent=2, sort_keys=True))
+            self.skipTest(f"recorded the latency baseline in {path}")
+
+        baseline = json.loads(path.read_text())["median_ms"]
+        tolerance = float(os.getenv("PERF_REGRESSION_TOLERANCE", 0.5))
+        min_ms = float(os.getenv("PERF_REGRESSION_MIN_MS", 10))
+
+        regressions = []
+        for name, ms in timings.items():
+            base = baseline.get(name)
+            if base is None:
+                regressions.append(f"{name}: not in the baseline; re-record with PERF_BASELINE_UPDATE=1")
+                continue
+            if ms > base * (1 + tolerance) and ms - base > min_ms:
+                regressions.append(f"{name}: {ms:.1f} ms vs baseline {base:.1f} ms")
+
+        self.assertFalse(regressions, "Latency regressions:\n" + "\n".join(regressions))
+
+
+# -----------------------------
+# Audit trail
+# -----------------------------
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    PERF_SAMPLE_RATE=0,
+    QUERY_STATS_ENABLED=False,
+    REPORTING_ASYNC=False,
+)
+class AuditTrailTests(ApiScaleMixin, TestCase):
+    def _write(self, method, path, payload=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.call(method, path, payload)
+        self.assertLess(response.status_code, 400, response.content[:300])
+        return response
+
+    def test_appointment_update_records_changed_fields_only(self):
+        appt = Appointment.objects.filter(patient__isnull=False).first()
+        self._write("patch", f"/api/appointments/{appt.id}/",
+                    {"patient": appt.patient_id, "office": appt.office, "notes": "audited"})
+
+        log = AuditLog.objects.get(object_type="appointments.appointment", object_id=str(appt.id))
+        self.assertEqual(log.action, "update")
+        self.assertEqual(log.actor_username, self.data["user"].username)
+        self.assertEqual(log.changes, {"notes": [appt.notes, "audited"]})
+
+    def test_patient_lifecycle_and_query_api(self):
+        response = self._write("post", "/api/patients/",
+                               {"first_name": "Audit", "last_name": "Trail", "date_of_birth": "1990-01-01"})
+        pk = str(response.json()["id"])
+        self._write("delete", f"/api/patients/{pk}/")
+
+        actions = list(
+            AuditLog.objects.filter(object_type="patients.patient", object_id=pk)
+            .order_by("created_at").values_list("action", flat=True)
+        )
+        self.assertEqual(actions, ["create", "delete"])
+
+        today = timezone.localdate().isoformat()
+        response = self.call(
+            "get", f"/api/audit/?object_type=patients.patient&object_id={pk}&since={today}&until={today}", None,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r["action"] for r in response.json()["results"]], ["delete", "create"])
+
+    def test_rolled_back_write_leaves_no_trail(self):
+        appt = Appointment.objects.first()
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    audit.deleted(self.data["user"], appt)
+                    raise RuntimeError("rollback")
+            except RuntimeError:
+                pass
+        self.assertFalse(AuditLog.objects.exists())
+
+    def test_deleting_the_actor_leaves_the_trail_alone(self):
+        clerk = User.objects.create_user("leaver", password="x")
+        with self.captureOnCommitCallbacks(execute=True):
+            audit.deleted(clerk, Appointment.objects.first())
+        pk = clerk.pk
+        clerk.delete()
+
+        log = AuditLog.objects.get()
+        self.assertEqual((log.actor_id, log.actor_username), (pk, "leaver"))
+        response = self.call("get", "/api/audit/?actor=leaver", None)
+        self.assertEqual([r["actor"] for r in response.json()["results"]], [pk])
+
+    def test_audit_api_is_admin_only(self):
+        clerk = User.objects.create_user("clerk", password="x")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(clerk).access_token}")
+        self.assertEqual(self.call("get", "/api/audit/", None).status_code, 403)
+
+
+# -----------------------------
+# Background jobs
+# -----------------------------
+
+@override_settings(QUERY_STATS_ENABLED=False)
+class JobQueueTests(TestCase):
+    calls: list = []
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        @jobs.job("test_echo")
+        def echo(ctx):
+            ctx.progress(50, "halfway")
+            return {"echo": ctx.payload.get("value")}
+
+        @jobs.job("test_flaky", max_attempts=2, retry_delay=60)
+        def flaky(ctx):
+            raise RuntimeError("boom")
+
+        @jobs.job("test_single", concurrency=1)
+        def single(ctx):
+            return None
+
+        @jobs.job("test_cancel")
+        def cancelled_midway(ctx):
+            Job.objects.filter(pk=ctx.job.pk).update(status=Job.STATUS_CANCELLED)
+            ctx.progress(10)
+            cls.calls.append("not reached")
+
+    @classmethod
+    def tearDownClass(cls):
+        for kind in ("test_echo", "test_flaky", "test_single", "test_cancel"):
+            jobs._registry.pop(kind, None)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.staff = User.objects.create_user("jobadmin", password="x", is_staff=True)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.staff).access_token}")
+
+    def test_runs_job_and_reports_status(self):
+        job = jobs.enqueue("test_echo", {"value": 7}, user=self.staff)
+        self.assertEqual(jobs.run_pending(worker="test"), 1)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.progress, job.result), (Job.STATUS_SUCCEEDED, 100, {"echo": 7}))
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f"/api/jobs/{job.pk}/")
+        self.assertEqual(response.json()["status"], "succeeded")
+        self.assertLessEqual(len(ctx), QUERY_BUDGETS["jobs_status"])
+
+    def test_failure_is_retried_with_backoff_then_failed(self):
+        job = jobs.enqueue("test_flaky")
+        jobs.run_pending(worker="test")
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_QUEUED, 1))
+        self.assertIn("boom", job.error)
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=50))
+        # Not due yet.
+        self.assertIsNone(jobs.claim("test"))
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        jobs.run_pending(worker="test")
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_FAILED, 2))
+
+    def test_concurrency_limit_per_kind(self):
+        first = jobs.enqueue("test_single")
+        jobs.enqueue("test_single")
+        other = jobs.enqueue("test_echo")
+
+        self.assertEqual(jobs.claim("w1").pk, first.pk)
+        # The second test_single waits for the first; other kinds go ahead.
+        self.assertEqual(jobs.claim("w2").pk, other.pk)
+        self.assertIsNone(jobs.claim("w3"))
+
+    def test_cancel(self):
+        queued = jobs.enqueue("test_echo", user=self.staff)
+        response = self.client.post(f"/api/jobs/{queued.pk}/cancel/")
+        self.assertEqual(response.json()["status"], "cancelled")
+        self.assertEqual(self.client.post(f"/api/jobs/{queued.pk}/cancel/").status_code, 409)
+
+        running = jobs.enqueue("test_cancel")
+        jobs.run_pending(worker="test")
+        running.refresh_from_db()
+        self.assertEqual(running.status, Job.STATUS_CANCELLED)
+        self.assertEqual(self.calls, [])
+
+    def test_stale_running_jobs_are_requeued_or_failed(self):
+        retryable = jobs.enqueue("test_flaky")
+        last_attempt = jobs.enqueue("test_echo")
+        jobs.claim("dead-worker")
+        jobs.claim("dead-worker")
+        Job.objects.update(heartbeat_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(jobs.requeue_stale(stale_after=60), 2)
+        retryable.refresh_from_db()
+        last_attempt.refresh_from_db()
+        self.assertEqual(retryable.status, Job.STATUS_QUEUED)
+        self.assertEqual(last_attempt.status, Job.STATUS_FAILED)
+
+    @override_settings(JOBS_HEARTBEAT_INTERVAL=0.01)
+    def test_run_pending_heartbeats_the_job_it_runs(self):
+        jobs.job("test_slow")(lambda ctx: _time.sleep(0.2))
+        self.addCleanup(jobs._registry.pop, "test_slow", None)
+        slow = jobs.enqueue("test_slow")
+
+        # Without a WorkerPool's housekeeping, another worker would requeue it as stale.
+        with mock.patch.object(jobs, "heartbeat") as beat:
+            self.assertEqual(jobs.run_pending(worker="test"), 1)
+        beat.assert_called_with([slow.pk])
+
+        running = jobs.enqueue("test_echo")
+        jobs.claim("w1")
+        Job.objects.filter(pk=running.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(jobs.heartbeat([running.pk, slow.pk]), 1)
+        self.assertEqual(jobs.requeue_stale(stale_after=60), 0)
+
+    def test_demo_reset_returns_job_and_jobs_are_private(self):
+        response = self.client.post("/api/demo/reset/")
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["job_id"]
+        # A second click while it is queued returns the same job.
+        self.assertEqual(self.client.post("/api/demo/reset/").json()["job_id"], job_id)
+
+        clerk = User.objects.create_user("clerk", password="x")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(clerk).access_token}")
+        self.assertEqual(self.client.get(f"/api/jobs/{job_id}/").status_code, 404)
+
+
+@override_settings(QUERY_STATS_ENABLED=False, JOBS_EAGER=True)
+class FhirExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(name="FHIR North", slug="fhir-north", timezone="America/Chicago")
+        cls.provider = Provider.objects.create(
+            first_name="Fay", last_name="Hir", email="fhir@example.com", specialty="Cardiology",
+        )
+        cls.patient = Patient.objects.create(
+            first_name="Pat", last_name="Export", date_of_birth="1970-02-03", gender="Female", phone="555-0100",
+        )
+        cls.other = Patient.objects.create(first_name="Old", last_name="Record", date_of_birth="1950-01-01")
+        common = {"provider": cls.provider, "location": cls.location, "office": "fhir-north", "date": "2026-03-02"}
+        cls.appt = Appointment.objects.create(
+            patient=cls.patient, appointment_type="Consult", status="seen", chief_complaint="Chest pain",
+            start_time="09:00", end_time="09:30", **common,
+        )
+        Appointment.objects.create(is_block=True, appointment_type="Lunch", start_time="12:00", end_time="13:00", **common)
+        cls.admin = User.objects.create_user("fhiradmin", password="x", is_staff=True)
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        self.enterContext(override_settings(FHIR_EXPORT_ROOT=root))
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.admin).access_token}")
+
+    def export(self, query=""):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(f"/api/fhir/$export{query}", HTTP_ACCEPT="application/fhir+json")
+        self.assertEqual(response.status_code, 202, response.content[:300])
+        status_url = response["Content-Location"]
+        with CaptureQueriesContext(connection) as ctx:
+            manifest = self.client.get(status_url)
+        self.assertLessEqual(len(ctx), QUERY_BUDGETS["fhir_export_status"])
+        self.assertEqual(manifest.status_code, 200, manifest.content[:300])
+        return status_url, manifest.json()
+
+    def download(self, url):
+        response = self.client.get(url, HTTP_ACCEPT="application/fhir+ndjson")
+        self.assertEqual(response["Content-Type"], "application/fhir+ndjson")
+        return [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+
+    def test_full_export_writes_ndjson_per_resource_type(self):
+        _, manifest = self.export()
+        self.assertTrue(manifest["requiresAccessToken"])
+        outputs = {o["type"]: o for o in manifest["output"]}
+        self.assertEqual(
+            {t: o["count"] for t, o in outputs.items()},
+            # The block is not an Appointment.
+            {"Patient": 2, "Practitioner": 1, "Location": Location.objects.count(), "Appointment": 1},
+        )
+
+        patients = {p["id"]: p for p in self.download(outputs["Patient"]["url"])}
+        pat = patients[str(self.patient.pk)]
+        self.assertEqual(pat["identifier"][0]["value"], self.patient.prn)
+        self.assertEqual((pat["gender"], pat["birthDate"]), ("female", "1970-02-03"))
+        self.assertNotIn("address", pat)
+
+        [appt] = self.download(outputs["Appointment"]["url"])
+        self.assertEqual((appt["id"], appt["status"]), (str(self.appt.pk), "fulfilled"))
+        self.assertEqual(appt["start"], "2026-03-02T15:00:00Z")
+        self.assertEqual(
+            [p["actor"]["reference"] for p in appt["participant"]],
+            [f"Patient/{self.patient.pk}", f"Practitioner/{self.provider.pk}", f"Location/{self.location.pk}"],
+        )
+        loc = next(l for l in self.download(outputs["Location"]["url"]) if l["id"] == str(self.location.pk))
+        self.assertEqual(loc["extension"][0]["valueCode"], "America/Chicago")
+
+    def test_since_exports_only_rows_updated_after_it(self):
+        old = timezone.now() - timedelta(days=30)
+        Patient.objects.filter(pk=self.other.pk).update(updated_at=old)
+        Provider.objects.update(updated_at=old)
+        Location.objects.update(updated_at=old)
+        Appointment.objects.update(updated_at=old)
+
+        since = (timezone.now() - timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        _, manifest = self.export(f"?_since={since}&_type=Patient,Appointment,Location")
+        self.assertEqual([(o["type"], o["count"]) for o in manifest["output"]], [("Patient", 1)])
+        [pat] = self.download(manifest["output"][0]["url"])
+        self.assertEqual(pat["id"], str(self.patient.pk))
+
+        # The next increment starts at this export's transactionTime.
+        self.patient.save()
+        _, manifest = self.export(f"?_since={manifest['transactionTime']}&_type=Patient")
+        self.assertEqual([(o["type"], o["count"]) for o in manifest["output"]], [("Patient", 1)])
+
+    def test_worker_written_export_is_served_by_the_view(self):
+        # As in production: the request only queues the job, run_jobs writes the files.
+        with override_settings(JOBS_EAGER=False), self.captureOnCommitCallbacks(execute=True):
+            status_url = self.client.get("/api/fhir/$export?_type=Patient")["Content-Location"]
+        self.assertEqual(self.client.get(status_url).status_code, 202)
+        self.assertEqual(jobs.run_pending(worker="worker-container"), 1)
+
+        manifest = self.client.get(status_url).json()
+        [output] = manifest["output"]
+        self.assertEqual(
+            sorted(p["id"] for p in self.download(output["url"])), sorted([str(self.patient.pk), str(self.other.pk)]),
+        )
+
+    def test_invalid_requests_and_cancel(self):
+        for query in ("?_type=Encounter", "?_since=yesterday", "?_outputFormat=text/csv"):
+            with self.subTest(query=query):
+                response = self.client.get(f"/api/fhir/$export{query}")
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()["resourceType"], "OperationOutcome")
+
+        with override_settings(JOBS_EAGER=False):
+            response = self.client.post("/api/fhir/$export")
+        status_url = response["Content-Location"]
+        self.assertEqual(self.client.get(status_url).status_code, 202)
+        self.assertEqual(self.client.delete(status_url).status_code, 202)
+        self.assertEqual(self.client.get(status_url).status_code, 404)
+
+        clerk = User.objects.create_user("fhirclerk", password="x")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(clerk).access_token}")
+        self.assertEqual(self.client.get("/api/fhir/$export").status_code, 403)
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    QUERY_STATS_ENABLED=False,
+    REPORTING_ASYNC=False,
+    DEMO_RESET_MODE="snapshot",
+)
+class DemoSnapshotTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.enterContext(override_settings(DEMO_SNAPSHOT_DIR=directory))
+        self.manifest_path = Path(directory) / demo_snapshot.MANIFEST_NAME
+
+    def test_restore_shifts_weeks_resets_dependents_and_sequences(self):
+        self.assertEqual(demo_snapshot.reset_demo_data()["reset_mode"], "snapshot_rebuilt")
+        seeded = sorted(Appointment.objects.values_list("id", "date"))
+        patients = Patient.objects.count()
+        max_patient_id = Patient.objects.order_by("-id").values_list("id", flat=True).first()
+
+        # Pretend the snapshot was taken two weeks ago, and leave rows behind.
+        manifest = json.loads(self.manifest_path.read_text())
+        manifest["seeded_for_date"] = str(date.fromisoformat(manifest["seeded_for_date"]) - timedelta(days=14))
+        self.manifest_path.write_text(json.dumps(manifest))
+        provider = Provider.objects.first()
+        CalendarFeed.objects.create(provider=provider)
+        Patient.objects.create(first_name="Extra", last_name="Row", date_of_birth="2000-01-01")
+
+        summary = demo_snapshot.reset_demo_data()
+        self.assertEqual(summary["reset_mode"], "snapshot")
+        self.assertEqual(
+            sorted(Appointment.objects.values_list("id", "date")),
+            [(pk, day + timedelta(days=14)) for pk, day in seeded],
+        )
+        self.assertEqual(Patient.objects.count(), patients)
+        self.assertFalse(CalendarFeed.objects.exists())
+        # Sequences continue after the restored ids.
+        self.assertGreater(
+            Patient.objects.create(first_name="New", last_name="Row", date_of_birth="2000-01-01").pk,
+            max_patient_id,
+        )
+
+
+# -----------------------------
+# Metrics
+# -----------------------------
+
+def _process_snapshot(pid: int, requests: float, latency: float, pool_open: float) -> dict:
+    labels = {"view": "SnapshotView", "action": "list", "method": "GET", "status": "2xx"}
+    registry = metrics.Registry()
+    registry.inc("http_requests_total", requests, **labels)
+    registry.observe("http_request_duration_seconds", latency, **labels)
+    registry.set_gauge("db_pool_connections", pool_open, alias="default", state="open")
+    return dict(registry.snapshot(), pid=pid)
+
+
+@override_settings(METRICS_TOKEN="scrape-token", QUERY_STATS_ENABLED=False)
+class MetricsTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.enterContext(override_settings(METRICS_DIR=directory))
+        self.directory = metrics.process_dir()
+        self.directory.mkdir()
+        for pid, requests, latency, pool_open in ((101, 3, 0.02, 4), (102, 5, 0.3, 6)):
+            (self.directory / f"metrics-{pid}.json").write_text(
+                json.dumps(_process_snapshot(pid, requests, latency, pool_open))
+            )
+        # run_jobs in another container on the shared volume; same pid, different host.
+        self.worker = Path(directory) / "worker"
+        self.worker.mkdir()
+        (self.worker / "metrics-101.json").write_text(json.dumps(_process_snapshot(101, 2, 0.5, 1)))
+
+    def scrape(self, **headers):
+        return self.client.get("/metrics", headers=headers)
+
+    @staticmethod
+    def value(body: str, series: str) -> float:
+        for line in body.splitlines():
+            if line.startswith(series + " "):
+                return float(line.rsplit(" ", 1)[1])
+        return 0.0
+
+    def test_process_snapshots_are_merged_and_dead_ones_compacted(self):
+        labels = '{action="list",method="GET",status="2xx",view="SnapshotView"}'
+        pool = 'db_pool_connections{alias="default",state="open"}'
+
+        body = metrics.render()
+        self.assertEqual(self.value(body, f"http_requests_total{labels}"), 10)
+        self.assertEqual(self.value(body, f"http_request_duration_seconds_count{labels}"), 3)
+        metrics.mark_process_dead(101)
+        # A per-worker dead file from an older release is folded in as well.
+        (self.directory / "dead-99.json").write_text(json.dumps(_process_snapshot(99, 1, 0.01, 9)))
+        metrics.mark_process_dead(102)
+        self.assertEqual(
+            sorted(p.name for p in self.directory.glob("*.json")),
+            ["dead.json", f"metrics-{os.getpid()}.json"],
+        )
+        # Marking a pid dead only touches this host's directory.
+        self.assertTrue((self.worker / "metrics-101.json").exists())
+
+        body = metrics.render()
+        # Exited workers' counters and histograms keep counting; their gauges are gone.
+        self.assertEqual(self.value(body, f"http_requests_total{labels}"), 11)
+        self.assertEqual(self.value(body, f"http_request_duration_seconds_count{labels}"), 4)
+        self.assertEqual(self.value(body, f'http_request_duration_seconds_bucket{labels[:-1]},le="0.025"}}'), 2)
+        # Live: this test process (render() flushes its own snapshot) and the worker.
+        own = json.loads((self.directory / f"metrics-{os.getpid()}.json").read_text())["gauges"]
+        own_pool = own.get(metrics._key("db_pool_connections", {"alias": "default", "state": "open"}), 0)
+        self.assertEqual(self.value(body, pool), own_pool + 1)
+
+    def test_scrapes_need_the_bearer_token_or_a_staff_login(self):
+        self.assertEqual(self.scrape().status_code, 403)
+        self.assertEqual(self.scrape(Authorization="Bearer wrong-token").status_code, 403)
+
+        response = self.scrape(Authorization="Bearer scrape-token")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("# TYPE http_requests_total counter", response.content.decode())
+
+        user = User.objects.create_user("viewer", password="x")
+        token = RefreshToken.for_user(user).access_token
+        self.assertEqual(self.scrape(Authorization=f"Bearer {token}").status_code, 403)
+        user.is_staff = True
+        user.save()
+        self.assertEqual(self.scrape(Authorization=f"Bearer {token}").status_code, 200)
+
+        with override_settings(METRICS_TOKEN=""):
+            self.assertEqual(self.scrape(Authorization="Bearer ").status_code, 403)
+
+
+# -----------------------------
+# Query fingerprints
+# -----------------------------
+
+class QueryFingerprintTests(SimpleTestCase):
+    def assertSameFingerprint(self, *statements):
+        prints = {query_stats.fingerprint(sql) for sql in statements}
+        self.assertEqual(len(prints), 1, "\n".join(normalized for _, normalized in prints))
+
+    def test_literals_collapse(self):
+        self.assertSameFingerprint(
+            "SELECT * FROM \"patients_patient\" WHERE \"last_name\" = 'Smith'",
+            "SELECT * FROM \"patients_patient\" WHERE \"last_name\" = 'O''Brien'",
+            "SELECT *  FROM \"patients_patient\"\n WHERE \"last_name\" = ''",
+        )
+
+    def test_in_lists_collapse(self):
+        self.assertSameFingerprint(
+            "SELECT 1 FROM \"t\" WHERE \"id\" IN (%s)",
+            "SELECT 1 FROM \"t\" WHERE \"id\" IN (%s, %s, %s)",
+            "SELECT 1 FROM \"t\" WHERE \"id\" IN (1, 2, 3, 4)",
+        )
+
+    def test_numbers_collapse_but_identifiers_keep_their_digits(self):
+        self.assertSameFingerprint(
+            "SELECT * FROM \"t\" WHERE \"duration\" > 30 LIMIT 21 OFFSET 0",
+            "SELECT * FROM \"t\" WHERE \"duration\" > -1.5 LIMIT 100 OFFSET 200",
+        )
+        self.assertNotEqual(
+            query_stats.fingerprint("SELECT \"t1\".\"id\" FROM \"t1\""),
+            query_stats.fingerprint("SELECT \"t2\".\"id\" FROM \"t2\""),
+        )
+
+    def test_values_rows_and_savepoints_collapse(self):
+        self.assertSameFingerprint(
+            "INSERT INTO \"t\" (\"a\", \"b\") VALUES (%s, %s), (%s, %s)",
+            "INSERT INTO \"t\" (\"a\", \"b\") VALUES (%s, %s), (%s, %s), (%s, %s)",
+        )
+        self.assertSameFingerprint('SAVEPOINT "s140_x1"', 'SAVEPOINT "s139_x7"')
+
+
+# -----------------------------
+# Tenancy
+# -----------------------------
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    PERF_SAMPLE_RATE=0,
+    QUERY_STATS_ENABLED=False,
+    REPORTING_ASYNC=False,
+)
+class TenancyTests(ApiScaleMixin, TestCase):
+    """The small scale lives in the default practice; a second practice gets its own copy."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other = Practice.objects.create(name="Other Clinic", slug="other")
+        with tenancy.use_practice(cls.other.pk):
+            location = Location.objects.create(name="Office 1", slug="office-1")
+            user = User.objects.create_user("other-admin", password="x", is_staff=True)
+            provider = Provider.objects.create(user=user, first_name="Oona", last_name="Other",
+                                               email="budget0@example.test")
+            patient = Patient.objects.create(first_name="Otto", last_name="Other", date_of_birth="1980-01-01")
+            day = cls.data["days"][0]
+            cls.other_appt = Appointment.objects.create(
+                patient=patient, provider=provider, location=location, office=location.slug,
+                appointment_type="Consult", date=day, start_time="09:00", end_time="09:30", duration=30,
+            )
+        cls.other_user = user
+
+    def setUp(self):
+        super().setUp()
+        tenancy.clear_cache()
+        self.addCleanup(tenancy.clear_cache)
+
+    def login(self, user, practice=None):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {RefreshToken.for_user(user).access_token}"}
+        if practice:
+            headers["HTTP_X_PRACTICE"] = practice
+        self.client.credentials(**headers)
+
+    def test_rows_are_scoped_to_the_request_practice(self):
+        ours = self.call("get", "/api/appointments/?page_size=100", None).json()
+        self.assertNotIn(self.other_appt.pk, [a["id"] for a in ours["results"]])
+        self.assertEqual(self.call("get", f"/api/appointments/{self.other_appt.pk}/", None).status_code, 404)
+
+        self.login(self.other_user, "other")
+        theirs = self.call("get", "/api/appointments/?page_size=100", None).json()
+        self.assertEqual([a["id"] for a in theirs["results"]], [self.other_appt.pk])
+        providers = self.call("get", "/api/providers/", None).json()["results"]
+        self.assertEqual([p["last_name"] for p in providers], ["Other"])
+
+    def test_users_of_another_practice_are_rejected(self):
+        self.login(self.data["user"], "other")
+        self.assertEqual(self.call("get", "/api/patients/", None).status_code, 403)
+        self.login(self.other_user)
+        self.assertEqual(self.call("get", "/api/patients/", None).status_code, 403)
+        self.login(self.other_user, "nope")
+        self.assertEqual(self.call("get", "/api/patients/", None).status_code, 404)
+
+    def test_new_rows_join_the_request_practice(self):
+        self.login(self.other_user, "other")
+        response = self.call("post", "/api/patients/",
+                             {"first_name": "New", "last_name": "Other", "date_of_birth": "1990-01-01"})
+        self.assertEqual(Patient.all_objects.get(pk=response.json()["id"]).practice_id, self.other.pk)
+        # Location slugs are unique per practice, not globally.
+        self.assertEqual(Location.all_objects.filter(slug="office-1").count(), 2)
+
+    def test_audit_trail_is_scoped_to_the_request_practice(self):
+        self.login(self.other_user, "other")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.call("patch", f"/api/patients/{self.other_appt.patient_id}/", {"first_name": "Ottilie"})
+        with self.captureOnCommitCallbacks(execute=True):
+            audit.record(self.data["user"], "ours", metadata={"note": "default practice"})
+
+        theirs = self.call("get", "/api/audit/", None).json()["results"]
+        self.assertEqual([(e["action"], e["object_id"]) for e in theirs],
+                         [("update", str(self.other_appt.patient_id))])
+
+        self.login(self.data["user"])
+        ours = self.call("get", "/api/audit/", None).json()["results"]
+        self.assertEqual([e["action"] for e in ours], ["ours"])
+        self.assertEqual(
+            self.call("get", f"/api/audit/?object_id={self.other_appt.patient_id}", None).json()["results"], [],
+        )
+
+    def test_window_cache_is_per_practice(self):
+        calls = {c[0]: c for c in endpoint_calls(self.data)}
+        _, _, window_path, _ = calls["appointments_window"]
+        self.call("get", window_path, None)
+
+        # A write in the other practice leaves our cached window alone.
+        self.login(self.other_user, "other")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.call("patch", f"/api/appointments/{self.other_appt.pk}/",
+                                 {"patient": self.other_appt.patient_id, "office": "office-1", "notes": "elsewhere"})
+        self.assertEqual(response.status_code, 200)
+
+        self.login(self.data["user"])
+        with CaptureQueriesContext(connection) as ctx:
+            self.call("get", window_path, None)
+        self.assertLessEqual(len(ctx), QUERY_BUDGETS["appointments_window_cached"])
+
+
+# -----------------------------
+# Async read views
+# -----------------------------
+
+# URLconf for AsyncReadViewTests: the async list views mounted in front of the
+# router, as core/urls.py does when ASYNC_READ_VIEWS is on.
+urlpatterns = [
+    urls.path("api/appointments/", AppointmentListAsyncView.as_view()),
+    urls.path("api/patients/", PatientListAsyncView.as_view()),
+    urls.path("api/locations/", LocationListAsyncView.as_view()),
+    urls.path("api/schedule-settings/", ScheduleSettingsListAsyncView.as_view()),
+    *core_urls.urlpatterns,
+]
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    PERF_SAMPLE_RATE=0,
+    QUERY_STATS_ENABLED=False,
+    REPORTING_ASYNC=False,
+)
+class AsyncReadViewTests(ApiScaleMixin, TestCase):
+    """The async list views answer exactly like the sync ViewSets they stand in for."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other = Practice.objects.create(name="Other Clinic", slug="other")
+        calls = {c[0]: c for c in endpoint_calls(cls.data)}
+        cls.paths = [
+            calls[name][2] for name in (
+                "appointments_window", "appointments_page", "patients_search", "locations_list",
+                "schedule_settings_list",
+            )
+        ] + ["/api/patients/?page_size=50"]
+
+    def setUp(self):
+        super().setUp()
+        tenancy.clear_cache()
+        self.addCleanup(tenancy.clear_cache)
+
+    def headers(self, practice=None) -> dict:
+        headers = {"Authorization": f"Bearer {RefreshToken.for_user(self.data['user']).access_token}"}
+        if practice:
+            headers["X-Practice"] = practice
+        return headers
+
+    async def aget(self, path, **headers):
+        with override_settings(ROOT_URLCONF=__name__):
+            return await self.async_client.get(path, headers=headers)
+
+    async def test_async_lists_match_the_sync_viewsets(self):
+        for path in self.paths:
+            with self.subTest(path=path):
+                # Cold caches on both sides, so neither answers from the other's window.
+                await sync_to_async(cache.clear)()
+                sync_response = await sync_to_async(self.client.get)(path)
+                await sync_to_async(cache.clear)()
+                async_response = await self.aget(path, **self.headers())
+                self.assertEqual(async_response.status_code, 200)
+                self.assertEqual(async_response.json(), sync_response.json())
+
+    async def test_async_lists_reject_anonymous_and_foreign_practice_requests(self):
+        for path in self.paths:
+            with self.subTest(path=path):
+                self.assertEqual((await self.aget(path)).status_code, 401)
+                self.assertEqual((await self.aget(path, **self.headers("other"))).status_code, 403)
+                self.assertEqual((await self.aget(path, **self.headers("nope"))).status_code, 404)
+
+
+# -----------------------------
+# Read replicas
+# -----------------------------
+
+REPLICA_ALIAS = "replica_test"
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    PERF_SAMPLE_RATE=0,
+    QUERY_STATS_ENABLED=False,
+    REPORTING_ASYNC=False,
+    REPLICA_PIN_SECONDS=1,
+)
+class ReplicaRoutingTests(ApiScaleMixin, TestCase):
+    """
+    PrimaryReplicaRouter + ReplicaReadMixin against a second alias that mirrors
+    the test database. The mirror is its own connection outside the test's
+    transaction, so these tests look at where queries go, not what they return.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        replica = copy.deepcopy(connections["default"].settings_dict)
+        replica["TEST"]["MIRROR"] = "default"
+        # connections.settings is settings.DATABASES, so replica_aliases() sees it too.
+        connections.settings[REPLICA_ALIAS] = replica
+        # Set here, not on the class: the runner checks `databases` before the alias exists.
+        cls.databases = {"default", REPLICA_ALIAS}
+        cls.addClassCleanup(cls._remove_replica)
+        super().setUpClass()
+
+    @classmethod
+    def _remove_replica(cls):
+        connections[REPLICA_ALIAS].close()
+        # With DB_POOL the pool keeps its own sessions open on the test database.
+        connections[REPLICA_ALIAS].close_pool()
+        del connections[REPLICA_ALIAS]
+        del connections.settings[REPLICA_ALIAS]
+
+    def call_and_capture(self, method, path, payload=None):
+        with CaptureQueriesContext(connection) as primary, \
+                CaptureQueriesContext(connections[REPLICA_ALIAS]) as replica:
+            response = self.call(method, path, payload)
+        self.assertLess(response.status_code, 400, response.content[:300])
+        return [q["sql"] for q in primary.captured_queries], [q["sql"] for q in replica.captured_queries]
+
+    def test_safe_reads_use_the_replica(self):
+        self.assertEqual(db_routing.replica_aliases(), [REPLICA_ALIAS])
+        primary, replica = self.call_and_capture("get", "/api/patients/")
+        self.assertTrue(any("patients_patient" in sql for sql in replica))
+        self.assertFalse(any("patients_patient" in sql for sql in primary))
+        # The alias is reset with the response: code outside the view reads the primary.
+        self.assertIsNone(db_routing.PrimaryReplicaRouter().db_for_read(Patient))
+
+    def test_unsafe_methods_never_read_the_replica(self):
+        patient = self.data["patients"][0]
+        calls = [
+            ("post", "/api/patients/", {"first_name": "New", "last_name": "Row", "date_of_birth": "1990-01-01"}),
+            ("patch", f"/api/patients/{patient.pk}/", {"phone": "555-0100"}),
+            ("delete", f"/api/patients/{patient.pk}/", None),
+        ]
+        for method, path, payload in calls:
+            with self.subTest(method=method):
+                primary, replica = self.call_and_capture(method, path, payload)
+                self.assertEqual(replica, [])
+                self.assertTrue(primary)
+
+    def test_a_write_pins_the_user_to_the_primary_for_the_pin_window(self):
+        self.call_and_capture("post", "/api/patients/",
+                              {"first_name": "New", "last_name": "Row", "date_of_birth": "1990-01-01"})
+        self.assertTrue(db_routing.is_pinned(self.data["user"]))
+
+        primary, replica = self.call_and_capture("get", "/api/patients/")
+        self.assertEqual(replica, [])
+        self.assertTrue(any("patients_patient" in sql for sql in primary))
+
+        _time.sleep(settings.REPLICA_PIN_SECONDS + 0.1)
+        self.assertFalse(db_routing.is_pinned(self.data["user"]))
+        primary, replica = self.call_and_capture("get", "/api/patients/")
+        self.assertTrue(any("patients_patient" in sql for sql in replica))
@@ -6,24 +6,67 @@ from django.conf.urls.static import static
 from rest_framework import routers
 from patients.views import PatientViewSet
 from providers.views import ProviderViewSet
-from appointments.views import AppointmentViewSet
+from appointments.views import (
+    AppointmentImportViewSet,
+    AppointmentViewSet,
+    BlockTemplateViewSet,
+    CalendarFeedView,
+    CalendarFeedViewSet,
+)
 from schedule.urls import router as schedule_router
 from locations.urls import router as locations_router
+from waitlist.urls import router as waitlist_router
 from locations.views import BusinessSettingsView
+from core.views_audit import AuditLogViewSet
 from core.views_demo import DemoResetView
+from core.views_fhir import FhirExportFileView, FhirExportStatusView, FhirExportView
+from core.views_health import DatabaseHealthView
+from core.views_jobs import JobViewSet
+from core.views_metrics import MetricsView
+from appointments.views_async import AppointmentListAsyncView
+from patients.views_async import PatientListAsyncView
+from locations.views_async import LocationListAsyncView
+from schedule.views_async import ScheduleSettingsListAsyncView
+from reporting.views import UtilizationReportView
 
 router = routers.DefaultRouter()
 router.register(r"patients", PatientViewSet)
 router.register(r"providers", ProviderViewSet)
 router.register(r"appointments", AppointmentViewSet)
+router.register(r"block-templates", BlockTemplateViewSet)
+router.register(r"calendar-feeds", CalendarFeedViewSet)
+router.register(r"appointment-imports", AppointmentImportViewSet)
+router.register(r"audit", AuditLogViewSet)
+router.register(r"jobs", JobViewSet)
 router.registry.extend(schedule_router.registry)
 router.registry.extend(locations_router.registry)
+router.registry.extend(waitlist_router.registry)
+
+# Hot read endpoints served natively async (ASGI mode). Must precede the router:
+# they take over the list URLs and delegate non-GET methods to the ViewSets.
+async_read_patterns = []
+if settings.ASYNC_READ_VIEWS:
+    async_read_patterns = [
+        path("api/appointments/", AppointmentListAsyncView.as_view()),
+        path("api/patients/", PatientListAsyncView.as_view()),
+        path("api/locations/", LocationListAsyncView.as_view()),
+        path("api/schedule-settings/", ScheduleSettingsListAsyncView.as_view()),
+    ]
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    *async_read_patterns,
     path("api/", include(router.urls)),
     path("api/business/settings/", BusinessSettingsView.as_view(),
          name="business-settings"),
     path("api/demo/reset/", DemoResetView.as_view(), name="demo-reset"),     
+    path("api/health/db/", DatabaseHealthView.as_view(), name="health-db"),
+    path("api/feeds/<str:token>.ics", CalendarFeedView.as_view(), name="calendar-feed"),
+    path("api/fhir/$export", FhirExportView.as_view(), name="fhir-export"),
+    path("api/fhir/$export/<int:job_id>/", FhirExportStatusView.as_view(), name="fhir-export-status"),
+    path("api/fhir/$export/<int:job_id>/<str:resource_type>.ndjson", FhirExportFileView.as_view(),
+         name="fhir-export-file"),
+    path("api/reports/utilization/", UtilizationReportView.as_view(), name="report-utilization"),
+    path("metrics", MetricsView.as_view(), name="metrics"),
     path("api/auth/", include("authapp.urls")),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -0,0 +1,86 @@
+# backend/core/views_audit.py
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import permissions, viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+
+from . import tenancy
+from .models import AuditLog
+from .serializers import AuditLogSerializer
+
+
+class AuditLogPagination(CursorPagination):
+    """
+    Cursor pagination: no COUNT(*) over the whole (partitioned) log, and
+    pages stay stable while new events are appended.
+    """
+    ordering = ("-created_at", "-id")
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+
+def _parse_bound(name: str, value: str, end_of_day: bool = False) -> datetime:
+    try:
+        day = parse_date(value)
+        parsed = None if day else parse_datetime(value)
+    except ValueError:
+        day = parsed = None
+    if day is not None:
+        parsed = datetime.combine(day, time.max if end_of_day else time.min)
+    elif parsed is None:
+        raise ValidationError({name: "Expected an ISO date or datetime."})
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Admin-only audit trail.
+
+    Filters (all optional, combined with AND):
+      ?actor=<user id or username>
+      ?object_type=appointments.appointment&object_id=42
+      ?action=update
+      ?since=2025-01-01[T08:00:00]&until=2025-01-31   (until is inclusive for dates)
+
+    A time range lets PostgreSQL skip whole monthly partitions. Staff see
+    their practice's events; superusers see every practice's.
+    """
+    queryset = AuditLog.objects.all()
+    serializer_class = AuditLogSerializer
+    permission_classes = [permissions.IsAdminUser]
+    pagination_class = AuditLogPagination
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if not self.request.user.is_superuser:
+            qs = tenancy.scoped(qs, "practice")
+        params = self.request.query_params
+
+        actor = params.get("actor")
+        if actor:
+            qs = qs.filter(actor_id=int(actor)) if actor.isdigit() else qs.filter(actor_username=actor)
+
+        object_type = params.get("object_type")
+        if object_type:
+            qs = qs.filter(object_type=object_type.lower())
+        object_id = params.get("object_id")
+        if object_id:
+            qs = qs.filter(object_id=object_id)
+
+        action = params.get("action")
+        if action:
+            qs = qs.filter(action=action)
+
+        since = params.get("since")
+        if since:
+            qs = qs.filter(created_at__gte=_parse_bound("since", since))
+        until = params.get("until")
+        if until:
+            qs = qs.filter(created_at__lte=_parse_bound("until", until, end_of_day=True))
+        return qs
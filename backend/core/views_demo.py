@@ -4,8 +4,8 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 
-from .demo_reset import reset_and_seed_demo_data
-from .models import AuditLog
+from . import jobs, tenancy
+from .views_jobs import job_accepted
 
 
 class DemoResetView(APIView):
@@ -15,24 +15,13 @@ class DemoResetView(APIView):
         # Admin-only
         if not (request.user and request.user.is_authenticated and request.user.is_staff):
             return Response({"detail": "Admin only."}, status=status.HTTP_403_FORBIDDEN)
-
-        summary = reset_and_seed_demo_data()
-
-        try:
-            AuditLog.objects.create(
-                action="demo_reset",
-                actor=request.user,
-                metadata={
-                    "window_start": summary.get("window_start"),
-                    "window_end": summary.get("window_end"),
-                    "providers": summary.get("providers"),
-                    "patients": summary.get("patients"),
-                    "appointments": summary.get("appointments"),
-                    "blocks": summary.get("blocks"),
-                },
+        if tenancy.current_practice_id() != tenancy.default_practice_id():
+            return Response(
+                {"detail": "Demo data lives in the default practice only."},
+                status=status.HTTP_403_FORBIDDEN,
             )
-        except Exception:
-            # Audit logging should never break demo reset.
-            pass
 
-        return Response(summary, status=status.HTTP_200_OK)
+        # Runs in `manage.py run_jobs` (core/tasks.py); clicking again while a
+        # reset is still queued returns the same job.
+        job = jobs.enqueue("demo_reset", user=request.user, dedupe=True)
+        return job_accepted(request, job)
@@ -0,0 +1,130 @@
+# backend/core/views_fhir.py
+"""FHIR bulk export endpoints; the export itself is core/fhir.py."""
+import json
+
+from django.http import FileResponse, Http404
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import fhir, jobs, tenancy
+from .models import Job
+from .views_jobs import job_accepted
+
+
+class FhirJSONRenderer(JSONRenderer):
+    """Bulk data clients send Accept: application/fhir+json on kick-off."""
+    media_type = "application/fhir+json"
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Accept: application/fhir+ndjson on file downloads; renders error bodies as JSON."""
+    media_type = fhir.NDJSON
+    format = "ndjson"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return b"" if data is None else json.dumps(data).encode("utf-8")
+
+
+def _status_url(request, job_id: int) -> str:
+    return request.build_absolute_uri(reverse("fhir-export-status", args=[job_id]))
+
+
+def _export_job(request, job_id: int) -> Job:
+    qs = Job.objects.filter(kind=fhir.JOB_KIND, pk=job_id)
+    if not request.user.is_superuser:
+        qs = tenancy.scoped(qs, "practice")
+    job = qs.first()
+    if job is None:
+        raise Http404
+    return job
+
+
+def _outcome(message: str, http_status: int, code: str = "exception") -> Response:
+    return Response(
+        {"resourceType": "OperationOutcome", "issue": [{"severity": "error", "code": code, "diagnostics": message}]},
+        status=http_status,
+    )
+
+
+class FhirExportView(APIView):
+    """
+    Kick-off: GET (or POST) /api/fhir/$export?_type=...&_since=...
+    Answers 202 with the status URL in Content-Location (Bulk Data Access IG).
+    """
+    permission_classes = [IsAdminUser]
+    renderer_classes = [JSONRenderer, FhirJSONRenderer]
+
+    def get(self, request):
+        try:
+            payload = fhir.parse_request(request.query_params)
+        except fhir.ExportError as exc:
+            return _outcome(str(exc), status.HTTP_400_BAD_REQUEST, code="invalid")
+
+        payload["request"] = request.build_absolute_uri()
+        job = jobs.enqueue(fhir.JOB_KIND, payload, user=request.user)
+        response = job_accepted(request, job)
+        response["Content-Location"] = _status_url(request, job.pk)
+        return response
+
+    post = get
+
+
+class FhirExportStatusView(APIView):
+    """
+    GET: 202 with X-Progress while the job runs, then 200 with the manifest
+    (or 500 with an OperationOutcome). DELETE cancels it and removes its files.
+    """
+    permission_classes = [IsAdminUser]
+    renderer_classes = [JSONRenderer, FhirJSONRenderer]
+
+    def get(self, request, job_id):
+        job = _export_job(request, job_id)
+        if job.status in (Job.STATUS_QUEUED, Job.STATUS_RUNNING):
+            return Response(
+                status=status.HTTP_202_ACCEPTED,
+                headers={"X-Progress": f"{job.progress}% {job.progress_message}".strip(), "Retry-After": "5"},
+            )
+        if job.status == Job.STATUS_FAILED:
+            return _outcome(job.error or "Export failed.", status.HTTP_500_INTERNAL_SERVER_ERROR)
+        if job.status == Job.STATUS_CANCELLED:
+            raise Http404
+
+        manifest = dict(job.result)
+        manifest["output"] = [
+            {
+                "type": item["type"],
+                "url": request.build_absolute_uri(
+                    reverse("fhir-export-file", args=[job.pk, item["type"]])
+                ),
+                "count": item["count"],
+            }
+            for item in manifest["output"]
+        ]
+        return Response(manifest)
+
+    def delete(self, request, job_id):
+        job = _export_job(request, job_id)
+        jobs.cancel(job)
+        fhir.remove(job.pk)
+        return Response(status=status.HTTP_202_ACCEPTED)
+
+
+class FhirExportFileView(APIView):
+    """One NDJSON output file of a finished export."""
+    permission_classes = [IsAdminUser]
+    renderer_classes = [NDJSONRenderer, JSONRenderer]
+
+    def get(self, request, job_id, resource_type):
+        job = _export_job(request, job_id)
+        if job.status != Job.STATUS_SUCCEEDED or not any(
+            item["type"] == resource_type for item in job.result["output"]
+        ):
+            raise Http404
+        path = fhir.file_path(job.pk, resource_type)
+        if not path.exists():
+            raise Http404
+        return FileResponse(path.open("rb"), content_type=fhir.NDJSON)
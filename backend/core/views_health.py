@@ -0,0 +1,49 @@
+# backend/core/views_health.py
+import os
+import time
+
+from django.db import connections
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .db import pool_stats
+
+
+class DatabaseHealthView(APIView):
+    """
+    GET /api/health/db/
+
+    Per-alias round-trip time plus connection pool counters
+    (pool_size, pool_available, requests_waiting, connections_lost, ...).
+    Pools are per worker process, so the response includes the pid.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.is_staff:
+            return Response({"detail": "Admin only."}, status=status.HTTP_403_FORBIDDEN)
+
+        databases = {}
+        healthy = True
+        for alias in connections:
+            conn = connections[alias]
+            entry = {"vendor": conn.vendor}
+            started = time.perf_counter()
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                entry["ok"] = True
+            except Exception as exc:
+                entry["ok"] = False
+                entry["error"] = str(exc)
+                healthy = False
+            entry["ping_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            entry["pool"] = pool_stats(conn)
+            databases[alias] = entry
+
+        return Response(
+            {"pid": os.getpid(), "databases": databases},
+            status=status.HTTP_200_OK if healthy else status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
@@ -0,0 +1,66 @@
+# backend/core/views_jobs.py
+from django.urls import reverse
+from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+from . import jobs, tenancy
+from .models import Job
+from .serializers import JobSerializer
+
+
+def job_accepted(request, job) -> Response:
+    """202 response for a view that handed its work to a background job."""
+    url = request.build_absolute_uri(reverse("job-detail", args=[job.pk]))
+    return Response(
+        {"job_id": job.pk, "kind": job.kind, "status": job.status, "status_url": url},
+        status=status.HTTP_202_ACCEPTED,
+        headers={"Location": url},
+    )
+
+
+class JobPagination(CursorPagination):
+    ordering = ("-created_at", "-id")
+    page_size = 50
+
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Background job status and progress.
+
+    Users see the jobs they started; staff see all of their practice's.
+      ?kind=demo_reset  ?status=queued,running
+
+    Poll GET /api/jobs/<id>/ until status is succeeded, failed or cancelled;
+    `result` holds the job's output. POST /api/jobs/<id>/cancel/ cancels a
+    queued job, or asks a running one to stop at its next progress update.
+    """
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = JobPagination
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if not self.request.user.is_staff:
+            qs = qs.filter(created_by=self.request.user)
+        elif not self.request.user.is_superuser:
+            qs = tenancy.scoped(qs, "practice")
+
+        params = self.request.query_params
+        kind = params.get("kind")
+        if kind:
+            qs = qs.filter(kind=kind)
+        statuses = [s for s in params.get("status", "").split(",") if s]
+        if statuses:
+            qs = qs.filter(status__in=statuses)
+        return qs
+
+    @action(detail=True, methods=["post"])
+    def cancel(self, request, pk=None):
+        job = self.get_object()
+        if not jobs.cancel(job):
+            return Response({"detail": f"Job already {job.status}."}, status=status.HTTP_409_CONFLICT)
+        job.refresh_from_db()
+        return Response(self.get_serializer(job).data)
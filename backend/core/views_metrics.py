@@ -0,0 +1,44 @@
+# backend/core/views_metrics.py
+import hmac
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from rest_framework import authentication, permissions
+from rest_framework.views import APIView
+
+from . import metrics
+
+
+class MetricsTokenAuthentication(authentication.BaseAuthentication):
+    """
+    "Authorization: Bearer <METRICS_TOKEN>" for scrapers. Any other header
+    falls through to the regular JWT/session authentication.
+    """
+
+    def authenticate(self, request):
+        token = settings.METRICS_TOKEN
+        header = request.META.get("HTTP_AUTHORIZATION", "")
+        if not token or not header.startswith("Bearer "):
+            return None
+        if hmac.compare_digest(header[len("Bearer "):].strip(), token):
+            return AnonymousUser(), "metrics-token"
+        return None
+
+
+class IsStaffOrMetricsToken(permissions.BasePermission):
+    def has_permission(self, request, view):
+        if request.auth == "metrics-token":
+            return True
+        return bool(request.user and request.user.is_authenticated and request.user.is_staff)
+
+
+class MetricsView(APIView):
+    """
+    GET /metrics — Prometheus text exposition of every worker's metrics.
+    """
+    authentication_classes = [MetricsTokenAuthentication, *APIView.authentication_classes]
+    permission_classes = [IsStaffOrMetricsToken]
+
+    def get(self, request):
+        return HttpResponse(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
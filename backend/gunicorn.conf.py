@@ -0,0 +1,53 @@
+# backend/gunicorn.conf.py
+"""
+Gunicorn settings shared by WSGI and ASGI modes.
+
+    gunicorn -c gunicorn.conf.py                          # sync workers, core.wsgi
+    DJANGO_SERVER_MODE=asgi gunicorn -c gunicorn.conf.py  # uvicorn workers, core.asgi
+"""
+import multiprocessing
+import os
+
+SERVER_MODE = os.getenv("DJANGO_SERVER_MODE", "wsgi")
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+accesslog = os.getenv("GUNICORN_ACCESSLOG", "-")
+
+if SERVER_MODE == "asgi":
+    wsgi_app = "core.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+    # Each event-loop worker multiplexes many requests; one per core is enough.
+    workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count()))
+else:
+    wsgi_app = "core.wsgi:application"
+    worker_class = "sync"
+    workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+
+
+# /metrics merges per-worker snapshot files (core/metrics.py).
+# Both hooks only need settings, not the app registry.
+def on_starting(server):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    from core.metrics import clear_metrics_dir
+
+    clear_metrics_dir()
+
+
+def child_exit(server, worker):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    from core.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
+
+
+# Runs in the exiting worker (app loaded): write audit events it still
+# buffers (core/audit.py) and refresh rollups it still has marked dirty
+# (reporting/rollups.py).
+def worker_exit(server, worker):
+    from core.audit import buffer
+    from reporting import rollups
+
+    buffer.flush()
+    rollups.buffer.flush()
@@ -1,6 +1,6 @@
 # backend/locations/admin.py
 from django.contrib import admin
-from .models import BusinessSettings, Location, LocationHours
+from .models import BusinessSettings, Location, LocationHours, Room
 
 
 @admin.register(BusinessSettings)
@@ -13,12 +13,17 @@ class LocationHoursInline(admin.TabularInline):
     extra = 0
 
 
+class RoomInline(admin.TabularInline):
+    model = Room
+    extra = 0
+
+
 @admin.register(Location)
 class LocationAdmin(admin.ModelAdmin):
     list_display = ("id", "name", "slug", "is_active", "created_at", "updated_at")
     list_filter = ("is_active",)
     search_fields = ("name", "slug", "phone", "email")
-    inlines = [LocationHoursInline]
+    inlines = [LocationHoursInline, RoomInline]
 
 
 @admin.register(LocationHours)
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0003_alter_location_slug'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Room',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text="Room number or name, e.g. '2' or '309B'.", max_length=6)),
+                ('sort_order', models.PositiveSmallIntegerField(default=0)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rooms', to='locations.location')),
+            ],
+            options={
+                'ordering': ['location', 'sort_order', 'name'],
+                'constraints': [models.UniqueConstraint(fields=('location', 'name'), name='room_location_name_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:17
+
+import core.tenancy
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_practice'),
+        ('locations', '0004_room'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='businesssettings',
+            name='practice',
+            field=models.ForeignKey(default=core.tenancy.practice_for_new_rows, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.practice'),
+        ),
+        migrations.AddField(
+            model_name='location',
+            name='practice',
+            field=models.ForeignKey(db_index=False, default=core.tenancy.practice_for_new_rows, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.practice'),
+        ),
+        migrations.AlterField(
+            model_name='location',
+            name='slug',
+            field=models.SlugField(blank=True),
+        ),
+        migrations.AddConstraint(
+            model_name='location',
+            constraint=models.UniqueConstraint(fields=('practice', 'slug'), name='location_practice_slug_uniq'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:24
+
+import locations.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0005_practice'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='location',
+            name='timezone',
+            field=models.CharField(default='America/Chicago', help_text="IANA time zone of the location, e.g. 'America/New_York'.", max_length=64, validators=[locations.models.validate_timezone]),
+        ),
+    ]
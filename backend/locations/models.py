@@ -1,19 +1,33 @@
 # backend/locations/models.py
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
 from django.utils.text import slugify
 
+from core.tenancy import PracticeScopedManager, practice_for_new_rows
+
 
 class BusinessSettings(models.Model):
     """
-    Global business-level settings (singleton semantics).
-    We will always use the first row; you can enforce true singleton later if desired.
+    Business-level settings, one row per practice (singleton semantics within
+    the current practice; see core/tenancy.py).
     """
     name = models.CharField(max_length=255, blank=True, null=True)
     show_name_in_nav = models.BooleanField(default=True)
+    practice = models.ForeignKey(
+        "core.Practice", on_delete=models.CASCADE, related_name="+",
+        default=practice_for_new_rows,
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PracticeScopedManager()
+    all_objects = models.Manager()
+
     def __str__(self) -> str:
         return self.name or "Business Settings"
 
@@ -25,24 +39,51 @@ DEFAULT_DAY = {
 
 WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
 
+
+def validate_timezone(value: str) -> None:
+    try:
+        ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValidationError(f"Unknown time zone '{value}'.")
+
 class Location(models.Model):
     """
     A physical or logical practice location (what you currently call 'north'/'south' offices).
-    slug will act as the stable key used by scheduling & appointments.
+    slug will act as the stable key used by scheduling & appointments, unique
+    within the practice (scoped to the current one; see core/tenancy.py).
+
+    Appointment dates and times are wall-clock times in the location's
+    `timezone`; each appointment keeps a copy of it (Appointment.timezone) so
+    the database can derive its UTC instants.
     """
 
     name = models.CharField(max_length=255)
-    slug = models.SlugField(max_length=50, unique=True, blank=True)
+    slug = models.SlugField(max_length=50, blank=True)
+    practice = models.ForeignKey(
+        "core.Practice", on_delete=models.CASCADE, related_name="+",
+        default=practice_for_new_rows,
+        # Covered by location_practice_slug_uniq.
+        db_index=False,
+    )
 
     phone = models.CharField(max_length=50, blank=True, null=True)
     email = models.EmailField(blank=True, null=True)
     address = models.TextField(blank=True, null=True)
+    timezone = models.CharField(
+        max_length=64,
+        default=settings.TIME_ZONE,
+        validators=[validate_timezone],
+        help_text="IANA time zone of the location, e.g. 'America/New_York'.",
+    )
 
     is_active = models.BooleanField(default=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PracticeScopedManager()
+    all_objects = models.Manager()
+
     def ensure_default_hours(self):
         """
         Guarantee that the location has 7 LocationHours rows.
@@ -67,17 +108,47 @@ class Location(models.Model):
 
     class Meta:
         ordering = ["name"]
+        constraints = [
+            models.UniqueConstraint(fields=["practice", "slug"], name="location_practice_slug_uniq"),
+        ]
 
     def __str__(self) -> str:
         return self.name
 
+    @property
+    def tzinfo(self) -> ZoneInfo:
+        return ZoneInfo(self.timezone)
+
+    def localdate(self):
+        """Today at this location."""
+        return timezone.localdate(timezone=self.tzinfo)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # save() re-homes appointments only when this changes.
+        instance._loaded_timezone = instance.__dict__.get("timezone")
+        return instance
+
+    def _timezone_changed(self, update_fields) -> bool:
+        if update_fields is not None and "timezone" not in update_fields:
+            return False
+        # Not loaded from the database (or deferred): can't tell, so sync.
+        loaded = getattr(self, "_loaded_timezone", None)
+        return loaded is None or loaded != self.timezone
+
     def save(self, *args, **kwargs):
+        adding = self._state.adding
+        resync = not adding and self._timezone_changed(kwargs.get("update_fields"))
         if not self.slug and self.name:
             base = slugify(self.name) or "location"
             candidate = base
             idx = 1
 
-            while Location.objects.filter(slug=candidate).exclude(pk=self.pk).exists():
+            while (
+                Location.all_objects.filter(practice_id=self.practice_id, slug=candidate)
+                .exclude(pk=self.pk).exists()
+            ):
                 idx += 1
                 candidate = f"{base}-{idx}"
 
@@ -88,6 +159,29 @@ class Location(models.Model):
         # After saving, ensure hours exist (idempotent)
         self.ensure_default_hours()
 
+        if resync:
+            self._sync_appointment_timezones()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "timezone" in update_fields:
+            self._loaded_timezone = self.timezone
+
+    def _sync_appointment_timezones(self):
+        """
+        Re-home existing appointments after a time zone change: their wall-clock
+        times stay, their UTC instants (generated from Appointment.timezone) move.
+        """
+        # Lazy import: appointments depends on locations.
+        from appointments.models import Appointment
+        from appointments.signals import notify_appointments_changed
+
+        moved = (
+            Appointment.all_objects.filter(location=self)
+            .exclude(timezone=self.timezone)
+            .update(timezone=self.timezone, updated_at=timezone.now())
+        )
+        if moved:
+            notify_appointments_changed(None)
+
 
 class LocationHours(models.Model):
     """
@@ -121,3 +215,34 @@ class LocationHours(models.Model):
 
     def __str__(self) -> str:
         return f"{self.location.slug} {self.weekday} ({'open' if self.open else 'closed'})"
+
+
+class Room(models.Model):
+    """
+    An exam / treatment room at a location.
+
+    An appointment in status 'in_room' occupies one (Appointment.assigned_room);
+    Appointment.room keeps the room's name for display. See appointments/rooms.py.
+    """
+
+    location = models.ForeignKey(
+        Location,
+        related_name="rooms",
+        on_delete=models.CASCADE,
+    )
+    # Same length as Appointment.room, which mirrors it.
+    name = models.CharField(max_length=6, help_text="Room number or name, e.g. '2' or '309B'.")
+    sort_order = models.PositiveSmallIntegerField(default=0)
+    is_active = models.BooleanField(default=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["location", "sort_order", "name"]
+        constraints = [
+            models.UniqueConstraint(fields=["location", "name"], name="room_location_name_uniq"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.location.slug} room {self.name}"
@@ -1,9 +1,10 @@
 # backend/locations/serializers.py
 from rest_framework import serializers
-from .models import BusinessSettings, Location, LocationHours
+from .models import BusinessSettings, Location, LocationHours, Room
+from core.perf import TimedSerializerMixin
 
 
-class BusinessSettingsSerializer(serializers.ModelSerializer):
+class BusinessSettingsSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = BusinessSettings
         fields = [
@@ -13,7 +14,7 @@ class BusinessSettingsSerializer(serializers.ModelSerializer):
         ]
 
 
-class LocationHoursSerializer(serializers.ModelSerializer):
+class LocationHoursSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = LocationHours
         fields = ["weekday", "open", "start", "end"]
@@ -26,7 +27,7 @@ class LocationHoursSerializer(serializers.ModelSerializer):
         return data
 
 
-class LocationSerializer(serializers.ModelSerializer):
+class LocationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     hours = LocationHoursSerializer(many=True, read_only=True)
 
     class Meta:
@@ -38,9 +39,44 @@ class LocationSerializer(serializers.ModelSerializer):
             "phone",
             "email",
             "address",
+            "timezone",
             "is_active",
             "hours",
         ]
         extra_kwargs = {
             "slug": {"required": False, "allow_blank": True},
         }
+
+    def validate_slug(self, value):
+        # Unique per practice (Location.objects is scoped to the current one);
+        # a blank slug is generated from the name on save.
+        if value:
+            clash = Location.objects.filter(slug=value)
+            if self.instance:
+                clash = clash.exclude(pk=self.instance.pk)
+            if clash.exists():
+                raise serializers.ValidationError("A location with this slug already exists.")
+        return value
+
+
+class RoomSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Room
+        fields = ["id", "location", "name", "sort_order", "is_active", "created_at", "updated_at"]
+        read_only_fields = ["id", "created_at", "updated_at"]
+
+    def validate_name(self, value):
+        value = value.strip()
+        if not value:
+            raise serializers.ValidationError("Room name is required.")
+        return value
+
+    def validate(self, data):
+        location = data.get("location", self.instance.location if self.instance else None)
+        name = data.get("name", self.instance.name if self.instance else "")
+        clash = Room.objects.filter(location=location, name__iexact=name)
+        if self.instance:
+            clash = clash.exclude(pk=self.instance.pk)
+        if clash.exists():
+            raise serializers.ValidationError({"name": f"Room '{name}' already exists at this location."})
+        return data
@@ -1,7 +1,8 @@
 # backend/locations/urls.py
 
 from rest_framework import routers
-from .views import LocationViewSet
+from .views import LocationViewSet, RoomViewSet
 
 router = routers.DefaultRouter()
 router.register(r"locations", LocationViewSet, basename="location")
+router.register(r"rooms", RoomViewSet, basename="room")
@@ -1,13 +1,17 @@
 # backend/locations/views.py
+from django.db import transaction
 from rest_framework import viewsets, generics, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from .models import BusinessSettings, Location, LocationHours
+from core import tenancy
+
+from .models import BusinessSettings, Location, LocationHours, Room
 from .serializers import (
     BusinessSettingsSerializer,
     LocationSerializer,
     LocationHoursSerializer,
+    RoomSerializer,
 )
 
 
@@ -25,7 +29,7 @@ class IsAdminOrReadOnly(permissions.BasePermission):
 
 class BusinessSettingsView(generics.RetrieveUpdateAPIView):
     """
-    Singleton-style endpoint for BusinessSettings.
+    Singleton-style endpoint for the current practice's BusinessSettings.
 
     GET   /api/business/settings/
     PATCH /api/business/settings/
@@ -35,11 +39,13 @@ class BusinessSettingsView(generics.RetrieveUpdateAPIView):
     permission_classes = [permissions.IsAuthenticated, IsAdminOrReadOnly]
 
     def get_object(self):
-        obj, _ = BusinessSettings.objects.get_or_create(pk=1)
+        obj = BusinessSettings.objects.order_by("pk").first()
+        if obj is None:
+            obj = BusinessSettings.objects.create()
         return obj
 
 
-class LocationViewSet(viewsets.ModelViewSet):
+class LocationViewSet(tenancy.PracticeScopedViewMixin, viewsets.ModelViewSet):
     """
     CRUD for locations.
 
@@ -52,9 +58,10 @@ class LocationViewSet(viewsets.ModelViewSet):
     Plus:
 
     - PATCH  /api/locations/{id}/hours/   (bulk-update hours for a location)
+    - GET    /api/locations/{id}/board/   (today's room occupancy, cached; ETag)
     """
 
-    queryset = Location.objects.all().order_by("name")
+    queryset = Location.objects.prefetch_related("hours").order_by("name")
     serializer_class = LocationSerializer
     permission_classes = [permissions.IsAuthenticated, IsAdminOrReadOnly]
 
@@ -84,21 +91,25 @@ class LocationViewSet(viewsets.ModelViewSet):
         serializer = LocationHoursSerializer(data=hours_data, many=True)
         serializer.is_valid(raise_exception=True)
 
-        # Upsert each weekday
-        seen_weekdays = set()
-        for item in serializer.validated_data:
-            weekday = item["weekday"]
-            seen_weekdays.add(weekday)
-
-            LocationHours.objects.update_or_create(
-                location=location,
-                weekday=weekday,
-                defaults={
-                    "open": item["open"],
-                    "start": item["start"],
-                    "end": item["end"],
-                },
-            )
+        # Upsert each weekday (last entry wins): one read, one bulk UPDATE,
+        # one bulk INSERT, instead of a SELECT + UPDATE per weekday.
+        wanted = {item["weekday"]: item for item in serializer.validated_data}
+        existing = {h.weekday: h for h in LocationHours.objects.filter(location=location)}
+
+        to_update, to_create = [], []
+        for weekday, item in wanted.items():
+            row = existing.get(weekday)
+            if row is None:
+                to_create.append(LocationHours(location=location, **item))
+                continue
+            row.open, row.start, row.end = item["open"], item["start"], item["end"]
+            to_update.append(row)
+
+        with transaction.atomic():
+            if to_update:
+                LocationHours.objects.bulk_update(to_update, ["open", "start", "end"])
+            if to_create:
+                LocationHours.objects.bulk_create(to_create)
 
         # Optional: you could enforce that all 7 weekdays are present.
         # For now we allow partial updates; missing days keep existing values.
@@ -106,6 +117,40 @@ class LocationViewSet(viewsets.ModelViewSet):
         location.refresh_from_db()
         return Response(LocationSerializer(location).data)
 
+    @action(detail=True, methods=["get"], url_path="board")
+    def board(self, request, pk=None):
+        """
+        Live room board: every active room with the patient in it, if any.
+
+        Served from a snapshot cached per location version (no get_object():
+        a cached refresh runs no SQL); a matching If-None-Match gets a 304.
+        """
+        # Lazy import to avoid circular dependencies.
+        from appointments import rooms
+
+        try:
+            location_id = int(pk)
+        except (TypeError, ValueError):
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        version = rooms.board_version(location_id)
+        etag = f'"{version}"'
+        if etag in request.headers.get("If-None-Match", ""):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        board = rooms.get_board(location_id, version)
+        if board is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(board, headers={"ETag": etag})
+
+    def perform_update(self, serializer):
+        # Lazy import to avoid circular dependencies.
+        from appointments import rooms
+
+        instance = serializer.save()
+        # The room board shows the location and is dated in its time zone.
+        rooms.notify_changed([instance.pk])
+
     def destroy(self, request, *args, **kwargs):
         """
         Prevent deletion if any Appointment rows still reference this location's slug.
@@ -128,3 +173,48 @@ class LocationViewSet(viewsets.ModelViewSet):
             )
 
         return super().destroy(request, *args, **kwargs)
+
+
+class RoomViewSet(tenancy.PracticeScopedViewMixin, viewsets.ModelViewSet):
+    """
+    CRUD for the rooms of a location.
+
+    - GET    /api/rooms/?location=<id>
+    - POST   /api/rooms/
+    - PATCH  /api/rooms/{id}/
+    - DELETE /api/rooms/{id}/
+
+    Deactivate (is_active=false) rather than delete a room that has history;
+    deleting only clears Appointment.assigned_room, the name stays.
+    """
+
+    queryset = Room.objects.all()
+    practice_field = "location__practice"
+    serializer_class = RoomSerializer
+    permission_classes = [permissions.IsAuthenticated, IsAdminOrReadOnly]
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        location = self.request.query_params.get("location")
+        if location:
+            qs = qs.filter(location_id=location) if location.isdigit() else qs.filter(location__slug=location)
+        return qs
+
+    def _changed(self, *location_ids):
+        from appointments import rooms
+
+        rooms.notify_changed(location_ids)
+
+    def perform_create(self, serializer):
+        room = serializer.save()
+        self._changed(room.location_id)
+
+    def perform_update(self, serializer):
+        before = serializer.instance.location_id
+        room = serializer.save()
+        self._changed(before, room.location_id)
+
+    def perform_destroy(self, instance):
+        location_id = instance.location_id
+        instance.delete()
+        self._changed(location_id)
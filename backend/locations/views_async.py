@@ -0,0 +1,11 @@
+# backend/locations/views_async.py
+from core.async_api import AsyncListView
+
+from .views import LocationViewSet
+
+
+class LocationListAsyncView(AsyncListView):
+    """
+    Async GET /api/locations/.
+    """
+    viewset_class = LocationViewSet
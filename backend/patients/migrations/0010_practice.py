@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:17
+
+import core.tenancy
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_practice'),
+        ('patients', '0009_alter_patient_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patient',
+            name='practice',
+            field=models.ForeignKey(db_index=False, default=core.tenancy.practice_for_new_rows, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.practice'),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['practice', 'last_name', 'first_name'], name='patient_practice_name_idx'),
+        ),
+    ]
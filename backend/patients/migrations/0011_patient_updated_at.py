@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0010_practice'),
+    ]
+
+    operations = [
+        # Existing rows count as updated now, so the first incremental
+        # export after this migration includes them.
+        migrations.AddField(
+            model_name='patient',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['practice', 'updated_at'], name='patient_practice_updated_idx'),
+        ),
+    ]
@@ -1,12 +1,15 @@
 import uuid
 from django.db import models
 
+from core.tenancy import PracticeScopedManager, practice_for_new_rows
+
 
 def generate_prn():
     return str(uuid.uuid4())[:8].upper()
 
 
 class Patient(models.Model):
+    """Scoped to the current practice (core/tenancy.py); see all_objects."""
     GENDER_CHOICES = [
         ("Male", "Male"),
         ("Female", "Female"),
@@ -25,9 +28,26 @@ class Patient(models.Model):
     phone = models.CharField(max_length=20, blank=True, null=True)
     address = models.TextField(blank=True, null=True)
     prn = models.CharField(max_length=8, unique=True, default=generate_prn, editable=False)
+    practice = models.ForeignKey(
+        "core.Practice", on_delete=models.CASCADE, related_name="+",
+        default=practice_for_new_rows,
+        # Covered by patient_practice_name_idx.
+        db_index=False,
+    )
+    # Incremental FHIR exports (core/fhir.py, _since).
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = PracticeScopedManager()
+    all_objects = models.Manager()
 
     class Meta:
         ordering = ["last_name", "first_name"]
+        indexes = [
+            # Patient lists and name search within a practice.
+            models.Index(fields=["practice", "last_name", "first_name"], name="patient_practice_name_idx"),
+            # FHIR _since exports of a practice.
+            models.Index(fields=["practice", "updated_at"], name="patient_practice_updated_idx"),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.prn})"
@@ -1,8 +1,9 @@
 # patients/serializers.py
 from rest_framework import serializers
 from .models import Patient
+from core.perf import TimedSerializerMixin
 
-class PatientSerializer(serializers.ModelSerializer):
+class PatientSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     full_name = serializers.SerializerMethodField()
 
     class Meta:
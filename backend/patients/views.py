@@ -1,10 +1,22 @@
 # patients/views.py
+from django.utils import timezone
 from rest_framework import viewsets, filters
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import Patient
 from .serializers import PatientSerializer
+from appointments import history, rooms
+from appointments import cache as window_cache
+from appointments.signals import notify_appointments_changed
+from appointments.serializers import PatientAppointmentSerializer
+from core import audit
+from core.tenancy import PracticeScopedViewMixin
+from core.db_routing import ReplicaReadMixin
 
-class PatientViewSet(viewsets.ModelViewSet):
+class PatientViewSet(PracticeScopedViewMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     """
     Provides CRUD and search for patients.
     Used by predictive search bar in appointment creation.
@@ -17,3 +29,63 @@ class PatientViewSet(viewsets.ModelViewSet):
     search_fields = ["^first_name", "^last_name", "prn", "date_of_birth"]
     ordering_fields = ["last_name", "first_name", "date_of_birth"]
     ordering = ["last_name"]
+
+    HISTORY_PAGE_SIZE = 20
+    HISTORY_MAX_PAGE_SIZE = 100
+
+    @action(detail=True, methods=["get"])
+    def appointments(self, request, pk=None):
+        """
+        The patient's upcoming and past appointments with visit counts
+        (appointments/history.py). ?when=upcoming|past&cursor= pages one list.
+        """
+        patient = self.get_object()
+        params = request.query_params
+        when = params.get("when")
+        if when not in (None, history.UPCOMING, history.PAST):
+            raise ValidationError({"when": "Use 'upcoming' or 'past'."})
+        if params.get("cursor") and when is None:
+            raise ValidationError({"cursor": "A cursor needs 'when'."})
+        try:
+            size = min(int(params.get("page_size", self.HISTORY_PAGE_SIZE)), self.HISTORY_MAX_PAGE_SIZE)
+        except ValueError:
+            raise ValidationError({"page_size": "Must be a number."})
+        size = max(size, 1)
+
+        now = timezone.now()
+        data = {"patient": patient.pk, "today": timezone.localdate(now).isoformat()}
+        if when is None:
+            data["summary"] = history.summary(patient.pk, now)
+        for which in [when] if when else [history.UPCOMING, history.PAST]:
+            try:
+                rows, cursor = history.page(patient, which, now, size, params.get("cursor"))
+            except history.CursorError as exc:
+                raise ValidationError({"cursor": str(exc)})
+            next_url = None
+            if cursor:
+                next_url = replace_query_param(request.build_absolute_uri(), "when", which)
+                next_url = replace_query_param(next_url, "cursor", cursor)
+            data[which] = {
+                "results": PatientAppointmentSerializer(rows, many=True, context={"request": request}).data,
+                "next": next_url,
+            }
+        return Response(data)
+
+    def perform_create(self, serializer):
+        instance = serializer.save()
+        audit.created(self.request, instance)
+
+    def perform_update(self, serializer):
+        old_values = audit.snapshot(serializer.instance)
+        instance = serializer.save()
+        audit.updated(self.request, instance, old_values)
+        window_cache.patient_changed(instance, audit.diff(old_values, audit.snapshot(instance)))
+
+    def perform_destroy(self, instance):
+        # The patient's appointments go with it (CASCADE).
+        scopes = window_cache.appointment_scopes(patient_id=instance.pk)
+        boards = window_cache.occupied_locations(patient_id=instance.pk)
+        audit.deleted(self.request, instance)
+        instance.delete()
+        notify_appointments_changed(scopes)
+        rooms.notify_changed(boards)
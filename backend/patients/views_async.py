@@ -0,0 +1,11 @@
+# patients/views_async.py
+from core.async_api import AsyncListView
+
+from .views import PatientViewSet
+
+
+class PatientListAsyncView(AsyncListView):
+    """
+    Async GET /api/patients/ (predictive search / typeahead).
+    """
+    viewset_class = PatientViewSet
@@ -15,6 +15,7 @@ class ProviderAdmin(admin.ModelAdmin):
     )
     search_fields = ("first_name", "last_name", "email", "specialty")
     readonly_fields = ("created_at", "user_link")
+    filter_horizontal = ("locations",)
 
     def display_name(self, obj):
         return f"{obj.first_name} {obj.last_name}"
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:17
+
+import core.tenancy
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_practice'),
+        ('providers', '0002_provider_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='provider',
+            name='practice',
+            field=models.ForeignKey(db_index=False, default=core.tenancy.practice_for_new_rows, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.practice'),
+        ),
+        migrations.AlterField(
+            model_name='provider',
+            name='email',
+            field=models.EmailField(max_length=254),
+        ),
+        migrations.AddConstraint(
+            model_name='provider',
+            constraint=models.UniqueConstraint(fields=('practice', 'email'), name='provider_practice_email_uniq'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0006_location_timezone'),
+        ('providers', '0004_provider_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='provider',
+            name='locations',
+            field=models.ManyToManyField(blank=True, related_name='providers', to='locations.location'),
+        ),
+    ]
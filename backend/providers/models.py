@@ -2,16 +2,41 @@ from django.db import models
 from django.contrib.auth.models import User
 import random
 
+from core.tenancy import PracticeScopedManager, practice_for_new_rows
+
 
 class Provider(models.Model):
+    """
+    Scoped to the current practice (core/tenancy.py); see all_objects.
+    The linked user belongs to the same practice.
+    """
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="provider_profile", null=True, blank=True)
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
     specialty = models.CharField(max_length=100, blank=True, null=True)
-    email = models.EmailField(unique=True)
+    email = models.EmailField()
     phone = models.CharField(max_length=20, blank=True, null=True)
     profile_picture = models.ImageField(upload_to="providers/", blank=True, null=True)
+    # Where the provider sees patients, during those locations' hours
+    # (locations.LocationHours); empty for every location.
+    locations = models.ManyToManyField("locations.Location", blank=True, related_name="providers")
     created_at = models.DateTimeField(auto_now_add=True)
+    # Incremental FHIR exports (core/fhir.py, _since).
+    updated_at = models.DateTimeField(auto_now=True)
+    practice = models.ForeignKey(
+        "core.Practice", on_delete=models.CASCADE, related_name="+",
+        default=practice_for_new_rows,
+        # Covered by provider_practice_email_uniq.
+        db_index=False,
+    )
+
+    objects = PracticeScopedManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["practice", "email"], name="provider_practice_email_uniq"),
+        ]
 
     def save(self, *args, **kwargs):
         if self.user and not self.user.username:
@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import Provider
 from authapp.validators import validate_password_strength
+from core.perf import TimedSerializerMixin
 
 
 def generate_unique_username(first_name: str, last_name: str) -> str:
@@ -18,7 +19,7 @@ def generate_unique_username(first_name: str, last_name: str) -> str:
     return username
 
 
-class ProviderSerializer(serializers.ModelSerializer):
+class ProviderSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     username = serializers.CharField(read_only=True)
     password = serializers.CharField(write_only=True, required=False, min_length=8)
     confirm_password = serializers.CharField(write_only=True, required=False)
@@ -36,6 +37,7 @@ class ProviderSerializer(serializers.ModelSerializer):
             "email",
             "phone",
             "profile_picture",
+            "locations",
             "username",
             "password",
             "confirm_password",
@@ -57,6 +59,15 @@ class ProviderSerializer(serializers.ModelSerializer):
             return False
         return obj.user.is_staff or obj.user.is_superuser
 
+    def validate_email(self, value):
+        # Unique per practice (Provider.objects is scoped to the current one).
+        clash = Provider.objects.filter(email__iexact=value)
+        if self.instance:
+            clash = clash.exclude(pk=self.instance.pk)
+        if clash.exists():
+            raise serializers.ValidationError("A provider with this email already exists.")
+        return value
+
     def validate(self, data):
         """
         Enforce password match and strength only if password provided.
@@ -83,6 +94,7 @@ class ProviderSerializer(serializers.ModelSerializer):
         """
         password = validated_data.pop("password", None)
         validated_data.pop("confirm_password", None)
+        locations = validated_data.pop("locations", None)
 
         first_name = validated_data.get("first_name")
         last_name = validated_data.get("last_name")
@@ -101,6 +113,8 @@ class ProviderSerializer(serializers.ModelSerializer):
         )
 
         provider = Provider.objects.create(user=user, **validated_data)
+        if locations:
+            provider.locations.set(locations)
         return provider
 
     def update(self, instance, validated_data):
@@ -110,11 +124,14 @@ class ProviderSerializer(serializers.ModelSerializer):
         """
         password = validated_data.pop("password", None)
         validated_data.pop("confirm_password", None)
+        locations = validated_data.pop("locations", None)
 
         # Update Provider model fields
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
+        if locations is not None:
+            instance.locations.set(locations)
 
         # Update linked User info
         user = instance.user
@@ -1,10 +1,13 @@
-from rest_framework import viewsets, filters
+from rest_framework import viewsets, filters, status
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
-from .permissions import IsAdminOrReadOnly
-from .models import Provider
-from .serializers import ProviderSerializer
-
+from rest_framework.response import Response
+from appointments import blocks, feeds, rooms
+from appointments import cache as window_cache
+from appointments.signals import notify_appointments_changed
+from django.db import transaction
+from core.db_routing import ReplicaReadMixin
+from core.tenancy import PracticeScopedViewMixin
 from .permissions import IsAdminOrReadOnly
 from .models import Provider
 from .serializers import ProviderSerializer
@@ -19,12 +22,13 @@ PROTECTED_PROVIDER_EMAILS = {
     "clay.adminton@example.test",
 }
 
-class ProviderViewSet(viewsets.ModelViewSet):
+class ProviderViewSet(PracticeScopedViewMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     """
     Provides list, create, retrieve, update, and delete endpoints for Providers.
     Supports search and ordering on key fields.
     """
-    queryset = Provider.objects.all().order_by('last_name')
+    # is_staff / is_superuser / is_admin come from the linked user.
+    queryset = Provider.objects.select_related('user').prefetch_related('locations').order_by('last_name')
     serializer_class = ProviderSerializer
     permission_classes = [IsAuthenticated, IsAdminOrReadOnly]
     pagination_class = ProviderPagination
@@ -42,4 +46,21 @@ class ProviderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        return super().destroy(request, *args, **kwargs)
\ No newline at end of file
+        return super().destroy(request, *args, **kwargs)
+
+    def perform_update(self, serializer):
+        before = {f: getattr(serializer.instance, f) for f in window_cache.PROVIDER_FIELDS}
+        instance = serializer.save()
+        window_cache.provider_changed(instance, [f for f, v in before.items() if getattr(instance, f) != v])
+
+    def perform_destroy(self, instance):
+        # Appointments, block templates and calendar feeds go with it (CASCADE).
+        scopes = window_cache.appointment_scopes(provider_id=instance.pk)
+        boards = window_cache.occupied_locations(provider_id=instance.pk)
+        templates = list(instance.block_templates.all())
+        tokens = list(instance.calendar_feeds.values_list("token", flat=True))
+        instance.delete()
+        notify_appointments_changed(scopes)
+        blocks.template_changed(*templates)
+        rooms.notify_changed(boards)
+        transaction.on_commit(lambda: feeds.forget(*tokens))
\ No newline at end of file
@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from .models import Reminder, ReminderCursor
+
+
+@admin.register(Reminder)
+class ReminderAdmin(admin.ModelAdmin):
+    list_display = ("id", "appointment", "offset_minutes", "due_at", "status", "attempts", "sent_at", "recipient")
+    list_filter = ("status", "offset_minutes")
+    search_fields = ("recipient", "appointment__id")
+    raw_id_fields = ("appointment",)
+    date_hierarchy = "due_at"
+    show_full_result_count = False
+
+
+@admin.register(ReminderCursor)
+class ReminderCursorAdmin(admin.ModelAdmin):
+    list_display = ("offset_minutes", "scanned_until", "scanned_at")
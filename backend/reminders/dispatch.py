@@ -0,0 +1,311 @@
+# backend/reminders/dispatch.py
+"""
+Appointment reminder dispatch: `python manage.py send_reminders`.
+
+Each tick does three things, each safe to run from any number of processes:
+
+1. Schedule. For every offset in REMINDER_OFFSETS (minutes before start), a
+   cursor remembers how far ahead reminder rows already exist. The scan
+   inserts rows for appointments whose start_utc falls between the cursor
+   and now + offset (+ REMINDER_LOOKAHEAD), as one
+   INSERT ... SELECT ... ON CONFLICT DO NOTHING driven by the partial index on
+   appointments(start_utc). Appointments booked or moved into the already
+   scanned range are picked up through the updated_at index. The cursor row
+   is taken with SKIP LOCKED, so one process scans each offset at a time.
+   Work per tick is proportional to the appointments entering the window,
+   never to the size of the table.
+
+2. Claim. Due pending rows are marked "sending" in batches of
+   REMINDER_BATCH_SIZE with SELECT ... FOR UPDATE SKIP LOCKED. A reminder
+   belongs to exactly one dispatcher. Claims older than REMINDER_CLAIM_TIMEOUT
+   (dispatcher killed mid-batch) are released again. Delivery is
+   at-least-once only in that case.
+
+3. Send. A batch is loaded with its appointments, patients, providers and
+   locations in one query and re-checked. Cancelled or started appointments
+   are skipped. Moved ones are rescheduled. The rest are rendered from
+   REMINDER_MESSAGE_TEMPLATE and handed to the transport in one call. The
+   outcomes are written back with one bulk_update.
+
+Block times, appointments without a patient or start time, and cancelled
+appointments never get reminders. Recurring series get one for the stored
+(first) occurrence only.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import List, Optional
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from appointments.models import Appointment
+from core import metrics
+
+from .models import Reminder, ReminderCursor
+from .transports import BaseTransport, ReminderMessage, get_transport
+
+
+logger = logging.getLogger("reminders")
+
+EXCLUDED_STATUSES = ("cancelled",)
+
+# _check() result for a reminder whose appointment moved later.
+_NOT_DUE = object()
+
+
+def eligible() -> Q:
+    """Appointments that get reminders (matches the appt_start_utc_idx predicate)."""
+    return (
+        Q(is_block=False, patient__isnull=False, start_utc__isnull=False)
+        & ~Q(status__in=EXCLUDED_STATUSES)
+    )
+
+
+def offsets() -> List[int]:
+    return sorted(set(settings.REMINDER_OFFSETS), reverse=True)
+
+
+@dataclass
+class DispatchStats:
+    scheduled: int = 0
+    sent: int = 0
+    failed: int = 0
+    skipped: int = 0
+    rescheduled: int = 0
+    released: int = 0
+    batches: int = 0
+    by_offset: dict = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        return {k: v for k, v in self.__dict__.items() if k != "by_offset"}
+
+
+# -----------------------------
+# 1. Schedule
+# -----------------------------
+
+def _insert_reminders(offset: int, window: Q) -> int:
+    """Create missing reminder rows for eligible appointments in `window`; returns rows inserted."""
+    select = (
+        Appointment.objects.filter(eligible() & window)
+        .order_by()
+        .values_list("id", "start_utc")
+    )
+    select_sql, params = select.query.sql_with_params()
+    table = connection.ops.quote_name(Reminder._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (appointment_id, offset_minutes, due_at) "
+            f"SELECT s.id, %s, s.start_utc - make_interval(mins => %s) FROM ({select_sql}) AS s "
+            f"ON CONFLICT (appointment_id, offset_minutes) DO NOTHING",
+            (offset, offset, *params),
+        )
+        return cursor.rowcount
+
+
+def schedule(now=None) -> dict:
+    """Materialize reminder rows for appointments entering each offset's window."""
+    now = now or timezone.now()
+    lookahead = timedelta(seconds=settings.REMINDER_LOOKAHEAD)
+    slack = timedelta(seconds=settings.REMINDER_CLAIM_TIMEOUT)
+    created = {}
+    ordered = offsets()
+    for i, offset in enumerate(ordered):
+        lead = timedelta(minutes=offset)
+        # Late bookings inside a shorter offset's window get only that reminder.
+        shorter = ordered[i + 1] if i + 1 < len(ordered) else None
+        with transaction.atomic():
+            ReminderCursor.objects.get_or_create(
+                offset_minutes=offset,
+                # Start with appointments entering the window from now on.
+                defaults={"scanned_until": now + lead, "scanned_at": now},
+            )
+            cursor = (
+                ReminderCursor.objects.select_for_update(skip_locked=True)
+                .filter(offset_minutes=offset).first()
+            )
+            if cursor is None:
+                continue  # another dispatcher is scanning this offset
+            horizon = now + lead + lookahead
+            inserted = 0
+            if horizon > cursor.scanned_until:
+                inserted += _insert_reminders(
+                    offset, Q(start_utc__gt=cursor.scanned_until, start_utc__lte=horizon),
+                )
+            # Booked or moved into the range scanned earlier.
+            late = Q(
+                updated_at__gte=cursor.scanned_at - slack,
+                start_utc__gt=now if shorter is None else now + timedelta(minutes=shorter),
+                start_utc__lte=min(cursor.scanned_until, horizon),
+            )
+            inserted += _insert_reminders(offset, late)
+            cursor.scanned_until = max(cursor.scanned_until, horizon)
+            cursor.scanned_at = now
+            cursor.save(update_fields=["scanned_until", "scanned_at"])
+        created[offset] = inserted
+    return created
+
+
+# -----------------------------
+# 2. Claim
+# -----------------------------
+
+def release_stale_claims(now=None) -> int:
+    now = now or timezone.now()
+    cutoff = now - timedelta(seconds=settings.REMINDER_CLAIM_TIMEOUT)
+    return Reminder.objects.filter(status=Reminder.STATUS_SENDING, claimed_at__lt=cutoff).update(
+        status=Reminder.STATUS_PENDING, claimed_at=None,
+    )
+
+
+def claim_batch(size: Optional[int] = None, now=None) -> List[Reminder]:
+    """Mark up to `size` due reminders as sending and return them with their appointments."""
+    now = now or timezone.now()
+    size = size or settings.REMINDER_BATCH_SIZE
+    with transaction.atomic():
+        ids = list(
+            Reminder.objects.select_for_update(skip_locked=True)
+            .filter(status=Reminder.STATUS_PENDING, due_at__lte=now)
+            .order_by("due_at", "id")
+            .values_list("id", flat=True)[:size]
+        )
+        if not ids:
+            return []
+        Reminder.objects.filter(id__in=ids).update(
+            status=Reminder.STATUS_SENDING, claimed_at=now, attempts=F("attempts") + 1,
+        )
+    return list(
+        Reminder.objects.filter(id__in=ids)
+        .select_related("appointment__patient", "appointment__provider", "appointment__location")
+        .order_by("due_at", "id")
+    )
+
+
+# -----------------------------
+# 3. Send
+# -----------------------------
+
+def _recipient(patient) -> str:
+    if settings.REMINDER_CHANNEL == "email":
+        return patient.email or ""
+    return patient.phone or ""
+
+
+def render(reminder: Reminder) -> ReminderMessage:
+    appt = reminder.appointment
+    patient, provider = appt.patient, appt.provider
+    local = appt.start_utc.astimezone(ZoneInfo(appt.timezone))
+    body = settings.REMINDER_MESSAGE_TEMPLATE.format(
+        first_name=patient.first_name,
+        last_name=patient.last_name,
+        provider=f"{provider.first_name} {provider.last_name}",
+        appointment_type=appt.appointment_type,
+        location=appt.location.name if appt.location_id else appt.office,
+        date=f"{local:%A, %B} {local.day}",
+        time=local.strftime("%I:%M %p").lstrip("0"),
+    )
+    return ReminderMessage(
+        reminder_id=reminder.pk,
+        appointment_id=appt.pk,
+        recipient=_recipient(patient),
+        subject=settings.REMINDER_SUBJECT,
+        body=body,
+    )
+
+
+def _check(reminder: Reminder, now):
+    """None if the reminder should go out now, _NOT_DUE, or why it is skipped."""
+    appt = reminder.appointment
+    if appt.is_block or appt.patient_id is None or appt.start_utc is None:
+        return "Not a patient appointment."
+    if appt.status in EXCLUDED_STATUSES:
+        return f"Appointment {appt.status}."
+    if appt.start_utc <= now:
+        return "Appointment already started."
+    if appt.start_utc - timedelta(minutes=reminder.offset_minutes) > now + timedelta(seconds=settings.REMINDER_LOOKAHEAD):
+        return _NOT_DUE
+    if not _recipient(appt.patient):
+        return f"Patient has no {settings.REMINDER_CHANNEL} contact."
+    return None
+
+
+def send_batch(reminders: List[Reminder], transport: BaseTransport, now=None) -> DispatchStats:
+    now = now or timezone.now()
+    stats = DispatchStats()
+    outgoing, messages = [], []
+    for reminder in reminders:
+        reason = _check(reminder, now)
+        if reason is _NOT_DUE:
+            reminder.status = Reminder.STATUS_PENDING
+            reminder.due_at = reminder.appointment.start_utc - timedelta(minutes=reminder.offset_minutes)
+            reminder.claimed_at = None
+            stats.rescheduled += 1
+        elif reason is not None:
+            reminder.status = Reminder.STATUS_SKIPPED
+            reminder.error = reason
+            stats.skipped += 1
+        else:
+            outgoing.append(reminder)
+            messages.append(render(reminder))
+
+    if messages:
+        try:
+            errors = transport.send_many(messages)
+        except Exception as exc:
+            logger.exception("Reminder transport failed for a batch of %d", len(messages))
+            errors = [f"{type(exc).__name__}: {exc}"] * len(messages)
+        for reminder, message, error in zip(outgoing, messages, errors):
+            reminder.recipient = message.recipient[:255]
+            reminder.message = message.body
+            if error is None:
+                reminder.status = Reminder.STATUS_SENT
+                reminder.sent_at = now
+                reminder.error = ""
+                stats.sent += 1
+            elif reminder.attempts < settings.REMINDER_MAX_ATTEMPTS:
+                # Retry on a later tick, backing off per attempt.
+                reminder.status = Reminder.STATUS_PENDING
+                reminder.due_at = now + timedelta(seconds=settings.REMINDER_RETRY_DELAY * reminder.attempts)
+                reminder.claimed_at = None
+                reminder.error = error
+                stats.failed += 1
+            else:
+                reminder.status = Reminder.STATUS_FAILED
+                reminder.error = error
+                stats.failed += 1
+
+    Reminder.objects.bulk_update(
+        reminders, ["status", "due_at", "claimed_at", "sent_at", "recipient", "message", "error"],
+    )
+    return stats
+
+
+def dispatch(now=None, transport: Optional[BaseTransport] = None, max_batches: Optional[int] = None) -> DispatchStats:
+    """One tick: release stale claims, schedule new reminders, send everything due."""
+    started = time.perf_counter()
+    now = now or timezone.now()
+    transport = transport or get_transport()
+    stats = DispatchStats(released=release_stale_claims(now))
+    stats.by_offset = schedule(now)
+    stats.scheduled = sum(stats.by_offset.values())
+    while max_batches is None or stats.batches < max_batches:
+        batch = claim_batch(now=now)
+        if not batch:
+            break
+        result = send_batch(batch, transport, now)
+        stats.batches += 1
+        for name in ("sent", "failed", "skipped", "rescheduled"):
+            setattr(stats, name, getattr(stats, name) + getattr(result, name))
+
+    for name in ("sent", "failed", "skipped"):
+        if getattr(stats, name):
+            metrics.registry.inc("reminders_total", getattr(stats, name), status=name)
+    metrics.observe_job("reminders_dispatch", time.perf_counter() - started)
+    return stats
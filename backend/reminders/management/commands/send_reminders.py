@@ -0,0 +1,51 @@
+# backend/reminders/management/commands/send_reminders.py
+import os
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core import metrics
+from reminders.dispatch import dispatch
+
+
+class Command(BaseCommand):
+    help = (
+        "Schedule and send appointment reminders (REMINDER_OFFSETS before each start). "
+        "Loops every REMINDER_SCAN_INTERVAL seconds; safe to run in several processes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run one tick and exit (cron).")
+        parser.add_argument("--interval", type=float, help="Seconds between ticks (default REMINDER_SCAN_INTERVAL).")
+
+    def handle(self, *args, **options):
+        interval = options["interval"] or settings.REMINDER_SCAN_INTERVAL
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+        metrics.mark_exited_processes_dead()
+        try:
+            while True:
+                stats = dispatch()
+                if options["once"] or options["verbosity"] > 1 or stats.batches:
+                    self.stdout.write(
+                        "reminders: " + " ".join(f"{k}={v}" for k, v in stats.as_dict().items())
+                    )
+                if options["once"]:
+                    return
+                metrics.registry.maybe_flush()
+                # Give the connection back to the pool between ticks.
+                connection.close()
+                if stop.wait(interval):
+                    return
+        finally:
+            # Scraped from the backend's /metrics (core/metrics.py).
+            try:
+                metrics.registry.flush()
+                metrics.mark_process_dead(os.getpid())
+            except OSError:
+                pass
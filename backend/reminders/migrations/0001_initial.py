@@ -0,0 +1,48 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:35
+
+import django.db.models.deletion
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('appointments', '0012_start_utc'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('offset_minutes', models.PositiveIntegerField(unique=True)),
+                ('scanned_until', models.DateTimeField()),
+                ('scanned_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Reminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('offset_minutes', models.PositiveIntegerField(help_text='Minutes before the appointment start.')),
+                ('due_at', models.DateTimeField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('skipped', 'Skipped'), ('failed', 'Failed')], db_default='pending', default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(db_default=0, default=0)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('recipient', models.CharField(blank=True, db_default='', default='', max_length=255)),
+                ('message', models.TextField(blank=True, db_default='', default='')),
+                ('error', models.TextField(blank=True, db_default='', default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_default=django.db.models.functions.datetime.Now())),
+                ('appointment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='appointments.appointment')),
+            ],
+            options={
+                'ordering': ['due_at'],
+                'indexes': [models.Index(condition=models.Q(('status', 'pending')), fields=['due_at', 'id'], name='reminder_due_idx'), models.Index(condition=models.Q(('status', 'sending')), fields=['claimed_at'], name='reminder_sending_idx')],
+                'constraints': [models.UniqueConstraint(fields=('appointment', 'offset_minutes'), name='reminder_appt_offset_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,79 @@
+# backend/reminders/models.py
+from django.db import models
+from django.db.models.functions import Now
+
+from appointments.models import Appointment
+
+
+class Reminder(models.Model):
+    """
+    One reminder for one appointment at one offset before its start.
+
+    Rows are inserted in bulk by the due-window scan in reminders/dispatch.py
+    (INSERT ... SELECT ... ON CONFLICT DO NOTHING, hence the database-side
+    defaults); the unique (appointment, offset) pair is what keeps two
+    schedulers from ever creating, and so sending, the same reminder twice.
+    """
+    STATUS_PENDING = "pending"
+    STATUS_SENDING = "sending"
+    STATUS_SENT = "sent"
+    STATUS_SKIPPED = "skipped"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENDING, "Sending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_SKIPPED, "Skipped"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    appointment = models.ForeignKey(Appointment, on_delete=models.CASCADE, related_name="reminders")
+    offset_minutes = models.PositiveIntegerField(help_text="Minutes before the appointment start.")
+    due_at = models.DateTimeField()
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, db_default=STATUS_PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0, db_default=0)
+    # Set when a dispatcher claims the row; stale claims are released.
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    recipient = models.CharField(max_length=255, blank=True, default="", db_default="")
+    message = models.TextField(blank=True, default="", db_default="")
+    # Why it failed or was skipped (cancelled, no contact details, ...).
+    error = models.TextField(blank=True, default="", db_default="")
+    created_at = models.DateTimeField(auto_now_add=True, db_default=Now())
+
+    class Meta:
+        ordering = ["due_at"]
+        constraints = [
+            models.UniqueConstraint(fields=["appointment", "offset_minutes"], name="reminder_appt_offset_uniq"),
+        ]
+        indexes = [
+            # Claim query: due pending reminders, oldest first.
+            models.Index(
+                fields=["due_at", "id"], name="reminder_due_idx",
+                condition=models.Q(status="pending"),
+            ),
+            # Releasing claims of dispatchers that died mid-batch.
+            models.Index(
+                fields=["claimed_at"], name="reminder_sending_idx",
+                condition=models.Q(status="sending"),
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.offset_minutes} min reminder for appointment #{self.appointment_id} ({self.status})"
+
+
+class ReminderCursor(models.Model):
+    """
+    How far ahead the due-window scan has materialized reminders for one
+    offset: appointments starting up to `scanned_until` already have their row.
+    """
+    offset_minutes = models.PositiveIntegerField(unique=True)
+    scanned_until = models.DateTimeField()
+    # When the last scan ran; appointments edited since are re-checked.
+    scanned_at = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"{self.offset_minutes} min: scanned until {self.scanned_until}"
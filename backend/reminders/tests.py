@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from appointments.models import Appointment
+from patients.models import Patient
+from providers.models import Provider
+
+from .dispatch import claim_batch, dispatch
+from .models import Reminder, ReminderCursor
+from .transports import BaseTransport
+
+
+class RecordingTransport(BaseTransport):
+    def __init__(self, error=None):
+        self.sent = []
+        self.error = error
+
+    def send_many(self, messages):
+        self.sent.extend(messages)
+        return [self.error] * len(messages)
+
+
+@override_settings(
+    REMINDER_OFFSETS=[1440, 120],
+    REMINDER_LOOKAHEAD=0,
+    REMINDER_MAX_ATTEMPTS=2,
+    QUERY_STATS_ENABLED=False,
+)
+class ReminderDispatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.provider = Provider.objects.create(first_name="Ada", last_name="Lane", email="ada@example.com")
+        cls.patient = Patient.objects.create(
+            first_name="Sam", last_name="Reed", date_of_birth="1980-01-01", phone="555-0100",
+        )
+
+    def setUp(self):
+        self.now = timezone.now().replace(second=0, microsecond=0)
+        # As if both offsets had been scanned up to now.
+        for offset in (1440, 120):
+            ReminderCursor.objects.create(offset_minutes=offset, scanned_until=self.now, scanned_at=self.now)
+
+    def book(self, starts_in: timedelta, **fields) -> Appointment:
+        local = timezone.localtime(self.now + starts_in)
+        fields.setdefault("patient", self.patient)
+        return Appointment.objects.create(
+            provider=self.provider, office="north", date=local.date(), start_time=local.time(), **fields,
+        )
+
+    def test_sends_each_reminder_once_at_its_offset(self):
+        appt = self.book(timedelta(hours=23, minutes=30))
+        self.book(timedelta(hours=23), status="cancelled")
+        self.book(timedelta(hours=22), is_block=True, patient=None)
+        self.book(timedelta(days=3))
+        transport = RecordingTransport()
+
+        stats = dispatch(now=self.now, transport=transport)
+        self.assertEqual(stats.sent, 1)
+        self.assertEqual([m.appointment_id for m in transport.sent], [appt.pk])
+        self.assertEqual(transport.sent[0].recipient, "555-0100")
+        self.assertIn("Ada Lane", transport.sent[0].body)
+
+        # Another dispatcher (or tick) does not send it again.
+        dispatch(now=self.now, transport=transport)
+        self.assertEqual(len(transport.sent), 1)
+        reminder = Reminder.objects.get(appointment=appt)
+        self.assertEqual((reminder.offset_minutes, reminder.status), (1440, Reminder.STATUS_SENT))
+
+        # 22 hours later the 2-hour reminder is due.
+        dispatch(now=self.now + timedelta(hours=22), transport=transport)
+        self.assertEqual(
+            sorted(Reminder.objects.filter(appointment=appt).values_list("offset_minutes", flat=True)), [120, 1440],
+        )
+        self.assertEqual(len(transport.sent), 2)
+
+    def test_late_booking_gets_only_the_nearest_reminder(self):
+        # Scanned a minute ago, then booked 90 minutes out.
+        ReminderCursor.objects.update(scanned_until=self.now + timedelta(days=2))
+        appt = self.book(timedelta(minutes=90))
+        dispatch(now=self.now, transport=RecordingTransport())
+        self.assertEqual(list(Reminder.objects.filter(appointment=appt).values_list("offset_minutes", flat=True)), [120])
+
+    def test_cancelled_after_scheduling_is_skipped(self):
+        appt = self.book(timedelta(hours=25))
+        with self.settings(REMINDER_LOOKAHEAD=3600):
+            dispatch(now=self.now, transport=RecordingTransport())
+        self.assertTrue(Reminder.objects.filter(appointment=appt, status=Reminder.STATUS_PENDING).exists())
+
+        Appointment.objects.filter(pk=appt.pk).update(status="cancelled")
+        transport = RecordingTransport()
+        dispatch(now=self.now + timedelta(hours=1), transport=transport)
+        self.assertEqual(transport.sent, [])
+        self.assertEqual(Reminder.objects.get(appointment=appt).status, Reminder.STATUS_SKIPPED)
+
+    def test_claimed_batch_is_not_claimed_twice(self):
+        self.book(timedelta(hours=23))
+        dispatch(now=self.now, transport=RecordingTransport(), max_batches=0)
+        self.assertEqual(len(claim_batch(now=self.now)), 1)
+        self.assertEqual(claim_batch(now=self.now), [])
+
+    def test_transport_errors_are_retried_then_failed(self):
+        appt = self.book(timedelta(hours=23))
+        failing = RecordingTransport(error="gateway down")
+        dispatch(now=self.now, transport=failing)
+        reminder = Reminder.objects.get(appointment=appt)
+        self.assertEqual((reminder.status, reminder.error), (Reminder.STATUS_PENDING, "gateway down"))
+        self.assertGreater(reminder.due_at, self.now)
+
+        dispatch(now=reminder.due_at, transport=failing)
+        reminder.refresh_from_db()
+        self.assertEqual((reminder.status, reminder.attempts), (Reminder.STATUS_FAILED, 2))
@@ -0,0 +1,76 @@
+# backend/reminders/transports.py
+"""
+Reminder transports: where rendered messages go.
+
+REMINDER_TRANSPORT is a dotted path to a BaseTransport subclass, the same way
+Django picks an email backend. The two here are local stand-ins; an SMS or
+email provider is a subclass whose send_many() makes one batched API call.
+"""
+from __future__ import annotations
+
+import json
+import sys
+import threading
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+@dataclass(frozen=True)
+class ReminderMessage:
+    reminder_id: int
+    appointment_id: int
+    recipient: str
+    subject: str
+    body: str
+
+
+class BaseTransport:
+    def send_many(self, messages: Sequence[ReminderMessage]) -> List[Optional[str]]:
+        """
+        Deliver a batch. Returns one entry per message, in order: None when it
+        was accepted, otherwise an error string (the reminder may be retried).
+        """
+        raise NotImplementedError
+
+
+class ConsoleTransport(BaseTransport):
+    """Writes messages to stdout (development)."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send_many(self, messages):
+        for message in messages:
+            self.stream.write(f"[reminder #{message.reminder_id}] to {message.recipient}: {message.body}\n")
+        self.stream.flush()
+        return [None] * len(messages)
+
+
+class FileTransport(BaseTransport):
+    """Appends messages as JSON lines to REMINDER_OUTBOX_PATH (local testing, demos)."""
+
+    _lock = threading.Lock()
+
+    def __init__(self, path=None):
+        self.path = Path(path or settings.REMINDER_OUTBOX_PATH)
+
+    def send_many(self, messages):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lines = "".join(json.dumps(asdict(m)) + "\n" for m in messages)
+        with self._lock, open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(lines)
+        return [None] * len(messages)
+
+
+@lru_cache(maxsize=None)
+def _transport_class(path: str):
+    return import_string(path)
+
+
+def get_transport() -> BaseTransport:
+    return _transport_class(settings.REMINDER_TRANSPORT)()
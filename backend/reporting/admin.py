@@ -0,0 +1,15 @@
+from django.contrib import admin
+
+from .models import AppointmentRollup
+
+
+@admin.register(AppointmentRollup)
+class AppointmentRollupAdmin(admin.ModelAdmin):
+    list_display = (
+        "date", "provider", "location", "appointment_type", "status", "is_block",
+        "appointment_count", "minutes", "refreshed_at",
+    )
+    list_filter = ("is_block", "status", "appointment_type")
+    raw_id_fields = ("provider", "location")
+    date_hierarchy = "date"
+    show_full_result_count = False
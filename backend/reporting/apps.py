@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+
+
+class ReportingConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'reporting'
+
+    def ready(self):
+        # Signal wiring only; no database access at startup.
+        from appointments.signals import appointments_changed
+
+        from .rollups import on_appointments_changed
+
+        appointments_changed.connect(on_appointments_changed, dispatch_uid="reporting.rollups")
@@ -0,0 +1,31 @@
+# backend/reporting/management/commands/rebuild_rollups.py
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reporting.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the appointment reporting rollups from appointments (all dates, or --start/--end)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="First date to rebuild (YYYY-MM-DD).")
+        parser.add_argument("--end", help="Last date to rebuild (YYYY-MM-DD).")
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options["start"]) if options["start"] else None
+            end = date.fromisoformat(options["end"]) if options["end"] else None
+        except ValueError as exc:
+            raise CommandError(f"Invalid date: {exc}")
+        if start and end and end < start:
+            raise CommandError("--end must not be before --start.")
+
+        started = time.perf_counter()
+        rows = rebuild(start, end)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {rows} rollup rows for {start or 'the beginning'} .. {end or 'the end'} "
+            f"in {time.perf_counter() - started:.2f}s"
+        ))
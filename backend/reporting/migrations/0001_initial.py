@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('locations', '0003_alter_location_slug'),
+        ('providers', '0002_provider_user'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppointmentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('appointment_type', models.CharField(max_length=100)),
+                ('status', models.CharField(max_length=20)),
+                ('is_block', models.BooleanField(default=False)),
+                ('appointment_count', models.PositiveIntegerField(default=0)),
+                ('minutes', models.PositiveIntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField()),
+                ('location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='locations.location')),
+                ('provider', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='providers.provider')),
+            ],
+            options={
+                'ordering': ['date', 'provider'],
+                'indexes': [models.Index(fields=['provider', 'date'], name='rollup_provider_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'provider', 'location', 'appointment_type', 'status', 'is_block'), name='rollup_grain_uniq', nulls_distinct=False)],
+            },
+        ),
+    ]
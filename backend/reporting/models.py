@@ -0,0 +1,44 @@
+# backend/reporting/models.py
+from django.db import models
+
+from locations.models import Location
+from providers.models import Provider
+
+
+class AppointmentRollup(models.Model):
+    """
+    Appointment counts and minutes per (date, provider, location,
+    appointment_type, status, is_block), maintained by reporting/rollups.py.
+
+    Report endpoints read only this table. It is refreshed per
+    (provider, date) after appointment writes and can be rebuilt for any date
+    range (`manage.py rebuild_rollups`), so it never has to be trusted blindly.
+    """
+    date = models.DateField()
+    provider = models.ForeignKey(Provider, on_delete=models.CASCADE, related_name="+")
+    location = models.ForeignKey(Location, null=True, blank=True, on_delete=models.CASCADE, related_name="+")
+    appointment_type = models.CharField(max_length=100)
+    status = models.CharField(max_length=20)
+    is_block = models.BooleanField(default=False)
+
+    appointment_count = models.PositiveIntegerField(default=0)
+    # end_time - start_time, or the appointment's duration when times are missing.
+    minutes = models.PositiveIntegerField(default=0)
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["date", "provider"]
+        constraints = [
+            # Also the index report queries range-scan by date.
+            models.UniqueConstraint(
+                fields=["date", "provider", "location", "appointment_type", "status", "is_block"],
+                name="rollup_grain_uniq",
+                nulls_distinct=False,
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["provider", "date"], name="rollup_provider_date_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.date} p{self.provider_id} {self.appointment_type}/{self.status}: {self.appointment_count}"
@@ -0,0 +1,201 @@
+# backend/reporting/rollups.py
+"""
+Maintenance of reporting_appointmentrollup (see models.AppointmentRollup).
+
+Incremental: appointments_changed (sent on commit with the (provider, date)
+scopes a write touched, before and after) marks those scopes dirty. A
+per-process background thread refreshes dirty scopes every
+REPORTING_REFRESH_INTERVAL seconds, so a burst of edits to one schedule day
+costs one refresh. A refresh re-aggregates just those provider-days from
+appointments (appt_provider_date_idx) and upserts the result in a single
+statement, deleting groups that no longer exist. Refreshes of the same
+provider-day serialize on an advisory lock, so the last one always reads
+the latest committed rows.
+
+Full: rebuild(start, end) recomputes a date range from scratch
+(`manage.py rebuild_rollups`, or the reporting_rebuild job). scopes=None
+("anything may have changed": demo reset, bulk imports) queues a full
+rebuild job instead of an incremental refresh.
+
+Dirty scopes only live in memory until the next interval; workers flush on
+exit. A hard kill can leave a few provider-days stale until the next rebuild.
+With REPORTING_ASYNC=False scopes are refreshed inline (tests, scripts).
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+import time
+from datetime import date
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from appointments.models import Appointment
+
+from .models import AppointmentRollup
+
+
+logger = logging.getLogger("reporting")
+
+# Namespace for pg_advisory_xact_lock(namespace, provider_id # day).
+_LOCK_NAMESPACE = 0x726F6C6C  # "roll"
+# Provider-days refreshed per statement.
+REFRESH_BATCH = 500
+
+_MINUTES_SQL = (
+    "CASE WHEN a.start_time IS NOT NULL AND a.end_time > a.start_time "
+    "THEN (EXTRACT(EPOCH FROM a.end_time - a.start_time) / 60)::int "
+    "ELSE a.duration END"
+)
+_GRAIN = "date, provider_id, location_id, appointment_type, status, is_block"
+
+
+def _aggregate_sql(where: str) -> str:
+    return (
+        f"SELECT a.date, a.provider_id, a.location_id, a.appointment_type, a.status, a.is_block, "
+        f"count(*), sum({_MINUTES_SQL}), now() "
+        f"FROM {Appointment._meta.db_table} a {where} "
+        f"GROUP BY a.date, a.provider_id, a.location_id, a.appointment_type, a.status, a.is_block"
+    )
+
+
+# -----------------------------
+# Refresh / rebuild
+# -----------------------------
+
+def refresh(scopes: Iterable[tuple]) -> None:
+    """Recompute the rollup rows of the given (provider_id, date) pairs."""
+    scopes = sorted(set(scopes))
+    table = AppointmentRollup._meta.db_table
+    for i in range(0, len(scopes), REFRESH_BATCH):
+        batch = scopes[i:i + REFRESH_BATCH]
+        provider_ids = [p for p, _ in batch]
+        days = [d for _, d in batch]
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Sorted, so concurrent refreshes of overlapping sets cannot deadlock.
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(%s, hashtext(p::text || ':' || d::text)) "
+                "FROM unnest(%s::bigint[], %s::date[]) AS s(p, d) ORDER BY p, d",
+                [_LOCK_NAMESPACE, provider_ids, days],
+            )
+            cursor.execute(
+                f"WITH scopes(provider_id, date) AS (SELECT * FROM unnest(%s::bigint[], %s::date[])), "
+                f"fresh AS ("
+                + _aggregate_sql("JOIN scopes s ON a.provider_id = s.provider_id AND a.date = s.date")
+                + f"), upserted AS ("
+                f"INSERT INTO {table} ({_GRAIN}, appointment_count, minutes, refreshed_at) "
+                f"SELECT * FROM fresh "
+                f"ON CONFLICT ({_GRAIN}) DO UPDATE SET appointment_count = EXCLUDED.appointment_count, "
+                f"minutes = EXCLUDED.minutes, refreshed_at = EXCLUDED.refreshed_at "
+                f"RETURNING id) "
+                f"DELETE FROM {table} r USING scopes s "
+                f"WHERE r.provider_id = s.provider_id AND r.date = s.date "
+                f"AND r.id NOT IN (SELECT id FROM upserted)",
+                [provider_ids, days],
+            )
+
+
+def rebuild(start: Optional[date] = None, end: Optional[date] = None) -> int:
+    """Recompute all rollup rows between start and end (inclusive; open-ended if None)."""
+    table = AppointmentRollup._meta.db_table
+    conditions, params = [], []
+    if start:
+        conditions.append("date >= %s")
+        params.append(start)
+    if end:
+        conditions.append("date <= %s")
+        params.append(end)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    source_where = f"WHERE {' AND '.join('a.' + c for c in conditions)}" if conditions else ""
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Incremental refreshes wait until the range is consistent again.
+        cursor.execute(f"LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE")
+        cursor.execute(f"DELETE FROM {table} {where}", params)
+        cursor.execute(
+            f"INSERT INTO {table} ({_GRAIN}, appointment_count, minutes, refreshed_at) "
+            + _aggregate_sql(source_where),
+            params,
+        )
+        return cursor.rowcount
+
+
+# -----------------------------
+# Dirty scopes + refresher thread
+# -----------------------------
+
+class RefreshBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dirty: set = set()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = None
+
+    def add(self, scopes: Iterable[tuple]) -> None:
+        scopes = set(scopes)
+        if not scopes:
+            return
+        if not settings.REPORTING_ASYNC:
+            refresh(scopes)
+            return
+        with self._lock:
+            self._dirty |= scopes
+        self._ensure_thread()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._dirty)
+
+    def flush(self) -> int:
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        if not dirty:
+            return 0
+        try:
+            refresh(dirty)
+        except Exception:
+            logger.exception("Could not refresh %d rollup provider-days; will retry", len(dirty))
+            with self._lock:
+                self._dirty |= dirty
+            return 0
+        return len(dirty)
+
+    def _ensure_thread(self) -> None:
+        # Started lazily in each worker (never in a pre-fork master).
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid is None:
+                atexit.register(self.flush)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="rollup-refresher", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        from core import metrics
+
+        while True:
+            time.sleep(settings.REPORTING_REFRESH_INTERVAL)
+            started = time.perf_counter()
+            refreshed = self.flush()
+            # Give the connection back to the pool between refreshes.
+            connection.close()
+            if refreshed:
+                metrics.observe_job("rollup_refresh", time.perf_counter() - started)
+
+
+buffer = RefreshBuffer()
+
+
+def on_appointments_changed(sender, scopes=None, **kwargs) -> None:
+    if scopes is None:
+        from core import jobs
+
+        jobs.enqueue("reporting_rebuild", dedupe=True)
+        return
+    buffer.add((scope.provider_id, scope.date) for scope in scopes)
@@ -0,0 +1,19 @@
+# backend/reporting/tasks.py
+"""Background job handlers for reporting (see core/jobs.py)."""
+from datetime import date
+
+from core.jobs import job
+
+from . import rollups
+
+
+@job("reporting_rebuild", concurrency=1, max_attempts=2, retry_delay=30)
+def reporting_rebuild(ctx) -> dict:
+    start = ctx.payload.get("start")
+    end = ctx.payload.get("end")
+    ctx.progress(5, "Rebuilding appointment rollups")
+    rows = rollups.rebuild(
+        start=date.fromisoformat(start) if start else None,
+        end=date.fromisoformat(end) if end else None,
+    )
+    return {"start": start, "end": end, "rows": rows}
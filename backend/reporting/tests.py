@@ -0,0 +1,163 @@
+from datetime import date, time
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from appointments.models import Appointment
+from appointments.signals import notify_appointments_changed, scope_of
+from core.models import Job
+from locations.models import Location, LocationHours
+from patients.models import Patient
+from providers.models import Provider
+
+from . import rollups
+from .models import AppointmentRollup
+
+
+MONDAY = date(2025, 3, 3)
+TUESDAY = date(2025, 3, 4)
+
+
+def _rows():
+    return sorted(
+        AppointmentRollup.objects.values_list(
+            "date", "provider_id", "location_id", "appointment_type", "status", "is_block",
+            "appointment_count", "minutes",
+        )
+    )
+
+
+@override_settings(REPORTING_ASYNC=False, QUERY_STATS_ENABLED=False)
+class RollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(name="Report Office", slug="report-office")
+        # Open 08:00-17:00 every day (default hours) = 540 minutes.
+        cls.provider = Provider.objects.create(first_name="Ada", last_name="Lane", email="ada@example.com")
+        cls.other = Provider.objects.create(first_name="Ben", last_name="Hart", email="ben@example.com")
+        cls.patient = Patient.objects.create(first_name="Sam", last_name="Reed", date_of_birth="1980-01-01")
+
+    def book(self, day, start, end, provider=None, **fields):
+        fields.setdefault("patient", None if fields.get("is_block") else self.patient)
+        appt = Appointment.objects.create(
+            provider=provider or self.provider, location=self.location, office="report-office",
+            date=day, start_time=time(*start), end_time=time(*end), **fields,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_appointments_changed([scope_of(appt)])
+        return appt
+
+    def test_incremental_refresh_matches_rebuild(self):
+        appt = self.book(MONDAY, (9, 0), (9, 30), appointment_type="Consult")
+        self.book(MONDAY, (10, 0), (11, 0), appointment_type="Consult")
+        self.book(MONDAY, (12, 0), (13, 0), appointment_type="Lunch", is_block=True)
+        self.book(TUESDAY, (9, 0), (9, 45), provider=self.other, appointment_type="Checkup", status="no_show")
+
+        # Moved to another day and cancelled: both provider-days change.
+        before = scope_of(appt)
+        Appointment.objects.filter(pk=appt.pk).update(date=TUESDAY, status="cancelled")
+        appt.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_appointments_changed([before, scope_of(appt)])
+
+        # Deleted: its group disappears.
+        gone = self.book(TUESDAY, (14, 0), (14, 30), appointment_type="Follow-up")
+        gone.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_appointments_changed([scope_of(gone)])
+
+        incremental = _rows()
+        self.assertIn((MONDAY, self.provider.pk, self.location.pk, "Consult", "pending", False, 1, 60), incremental)
+        self.assertIn((TUESDAY, self.provider.pk, self.location.pk, "Consult", "cancelled", False, 1, 30), incremental)
+        self.assertFalse(AppointmentRollup.objects.filter(appointment_type="Follow-up").exists())
+
+        self.assertEqual(rollups.rebuild(), len(incremental))
+        self.assertEqual(_rows(), incremental)
+
+    def test_rebuild_limited_to_range(self):
+        self.book(MONDAY, (9, 0), (9, 30))
+        self.book(TUESDAY, (9, 0), (9, 30))
+        AppointmentRollup.objects.update(appointment_count=99)
+        self.assertEqual(rollups.rebuild(start=TUESDAY, end=TUESDAY), 1)
+        self.assertEqual(AppointmentRollup.objects.get(date=MONDAY).appointment_count, 99)
+        self.assertEqual(AppointmentRollup.objects.get(date=TUESDAY).appointment_count, 1)
+
+    def test_unscoped_change_queues_one_rebuild(self):
+        for _ in range(2):
+            with self.captureOnCommitCallbacks(execute=True):
+                notify_appointments_changed(None)
+        self.assertEqual(Job.objects.filter(kind="reporting_rebuild", status=Job.STATUS_QUEUED).count(), 1)
+
+    def test_refresh_of_empty_scope_is_a_no_op(self):
+        rollups.refresh([(self.provider.pk, MONDAY)])
+        self.assertFalse(AppointmentRollup.objects.exists())
+
+
+@override_settings(REPORTING_ASYNC=False, QUERY_STATS_ENABLED=False)
+class UtilizationReportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(name="Report Office", slug="report-office")
+        LocationHours.objects.filter(location=cls.location, weekday="tue").update(open=False)
+        cls.provider = Provider.objects.create(first_name="Ada", last_name="Lane", email="ada@example.com")
+        patient = Patient.objects.create(first_name="Sam", last_name="Reed", date_of_birth="1980-01-01")
+        common = {"provider": cls.provider, "location": cls.location, "office": "report-office"}
+        Appointment.objects.bulk_create([
+            Appointment(patient=patient, date=MONDAY, start_time=time(9), end_time=time(10), **common),
+            Appointment(patient=patient, date=MONDAY, start_time=time(10), end_time=time(11),
+                        status="no_show", **common),
+            Appointment(patient=patient, date=MONDAY, start_time=time(11), end_time=time(12),
+                        status="cancelled", **common),
+            Appointment(date=MONDAY, start_time=time(12), end_time=time(13), is_block=True,
+                        appointment_type="Lunch", **common),
+            # Booked on a closed day: counted, but adds no capacity.
+            Appointment(patient=patient, date=TUESDAY, start_time=time(9), end_time=time(9, 30), **common),
+        ])
+        rollups.rebuild()
+        cls.staff = User.objects.create_user("boss", password="x", is_staff=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def test_monthly_utilization_per_provider(self):
+        response = self.client.get("/api/reports/utilization/", {"start": "2025-03-01", "end": "2025-03-31"})
+        self.assertEqual(response.status_code, 200)
+        [row] = response.json()["rows"]
+        self.assertEqual(row["period"], "2025-03-01")
+        self.assertEqual(row["provider"], self.provider.pk)
+        self.assertEqual(
+            {k: row[k] for k in ("appointments", "booked_minutes", "cancelled", "no_show", "blocked_minutes")},
+            {"appointments": 4, "booked_minutes": 150, "cancelled": 1, "no_show": 1, "blocked_minutes": 60},
+        )
+        # Monday 540 open minutes - 60 blocked; Tuesday closed.
+        self.assertEqual(row["available_minutes"], 480)
+        self.assertEqual(row["utilization"], round(150 / 480, 4))
+        self.assertEqual(response.json()["providers"], {str(self.provider.pk): "Ada Lane"})
+
+    def test_by_appointment_type_has_no_capacity(self):
+        response = self.client.get(
+            "/api/reports/utilization/",
+            {"start": "2025-03-01", "end": "2025-03-31", "period": "day", "group_by": "appointment_type"},
+        )
+        rows = response.json()["rows"]
+        self.assertEqual(
+            [(r["period"], r["appointment_type"]) for r in rows],
+            [("2025-03-03", "Lunch"), ("2025-03-03", "Wellness Exam"), ("2025-03-04", "Wellness Exam")],
+        )
+        self.assertNotIn("utilization", rows[0])
+
+    def test_validation_and_permissions(self):
+        self.assertEqual(self.client.get("/api/reports/utilization/", {"start": "2025-03-01"}).status_code, 400)
+        self.assertEqual(
+            self.client.get(
+                "/api/reports/utilization/", {"start": "2025-03-01", "end": "2025-03-31", "group_by": "patient"},
+            ).status_code,
+            400,
+        )
+        self.client.force_authenticate(User.objects.create_user("clerk", password="x"))
+        self.assertEqual(
+            self.client.get("/api/reports/utilization/", {"start": "2025-03-01", "end": "2025-03-31"}).status_code,
+            403,
+        )
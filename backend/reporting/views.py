@@ -0,0 +1,185 @@
+# backend/reporting/views.py
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.db.models import F, Q, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from rest_framework import permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from appointments import blocks
+from core import tenancy
+from core.db_routing import ReplicaReadMixin
+from locations.models import WEEKDAYS, Location, LocationHours
+from providers.models import Provider
+
+from .models import AppointmentRollup
+
+
+PERIODS = {
+    "day": (F("date"), lambda d: d),
+    "week": (TruncWeek("date"), lambda d: d - timedelta(days=d.weekday())),
+    "month": (TruncMonth("date"), lambda d: d.replace(day=1)),
+}
+DIMENSIONS = {
+    "provider": "provider_id",
+    "location": "location_id",
+    "appointment_type": "appointment_type",
+}
+MAX_DAYS = 3 * 366
+
+PATIENT = Q(is_block=False)
+BOOKED = PATIENT & ~Q(status="cancelled")
+
+
+def _parse_date(name: str, value) -> date:
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValidationError({name: "Expected YYYY-MM-DD."})
+
+
+def _id_list(name: str, values) -> list:
+    try:
+        return [int(v) for raw in values for v in raw.split(",") if v.strip()]
+    except ValueError:
+        raise ValidationError({name: "Expected comma-separated ids."})
+
+
+def _open_minutes() -> dict:
+    """(location_id, weekday index) -> minutes the current practice's locations are open."""
+    minutes = {}
+    for hours in tenancy.scoped(LocationHours.objects, "location__practice"):
+        if hours.open and hours.end > hours.start:
+            span = (hours.end.hour * 60 + hours.end.minute) - (hours.start.hour * 60 + hours.start.minute)
+            minutes[(hours.location_id, WEEKDAYS.index(hours.weekday))] = span
+    return minutes
+
+
+class UtilizationReportView(ReplicaReadMixin, APIView):
+    """
+    GET /api/reports/utilization/?start=2025-01-01&end=2025-12-31
+        &period=day|week|month            (default month)
+        &group_by=provider,location,appointment_type   (default provider)
+        &provider=1,2 &location=3          (optional filters)
+
+    Booked vs. available minutes, read only from the appointment rollups
+    (reporting/rollups.py), never from appointments.
+
+    - booked_minutes: patient appointments that are not cancelled (no-shows
+      count as booked).
+    - blocked_minutes: block times (lunch, admin, ...): one-off block rows
+      plus recurring blocks (appointments/blocks.py) on the days a provider
+      has anything on the schedule at a location they apply to.
+    - available_minutes: for every day a provider has anything on the
+      schedule at a location, that location's opening hours (LocationHours),
+      minus blocked time. Not reported when grouping by appointment_type.
+    - utilization: booked / available.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        params = request.query_params
+        start = _parse_date("start", params.get("start"))
+        end = _parse_date("end", params.get("end"))
+        if end < start:
+            raise ValidationError({"end": "Must not be before start."})
+        if (end - start).days > MAX_DAYS:
+            raise ValidationError({"end": f"Reports cover at most {MAX_DAYS} days."})
+
+        period = params.get("period", "month")
+        if period not in PERIODS:
+            raise ValidationError({"period": f"One of {', '.join(PERIODS)}."})
+        group_by = [g for g in params.get("group_by", "provider").split(",") if g]
+        unknown = set(group_by) - set(DIMENSIONS)
+        if unknown:
+            raise ValidationError({"group_by": f"Unknown: {', '.join(sorted(unknown))}."})
+        fields = [DIMENSIONS[g] for g in group_by]
+
+        qs = tenancy.scoped(AppointmentRollup.objects, "provider__practice").filter(date__gte=start, date__lte=end)
+        provider_ids = _id_list("provider", params.getlist("provider"))
+        if provider_ids:
+            qs = qs.filter(provider_id__in=provider_ids)
+        location_ids = _id_list("location", params.getlist("location"))
+        if location_ids:
+            qs = qs.filter(location_id__in=location_ids)
+
+        period_expr, period_of = PERIODS[period]
+        rows = {}
+        for row in (
+            qs.annotate(period=period_expr)
+            .values("period", *fields)
+            .annotate(
+                appointments=Sum("appointment_count", filter=PATIENT),
+                booked_minutes=Sum("minutes", filter=BOOKED),
+                cancelled=Sum("appointment_count", filter=PATIENT & Q(status="cancelled")),
+                no_show=Sum("appointment_count", filter=PATIENT & Q(status="no_show")),
+                blocked_minutes=Sum("minutes", filter=Q(is_block=True)),
+            )
+            .order_by("period", *fields)
+        ):
+            key = (row["period"], *(row[f] for f in fields))
+            rows[key] = {
+                "period": row["period"].isoformat(),
+                **{g: row[DIMENSIONS[g]] for g in group_by},
+                **{m: row[m] or 0 for m in ("appointments", "booked_minutes", "cancelled", "no_show", "blocked_minutes")},
+            }
+
+        days = list(qs.values("date", "provider_id", "location_id").distinct().order_by("date"))
+        self._add_recurring_blocks(days, rows, group_by, period_of, start, end, location_ids)
+        if "appointment_type" not in group_by:
+            self._add_capacity(days, rows, fields, period_of)
+
+        return Response({
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "period": period,
+            "group_by": group_by,
+            "rows": sorted(rows.values(), key=lambda r: r["period"]),
+            "providers": {
+                p.pk: f"{p.first_name} {p.last_name}"
+                for p in Provider.objects.filter(pk__in={r["provider"] for r in rows.values()}).only("first_name", "last_name")
+            } if "provider" in group_by else {},
+            "locations": dict(
+                Location.objects.filter(pk__in={r["location"] for r in rows.values()}).values_list("pk", "name")
+            ) if "location" in group_by else {},
+        })
+
+    @staticmethod
+    def _add_recurring_blocks(days: list, rows: dict, group_by: list, period_of, start, end, location_ids) -> None:
+        """Template occurrences are not in the rollups; add them per scheduled day."""
+        if not days:
+            return
+        templates = defaultdict(list)
+        qs = blocks.templates(start, end, {d["provider_id"] for d in days})
+        if location_ids:
+            qs = qs.filter(Q(location__isnull=True) | Q(location_id__in=location_ids))
+        for tpl in qs:
+            templates[tpl.provider_id].append(tpl)
+
+        for day in days:
+            for tpl in templates.get(day["provider_id"], ()):
+                if tpl.location_id not in (None, day["location_id"]) or not tpl.occurs_on(day["date"]):
+                    continue
+                values = {**day, "appointment_type": tpl.label}
+                key = (period_of(day["date"]), *(values[DIMENSIONS[g]] for g in group_by))
+                row = rows.setdefault(key, {
+                    "period": key[0].isoformat(),
+                    **{g: values[DIMENSIONS[g]] for g in group_by},
+                    **dict.fromkeys(("appointments", "booked_minutes", "cancelled", "no_show", "blocked_minutes"), 0),
+                })
+                row["blocked_minutes"] += tpl.duration
+
+    @staticmethod
+    def _add_capacity(days: list, rows: dict, fields: list, period_of) -> None:
+        open_minutes = _open_minutes()
+        available = defaultdict(int)
+        for day in days:
+            key = (period_of(day["date"]), *(day[f] for f in fields))
+            available[key] += open_minutes.get((day["location_id"], day["date"].weekday()), 0)
+        for key, row in rows.items():
+            minutes = max(available.get(key, 0) - row["blocked_minutes"], 0)
+            row["available_minutes"] = minutes
+            row["utilization"] = round(row["booked_minutes"] / minutes, 4) if minutes else None
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:17
+
+import core.tenancy
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_practice'),
+        ('schedule', '0002_alter_schedulesettings_business_hours'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schedulesettings',
+            name='practice',
+            field=models.ForeignKey(default=core.tenancy.practice_for_new_rows, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.practice'),
+        ),
+    ]
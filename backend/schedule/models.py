@@ -1,5 +1,7 @@
 from django.db import models
 
+from core.tenancy import PracticeScopedManager, practice_for_new_rows
+
 def default_day():
     return {"open": True, "start": "08:00", "end": "17:00"}
 
@@ -22,12 +24,20 @@ def default_business_hours():
 
 class ScheduleSettings(models.Model):
     """
-    Singleton-ish site settings for schedule config.
+    Singleton-ish schedule config, one row per practice (scoped to the
+    current one; see core/tenancy.py).
     """
     business_hours = models.JSONField(default=default_business_hours)
     # [{ name: str, default_duration: 15|30|60, color_code: "#RRGGBB" }, ...]
     appointment_types = models.JSONField(default=list)
     updated_at = models.DateTimeField(auto_now=True)
+    practice = models.ForeignKey(
+        "core.Practice", on_delete=models.CASCADE, related_name="+",
+        default=practice_for_new_rows,
+    )
+
+    objects = PracticeScopedManager()
+    all_objects = models.Manager()
 
     def __str__(self):
         return f"Schedule Settings (updated {self.updated_at:%Y-%m-%d %H:%M})"
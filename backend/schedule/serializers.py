@@ -2,6 +2,7 @@
 from rest_framework import serializers
 from .models import ScheduleSettings
 import re
+from core.perf import TimedSerializerMixin
 
 
 def normalize_appointment_types(payload: dict) -> list:
@@ -45,7 +46,7 @@ def normalize_appointment_types(payload: dict) -> list:
     return normalized_types
 
 
-class ScheduleSettingsSerializer(serializers.ModelSerializer):
+class ScheduleSettingsSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     ScheduleSettings stores non-hour schedule configuration.
     Location hours are authoritative via LocationHours and are injected
@@ -1,35 +1,31 @@
 # backend/schedule/views.py
+from django.db import DEFAULT_DB_ALIAS
 from rest_framework import viewsets, permissions
 from rest_framework.response import Response
 
 from .models import ScheduleSettings
 from .serializers import ScheduleSettingsSerializer
+from core.db_routing import ReplicaReadMixin
+from core.tenancy import PracticeScopedViewMixin
 
-from locations.models import Location, LocationHours
+from locations.models import Location
 from locations.serializers import LocationSerializer
 
 WEEKDAYS = ["sun", "mon", "tue", "wed", "thu", "fri", "sat"]
 DEFAULT_DAY = {"open": True, "start": "08:00", "end": "17:00"}
 
 
-def build_business_hours_from_locations() -> dict:
+def project_business_hours(locations) -> dict:
     """
-    Authoritative business_hours projection from LocationHours.
-    Shape:
-      {
-        "<location_slug>": {
-          "mon": {open,start,end}, ...
-        }
-      }
+    Project business_hours from already-loaded locations (uses loc.hours.all(),
+    so prefetch "hours" to avoid a query per location).
     """
     hours_by_slug: dict = {}
 
-    locations = Location.objects.filter(is_active=True).order_by("name")
     for loc in locations:
         loc_map = {d: dict(DEFAULT_DAY) for d in WEEKDAYS}
 
-        rows = LocationHours.objects.filter(location=loc)
-        for h in rows:
+        for h in loc.hours.all():
             loc_map[h.weekday] = {
                 "open": bool(h.open),
                 "start": h.start.strftime("%H:%M"),
@@ -41,7 +37,37 @@ def build_business_hours_from_locations() -> dict:
     return hours_by_slug
 
 
-class ScheduleSettingsViewSet(viewsets.ModelViewSet):
+def build_business_hours_from_locations() -> dict:
+    """
+    Authoritative business_hours projection from LocationHours.
+    Shape:
+      {
+        "<location_slug>": {
+          "mon": {open,start,end}, ...
+        }
+      }
+    """
+    return project_business_hours(active_locations())
+
+
+def active_locations():
+    return Location.objects.filter(is_active=True).prefetch_related("hours").order_by("name")
+
+
+def list_payload(data, locations) -> list:
+    """
+    Settings rows (serialized) with the location projections injected into
+    each item. Shared by the sync list and the async one (views_async.py).
+    """
+    business_hours = project_business_hours(locations)
+    dynamic_locations = LocationSerializer(locations, many=True).data
+    return [
+        {**dict(item), "business_hours": business_hours, "dynamic_locations": dynamic_locations}
+        for item in data
+    ]
+
+
+class ScheduleSettingsViewSet(PracticeScopedViewMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     """
     CRUD for settings. In practice there will be a single row.
     GET /api/schedule-settings/        -> list (usually length 1)
@@ -52,11 +78,16 @@ class ScheduleSettingsViewSet(viewsets.ModelViewSet):
     serializer_class = ScheduleSettingsSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def settings_queryset(self):
+        """The practice's settings rows; builds the query only (no I/O), so the async list shares it."""
+        return super().get_queryset()
+
     def get_queryset(self):
-        qs = super().get_queryset()
+        qs = self.settings_queryset()
         if not qs.exists():
             ScheduleSettings.objects.create()
-            qs = super().get_queryset()
+            # Just written: read it back from the primary, not a lagging replica.
+            qs = qs.using(DEFAULT_DB_ALIAS)
         return qs
 
     def _inject_location_projection(self, base_data: dict) -> dict:
@@ -66,11 +97,10 @@ class ScheduleSettingsViewSet(viewsets.ModelViewSet):
         - business_hours come from LocationHours
         - dynamic_locations come from Location
         """
-        base_data["business_hours"] = build_business_hours_from_locations()
-        base_data["dynamic_locations"] = LocationSerializer(
-            Location.objects.filter(is_active=True).order_by("name"),
-            many=True,
-        ).data
+        # One locations query + one hours query feed both projections.
+        locations = list(active_locations())
+        base_data["business_hours"] = project_business_hours(locations)
+        base_data["dynamic_locations"] = LocationSerializer(locations, many=True).data
         return base_data
 
     def retrieve(self, request, *args, **kwargs):
@@ -79,12 +109,6 @@ class ScheduleSettingsViewSet(viewsets.ModelViewSet):
         return Response(self._inject_location_projection(data))
 
     def list(self, request, *args, **kwargs):
-        qs = self.get_queryset()
-        serializer = self.get_serializer(qs, many=True)
-        data = serializer.data
-
+        data = self.get_serializer(self.get_queryset(), many=True).data
         # In practice there is one row. Inject projections into each item for consistency.
-        if isinstance(data, list):
-            data = [self._inject_location_projection(dict(item)) for item in data]
-
-        return Response(data)
+        return Response(list_payload(data, list(active_locations())))
@@ -0,0 +1,28 @@
+# backend/schedule/views_async.py
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.response import Response
+
+from core.async_api import AsyncListView
+
+from .models import ScheduleSettings
+from .views import ScheduleSettingsViewSet, active_locations, list_payload
+
+
+class ScheduleSettingsListAsyncView(AsyncListView):
+    """
+    Async GET /api/schedule-settings/.
+    Same payload as ScheduleSettingsViewSet.list(): the ViewSet's queryset and
+    list_payload(), with the missing-row check and the reads done async.
+    """
+    viewset_class = ScheduleSettingsViewSet
+
+    async def alist(self, viewset) -> Response:
+        qs = viewset.settings_queryset()
+        if not await qs.aexists():
+            await ScheduleSettings.objects.acreate()
+            qs = qs.using(DEFAULT_DB_ALIAS)
+
+        rows = [s async for s in qs]
+        data = viewset.get_serializer(rows, many=True).data
+        locations = [loc async for loc in active_locations()]
+        return Response(list_payload(data, locations))
@@ -0,0 +1,19 @@
+from django.contrib import admin
+
+from .models import WaitlistEntry, WaitlistOffer
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ("id", "patient", "appointment_type", "earliest_date", "latest_date", "priority", "auto_book", "status")
+    list_filter = ("status", "auto_book")
+    search_fields = ("patient__first_name", "patient__last_name")
+    raw_id_fields = ("patient", "created_by")
+
+
+@admin.register(WaitlistOffer)
+class WaitlistOfferAdmin(admin.ModelAdmin):
+    list_display = ("id", "entry", "provider", "date", "start_time", "end_time", "status", "expires_at")
+    list_filter = ("status",)
+    raw_id_fields = ("entry", "source_appointment", "provider", "location", "appointment")
+    date_hierarchy = "date"
@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+
+
+class WaitlistConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'waitlist'
+
+    def ready(self):
+        # Signal wiring only; no database access at startup.
+        from appointments.signals import appointment_slot_freed
+
+        from .matcher import on_slot_freed
+
+        appointment_slot_freed.connect(on_slot_freed, dispatch_uid="waitlist.matcher")
@@ -0,0 +1,15 @@
+# backend/waitlist/management/commands/expire_waitlist_offers.py
+from django.core.management.base import BaseCommand
+
+from waitlist.matcher import expire_offers
+
+
+class Command(BaseCommand):
+    help = (
+        "Expire waitlist offers past WAITLIST_OFFER_TTL and pass their slots to the "
+        "next candidates. Run from cron every few minutes"
+    )
+
+    def handle(self, *args, **options):
+        expired = expire_offers()
+        self.stdout.write(f"waitlist: {expired} offer(s) expired")
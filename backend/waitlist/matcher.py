@@ -0,0 +1,327 @@
+# backend/waitlist/matcher.py
+"""
+Backfilling cancelled and no-show slots from the waitlist.
+
+AppointmentSerializer.update sends appointment_slot_freed (on commit) when an
+appointment becomes cancelled or no-show. slot_freed() turns the appointment
+into a Slot and match_slot() looks for the best waiting entry:
+
+- Candidates come from one query driven by the partial GIN index on
+  provider_ids (entries that name the slot's provider), OR'ed with the
+  partial index of entries that accept any provider; both cover waiting
+  entries only. Dates, weekdays, times, locations, type and duration filter
+  those rows, so the cost follows the entries that could want this provider,
+  not the length of the waitlist.
+- Highest priority wins, then the longest wait. Candidates are locked with
+  FOR UPDATE SKIP LOCKED, so two slots freed at once never go to the same
+  entry. Matching and booking for one provider-day serialize on an advisory
+  lock, so two overlapping slots cannot both be booked.
+- The winner gets a pending offer valid for WAITLIST_OFFER_TTL seconds or,
+  with auto_book, the appointment itself. A declined or expired offer passes
+  the slot to the next candidate (`manage.py expire_waitlist_offers`).
+
+Slots starting less than WAITLIST_MIN_LEAD minutes from now are not offered;
+no-shows are usually recorded after the time has passed. A slot is only
+offered within its own practice: matching runs with the freed appointment's
+practice current (core/tenancy.py), also from `expire_waitlist_offers`.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from appointments.models import Appointment
+from appointments.signals import FREED_STATUSES, notify_appointments_changed, scope_of
+from core import audit, metrics, tenancy
+from schedule.models import ScheduleSettings
+
+from .models import WaitlistEntry, WaitlistOffer
+
+
+logger = logging.getLogger("waitlist")
+
+# Namespace for pg_advisory_xact_lock(namespace, provider_id # day).
+_LOCK_NAMESPACE = 0x77616974  # "wait"
+
+
+class OfferError(Exception):
+    """The offer can no longer be accepted or declined."""
+
+
+@dataclass(frozen=True)
+class Slot:
+    provider_id: int
+    location_id: Optional[int]
+    office: str
+    date: date
+    start_time: dtime
+    end_time: dtime
+    # The start as an instant, in the appointment's own zone (Appointment.start_utc).
+    start_utc: datetime
+    appointment_type: str
+    source_appointment_id: Optional[int] = None
+    source_patient_id: Optional[int] = None
+
+    @classmethod
+    def from_appointment(cls, appt: Appointment) -> "Slot":
+        end = appt.end_time
+        if end is None or end <= appt.start_time:
+            end = (datetime.combine(appt.date, appt.start_time) + timedelta(minutes=appt.duration)).time()
+        return cls(
+            provider_id=appt.provider_id,
+            location_id=appt.location_id,
+            office=appt.office,
+            date=appt.date,
+            start_time=appt.start_time,
+            end_time=end,
+            start_utc=appt.start_utc,
+            appointment_type=appt.appointment_type,
+            source_appointment_id=appt.pk,
+            source_patient_id=appt.patient_id,
+        )
+
+    @property
+    def minutes(self) -> int:
+        return int((datetime.combine(self.date, self.end_time) - datetime.combine(self.date, self.start_time))
+                   .total_seconds() // 60)
+
+    def end_for(self, minutes: int) -> dtime:
+        return min(self.end_time, (datetime.combine(self.date, self.start_time) + timedelta(minutes=minutes)).time())
+
+
+def _lock(provider_id: int, day: date) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_advisory_xact_lock(%s, hashtext(%s))", [_LOCK_NAMESPACE, f"{provider_id}:{day}"],
+        )
+
+
+def _busy(day: date, start: dtime, end: dtime, **who) -> bool:
+    """Anything but cancelled / no-show appointments (blocks included) overlapping start-end."""
+    return (
+        Appointment.objects.filter(date=day, start_time__lt=end, end_time__gt=start, **who)
+        .exclude(status__in=FREED_STATUSES)
+        .exists()
+    )
+
+
+# -----------------------------
+# Matching
+# -----------------------------
+
+def candidates(slot: Slot):
+    """Waiting entries of the current practice the slot satisfies, best first."""
+    qs = tenancy.scoped(WaitlistEntry.objects, "patient__practice").filter(
+        Q(provider_ids__contains=[slot.provider_id]) | Q(provider_ids=[]),
+        status=WaitlistEntry.STATUS_WAITING,
+        earliest_date__lte=slot.date,
+        duration__lte=slot.minutes,
+    ).filter(
+        Q(latest_date__isnull=True) | Q(latest_date__gte=slot.date),
+        Q(weekdays=[]) | Q(weekdays__contains=[slot.date.weekday()]),
+        Q(earliest_time__isnull=True) | Q(earliest_time__lte=slot.start_time),
+        Q(latest_time__isnull=True) | Q(latest_time__gte=slot.start_time),
+        Q(appointment_type="") | Q(appointment_type=slot.appointment_type),
+    )
+    if slot.location_id:
+        qs = qs.filter(Q(location_ids=[]) | Q(location_ids__contains=[slot.location_id]))
+    else:
+        qs = qs.filter(location_ids=[])
+    if slot.source_patient_id:
+        qs = qs.exclude(patient_id=slot.source_patient_id)
+    if slot.source_appointment_id:
+        # Entries that already declined or let this slot expire.
+        qs = qs.exclude(offers__source_appointment_id=slot.source_appointment_id)
+    return qs.order_by("-priority", "created_at", "id")
+
+
+def match_slot(slot: Slot, now=None) -> Optional[WaitlistOffer]:
+    """Offer (or book) the slot to the best waiting entry; None if nobody fits."""
+    now = now or timezone.now()
+    if slot.start_utc < now + timedelta(minutes=settings.WAITLIST_MIN_LEAD):
+        return None
+    with transaction.atomic():
+        _lock(slot.provider_id, slot.date)
+        if slot.source_appointment_id and WaitlistOffer.objects.filter(
+            source_appointment_id=slot.source_appointment_id, status=WaitlistOffer.STATUS_PENDING,
+        ).exists():
+            return None
+        if _busy(slot.date, slot.start_time, slot.end_time, provider_id=slot.provider_id):
+            return None
+        entries = candidates(slot).select_for_update(skip_locked=True)[:settings.WAITLIST_CANDIDATES]
+        for entry in entries:
+            if _busy(slot.date, slot.start_time, slot.end_for(entry.duration), patient_id=entry.patient_id):
+                continue
+            return _offer(entry, slot, now)
+    return None
+
+
+def _offer(entry: WaitlistEntry, slot: Slot, now) -> WaitlistOffer:
+    offer = WaitlistOffer.objects.create(
+        entry=entry,
+        source_appointment_id=slot.source_appointment_id,
+        provider_id=slot.provider_id,
+        location_id=slot.location_id,
+        office=slot.office,
+        appointment_type=entry.appointment_type or slot.appointment_type,
+        date=slot.date,
+        start_time=slot.start_time,
+        end_time=slot.end_for(entry.duration),
+        expires_at=None if entry.auto_book else now + timedelta(seconds=settings.WAITLIST_OFFER_TTL),
+    )
+    if entry.auto_book:
+        _book(offer, None, now)
+    else:
+        entry.status = WaitlistEntry.STATUS_OFFERED
+        entry.save(update_fields=["status", "updated_at"])
+    return offer
+
+
+def _type_color(appointment_type: str) -> str:
+    ss = ScheduleSettings.objects.first()
+    if ss and isinstance(ss.appointment_types, list):
+        match = next((t for t in ss.appointment_types if t.get("name") == appointment_type), None)
+        if match:
+            return match.get("color_code", "#3B82F6")
+    return "#3B82F6"
+
+
+def _book(offer: WaitlistOffer, user, now) -> Appointment:
+    entry = offer.entry
+    appt = Appointment.objects.create(
+        patient_id=entry.patient_id,
+        provider_id=offer.provider_id,
+        location_id=offer.location_id,
+        office=offer.office,
+        appointment_type=offer.appointment_type,
+        color_code=_type_color(offer.appointment_type),
+        date=offer.date,
+        start_time=offer.start_time,
+        end_time=offer.end_time,
+        duration=entry.duration,
+        notes=f"Booked from waitlist entry #{entry.pk}.",
+    )
+    offer.status = WaitlistOffer.STATUS_ACCEPTED
+    offer.appointment = appt
+    offer.responded_at = now
+    offer.save(update_fields=["status", "appointment", "responded_at"])
+    entry.status = WaitlistEntry.STATUS_BOOKED
+    entry.save(update_fields=["status", "updated_at"])
+
+    notify_appointments_changed([scope_of(appt)])
+    audit.created(user, appt, metadata={"waitlist_entry": entry.pk, "waitlist_offer": offer.pk})
+    return appt
+
+
+# -----------------------------
+# Offer responses
+# -----------------------------
+
+def _close(offer: WaitlistOffer, status: str, now) -> None:
+    """End a pending offer; the entry waits again and the slot goes to the next candidate."""
+    offer.status = status
+    offer.responded_at = now
+    offer.save(update_fields=["status", "responded_at"])
+    WaitlistEntry.objects.filter(pk=offer.entry_id, status=WaitlistEntry.STATUS_OFFERED).update(
+        status=WaitlistEntry.STATUS_WAITING, updated_at=now,
+    )
+    if status != WaitlistOffer.STATUS_TAKEN and offer.source_appointment_id:
+        source_id = offer.source_appointment_id
+        transaction.on_commit(lambda: _safe_slot_freed(source_id))
+
+
+def _pending_offer(offer_id: int) -> WaitlistOffer:
+    offer = WaitlistOffer.objects.get(pk=offer_id)
+    _lock(offer.provider_id, offer.date)
+    return WaitlistOffer.objects.select_for_update(of=("self",)).select_related("entry").get(pk=offer_id)
+
+
+def accept(offer: WaitlistOffer, user=None, now=None) -> Appointment:
+    """Book a pending offer. Raises OfferError if it expired or the time was taken."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        offer = _pending_offer(offer.pk)
+        if offer.status != WaitlistOffer.STATUS_PENDING:
+            problem = f"Offer already {offer.status}."
+        elif offer.expires_at and offer.expires_at <= now:
+            _close(offer, WaitlistOffer.STATUS_EXPIRED, now)
+            problem = "Offer expired."
+        elif _busy(offer.date, offer.start_time, offer.end_time, provider_id=offer.provider_id):
+            _close(offer, WaitlistOffer.STATUS_TAKEN, now)
+            problem = "The time has been booked in the meantime."
+        else:
+            return _book(offer, user, now)
+    raise OfferError(problem)
+
+
+def decline(offer: WaitlistOffer, user=None, now=None) -> WaitlistOffer:
+    now = now or timezone.now()
+    with transaction.atomic():
+        offer = _pending_offer(offer.pk)
+        if offer.status != WaitlistOffer.STATUS_PENDING:
+            raise OfferError(f"Offer already {offer.status}.")
+        _close(offer, WaitlistOffer.STATUS_DECLINED, now)
+    return offer
+
+
+def withdraw(entry: WaitlistEntry, now=None) -> None:
+    """Take an entry off the waitlist, passing on any slot it is being offered."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        for offer in WaitlistOffer.objects.filter(entry=entry, status=WaitlistOffer.STATUS_PENDING):
+            _close(offer, WaitlistOffer.STATUS_DECLINED, now)
+        WaitlistEntry.objects.filter(pk=entry.pk).update(status=WaitlistEntry.STATUS_CANCELLED, updated_at=now)
+
+
+def expire_offers(now=None) -> int:
+    """Expire pending offers past expires_at; returns how many."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        offers = list(
+            WaitlistOffer.objects.select_for_update(skip_locked=True)
+            .filter(status=WaitlistOffer.STATUS_PENDING, expires_at__lte=now)
+        )
+        for offer in offers:
+            _close(offer, WaitlistOffer.STATUS_EXPIRED, now)
+    return len(offers)
+
+
+# -----------------------------
+# Signal entry point
+# -----------------------------
+
+def slot_freed(appointment_id: int, now=None) -> Optional[WaitlistOffer]:
+    appt = Appointment.objects.filter(pk=appointment_id).first()
+    if appt is None or appt.status not in FREED_STATUSES or appt.is_block or appt.start_time is None:
+        return None
+    started = time.perf_counter()
+    with tenancy.use_practice(appt.practice_id):
+        offer = match_slot(Slot.from_appointment(appt), now)
+    metrics.observe_job("waitlist_match", time.perf_counter() - started)
+    if offer is not None:
+        logger.info(
+            "Appointment #%s freed: %s waitlist entry #%s (offer #%s)",
+            appointment_id, "booked" if offer.appointment_id else "offered to", offer.entry_id, offer.pk,
+        )
+    return offer
+
+
+def _safe_slot_freed(appointment_id: int) -> None:
+    # Runs after the request's transaction committed: never fail the request.
+    try:
+        slot_freed(appointment_id)
+    except Exception:
+        logger.exception("Waitlist matching failed for appointment #%s", appointment_id)
+
+
+def on_slot_freed(sender, appointment_id, **kwargs) -> None:
+    if settings.WAITLIST_ENABLED:
+        _safe_slot_freed(appointment_id)
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:46
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('appointments', '0012_start_utc'),
+        ('locations', '0003_alter_location_slug'),
+        ('patients', '0009_alter_patient_options'),
+        ('providers', '0002_provider_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('appointment_type', models.CharField(blank=True, default='', max_length=100)),
+                ('duration', models.PositiveIntegerField(default=30)),
+                ('provider_ids', django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), blank=True, default=list, size=None)),
+                ('location_ids', django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), blank=True, default=list, size=None)),
+                ('weekdays', django.contrib.postgres.fields.ArrayField(base_field=models.PositiveSmallIntegerField(), blank=True, default=list, size=None)),
+                ('earliest_date', models.DateField()),
+                ('latest_date', models.DateField(blank=True, null=True)),
+                ('earliest_time', models.TimeField(blank=True, null=True)),
+                ('latest_time', models.TimeField(blank=True, null=True)),
+                ('priority', models.SmallIntegerField(default=0, help_text='Higher is offered first.')),
+                ('auto_book', models.BooleanField(default=False, help_text='Book a matching slot without asking.')),
+                ('status', models.CharField(choices=[('waiting', 'Waiting'), ('offered', 'Offered a slot'), ('booked', 'Booked'), ('cancelled', 'Cancelled')], default='waiting', max_length=10)),
+                ('notes', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='patients.patient')),
+            ],
+            options={
+                'verbose_name_plural': 'waitlist entries',
+                'ordering': ['-priority', 'created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='WaitlistOffer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('office', models.CharField(max_length=64)),
+                ('appointment_type', models.CharField(max_length=100)),
+                ('date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('accepted', 'Accepted'), ('declined', 'Declined'), ('expired', 'Expired'), ('taken', 'Slot taken')], default='pending', max_length=10)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('responded_at', models.DateTimeField(blank=True, null=True)),
+                ('appointment', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='appointments.appointment')),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offers', to='waitlist.waitlistentry')),
+                ('location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='locations.location')),
+                ('provider', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='providers.provider')),
+                ('source_appointment', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='appointments.appointment')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='waitlistentry',
+            index=django.contrib.postgres.indexes.GinIndex(condition=models.Q(('status', 'waiting')), fields=['provider_ids'], name='waitlist_providers_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='waitlistentry',
+            index=models.Index(condition=models.Q(('provider_ids', []), ('status', 'waiting')), fields=['earliest_date'], name='waitlist_any_provider_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='waitlistoffer',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['expires_at'], name='waitlist_offer_expiry_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='waitlistoffer',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('source_appointment',), name='waitlist_offer_pending_uniq'),
+        ),
+    ]
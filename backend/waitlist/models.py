@@ -0,0 +1,141 @@
+# backend/waitlist/models.py
+from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models
+
+from appointments.models import Appointment
+from locations.models import Location
+from patients.models import Patient
+from providers.models import Provider
+
+
+class WaitlistEntry(models.Model):
+    """
+    A patient waiting for an earlier or any slot.
+
+    Empty provider_ids / location_ids / weekdays and a blank appointment_type
+    mean "any". When an appointment is cancelled or marked no-show, the
+    matcher (waitlist/matcher.py) picks the highest-priority, oldest waiting
+    entry the freed slot satisfies and offers it the slot, or books it
+    straight away when auto_book is set.
+    """
+    STATUS_WAITING = "waiting"
+    STATUS_OFFERED = "offered"
+    STATUS_BOOKED = "booked"
+    STATUS_CANCELLED = "cancelled"
+    STATUS_CHOICES = [
+        (STATUS_WAITING, "Waiting"),
+        (STATUS_OFFERED, "Offered a slot"),
+        (STATUS_BOOKED, "Booked"),
+        (STATUS_CANCELLED, "Cancelled"),
+    ]
+
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name="waitlist_entries")
+    appointment_type = models.CharField(max_length=100, blank=True, default="")
+    # Minutes needed; the freed slot must be at least this long.
+    duration = models.PositiveIntegerField(default=30)
+
+    provider_ids = ArrayField(models.BigIntegerField(), default=list, blank=True)
+    location_ids = ArrayField(models.BigIntegerField(), default=list, blank=True)
+    # 0 = Monday ... 6 = Sunday.
+    weekdays = ArrayField(models.PositiveSmallIntegerField(), default=list, blank=True)
+    earliest_date = models.DateField()
+    latest_date = models.DateField(null=True, blank=True)
+    # Acceptable start times of day.
+    earliest_time = models.TimeField(null=True, blank=True)
+    latest_time = models.TimeField(null=True, blank=True)
+
+    priority = models.SmallIntegerField(default=0, help_text="Higher is offered first.")
+    auto_book = models.BooleanField(default=False, help_text="Book a matching slot without asking.")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_WAITING)
+    notes = models.TextField(blank=True, default="")
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name="+",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-priority", "created_at"]
+        verbose_name_plural = "waitlist entries"
+        indexes = [
+            # Candidate lookup: entries that name the slot's provider ...
+            GinIndex(
+                fields=["provider_ids"], name="waitlist_providers_gin",
+                condition=models.Q(status="waiting"),
+            ),
+            # ... or accept any provider.
+            models.Index(
+                fields=["earliest_date"], name="waitlist_any_provider_idx",
+                condition=models.Q(status="waiting", provider_ids=[]),
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Waitlist #{self.pk} patient {self.patient_id} ({self.status})"
+
+
+class WaitlistOffer(models.Model):
+    """
+    A freed slot offered to (or, with auto_book, booked for) a waitlist entry.
+
+    The slot is copied from the appointment that freed it, so the offer stays
+    meaningful if that appointment is edited or deleted later. Both appointment
+    references are unconstrained for that reason: deleting an appointment costs
+    no extra queries and may leave an offer pointing at a missing row.
+    """
+    STATUS_PENDING = "pending"
+    STATUS_ACCEPTED = "accepted"
+    STATUS_DECLINED = "declined"
+    STATUS_EXPIRED = "expired"
+    # Someone else booked the time before the offer was accepted.
+    STATUS_TAKEN = "taken"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_ACCEPTED, "Accepted"),
+        (STATUS_DECLINED, "Declined"),
+        (STATUS_EXPIRED, "Expired"),
+        (STATUS_TAKEN, "Slot taken"),
+    ]
+
+    entry = models.ForeignKey(WaitlistEntry, on_delete=models.CASCADE, related_name="offers")
+    source_appointment = models.ForeignKey(
+        Appointment, null=True, blank=True, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+",
+    )
+    provider = models.ForeignKey(Provider, on_delete=models.CASCADE, related_name="+")
+    location = models.ForeignKey(Location, null=True, blank=True, on_delete=models.CASCADE, related_name="+")
+    office = models.CharField(max_length=64)
+    appointment_type = models.CharField(max_length=100)
+    date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    # The appointment booked from this offer.
+    appointment = models.ForeignKey(
+        Appointment, null=True, blank=True, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    responded_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        constraints = [
+            # A freed slot is offered to one entry at a time.
+            models.UniqueConstraint(
+                fields=["source_appointment"], name="waitlist_offer_pending_uniq",
+                condition=models.Q(status="pending"),
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["expires_at"], name="waitlist_offer_expiry_idx",
+                condition=models.Q(status="pending"),
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Offer #{self.pk} {self.date} {self.start_time} to entry {self.entry_id} ({self.status})"
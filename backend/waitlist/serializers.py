@@ -0,0 +1,94 @@
+# backend/waitlist/serializers.py
+from rest_framework import serializers
+
+from core.perf import TimedSerializerMixin
+from locations.models import Location
+from providers.models import Provider
+
+from .models import WaitlistEntry, WaitlistOffer
+
+
+class WaitlistEntrySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    patient_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = WaitlistEntry
+        fields = [
+            "id",
+            "patient",
+            "patient_name",
+            "appointment_type",
+            "duration",
+            "provider_ids",
+            "location_ids",
+            "weekdays",
+            "earliest_date",
+            "latest_date",
+            "earliest_time",
+            "latest_time",
+            "priority",
+            "auto_book",
+            "status",
+            "notes",
+            "created_by",
+            "created_at",
+            "updated_at",
+        ]
+        # Status moves through offers (and DELETE, which withdraws the entry).
+        read_only_fields = ["id", "status", "created_by", "created_at", "updated_at"]
+
+    def get_patient_name(self, obj):
+        return str(obj.patient) if obj.patient else None
+
+    def _existing(self, model, ids, field):
+        ids = sorted(set(ids))
+        found = set(model.objects.filter(pk__in=ids).values_list("pk", flat=True)) if ids else set()
+        missing = [i for i in ids if i not in found]
+        if missing:
+            raise serializers.ValidationError({field: f"Unknown ids: {', '.join(map(str, missing))}."})
+        return ids
+
+    def validate(self, data):
+        if "provider_ids" in data:
+            data["provider_ids"] = self._existing(Provider, data["provider_ids"], "provider_ids")
+        if "location_ids" in data:
+            data["location_ids"] = self._existing(Location, data["location_ids"], "location_ids")
+        if "weekdays" in data:
+            if any(d < 0 or d > 6 for d in data["weekdays"]):
+                raise serializers.ValidationError({"weekdays": "Use 0 (Monday) to 6 (Sunday)."})
+            data["weekdays"] = sorted(set(data["weekdays"]))
+
+        def current(name):
+            return data.get(name, getattr(self.instance, name, None))
+
+        if current("latest_date") and current("earliest_date") and current("latest_date") < current("earliest_date"):
+            raise serializers.ValidationError({"latest_date": "Must not be before earliest_date."})
+        if current("latest_time") and current("earliest_time") and current("latest_time") < current("earliest_time"):
+            raise serializers.ValidationError({"latest_time": "Must not be before earliest_time."})
+        return data
+
+
+class WaitlistOfferSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    patient = serializers.IntegerField(source="entry.patient_id", read_only=True)
+
+    class Meta:
+        model = WaitlistOffer
+        fields = [
+            "id",
+            "entry",
+            "patient",
+            "source_appointment",
+            "provider",
+            "location",
+            "office",
+            "appointment_type",
+            "date",
+            "start_time",
+            "end_time",
+            "status",
+            "expires_at",
+            "appointment",
+            "created_at",
+            "responded_at",
+        ]
+        read_only_fields = fields
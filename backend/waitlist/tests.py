@@ -0,0 +1,184 @@
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from appointments.models import Appointment
+from locations.models import Location
+from patients.models import Patient
+from providers.models import Provider
+
+from . import matcher
+from .models import WaitlistEntry, WaitlistOffer
+
+
+@override_settings(
+    WAITLIST_ENABLED=True,
+    WAITLIST_MIN_LEAD=60,
+    QUERY_STATS_ENABLED=False,
+    REPORTING_ASYNC=False,
+)
+class WaitlistMatchingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(name="Waitlist Office", slug="waitlist-office")
+        cls.provider = Provider.objects.create(first_name="Ada", last_name="Lane", email="ada@example.com")
+        cls.other = Provider.objects.create(first_name="Ben", last_name="Hart", email="ben@example.com")
+        cls.patients = [
+            Patient.objects.create(first_name=f"P{i}", last_name="Waiting", date_of_birth="1980-01-01")
+            for i in range(5)
+        ]
+        cls.user = User.objects.create_user("frontdesk", password="x")
+        cls.day = timezone.localdate() + timedelta(days=7)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.appt = Appointment.objects.create(
+            patient=self.patients[0], provider=self.provider, location=self.location, office="waitlist-office",
+            appointment_type="Consult", date=self.day, start_time=time(10), end_time=time(10, 30),
+        )
+
+    def wait(self, patient, **fields):
+        fields.setdefault("earliest_date", timezone.localdate())
+        return WaitlistEntry.objects.create(patient=patient, **fields)
+
+    def cancel(self, appt=None):
+        appt = appt or self.appt
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                f"/api/appointments/{appt.pk}/",
+                {"status": "cancelled", "patient": appt.patient_id, "office": appt.office},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200, response.content[:300])
+
+    def test_cancellation_offers_slot_to_best_matching_entry(self):
+        self.wait(self.patients[1], provider_ids=[self.other.pk], priority=9)   # other provider
+        self.wait(self.patients[1], duration=60, priority=9)                     # too long
+        self.wait(self.patients[1], weekdays=[(self.day.weekday() + 1) % 7], priority=9)
+        self.wait(self.patients[1], latest_date=self.day - timedelta(days=1), priority=9)
+        self.wait(self.patients[1], appointment_type="Surgery", priority=9)
+        self.wait(self.patients[1], earliest_time=time(13), priority=9)
+        older = self.wait(self.patients[2], provider_ids=[self.provider.pk], priority=1)
+        self.wait(self.patients[3], priority=1)
+        self.wait(self.patients[4], priority=0)
+
+        self.cancel()
+        offer = WaitlistOffer.objects.get()
+        self.assertEqual(offer.entry, older)
+        self.assertEqual((offer.date, offer.start_time, offer.end_time), (self.day, time(10), time(10, 30)))
+        self.assertEqual(offer.status, WaitlistOffer.STATUS_PENDING)
+        older.refresh_from_db()
+        self.assertEqual(older.status, WaitlistEntry.STATUS_OFFERED)
+
+    def test_auto_book(self):
+        entry = self.wait(self.patients[1], auto_book=True, duration=20, appointment_type="Consult")
+        self.cancel()
+        offer = WaitlistOffer.objects.get()
+        self.assertEqual(offer.status, WaitlistOffer.STATUS_ACCEPTED)
+        booked = offer.appointment
+        self.assertEqual(
+            (booked.patient_id, booked.provider_id, booked.start_time, booked.end_time),
+            (self.patients[1].pk, self.provider.pk, time(10), time(10, 20)),
+        )
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, WaitlistEntry.STATUS_BOOKED)
+
+    def test_accept_and_decline(self):
+        first = self.wait(self.patients[1], priority=2)
+        second = self.wait(self.patients[2], priority=1)
+        self.cancel()
+        offer = WaitlistOffer.objects.get(entry=first)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f"/api/waitlist-offers/{offer.pk}/decline/")
+        self.assertEqual(response.json()["status"], WaitlistOffer.STATUS_DECLINED)
+        first.refresh_from_db()
+        self.assertEqual(first.status, WaitlistEntry.STATUS_WAITING)
+
+        # Passed on to the next candidate, never back to the one who declined.
+        next_offer = WaitlistOffer.objects.get(entry=second)
+        response = self.client.post(f"/api/waitlist-offers/{next_offer.pk}/accept/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(
+            Appointment.objects.filter(patient=self.patients[2], date=self.day, start_time=time(10)).exists()
+        )
+        self.assertEqual(self.client.post(f"/api/waitlist-offers/{next_offer.pk}/accept/").status_code, 409)
+
+    def test_slot_taken_before_accept(self):
+        self.wait(self.patients[1])
+        self.cancel()
+        offer = WaitlistOffer.objects.get()
+        Appointment.objects.create(
+            patient=self.patients[3], provider=self.provider, location=self.location, office="waitlist-office",
+            date=self.day, start_time=time(10), end_time=time(10, 30),
+        )
+        response = self.client.post(f"/api/waitlist-offers/{offer.pk}/accept/")
+        self.assertEqual(response.status_code, 409)
+        offer.refresh_from_db()
+        self.assertEqual(offer.status, WaitlistOffer.STATUS_TAKEN)
+
+    def test_expired_offer_moves_on(self):
+        self.wait(self.patients[1], priority=1)
+        nxt = self.wait(self.patients[2])
+        self.cancel()
+        with self.captureOnCommitCallbacks(execute=True):
+            expired = matcher.expire_offers(now=timezone.now() + timedelta(days=1))
+        self.assertEqual(expired, 1)
+        self.assertEqual(WaitlistOffer.objects.get(entry=nxt).status, WaitlistOffer.STATUS_PENDING)
+
+    def test_imminent_and_busy_slots_are_not_offered(self):
+        self.wait(self.patients[1])
+        Appointment.objects.filter(pk=self.appt.pk).update(status="no_show")
+        half_hour_before = timezone.make_aware(datetime.combine(self.day, time(9, 30)))
+        self.assertIsNone(matcher.slot_freed(self.appt.pk, now=half_hour_before))
+        Appointment.objects.filter(pk=self.appt.pk).update(status="pending")
+
+        # Patient 1 already has something at 10:00 that day.
+        Appointment.objects.create(
+            patient=self.patients[1], provider=self.other, location=self.location, office="waitlist-office",
+            date=self.day, start_time=time(10), end_time=time(11),
+        )
+        self.cancel()
+        self.assertFalse(WaitlistOffer.objects.exists())
+
+    def test_lead_time_is_measured_in_the_appointments_zone(self):
+        self.wait(self.patients[1])
+        # 10:00 in Tokyo is the evening before in Chicago (TIME_ZONE).
+        Appointment.objects.filter(pk=self.appt.pk).update(status="no_show", timezone="Asia/Tokyo")
+        self.appt.refresh_from_db()
+        self.assertIsNone(matcher.slot_freed(self.appt.pk, now=self.appt.start_utc - timedelta(minutes=30)))
+        offer = matcher.slot_freed(self.appt.pk, now=self.appt.start_utc - timedelta(hours=2))
+        self.assertEqual(offer.source_appointment_id, self.appt.pk)
+
+    def test_withdraw_passes_offer_on(self):
+        first = self.wait(self.patients[1], priority=1)
+        second = self.wait(self.patients[2])
+        self.cancel()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete(f"/api/waitlist/{first.pk}/").status_code, 204)
+        first.refresh_from_db()
+        self.assertEqual(first.status, WaitlistEntry.STATUS_CANCELLED)
+        self.assertTrue(WaitlistOffer.objects.filter(entry=second, status=WaitlistOffer.STATUS_PENDING).exists())
+
+    def test_entry_validation(self):
+        response = self.client.post("/api/waitlist/", {
+            "patient": self.patients[1].pk,
+            "provider_ids": [self.provider.pk, 999999],
+            "earliest_date": str(self.day),
+        }, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("provider_ids", response.json())
+
+        response = self.client.post("/api/waitlist/", {
+            "patient": self.patients[1].pk,
+            "provider_ids": [self.provider.pk],
+            "weekdays": [4, 0, 4],
+            "earliest_date": str(self.day),
+        }, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["weekdays"], [0, 4])
+        self.assertEqual(response.json()["created_by"], self.user.pk)
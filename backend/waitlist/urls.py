@@ -0,0 +1,8 @@
+# backend/waitlist/urls.py
+from rest_framework import routers
+
+from .views import WaitlistEntryViewSet, WaitlistOfferViewSet
+
+router = routers.DefaultRouter()
+router.register(r"waitlist", WaitlistEntryViewSet, basename="waitlist")
+router.register(r"waitlist-offers", WaitlistOfferViewSet, basename="waitlist-offer")
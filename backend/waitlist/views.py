@@ -0,0 +1,86 @@
+# backend/waitlist/views.py
+from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from core import tenancy
+
+from . import matcher
+from .models import WaitlistEntry, WaitlistOffer
+from .serializers import WaitlistEntrySerializer, WaitlistOfferSerializer
+
+
+def _statuses(request) -> list:
+    return [s for s in request.query_params.get("status", "").split(",") if s]
+
+
+class WaitlistEntryViewSet(tenancy.PracticeScopedViewMixin, viewsets.ModelViewSet):
+    """
+    Waitlist entries.
+      ?status=waiting,offered  ?patient=<id>
+
+    DELETE withdraws the entry (status cancelled) and passes any slot it is
+    being offered to the next candidate.
+    """
+    queryset = WaitlistEntry.objects.select_related("patient")
+    practice_field = "patient__practice"
+    serializer_class = WaitlistEntrySerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        statuses = _statuses(self.request)
+        if statuses:
+            qs = qs.filter(status__in=statuses)
+        patient = self.request.query_params.get("patient")
+        if patient:
+            qs = qs.filter(patient_id=patient)
+        return qs
+
+    def perform_create(self, serializer):
+        serializer.save(created_by=self.request.user)
+
+    def perform_destroy(self, instance):
+        matcher.withdraw(instance)
+
+
+class WaitlistOfferViewSet(tenancy.PracticeScopedViewMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Slots offered to waitlist entries.
+      ?status=pending  ?entry=<id>
+
+    POST /api/waitlist-offers/<id>/accept/ books the appointment;
+    POST .../decline/ passes the slot on. Both answer 409 when the offer is
+    no longer pending, has expired, or the time was booked meanwhile.
+    """
+    queryset = WaitlistOffer.objects.select_related("entry")
+    practice_field = "entry__patient__practice"
+    serializer_class = WaitlistOfferSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        statuses = _statuses(self.request)
+        if statuses:
+            qs = qs.filter(status__in=statuses)
+        entry = self.request.query_params.get("entry")
+        if entry:
+            qs = qs.filter(entry_id=entry)
+        return qs
+
+    def _respond(self, func):
+        offer = self.get_object()
+        try:
+            func(offer, self.request.user)
+        except matcher.OfferError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_409_CONFLICT)
+        offer.refresh_from_db()
+        return Response(self.get_serializer(offer).data)
+
+    @action(detail=True, methods=["post"])
+    def accept(self, request, pk=None):
+        return self._respond(matcher.accept)
+
+    @action(detail=True, methods=["post"])
+    def decline(self, request, pk=None):
+        return self._respond(matcher.decline)
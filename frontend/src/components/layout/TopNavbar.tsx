@@ -4,6 +4,7 @@ import React, { useEffect, useState } from "react";
 import { NavLink } from "react-router-dom";
 import Dropdown from "../ui/Dropdown";
 import API from "../../services/api";
+import { JobAcceptedDTO, waitForJob } from "../../services/jobs";
 import { useBusinessSettings } from "../../features/locations/hooks/useBusinessSettings";
 
 import ChevronDown from "lucide-react/dist/esm/icons/chevron-down";
@@ -73,7 +74,9 @@ const TopNavbar: React.FC<TopbarProps> = ({ onLogout, onOpenProfile }) => {
   const handleResetDemo = async () => {
     try {
       setResettingDemo(true);
-      await API.post("/demo/reset/");
+      const res = await API.post<JobAcceptedDTO>("/demo/reset/");
+      // The reset runs as a background job; reload once it has finished.
+      await waitForJob(res.data.job_id);
       window.location.reload();
     } catch (err) {
       console.error("Demo reset failed:", err);
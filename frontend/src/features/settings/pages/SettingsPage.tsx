@@ -4,6 +4,7 @@ import { useNavigate } from "react-router-dom";
 import { useCurrentProvider } from "../../providers/hooks/useCurrentProvider";
 import AppointmentTypesModal from "../components/AppointmentTypesModal";
 import API from "../../../services/api";
+import { JobAcceptedDTO, waitForJob } from "../../../services/jobs";
 
 const SettingsPage: React.FC = () => {
   const navigate = useNavigate();
@@ -25,7 +26,9 @@ const SettingsPage: React.FC = () => {
   const handleResetDemo = async () => {
     try {
       setDemoResetting(true);
-      await API.post("demo/reset/");
+      const res = await API.post<JobAcceptedDTO>("demo/reset/");
+      // The reset runs as a background job; wait for it before reloading.
+      await waitForJob(res.data.job_id);
       setDemoConfirmOpen(false);
       // simplest deterministic refresh to reload schedule + lists
       window.location.reload();
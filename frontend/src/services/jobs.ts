@@ -0,0 +1,49 @@
+// frontend/src/services/jobs.ts
+import API from "./api";
+
+export type JobStatus = "queued" | "running" | "succeeded" | "failed" | "cancelled";
+
+export interface JobDTO {
+  id: number;
+  kind: string;
+  status: JobStatus;
+  progress: number; // 0-100
+  progress_message: string;
+  result: unknown;
+  error: string;
+}
+
+/** 202 body of endpoints that hand their work to a background job. */
+export interface JobAcceptedDTO {
+  job_id: number;
+  kind: string;
+  status: JobStatus;
+  status_url: string;
+}
+
+const FINISHED: JobStatus[] = ["succeeded", "failed", "cancelled"];
+
+export async function getJob(id: number): Promise<JobDTO> {
+  const res = await API.get<JobDTO>(`jobs/${id}/`);
+  return res.data;
+}
+
+/**
+ * Poll a background job until it finishes. Resolves with the finished job
+ * when it succeeded; rejects with its error otherwise.
+ */
+export async function waitForJob(
+  id: number,
+  onProgress?: (job: JobDTO) => void,
+  intervalMs = 1000
+): Promise<JobDTO> {
+  for (;;) {
+    const job = await getJob(id);
+    onProgress?.(job);
+    if (FINISHED.includes(job.status)) {
+      if (job.status === "succeeded") return job;
+      throw new Error(job.error || `Job ${job.status}`);
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+}